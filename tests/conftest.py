@@ -5,6 +5,31 @@ import shutil
 from pathlib import Path
 import pytest
 
+def pytest_addoption(parser):
+    """Add the option to run the benchmarks."""
+    parser.addoption(
+        "--benchmarks", action="store_true", default=False,
+        help="Run the benchmarks as well."
+    )
+
+
+def pytest_configure(config):
+    """Register the custom markers."""
+    config.addinivalue_line(
+        "markers", "benchmark: slow measurements, skipped unless --benchmarks is given."
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip the benchmarks unless they are requested."""
+    if config.getoption("--benchmarks"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="Run with --benchmarks to include the benchmarks.")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
 @pytest.fixture(scope='function')
 def tik(tmp_path):
     """Initialize tik_manager4 for testing."""
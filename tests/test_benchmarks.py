@@ -0,0 +1,837 @@
+# pylint: skip-file
+"""Benchmarks for the database and object layers.
+
+The benchmarks are skipped by default. Run them with ``--benchmarks``
+and ``-s`` to see the reports. The behaviors they measure are covered by
+the regular tests.
+"""
+import builtins
+import os
+import time
+import tracemalloc
+from collections import Counter
+from types import SimpleNamespace
+from pathlib import Path
+
+import pytest
+
+from tik_manager4.core import io
+from tik_manager4.core import utils
+
+pytestmark = pytest.mark.benchmark
+
+
+class SyscallCounter:
+    """Count the file system calls made while the context is active."""
+
+    calls = ("stat", "lstat", "mkdir", "scandir", "listdir")
+
+    def __init__(self, monkeypatch):
+        self.monkeypatch = monkeypatch
+        self.counts = Counter()
+
+    def _wrap(self, owner, name):
+        original = getattr(owner, name)
+
+        def wrapper(*args, **kwargs):
+            self.counts[name] += 1
+            return original(*args, **kwargs)
+
+        self.monkeypatch.setattr(owner, name, wrapper)
+
+    def __enter__(self):
+        for name in self.calls:
+            self._wrap(os, name)
+        self._wrap(builtins, "open")
+        return self
+
+    def __exit__(self, *args):
+        self.monkeypatch.undo()
+
+
+class _CountingFile:
+    """File object proxy counting the written bytes."""
+
+    def __init__(self, file_obj, counter):
+        self._file = file_obj
+        self._counter = counter
+
+    def write(self, data):
+        self._counter.written += len(data)
+        return self._file.write(data)
+
+    def __enter__(self):
+        self._file.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        return self._file.__exit__(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class WriteCounter:
+    """Count the bytes written to the opened files while the context is active."""
+
+    def __init__(self, monkeypatch):
+        self.monkeypatch = monkeypatch
+        self.written = 0
+
+    def __enter__(self):
+        original = builtins.open
+
+        def wrapper(*args, **kwargs):
+            return _CountingFile(original(*args, **kwargs), self)
+
+        self.monkeypatch.setattr(builtins, "open", wrapper)
+        return self
+
+    def __exit__(self, *args):
+        self.monkeypatch.undo()
+
+
+@pytest.fixture(scope="function")
+def benchmark_project_path(files):
+    project_path = Path(utils.get_home_dir(), "t4_benchmark_DO_NOT_USE")
+    if project_path.exists():
+        files.force_remove_directory(project_path)
+    yield str(project_path)
+    if project_path.exists():
+        files.force_remove_directory(project_path)
+
+
+def test_syscalls_opening_a_populated_category(benchmark_project_path, tik, monkeypatch):
+    """Count the file system calls for opening a category with works."""
+    work_count = 30
+    tik.user.set("Admin", "1234")
+    tik.create_project(benchmark_project_path, structure_template="empty")
+    tik.set_project(benchmark_project_path)
+    sub = tik.project.create_sub_project("bench", mode="asset", parent_path="")
+    task = tik.project.create_task("bench_task", categories=["Model"], parent_path=sub.path)
+    for nmb in range(work_count):
+        task.categories["Model"].create_work(f"work_{nmb}")
+
+    reports = []
+    for label in ("cold", "warm"):
+        if label == "cold":
+            io.invalidate_cache()
+        with SyscallCounter(monkeypatch) as counter:
+            start = time.perf_counter()
+            task.refresh()
+            works = task.categories["Model"].works
+            elapsed = time.perf_counter() - start
+        assert len(works) == work_count
+        reports.append((label, dict(counter.counts), elapsed))
+        # opening the category must not touch the folders
+        assert counter.counts["mkdir"] == 0
+
+    for label, counts, elapsed in reports:
+        print(f"\n{label} open of {work_count} works: {counts} in {elapsed:.4f}s")
+    # the warm open is served from the json cache
+    assert reports[1][1].get("open", 0) < reports[0][1].get("open", 0)
+
+
+def _build_structure(count, branching=10):
+    """Build a project structure dictionary with the given subproject count."""
+    root = {"id": 0, "name": "bench", "path": "", "subs": []}
+    queue = [root]
+    created = 0
+    while created < count:
+        parent = queue.pop(0)
+        for nmb in range(branching):
+            if created >= count:
+                break
+            created += 1
+            path = f"{parent['path']}/sub_{nmb}".lstrip("/")
+            sub = {"id": created, "name": f"sub_{nmb}", "path": path,
+                   "mode": "asset", "fps": 25, "subs": []}
+            parent["subs"].append(sub)
+            queue.append(sub)
+    return root
+
+
+def _build_work(version_count):
+    """Build a work dictionary with the given version count."""
+    return {
+        "name": "bench_work",
+        "creator": "Admin",
+        "category": "Model",
+        "dcc": "Maya",
+        "versions": [
+            {
+                "version_number": nmb,
+                "workstation": "workstation",
+                "notes": "Lorem ipsum dolor sit amet " * 2,
+                "thumbnail": f"thumbnails/bench_work_v{nmb:03d}_thumbnail.jpg",
+                "scene_path": f"bench_work/bench_work_v{nmb:03d}.ma",
+                "user": "Admin",
+                "previews": {},
+                "file_format": ".ma",
+                "dcc_version": "2024",
+            }
+            for nmb in range(1, version_count + 1)
+        ],
+    }
+
+
+@pytest.mark.parametrize("backend", sorted(io.BACKENDS))
+@pytest.mark.parametrize("compact", [False, True])
+def test_json_backends(tmp_path, backend, compact):
+    """Compare the read/write times of the json backends."""
+    subproject_count = 5000
+    version_count = 500
+    repeat = 3
+    previous_backend = io.get_json_backend()
+    io.set_json_backend(backend)
+    io.set_compact_folder(str(tmp_path), compact)
+    try:
+        for label, data, file_name in (
+            ("structure", _build_structure(subproject_count), "project_structure.json"),
+            ("work", _build_work(version_count), "bench_work.twork"),
+        ):
+            _io = io.IO(file_path=str(tmp_path / file_name))
+            start = time.perf_counter()
+            for _ in range(repeat):
+                _io.write(data)
+            write_time = (time.perf_counter() - start) / repeat
+            start = time.perf_counter()
+            for _ in range(repeat):
+                io.invalidate_cache()
+                read_data = _io.read()
+            read_time = (time.perf_counter() - start) / repeat
+            assert read_data == data
+            size = (tmp_path / file_name).stat().st_size
+            print(f"\n{backend:>6} {'compact' if compact else 'pretty':>7} {label:>9}: "
+                  f"write {write_time:.4f}s, read {read_time:.4f}s, {size / 1024:.0f} KB")
+    finally:
+        io.set_json_backend(previous_backend)
+        io.set_compact_folder(str(tmp_path), False)
+
+
+def _age_folders(root, seconds=60):
+    """Move the modified times of the folders out of the racy window."""
+    past = time.time() - seconds
+    for folder in (Path(root), *Path(root).rglob("*")):
+        if folder.is_dir():
+            os.utime(folder, (past, past))
+
+
+def test_incremental_rescans(benchmark_project_path, tik, monkeypatch):
+    """Compare the full and incremental scans of an unchanged tree."""
+    task_count = 20
+    work_count = 10
+    tik.user.set("Admin", "1234")
+    tik.create_project(benchmark_project_path, structure_template="empty")
+    tik.set_project(benchmark_project_path)
+    sub = tik.project.create_sub_project("bench", mode="asset", parent_path="")
+    for nmb in range(task_count):
+        task = tik.project.create_task(f"task_{nmb}", categories=["Model"], parent_path=sub.path)
+        for work_nmb in range(work_count):
+            task.categories["Model"].create_work(f"work_{work_nmb}")
+    _age_folders(tik.project.database_path)
+
+    def navigate(force):
+        for _task in sub.scan_tasks(force=force).values():
+            works = _task.categories["Model"].scan_works(force=force)
+            for work in works.values():
+                work.publish.scan_publish_versions(force=force)
+
+    navigate(force=True)
+    reports = []
+    for label, force in (("full", True), ("incremental", False)):
+        with SyscallCounter(monkeypatch) as counter:
+            start = time.perf_counter()
+            navigate(force)
+            elapsed = time.perf_counter() - start
+        reports.append((label, dict(counter.counts), elapsed))
+
+    for label, counts, elapsed in reports:
+        print(f"\n{label} scan of {task_count} tasks x {work_count} works: {counts} in {elapsed:.4f}s")
+    assert reports[0][1]["scandir"] > 0
+    assert reports[1][1].get("scandir", 0) == 0
+    assert reports[1][1].get("open", 0) == 0
+
+
+def test_task_model_population(qapp):
+    """Measure populating the task model and reading the visible rows."""
+    from tik_manager4.ui.Qt import QtCore
+    from tik_manager4.ui.mcv.task_mcv import TikTaskModel
+
+    task_count = 20000
+    visible_rows = 50
+    parent_sub = SimpleNamespace(id=1)
+    tasks = [
+        SimpleNamespace(name=f"task_{nmb}", nice_name=None, id=nmb, path=f"bench/task_{nmb}",
+                        type="asset", state="active", deleted=False, parent_sub=parent_sub)
+        for nmb in range(task_count)
+    ]
+
+    model = TikTaskModel()
+    tracemalloc.start()
+    start = time.perf_counter()
+    model.append_tasks(tasks)
+    populate_time = time.perf_counter() - start
+    memory, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert model.rowCount() == task_count
+
+    roles = (QtCore.Qt.DisplayRole, QtCore.Qt.ForegroundRole,
+             QtCore.Qt.FontRole, QtCore.Qt.DecorationRole)
+    start = time.perf_counter()
+    for row in range(visible_rows):
+        for column in range(model.columnCount()):
+            for role in roles:
+                model.data(model.index(row, column), role)
+    data_time = time.perf_counter() - start
+    assert model.data(model.index(visible_rows, 0)) == f"task_{visible_rows}"
+
+    print(f"\npopulating {task_count} tasks: {populate_time:.4f}s, {memory / 1024:.0f} KB, "
+          f"data of {visible_rows} visible rows: {data_time:.4f}s")
+
+
+def test_bulk_creation(benchmark_project_path, tik, monkeypatch):
+    """Compare the per call and the batched creation of subprojects and tasks."""
+    shot_count = 100
+    tik.user.set("Admin", "1234")
+    tik.create_project(benchmark_project_path, structure_template="empty")
+    tik.set_project(benchmark_project_path)
+    project = tik.project
+
+    def create(parent):
+        project.create_sub_project(parent, parent_path="")
+        for nmb in range(shot_count):
+            sub = project.create_sub_project(f"SH{nmb:04d}", parent_path=parent)
+            project.create_task("Layout", categories=["Layout"], parent_uid=sub.id)
+
+    reports = []
+    for label in ("per call", "batch"):
+        with SyscallCounter(monkeypatch) as counter:
+            start = time.perf_counter()
+            if label == "batch":
+                with project.batch():
+                    create("Batch")
+            else:
+                create("PerCall")
+            elapsed = time.perf_counter() - start
+        reports.append((label, dict(counter.counts), elapsed))
+
+    for label, counts, elapsed in reports:
+        print(f"\n{label} creation of {shot_count} shots with a task: {counts} in {elapsed:.4f}s")
+    tik.set_project(benchmark_project_path)
+    assert len(tik.project.find_sub_by_path("Batch").subs) == shot_count
+    assert reports[1][1]["stat"] < reports[0][1]["stat"]
+    assert reports[1][1]["open"] < reports[0][1]["open"]
+
+
+def test_metadata_inheritance(tik):
+    """Measure building a large structure with inherited metadata."""
+    from tik_manager4.objects.metadata import Metadata
+    from tik_manager4.objects.project import Project
+
+    subproject_count = 2000
+    structure = _build_structure(subproject_count)
+    for nmb, sub in enumerate(structure["subs"]):
+        sub.update({f"key_{key}": key for key in range(20)})
+        sub["mode"] = "shot" if nmb % 2 else "asset"
+        for child in sub["subs"]:
+            # only a few overrides below the first level
+            for grand_child in child["subs"]:
+                grand_child.pop("mode")
+                grand_child.pop("fps")
+
+    project = Project()
+    tracemalloc.start()
+    start = time.perf_counter()
+    project.set_sub_tree(structure)
+    # build all the subprojects
+    subs = project.find_subs_by_wildcard("*")
+    build_time = time.perf_counter() - start
+    memory, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(subs) == subproject_count
+
+    # the eager copies of the previous implementation
+    tracemalloc.start()
+    start = time.perf_counter()
+    copies = [Metadata(dict(sub.metadata.get_all_items())) for sub in subs]
+    copy_time = time.perf_counter() - start
+    copy_memory, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for sub in subs:
+        sub.metadata.get_value("key_10")
+    lookup_time = time.perf_counter() - start
+    assert project.get_sub_tree()["subs"] == structure["subs"]
+
+    print(f"\nbuilding {subproject_count} subprojects: {build_time:.4f}s, {memory / 1024:.0f} KB; "
+          f"eager metadata copies: {copy_time:.4f}s, {copy_memory / 1024:.0f} KB; "
+          f"lookups: {lookup_time:.4f}s")
+
+
+def test_structure_load_and_save(tik):
+    """Measure loading and saving a large project structure."""
+    from tik_manager4.objects.project import Project
+
+    subproject_count = 20000
+    structure = _build_structure(subproject_count)
+    deepest = structure
+    while deepest["subs"]:
+        deepest = deepest["subs"][-1]
+
+    project = Project()
+    start = time.perf_counter()
+    project.set_sub_tree(structure)
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    assert project.find_sub_by_path(deepest["path"]).id == deepest["id"]
+    branch_time = time.perf_counter() - start
+    start = time.perf_counter()
+    data = project.get_sub_tree()
+    save_time = time.perf_counter() - start
+    assert data["subs"] == structure["subs"]
+
+    start = time.perf_counter()
+    subs = project.find_subs_by_wildcard("*")
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    data = project.get_sub_tree()
+    full_save_time = time.perf_counter() - start
+
+    assert len(subs) == subproject_count
+    assert data["subs"] == structure["subs"]
+    print(f"\n{subproject_count} subprojects: load {load_time:.4f}s, "
+          f"find deepest {branch_time:.4f}s, save {save_time:.4f}s, "
+          f"build all {build_time:.4f}s, save all built {full_save_time:.4f}s")
+
+
+@pytest.mark.parametrize("version_count", [10, 100, 1000])
+def test_work_version_journal(tmp_path, tik, monkeypatch, version_count):
+    """Compare the save latency of the whole file writes and the journal."""
+    from tik_manager4.objects.work import Work
+
+    save_count = 50
+    reports = []
+    for label, journaled in (("whole file", False), ("journal", True)):
+        work_path = tmp_path / label.replace(" ", "_") / "bench_work.twork"
+        work_data = _build_work(version_count)
+        work_data["path"] = "bench"
+        io.IO(str(work_path)).write(work_data)
+        io.set_journal_folder(str(work_path.parent), journaled)
+        try:
+            work = Work(work_path)
+            with WriteCounter(monkeypatch) as counter:
+                start = time.perf_counter()
+                for nmb in range(save_count):
+                    work.get_version(version_count - nmb % 10).notes = f"edit {nmb}"
+                    work.apply_settings()
+                elapsed = time.perf_counter() - start
+        finally:
+            io.set_journal_folder(str(work_path.parent), False)
+        reloaded = Work(work_path)
+        assert reloaded.version_count == version_count
+        assert reloaded.get_version(version_count - 9).notes == f"edit {save_count - 1}"
+        reports.append((label, counter.written, elapsed))
+
+    for label, written, elapsed in reports:
+        print(f"\n{label} saves with {version_count} versions: "
+              f"{elapsed / save_count * 1000:.3f}ms and {written // save_count} bytes per save")
+    assert reports[1][1] < reports[0][1]
+
+
+def test_work_version_records(tmp_path, tik):
+    """Measure the memory of a category with many works and versions."""
+    from copy import deepcopy
+    from tik_manager4.objects.version import WorkVersion
+    from tik_manager4.objects.work import Work
+
+    work_count = 200
+    version_count = 300
+    work_data = _build_work(version_count)
+    work_data["path"] = "bench"
+    work_paths = []
+    for nmb in range(work_count):
+        work_path = tmp_path / f"work_{nmb}.twork"
+        io.IO(str(work_path)).write(work_data)
+        work_paths.append(work_path)
+
+    # the data, its copy and the version objects of the previous implementation
+    tracemalloc.start()
+    start = time.perf_counter()
+    previous = []
+    for work_path in work_paths:
+        data = io.IO(str(work_path)).read()
+        versions = [WorkVersion("bench", version, None) for version in data["versions"]]
+        previous.append((data, deepcopy(data), versions))
+    previous_time = time.perf_counter() - start
+    # leave the file contents kept by the json cache out
+    io.invalidate_cache()
+    previous_memory, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del previous
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    works = [Work(work_path) for work_path in work_paths]
+    load_time = time.perf_counter() - start
+    io.invalidate_cache()
+    memory, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    last_versions = [work.get_last_version() for work in works]
+    version_counts = [len(work.versions) for work in works]
+    query_time = time.perf_counter() - start
+    assert last_versions == [version_count] * work_count
+    assert version_counts == [version_count] * work_count
+    assert works[-1].get_version(version_count).scene_path == work_data["versions"][-1]["scene_path"]
+
+    print(f"\n{work_count} works x {version_count} versions: "
+          f"records {load_time:.4f}s, {memory / 1024:.0f} KB; "
+          f"version objects {previous_time:.4f}s, {previous_memory / 1024:.0f} KB; "
+          f"last version and count queries {query_time:.4f}s")
+
+
+def test_publish_listing(benchmark_project_path, tik, monkeypatch):
+    """Compare listing the publishes from the files and from the manifest."""
+    from tik_manager4.objects.version import PublishVersion
+    from tik_manager4.objects.work import Work
+
+    publish_count = 100
+    tik.user.set("Admin", "1234")
+    tik.create_project(benchmark_project_path, structure_template="empty")
+    tik.set_project(benchmark_project_path)
+    sub = tik.project.create_sub_project("bench", mode="asset", parent_path="")
+    task = tik.project.create_task("task", categories=["Model"], parent_path=sub.path)
+    work = task.categories["Model"].create_work("work")
+    publisher = tik.project.snapshot_publisher
+    for _ in range(publish_count):
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.resolve()
+        publisher.reserve()
+        publisher.extract()
+        publisher.publish()
+    _age_folders(tik.project.database_path)
+
+    def list_from_files():
+        # the previous implementation created every version on scan.
+        paths = sorted(Path(work.publish.get_publish_data_folder()).glob("*.tpub"))
+        versions = [PublishVersion(str(path)) for path in paths]
+        return max(version.version for version in versions)
+
+    def list_from_manifest():
+        loaded = Work(work.settings_file)
+        loaded.publish.scan_publish_versions()
+        return loaded.publish.get_last_version()
+
+    reports = []
+    for label, function in (("files", list_from_files), ("manifest", list_from_manifest)):
+        io.invalidate_cache()
+        with SyscallCounter(monkeypatch) as counter:
+            start = time.perf_counter()
+            last_version = function()
+            elapsed = time.perf_counter() - start
+        assert last_version == publish_count
+        reports.append((label, dict(counter.counts), elapsed))
+
+    for label, counts, elapsed in reports:
+        print(f"\nlisting {publish_count} publishes from the {label}: {counts} in {elapsed:.4f}s")
+    assert reports[1][1]["open"] < reports[0][1]["open"]
+
+
+def test_resolve_work_from_scene(benchmark_project_path, tik, monkeypatch):
+    """Compare resolving the work of a scene by searching and by the index."""
+    work_count = 200
+    tik.user.set("Admin", "1234")
+    tik.create_project(benchmark_project_path, structure_template="empty")
+    tik.set_project(benchmark_project_path)
+    sub = tik.project.create_sub_project("bench", mode="asset", parent_path="")
+    task = tik.project.create_task("task", categories=["Model"], parent_path=sub.path)
+    with tik.project.batch():
+        works = [task.categories["Model"].create_work(f"work_{nmb}") for nmb in range(work_count)]
+    # the searched work is the last one listed in the category
+    work_files = sorted(Path(works[0].settings_file).parent.glob("*.twork"))
+    target = next(work for work in works if work.settings_file == work_files[-1])
+    scene_path = target.get_abs_project_path(target.get_version(1).scene_path)
+    index_file = Path(target.scene_index.file_path)
+
+    reports = []
+    for label in ("search", "index"):
+        if label == "search":
+            index_file.unlink(missing_ok=True)
+            Path(f"{index_file}.journal").unlink(missing_ok=True)
+        io.invalidate_cache()
+        with SyscallCounter(monkeypatch) as counter:
+            start = time.perf_counter()
+            found_work, version_number = tik.project.find_work_by_absolute_path(scene_path)
+            elapsed = time.perf_counter() - start
+        assert (found_work.id, version_number) == (target.id, 1)
+        reports.append((label, dict(counter.counts), elapsed))
+
+    for label, counts, elapsed in reports:
+        print(f"\nresolving a scene in a category of {work_count} works by {label}: "
+              f"{counts} in {elapsed:.4f}s")
+    assert reports[1][1]["open"] < reports[0][1]["open"]
+
+
+def test_filelog_throughput(tmp_path, monkeypatch):
+    """Compare a file handler per message with the background writer."""
+    import logging
+    from tik_manager4.core import filelog
+
+    message_count = 2000
+    log = filelog.Filelog(logname="bench", filename="bench_log", filedir=str(tmp_path))
+    # the previous implementation opened and closed a handler per message.
+    legacy_logger = logging.getLogger("bench_legacy_log")
+    legacy_logger.setLevel(logging.DEBUG)
+    legacy_path = str(tmp_path / "bench_legacy_log.log")
+
+    start = time.perf_counter()
+    for nmb in range(message_count):
+        handler = logging.FileHandler(legacy_path)
+        legacy_logger.addHandler(handler)
+        legacy_logger.info(f"INFO     : message {nmb}")
+        legacy_logger.removeHandler(handler)
+        handler.close()
+    legacy_time = time.perf_counter() - start
+
+    with SyscallCounter(monkeypatch) as counter:
+        start = time.perf_counter()
+        for nmb in range(message_count):
+            log.info("message %s", nmb)
+        queue_time = time.perf_counter() - start
+        log.flush()
+        flush_time = time.perf_counter() - start
+
+    print(f"\n{message_count} messages: handler per message {legacy_time:.4f}s, "
+          f"queued {queue_time:.4f}s, written {flush_time:.4f}s "
+          f"with {counter.counts['open']} file opens")
+    assert "message 1999" in (tmp_path / "bench_log.log").read_text()
+    # the writer keeps the file open instead of opening it per message
+    assert counter.counts["open"] <= 1
+
+
+def test_startup_phases(tik, monkeypatch):
+    """Compare the time to the first paint of the eager and deferred startups."""
+    from tik_manager4.core import profiler
+    from tik_manager4.objects.main import Main
+
+    plugin_count = 20
+    commons_folder = tik.user.commons.folder_path
+    plugin_folder = Path(commons_folder, "plugins", "standalone", "extract")
+    plugin_folder.mkdir(parents=True, exist_ok=True)
+    for nmb in range(plugin_count):
+        # the sleep stands for importing from a network share.
+        (plugin_folder / f"studio_extract_{nmb}.py").write_text(
+            "import time\n"
+            "from tik_manager4.dcc.extract_core import ExtractCore\n\n"
+            "time.sleep(0.002)\n\n"
+            f"class StudioExtract{nmb}(ExtractCore):\n"
+            f"    name = 'studio_extract_{nmb}'\n"
+        )
+    monkeypatch.setattr(type(tik.dcc), "extracts", dict(tik.dcc.extracts))
+    monkeypatch.setattr(profiler, "PROFILER", profiler.StartupProfiler())
+    profiler.PROFILER.configure(enabled=True)
+
+    imported = []
+    import_from_path = utils.import_from_path
+
+    def counting_import(module_name, file_path, *args, **kwargs):
+        imported.append(file_path)
+        return import_from_path(module_name, file_path, *args, **kwargs)
+
+    monkeypatch.setattr(utils, "import_from_path", counting_import)
+
+    reports = []
+    for label, deferred in (("eager", False), ("deferred", True)):
+        imported.clear()
+        start = time.perf_counter()
+        tik_main = Main(common_folder=commons_folder, deferred=deferred)
+        first_paint = time.perf_counter() - start
+        plugin_imports = sum("studio_extract" in str(path) for path in imported)
+        print(f"\n{label} startup:")
+        # reports the deferred phases too
+        tik_main.finish_startup()
+        profiler.PROFILER.report()
+        reports.append((label, plugin_imports, first_paint))
+
+    for label, plugin_imports, elapsed in reports:
+        print(f"\ntime to the first paint with {plugin_count} common plugins, {label}: "
+              f"{plugin_imports} imported in {elapsed:.4f}s")
+    # the deferred startup imports the common plugins after the first paint
+    assert reports[0][1] == plugin_count
+    assert reports[1][1] == 0
+
+
+@pytest.mark.parametrize("strategy", ["Copy", "Reflink", "Hardlink", "Symlink"])
+def test_branch_materialization(benchmark_project_path, tik, tmp_path, strategy):
+    """Publish a bundled element and measure making it LIVE with each strategy."""
+    # 2 GB in production. Increase locally for meaningful numbers.
+    bundle_size = 64 * 1024 * 1024
+    file_count = 16
+    bundle = tmp_path / "cache_bundle"
+    bundle.mkdir()
+    chunk = os.urandom(bundle_size // file_count)
+    for nmb in range(file_count):
+        (bundle / f"cache.{nmb:04d}.abc").write_bytes(chunk)
+
+    tik.user.set("Admin", "1234")
+    tik.create_project(benchmark_project_path, structure_template="empty")
+    tik.set_project(benchmark_project_path)
+    tik.project.settings.edit_property("branch_materialization", strategy)
+    tik.project.settings.apply_settings(force=True)
+    sub = tik.project.create_sub_project("bench", mode="asset", parent_path="")
+    task = tik.project.create_task("task", categories=["Model"], parent_path=sub.path)
+    work = task.categories["Model"].create_work("work")
+    publisher = tik.project.snapshot_publisher
+    publisher.work_object = work
+    publisher.work_version = 1
+    publisher.source_path = str(bundle)
+    try:
+        publisher.resolve()
+        publisher.reserve()
+        publisher.extract()
+        start = time.perf_counter()
+        publisher.publish()
+        elapsed = time.perf_counter() - start
+    finally:
+        publisher.source_path = None
+
+    work.publish.scan_publish_versions()
+    live_version = work.publish.get_version(-1)
+    live_bundle = Path(live_version.get_element_path(live_version.elements[0]["type"], relative=False))
+    live_files = [path for path in live_bundle.rglob("*") if path.is_file()]
+    # the bytes written for the LIVE branch. Links share the published data.
+    new_bytes = sum(
+        path.stat().st_size for path in live_files
+        if not live_bundle.is_symlink() and path.stat().st_nlink == 1
+    )
+    print(f"\npublishing a {bundle_size // (1024 * 1024)} MB bundle with {strategy}: "
+          f"{elapsed:.4f}s, {new_bytes // (1024 * 1024)} MB written to LIVE")
+    assert len(live_files) == file_count
+    if strategy in ("Hardlink", "Symlink"):
+        assert new_bytes == 0
+
+
+def test_parallel_transfer(tmp_path):
+    """Copy a folder of many small files serially and with the transfer engine."""
+    import shutil
+    from tik_manager4.core import transfer
+
+    # thousands of files on network shares in production.
+    file_count = 2000
+    source = tmp_path / "source"
+    for nmb in range(file_count):
+        folder = source / f"sub_{nmb % 20:02d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"frame.{nmb:04d}.exr").write_bytes(os.urandom(4096))
+
+    start = time.perf_counter()
+    shutil.copytree(source, tmp_path / "serial")
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    state, msg = transfer.Transfer(source, tmp_path / "parallel").run()
+    parallel = time.perf_counter() - start
+    assert state, msg
+
+    print(f"\ncopying {file_count} files serially: {serial:.4f}s, "
+          f"with {transfer.DEFAULT_WORKERS} workers: {parallel:.4f}s")
+    assert len(list((tmp_path / "parallel").rglob("*.exr"))) == file_count
+
+
+@pytest.mark.parametrize("deduplicate", [False, True])
+def test_deduplicated_publishes(benchmark_project_path, tik, tmp_path, deduplicate):
+    """Publish the same bundle repeatedly and measure the stored bytes."""
+    # republishing unchanged textures and caches in production.
+    bundle_size = 16 * 1024 * 1024
+    file_count = 16
+    publish_count = 4
+    bundle = tmp_path / "texture_bundle"
+    bundle.mkdir()
+    for nmb in range(file_count):
+        (bundle / f"texture.{nmb:04d}.exr").write_bytes(os.urandom(bundle_size // file_count))
+
+    tik.user.set("Admin", "1234")
+    tik.create_project(benchmark_project_path, structure_template="empty")
+    tik.set_project(benchmark_project_path)
+    tik.project.settings.edit_property("deduplicate_publishes", deduplicate)
+    tik.project.settings.edit_property("branch_materialization", "Hardlink")
+    tik.project.settings.apply_settings(force=True)
+    sub = tik.project.create_sub_project("bench", mode="asset", parent_path="")
+    task = tik.project.create_task("task", categories=["LookDev"], parent_path=sub.path)
+    work = task.categories["LookDev"].create_work("work")
+    publisher = tik.project.snapshot_publisher
+    start = time.perf_counter()
+    for _ in range(publish_count):
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.source_path = str(bundle)
+        try:
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            publisher.publish()
+        finally:
+            publisher.source_path = None
+    elapsed = time.perf_counter() - start
+
+    inodes = {}
+    for path in Path(benchmark_project_path).rglob("*.exr"):
+        stat_result = path.stat()
+        inodes[(stat_result.st_dev, stat_result.st_ino)] = stat_result.st_size
+    stored = sum(inodes.values())
+    report = tik.project.blob_store.get_report()
+    print(f"\n{publish_count} publishes of a {bundle_size // (1024 * 1024)} MB bundle, "
+          f"deduplicate={deduplicate}: {elapsed:.4f}s, {stored // (1024 * 1024)} MB stored, "
+          f"ratio {report['ratio']:.2f}, {report['saved_bytes'] // (1024 * 1024)} MB saved")
+    if deduplicate:
+        assert stored == bundle_size
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_background_post_publish(benchmark_project_path, tik, tmp_path, background):
+    """Measure the time the artist waits for the publishes."""
+    from tik_manager4.objects import post_publish
+
+    bundle_size = 16 * 1024 * 1024
+    file_count = 16
+    publish_count = 4
+    bundle = tmp_path / "texture_bundle"
+    bundle.mkdir()
+    for nmb in range(file_count):
+        (bundle / f"texture.{nmb:04d}.exr").write_bytes(os.urandom(bundle_size // file_count))
+
+    tik.user.set("Admin", "1234")
+    tik.create_project(benchmark_project_path, structure_template="empty")
+    tik.set_project(benchmark_project_path)
+    tik.project.settings.edit_property("deduplicate_publishes", True)
+    tik.project.settings.apply_settings(force=True)
+    sub = tik.project.create_sub_project("bench", mode="asset", parent_path="")
+    task = tik.project.create_task("task", categories=["LookDev"], parent_path=sub.path)
+    work = task.categories["LookDev"].create_work("work")
+    publisher = tik.project.snapshot_publisher
+    waited = 0.0
+    start = time.perf_counter()
+    for _ in range(publish_count):
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.source_path = str(bundle)
+        try:
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            finalize_start = time.perf_counter()
+            publisher.publish(background=background)
+            waited += time.perf_counter() - finalize_start
+        finally:
+            publisher.source_path = None
+    assert post_publish.QUEUE.wait(timeout=120)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{publish_count} publishes of a {bundle_size // (1024 * 1024)} MB bundle, "
+          f"background={background}: finalize waited {waited:.4f}s, total {elapsed:.4f}s")
+    work.publish.scan_publish_versions()
+    assert work.publish.get_version(publish_count).is_live()
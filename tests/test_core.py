@@ -1,5 +1,8 @@
 """Tests for core modules."""
+import logging
+import queue
 import sys
+import threading
 import time
 import os
 import pytest
@@ -7,9 +10,12 @@ from unittest.mock import patch, MagicMock
 import platform
 import codecs
 from pathlib import Path
+from tik_manager4.core import blob_store
 from tik_manager4.core import filelog
 from tik_manager4.core import io
+from tik_manager4.core import profiler
 from tik_manager4.core import settings
+from tik_manager4.core import transfer
 from tik_manager4.core import utils
 from tik_manager4.external import fileseq
 from tik_manager4.external.filelock import FileLock, Timeout
@@ -66,6 +72,130 @@ def test_filelog(tmp_path: Path):
             }
     assert log.get_size() == nbytes_truth_per_system[platform.system()]
 
+
+def test_filelog_writer(tmp_path: Path):
+    """Test the log lines are written in the background and rotated."""
+    log = filelog.Filelog(logname="writer_test", filename="writer_log", filedir=str(tmp_path),
+                          date=False, time=False, size_cap=2000)
+    for nmb in range(100):
+        log.info("message %s", nmb)
+    assert log.get_last_message() == ("message 99", "info")
+    log.flush()
+    assert not (tmp_path / "writer_log.log.1").exists()
+    log.info("message %s", 100)
+    log.flush()
+    backup = tmp_path / "writer_log.log.1"
+    assert backup.is_file()
+    current = (tmp_path / "writer_log.log").read_text()
+    assert current.startswith("===========\nwriter_test\n")
+    assert current.endswith("\n\nINFO     : message 100\n")
+    assert backup.read_text().endswith("INFO     : message 99\n")
+
+    # the records of other loggers are not written to the file
+    logging.getLogger("writer_log.child").warning("not in the file")
+    log.flush()
+    assert "not in the file" not in (tmp_path / "writer_log.log").read_text()
+
+    # the same file is shared by the instances
+    other = filelog.Filelog(logname="other", filename="writer_log", filedir=str(tmp_path))
+    assert other._writer is log._writer
+
+
+def test_filelog_writer_recovery(tmp_path: Path, monkeypatch):
+    """Test the writer survives the failing batches and rotations."""
+    log = filelog.Filelog(logname="recovery_test", filename="recovery_log", filedir=str(tmp_path),
+                          date=False, time=False, size_cap=200)
+    writer = log._writer
+    log.info("ünïcödé ✓")
+    log.flush()
+    assert "ünïcödé ✓" in (tmp_path / "recovery_log.log").read_text(encoding="utf-8")
+
+    # a failing batch is reported and the writer carries on
+    def failing_write(lines):
+        raise ValueError("broken batch")
+    with monkeypatch.context() as patch:
+        patch.setattr(writer, "_write_lines", failing_write)
+        log.info("lost")
+        log.flush()
+        assert writer._thread.is_alive()
+    log.info("after the failure")
+    log.flush()
+    assert "after the failure" in (tmp_path / "recovery_log.log").read_text(encoding="utf-8")
+
+    # a dead writer thread is started again
+    class DeadQueue:
+        def get(self):
+            raise RuntimeError("writer died")
+
+        def get_nowait(self):
+            raise queue.Empty
+    live_queue = writer._queue
+    with monkeypatch.context() as patch:
+        patch.setattr(threading, "excepthook", lambda args: None)
+        patch.setattr(writer, "_queue", DeadQueue())
+        live_queue.put("wake up")
+        writer._thread.join(timeout=1.0)
+    assert not writer._thread.is_alive()
+    log.info("after the restart")
+    log.flush()
+    assert "after the restart" in (tmp_path / "recovery_log.log").read_text(encoding="utf-8")
+
+    # a file which cannot be rotated is appended without new headers
+    def failing_replace(*args):
+        raise PermissionError("in use")
+    monkeypatch.setattr(filelog.os, "replace", failing_replace)
+    for nmb in range(30):
+        log.info("message %s", nmb)
+        log.flush()
+    contents = (tmp_path / "recovery_log.log").read_text(encoding="utf-8")
+    assert contents.count("recovery_test") == 1
+    assert contents.endswith("INFO     : message 29\n")
+    assert not (tmp_path / "recovery_log.log.1").exists()
+
+
+def test_startup_profiler(tmp_path, monkeypatch):
+    """Test the startup phases are measured and reported."""
+    monkeypatch.setenv(profiler.ENV_VAR, "0")
+    _profiler = profiler.StartupProfiler()
+    assert not _profiler.enabled
+    with _profiler.phase("disabled"):
+        pass
+    assert _profiler.phases == []
+    assert _profiler.report() is None
+
+    report_path = tmp_path / "ci" / "startup.json"
+    monkeypatch.setenv(profiler.ENV_VAR, str(report_path))
+    _profiler.configure_from_env()
+    assert _profiler.enabled
+    assert _profiler.report_path == str(report_path)
+
+    with _profiler.phase("main"):
+        with _profiler.phase("user"):
+            time.sleep(0.01)
+        with _profiler.phase("project"):
+            pass
+    with _profiler.phase("ui"):
+        pass
+    names = [entry["name"] for entry in _profiler.phases]
+    assert names == ["main", "main/user", "main/project", "ui"]
+    assert _profiler.phases[1]["depth"] == 1
+    assert _profiler.phases[1]["duration"] >= 0.01
+    assert "  user" in _profiler.format_report()
+
+    data = _profiler.report()
+    assert data["total"] >= 0.01
+    assert json.loads(report_path.read_text())["phases"][0]["name"] == "main"
+    # the report starts over
+    assert _profiler.phases == []
+
+    monkeypatch.setenv(profiler.ENV_VAR, "")
+    _profiler.configure_from_env()
+    assert not _profiler.configure_from_args(["tik4_standalone.py"])
+    assert not _profiler.enabled
+    assert _profiler.configure_from_args(["tik4_standalone.py", "--profile-startup=out.json"])
+    assert _profiler.enabled and _profiler.report_path == "out.json"
+
+
 def test_creating_a_settings_object_with_and_without_arguments(tmp_path):
     """Test settings module"""
     # create a settings object without any arguments
@@ -271,6 +401,128 @@ def test_io(tmp_path):
     # test reading corrupted file
     pytest.raises(Exception, _io.read)
 
+
+def test_io_cache(tmp_path, monkeypatch):
+    """Test the process-wide json cache."""
+    monkeypatch.setattr(io, "CACHE", io.JsonCache(max_bytes=1024))
+    _settings = settings.Settings(file_path=str(tmp_path / "cached.json"))
+    _settings.add_property("test_string", "test")
+    _settings.apply_settings()
+
+    _io = io.IO(file_path=str(tmp_path / "cached.json"))
+    assert _io.read() == {"test_string": "test"}
+    assert io.CACHE.stats()["misses"] == 1
+    # served from the cache, and not shared between the callers
+    data = _io.read()
+    data["test_string"] = "changed"
+    assert _io.read() == {"test_string": "test"}
+    assert io.CACHE.stats()["hits"] == 2
+
+    # writing through settings invalidates the entry
+    _settings.edit_property("test_string", "new_value")
+    _settings.apply_settings()
+    assert io.CACHE.stats()["entries"] == 0
+    assert _io.read() == {"test_string": "new_value"}
+
+    # changes from other processes are detected by the stat signature
+    with open(tmp_path / "cached.json", "w") as f:
+        json.dump({"test_string": "external"}, f)
+    assert _io.read() == {"test_string": "external"}
+
+    # least recently used entries are evicted beyond the byte budget
+    for nmb in range(20):
+        _path = str(tmp_path / f"big_{nmb}.json")
+        with open(_path, "w") as f:
+            json.dump({"data": "x" * 100}, f)
+        io.IO(file_path=_path).read()
+    stats = io.CACHE.stats()
+    assert stats["bytes"] <= 1024
+    assert stats["evictions"] > 0
+
+    io.invalidate_cache()
+    assert io.CACHE.stats()["entries"] == 0
+
+
+def test_io_write_behind(tmp_path, monkeypatch):
+    """Test the atomic writes and the write-behind queue."""
+    dumps = []
+    original_dump = io.IO._dump_json
+    monkeypatch.setattr(io.IO, "_dump_json", staticmethod(
+        lambda data, file_path: dumps.append(file_path) or original_dump(data, file_path)))
+
+    test_path = tmp_path / "deferred.json"
+    _settings = settings.Settings(file_path=str(test_path))
+    with io.write_behind():
+        for nmb in range(5):
+            _settings.edit_property("value", nmb)
+            _settings.apply_settings()
+        assert not test_path.exists()
+        # reading back a pending file flushes it first
+        assert settings.Settings(file_path=str(test_path)).get_property("value") == 4
+        _settings.edit_property("value", 10)
+        _settings.apply_settings()
+        _settings.edit_property("value", 11)
+        _settings.apply_settings()
+    assert len(dumps) == 2
+    assert settings.Settings(file_path=str(test_path)).get_property("value") == 11
+    # no temporary files left behind and the lock is released
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+    with FileLock(str(test_path) + ".lock", timeout=0):
+        pass
+
+    # explicit flush within the context
+    with io.write_behind():
+        _settings.edit_property("value", 12)
+        _settings.apply_settings()
+        io.flush()
+        assert json.loads(test_path.read_text())["value"] == 12
+
+    # the writes of the other threads are not deferred
+    other_path = tmp_path / "other_thread.json"
+
+    def write_from_other_thread():
+        _other = settings.Settings(file_path=str(other_path))
+        _other.edit_property("value", 1)
+        _other.apply_settings()
+
+    with io.write_behind():
+        thread = threading.Thread(target=write_from_other_thread)
+        thread.start()
+        thread.join()
+        assert json.loads(other_path.read_text())["value"] == 1
+
+    # the failed delayed writes are retried
+    monkeypatch.setattr(io.WRITE_QUEUE, "delay", 0.01)
+    failures = []
+    original_locked_write = io.IO._locked_write
+
+    def failing_locked_write(_io, data, path_obj):
+        if len(failures) < 3:
+            failures.append(path_obj)
+            raise OSError("Share is not reachable")
+        return original_locked_write(_io, data, path_obj)
+
+    monkeypatch.setattr(io.IO, "_locked_write", failing_locked_write)
+    with io.write_behind():
+        _settings.edit_property("value", 13)
+        _settings.apply_settings()
+        for _ in range(200):
+            if json.loads(test_path.read_text())["value"] == 13:
+                break
+            time.sleep(0.01)
+        assert not io.WRITE_QUEUE.is_pending(test_path)
+    assert len(failures) == 3
+
+    # and raised to the caller if they still fail on the context exit
+    failures.clear()
+    monkeypatch.setattr(io.WRITE_QUEUE, "delay", 10)
+    with pytest.raises(OSError):
+        with io.write_behind():
+            _settings.edit_property("value", 14)
+            _settings.apply_settings()
+    assert json.loads(test_path.read_text())["value"] == 13
+    assert not io.WRITE_QUEUE.is_pending(test_path)
+
 def test_getting_home_dir(monkeypatch):
     """Test the utils module."""
     # test get_home_dir
@@ -572,6 +824,36 @@ def test_reload(tmp_path):
     settings.reload()
     assert settings.get_property("key1") == "value1"
 
+
+def test_apply_properties(tmp_path):
+    """Test writing only the given properties and reading back the others."""
+    settings_path = tmp_path / "settings.json"
+    settings = Settings(file_path=str(settings_path))
+    settings.set_data({"key1": "value1", "key2": "value2", "key3": "value3"})
+    settings.apply_settings(force=True)
+    other = Settings(file_path=str(settings_path))
+
+    other.edit_property("key2", "edited by the other")
+    other.apply_settings()
+    settings.edit_property("key1", "written")
+    settings.edit_property("key3", "not written")
+    settings.apply_properties("key1")
+    assert io.IO(str(settings_path)).read() == {
+        "key1": "written", "key2": "edited by the other", "key3": "value3"
+    }
+    # the unsaved edits are kept
+    assert settings.get_property("key2") == "edited by the other"
+    assert settings.get_property("key3") == "not written"
+    assert settings.is_settings_changed()
+
+    time.sleep(0.01)
+    other.edit_property("key2", "edited again")
+    other.apply_settings()
+    assert settings.refresh()
+    assert settings.get_property("key2") == "edited again"
+    assert settings.get_property("key3") == "not written"
+    assert not settings.refresh()
+
 def test_sanitize_text():
     """Test sanitize_text function."""
     assert utils.sanitize_text("Hello World!") == "Hello_World"
@@ -610,6 +892,268 @@ def test_write_unprotect(tmp_path):
     assert utils.write_unprotect(file) == (True, "Write protection removed.")
     assert os.access(file, os.W_OK)
 
+
+@pytest.mark.parametrize("strategy", ["copy", "auto", "reflink", "hardlink", "symlink"])
+def test_materialize(tmp_path, strategy):
+    """Test materializing files and folders with each strategy."""
+    source = tmp_path / "publish" / "v001" / "cache.abc"
+    source.parent.mkdir(parents=True)
+    source.write_text("v001")
+    utils.write_protect(source)
+    bundle = tmp_path / "publish" / "v001" / "bundle"
+    (bundle / "sub").mkdir(parents=True)
+    (bundle / "sub" / "frame.exr").write_text("frame")
+    target = tmp_path / "LIVE" / "cache.abc"
+    bundle_target = tmp_path / "LIVE" / "bundle"
+
+    # the targets created by any other strategy are replaced
+    for previous in ("hardlink", "symlink", strategy, strategy):
+        state, used = utils.materialize(source, target, strategy=previous)
+        assert state
+        state, used = utils.materialize(bundle, bundle_target, strategy=previous)
+        assert state
+    assert used in {"auto": ("reflink", "hardlink")}.get(strategy, (strategy,)) + ("copy",)
+    assert target.read_text() == "v001"
+    assert (bundle_target / "sub" / "frame.exr").read_text() == "frame"
+    assert not target.stat().st_mode & 0o222
+    if used == "hardlink":
+        assert os.path.samefile(source, target)
+    if used == "symlink":
+        assert not Path(os.readlink(target)).is_absolute()
+    assert sorted(path.name for path in tmp_path.joinpath("LIVE").iterdir()) == ["bundle", "cache.abc"]
+
+    # replacing the target never writes through to the linked source
+    newer = tmp_path / "publish" / "v002" / "cache.abc"
+    newer.parent.mkdir(parents=True)
+    newer.write_text("v002")
+    assert utils.materialize(newer, target, strategy="copy") == (True, "copy")
+    assert target.read_text() == "v002"
+    assert source.read_text() == "v001"
+    assert not source.stat().st_mode & 0o222
+    assert source.stat().st_nlink == 1
+
+    assert utils.materialize(tmp_path / "missing", target, strategy=strategy)[0] is False
+    assert utils.materialize(source, target, strategy="teleport") == (
+        False, "Unknown materialization strategy: teleport")
+
+
+def _make_transfer_source(root):
+    """Create a folder with small files, an empty folder and a large file."""
+    source = root / "source"
+    (source / "sub" / "deep").mkdir(parents=True)
+    (source / "empty").mkdir()
+    for nmb in range(20):
+        (source / "sub" / f"file_{nmb:02d}.txt").write_text(f"content {nmb}")
+    (source / "sub" / "deep" / "large.bin").write_bytes(os.urandom(5 * 1024 * 1024 + 7))
+    return source
+
+
+def _relative_files(folder):
+    return {
+        path.relative_to(folder).as_posix(): path.read_bytes()
+        for path in folder.rglob("*") if path.is_file()
+    }
+
+
+def test_transfer(tmp_path):
+    """Test copying a folder with the transfer engine."""
+    source = _make_transfer_source(tmp_path)
+    target = tmp_path / "target"
+    reports = []
+    engine = transfer.Transfer(
+        source, target, chunk_size=1024 * 1024, verify=True, progress_callback=reports.append
+    )
+    state, msg = engine.run()
+    assert state, msg
+    assert _relative_files(target) == _relative_files(source)
+    assert (target / "empty").is_dir()
+    assert not engine.journal.exists()
+    assert not list(target.rglob("*.tik_part"))
+    assert reports[-1].done_files == reports[-1].total_files == 21
+    assert reports[-1].percent == 100.0
+
+    # a single file
+    state, msg = transfer.Transfer(source / "sub" / "file_00.txt", tmp_path / "single.txt").run()
+    assert state, msg
+    assert (tmp_path / "single.txt").read_text() == "content 0"
+
+    assert transfer.Transfer(tmp_path / "missing", tmp_path / "nowhere").run()[0] is False
+
+
+def test_transfer_resume(tmp_path, monkeypatch):
+    """Test resuming an interrupted transfer."""
+    source = _make_transfer_source(tmp_path)
+    target = tmp_path / "target"
+    original_copy_file = transfer.Transfer._copy_file
+    # fail on the last small file in the order of the walk.
+    failing = "sub/" + [name for name in os.listdir(source / "sub") if name.endswith(".txt")][-1]
+
+    def failing_copy_file(engine, item):
+        if item.path == failing:
+            raise OSError("Disk is unplugged")
+        return original_copy_file(engine, item)
+
+    monkeypatch.setattr(transfer.Transfer, "_copy_file", failing_copy_file)
+    engine = transfer.Transfer(source, target, workers=1, chunk_size=1024 * 1024)
+    state, msg = engine.run()
+    assert not state
+    assert "Disk is unplugged" in msg
+    assert engine.journal.exists()
+    monkeypatch.undo()
+
+    copied = []
+
+    def recording_copy_file(engine, item):
+        copied.append(item.path)
+        return original_copy_file(engine, item)
+
+    monkeypatch.setattr(transfer.Transfer, "_copy_file", recording_copy_file)
+    engine = transfer.Transfer(source, target, chunk_size=1024 * 1024, verify=True, clean=True)
+    state, msg = engine.run()
+    assert state, msg
+    assert engine.resumed
+    assert copied == [failing]
+    assert _relative_files(target) == _relative_files(source)
+    assert not engine.journal.exists()
+
+
+def test_transfer_over_linked_file(tmp_path, monkeypatch):
+    """Test replacing a protected hardlink keeps the linked file protected.
+
+    Emulates Windows, where the read-only files cannot be removed.
+    """
+    import errno
+
+    source = tmp_path / "source.txt"
+    source.write_text("new content")
+    published = tmp_path / "published.txt"
+    published.write_text("published content")
+    utils.write_protect(published)
+    target = tmp_path / "live.txt"
+    os.link(published, target)
+
+    real_unlink = os.unlink
+
+    def windows_unlink(path, *args, **kwargs):
+        if os.path.isfile(path) and not os.stat(path).st_mode & 0o222:
+            raise PermissionError(errno.EACCES, "Access is denied", str(path))
+        return real_unlink(path, *args, **kwargs)
+
+    monkeypatch.setattr(utils, "CURRENT_PLATFORM", "Windows")
+    monkeypatch.setattr(utils, "_delete_ignoring_readonly", lambda path: False)
+    monkeypatch.setattr(os, "unlink", windows_unlink)
+
+    state, msg = transfer.Transfer(source, target).run()
+    assert state, msg
+    assert target.read_text() == "new content"
+    assert not os.path.samefile(published, target)
+    assert published.read_text() == "published content"
+    assert not published.stat().st_mode & 0o222
+
+
+def test_copy(tmp_path):
+    """Test copying files and folders."""
+    source = _make_transfer_source(tmp_path)
+    target = tmp_path / "target"
+    (target / "stale").mkdir(parents=True)
+    reports = []
+    assert utils.copy(source, target, progress_callback=reports.append, verify=True)[0]
+    assert _relative_files(target) == _relative_files(source)
+    assert not (target / "stale").exists()
+    assert reports[-1].done_files == 21
+
+    # write protected targets are replaced without unlocking them in place
+    single = tmp_path / "single.txt"
+    utils.copy(source / "sub" / "file_00.txt", single)
+    utils.write_protect(single)
+    assert utils.copy(source / "sub" / "file_01.txt", single)[0]
+    assert single.read_text() == "content 1"
+    assert utils.copy(source / "sub" / "file_02.txt", single, force=False)[0] is False
+
+
+def test_copy_over_write_protected_targets(tmp_path, monkeypatch):
+    """Test copying over write protected files and folders.
+
+    Emulates Windows, where the read-only files cannot be removed.
+    """
+    import errno
+    import stat
+
+    source = _make_transfer_source(tmp_path)
+    single = tmp_path / "single.txt"
+    utils.copy(source / "sub" / "file_00.txt", single)
+    utils.write_protect(single)
+    target = tmp_path / "target"
+    utils.copy(source, target)
+    (target / "stale.txt").write_text("stale")
+    for path in target.rglob("*"):
+        if path.is_file():
+            utils.write_protect(path)
+
+    real_unlink = os.unlink
+
+    def windows_unlink(path, *args, dir_fd=None, **kwargs):
+        try:
+            mode = os.stat(path, dir_fd=dir_fd, follow_symlinks=False).st_mode
+        except FileNotFoundError:
+            mode = 0
+        if stat.S_ISREG(mode) and not mode & 0o222:
+            raise PermissionError(errno.EACCES, "Access is denied", str(path))
+        return real_unlink(path, *args, dir_fd=dir_fd, **kwargs)
+
+    monkeypatch.setattr(utils, "CURRENT_PLATFORM", "Windows")
+    monkeypatch.setattr(utils, "_delete_ignoring_readonly", lambda path: real_unlink(path) or True)
+    monkeypatch.setattr(os, "unlink", windows_unlink)
+
+    assert utils.copy(source / "sub" / "file_01.txt", single)[0]
+    assert single.read_text() == "content 1"
+    assert list(tmp_path.glob("single.txt*")) == [single]
+
+    state, msg = utils.copy(source, target)
+    assert state, msg
+    assert _relative_files(target) == _relative_files(source)
+    assert not (target / "stale.txt").exists()
+
+
+def test_blob_store(tmp_path):
+    """Test storing identical files once and collecting the unreferenced blobs."""
+    store = blob_store.BlobStore(tmp_path / "project", min_size=1024)
+    content = os.urandom(4096)
+    first = tmp_path / "project" / "publish" / "v001" / "cache.abc"
+    bundle = tmp_path / "project" / "publish" / "v002" / "bundle"
+    (bundle / "sub").mkdir(parents=True)
+    first.parent.mkdir(parents=True)
+    first.write_bytes(content)
+    (bundle / "sub" / "cache.abc").write_bytes(content)
+    (bundle / "unique.abc").write_bytes(os.urandom(4096))
+    (bundle / "small.txt").write_text("too small for a blob")
+
+    stored = store.ingest([first, bundle])
+    assert set(stored) == {first, bundle / "sub" / "cache.abc", bundle / "unique.abc"}
+    assert stored[first] == stored[bundle / "sub" / "cache.abc"]
+    assert os.path.samefile(first, bundle / "sub" / "cache.abc")
+    assert os.path.samefile(first, store.get_blob_path(stored[first]))
+    assert first.read_bytes() == content
+    assert not first.stat().st_mode & 0o222
+    # storing again changes nothing
+    assert store.ingest([first]) == {first: stored[first]}
+
+    report = store.get_report()
+    assert report["blobs"] == 2
+    assert report["stored_bytes"] == 8192
+    assert report["referenced_bytes"] == 12288
+    assert report["saved_bytes"] == 4096
+    assert report["ratio"] == 1.5
+
+    # blobs are removed only when nothing references them
+    utils.delete(first)
+    assert store.collect_garbage() == (0, 0)
+    utils.delete(bundle)
+    assert store.collect_garbage() == (2, 8192)
+    assert store.get_report()["blobs"] == 0
+    assert not any(store.root.iterdir())
+
+
 def test_get_nice_name():
     """Test get_nice_name function."""
     assert utils.get_nice_name("camelCase") == "Camel Case"
@@ -622,6 +1166,33 @@ def test_import_from_path(tmp_path):
     module = utils.import_from_path("test_module", str(module_file))
     assert module.value == 42
 
+def test_walk_tree():
+    """Test walk_tree function."""
+    leaf = {"name": "leaf", "subs": []}
+    tree = {"name": "root", "subs": [
+        {"name": "a", "subs": [{"name": "a1", "subs": []}, leaf]},
+        {"name": "b", "subs": [leaf, {"name": "b1", "subs": []}]},
+    ]}
+
+    def get_children(node):
+        return node["subs"]
+
+    def names(**kwargs):
+        return [node["name"] for node, _parent, _depth in utils.walk_tree(tree, get_children, **kwargs)]
+
+    # shared nodes are visited once
+    assert names() == ["root", "a", "b", "a1", "leaf", "b1"]
+    assert names(depth_first=True) == ["root", "a", "a1", "leaf", "b", "b1"]
+    assert names(max_depth=1, include_root=False) == ["a", "b"]
+    assert names(prune=lambda node: node["name"] == "a") == ["root", "b", "leaf", "b1"]
+    # equal but distinct nodes are both visited
+    tree["subs"].append({"name": "a1", "subs": []})
+    assert names(max_depth=1).count("a1") == 1
+    assert names().count("a1") == 2
+    parents = {node["name"]: parent["name"] for node, parent, _depth
+               in utils.walk_tree(tree, get_children, include_root=False)}
+    assert parents["leaf"] == "a"
+
 def test_copy_data():
     """Test the copy_data function."""
     settings = Settings()
@@ -635,4 +1206,70 @@ def test_copy_data():
 
     # Ensure the copied data is a deep copy (modifying it should not affect the original)
     copied_data["key2"]["subkey"] = "new_subvalue"
-    assert settings.get_property("key2")["subkey"] == "subvalue"
\ No newline at end of file
+    assert settings.get_property("key2")["subkey"] == "subvalue"
+
+
+def test_io_json_backends(tmp_path):
+    """Test the json backends and the compact mode."""
+    previous_backend = io.get_json_backend()
+    assert io.set_json_backend("not_a_backend") in io.BACKENDS
+    _io = io.IO(file_path=str(tmp_path / "database" / "backend.json"))
+    try:
+        for backend in io.BACKENDS:
+            io.set_json_backend(backend)
+            # non-string keys fall back to the standard json
+            _io.write({"id": 123, 1: "one"})
+            assert _io.read() == {"id": 123, "1": "one"}
+
+            io.set_compact_folder(str(tmp_path / "database"))
+            _io.write({"key": ["value"]})
+            assert (tmp_path / "database" / "backend.json").read_text() == '{"key":["value"]}'
+            io.set_compact_folder(str(tmp_path / "database"), False)
+            _io.write({"key": ["value"]})
+            assert "\n" in (tmp_path / "database" / "backend.json").read_text()
+    finally:
+        io.set_json_backend(previous_backend)
+
+
+def test_io_journal(tmp_path):
+    """Test appending, reading and compacting the journals."""
+    file_path = tmp_path / "database" / "work.twork"
+    io.IO(str(file_path)).write({"name": "work", "versions": [{"nmb": 1, "notes": ""}]})
+    journal = io.Journal(file_path, "versions", "nmb")
+    other = io.Journal(file_path, "versions", "nmb")
+    assert journal.read() == []
+    assert not journal.is_modified()
+
+    assert journal.append([{"nmb": 1, "notes": "edited"}]) == []
+    assert other.is_modified()
+    assert other.append([{"nmb": 2, "notes": ""}]) == [{"nmb": 1, "notes": "edited"}]
+    assert journal.append([{"nmb": 3, "notes": ""}]) == [{"nmb": 2, "notes": ""}]
+
+    # interrupted appends are skipped
+    with open(journal.journal_path, "ab") as f:
+        f.write(b'{"nmb": 4, "no')
+    assert len(io.Journal(file_path, "versions", "nmb").read()) == 3
+    journal.append([{"nmb": 4, "notes": ""}])
+    records = io.Journal(file_path, "versions", "nmb").read()
+    assert [record["nmb"] for record in records] == [1, 2, 3, 4]
+
+    # new ids appended by others first are not appended again
+    assert other.append([{"nmb": 5, "notes": "first"}], new_ids=[5]) == [
+        {"nmb": 3, "notes": ""}, {"nmb": 4, "notes": ""}
+    ]
+    with pytest.raises(io.JournalConflict) as conflict:
+        journal.append([{"nmb": 5, "notes": "second"}], new_ids=[5])
+    assert conflict.value.records == [{"nmb": 5, "notes": "first"}]
+    records = io.Journal(file_path, "versions", "nmb").read()
+    assert [record["nmb"] for record in records] == [1, 2, 3, 4, 5]
+
+    # rewritten files are not appended to
+    assert other.append([{"nmb": 5}], base_modified_time=0) is None
+
+    data = journal.merge(io.IO(str(file_path)).read(), records)
+    assert data["versions"][0] == {"nmb": 1, "notes": "edited"}
+    assert len(data["versions"]) == 5
+
+    assert len(io.Journal(file_path, "versions", "nmb").compact()) == 5
+    assert not journal.exists()
+    assert io.IO(str(file_path)).read() == data
@@ -1,5 +1,6 @@
 # pylint: skip-file
 """Tests for Project related functions"""
+import os
 import time
 from pathlib import Path
 import shutil
@@ -9,6 +10,7 @@ from tik_manager4.core.constants import ValidationResult, ValidationState # Make
 import pytest
 
 import tik_manager4
+from tik_manager4.core import io
 from tik_manager4.core import settings
 from tik_manager4.core import utils
 
@@ -366,6 +368,33 @@ class TestProject:
         assert shots
         assert len(shots) == 7
 
+    def test_lazy_subproject_tree(self, project_manual_path, tik):
+        test_project_path = self._create_a_shot_asset_project_structure(
+            project_manual_path, tik, print_results=False
+        )
+        structure = tik.project.get_sub_tree()
+        tik.set_project(test_project_path)
+        # nothing is built until accessed
+        assert tik.project._sub_projects == {}
+
+        # only the branch leading to the subproject is built
+        rifle = tik.project.find_sub_by_path("Assets/Props/Rifle")
+        assert rifle.name == "Rifle"
+        assert rifle.metadata.get_value("metatest") == "uberMetaTestingen"
+        assert rifle.metadata.get_value("mode") == "asset"
+        assert list(tik.project._sub_projects) == ["Assets", "Shots"]
+        assert tik.project.subs["Shots"]._raw_subs is not None
+        shot = tik.project.find_sub_by_id(structure["subs"][1]["subs"][1]["subs"][0]["id"])
+        assert shot.path == "Shots/SequenceB/SHOT_010"
+
+        # the branches which are not built are saved as they are
+        assert tik.project.get_sub_tree() == structure
+        tik.project.create_sub_project("Hero", parent_path="Assets/Characters")
+        tik.set_project(test_project_path)
+        assert tik.project.find_sub_by_path("Assets/Characters/Hero") != -1
+        assert tik.project.find_sub_by_path("Shots/SequenceA/SHOT_040") != -1
+        assert len(tik.project.find_subs_by_wildcard("*")) == 24
+
     def test_get_uid_and_get_path(self, project_path, tik):
         test_project_path = self._new_asset_shot_project(project_path, tik)
         tik.set_project(test_project_path)
@@ -378,6 +407,87 @@ class TestProject:
         assert tik.project.get_uid_by_path("Burhan/Altintop") == -1
         assert tik.project.get_path_by_uid(123123123123123123123) == -1
 
+    def test_bulk_creation(self, project_path, tik, monkeypatch):
+        self._new_empty_project(project_path, tik)
+        tik.set_project(project_path)
+        saves = []
+        original_apply = tik.project.structure.apply_settings
+        monkeypatch.setattr(tik.project.structure, "apply_settings",
+                            lambda *args, **kwargs: saves.append(1) or original_apply(*args, **kwargs))
+
+        subs = tik.project.create_sub_projects_bulk(
+            [{"name": "Shots", "parent_path": "", "mode": "shot"}]
+            + [{"name": f"SH{nmb:03d}", "parent_path": "Shots"} for nmb in range(10)]
+        )
+        assert len(subs) == 11
+        assert len(saves) == 1
+        assert Path(tik.project.database_path, "Shots", "SH009").is_dir()
+        assert Path(tik.project.absolute_path, "Shots", "SH009").is_dir()
+
+        tasks = tik.project.create_tasks_bulk(
+            [{"name": "Layout", "categories": ["Layout"], "parent_uid": sub.id} for sub in subs[1:]]
+        )
+        assert len(tasks) == 10
+
+        # nested batches save once at the end of the outermost one
+        with tik.project.batch():
+            with tik.project.batch():
+                tik.project.create_sub_project("Assets", parent_path="")
+            assert tik.project.in_batch
+            tik.project.create_sub_project("Props", parent_path="Assets")
+            assert len(saves) == 1
+        assert len(saves) == 2
+
+        # everything is validated before creating anything
+        assert tik.project.create_sub_projects_bulk(
+            [{"name": "Chars", "parent_path": "Assets"}, {"name": "Hero", "parent_path": "Missing"}]
+        ) == -1
+        assert tik.project.create_sub_projects_bulk([{"name": "Props", "parent_path": "Assets"}]) == -1
+        assert tik.project.find_sub_by_path("Assets/Chars") == -1
+        assert tik.project.create_tasks_bulk([{"name": "Layout", "parent_path": "Missing"}]) == -1
+
+        # a failure in the middle rolls back the previous entries
+        tik.project.create_sub_project("Vehicles", parent_path="Assets")
+        assert tik.project.delete_sub_project(path="Assets/Vehicles") == 1
+        original_create_sub = tik.project.create_sub_project
+        monkeypatch.setattr(tik.project, "create_sub_project",
+                            lambda name, **kwargs: -1 if name == "Broken" else original_create_sub(name, **kwargs))
+        assert tik.project.create_sub_projects_bulk(
+            [{"name": "Vehicles", "parent_path": "Assets"},
+             {"name": "Chars", "parent_path": "Assets"},
+             {"name": "Hero", "parent_path": "Assets/Chars"},
+             {"name": "Broken", "parent_path": "Assets"}]
+        ) == -1
+        assert tik.project.find_sub_by_path("Assets/Chars") == -1
+        assert tik.project.find_sub_by_path("Assets/Chars/Hero") == -1
+        assert tik.project.find_sub_by_path("Assets/Vehicles").deleted
+        assert not Path(tik.project.database_path, "Assets", "Chars").exists()
+
+        sh000 = tik.project.find_sub_by_path("Shots/SH000")
+        assert sh000.delete_task("Layout")[0]
+        original_create_task = tik.project.create_task
+        monkeypatch.setattr(tik.project, "create_task",
+                            lambda name, **kwargs: -1 if name == "Broken" else original_create_task(name, **kwargs))
+        assert tik.project.create_tasks_bulk(
+            [{"name": "Layout", "categories": ["Animation"], "parent_path": "Shots/SH000"},
+             {"name": "Lighting", "categories": ["Lighting"], "parent_path": "Shots/SH001"},
+             {"name": "Broken", "categories": ["Lighting"], "parent_path": "Shots/SH002"}]
+        ) == -1
+        assert not Path(tik.project.database_path, "Shots", "SH001", "Lighting.ttask").exists()
+        assert "Lighting" not in tik.project.find_sub_by_path("Shots/SH001").scan_tasks()
+        assert tik.project.find_tasks_by_wildcard("Lighting") == []
+        layout = sh000.scan_tasks()["Layout"]
+        assert layout.deleted
+        assert list(layout.categories) == ["Layout"]
+
+        # reload from the disk
+        tik.set_project(project_path)
+        assert len(tik.project.find_sub_by_path("Shots").subs) == 10
+        assert tik.project.find_sub_by_path("Assets/Props") != -1
+        assert "Layout" in tik.project.find_sub_by_path("Shots/SH005").scan_tasks()
+        assert tik.project.find_sub_by_path("Assets/Chars") == -1
+        assert tik.project.find_sub_by_path("Assets/Vehicles").deleted
+
     def test_creating_and_adding_new_tasks(self, project_manual_path, tik):
         test_project_path = self._create_a_shot_asset_project_structure(
             project_manual_path, tik, print_results=False
@@ -527,6 +637,14 @@ class TestProject:
         assert list(task.categories.keys()) == ["Model", "Rig", "LookDev", "Animation"]
         assert task.nice_name == "Aquaman"
         assert task.name == "Poseidon"
+        assert task.metadata.get_value("mode") == "shot"
+
+        # the management platforms edit the overrides in place
+        task._metadata_overrides["mode"] = "asset"
+        task.edit_property("metadata_overrides", task._metadata_overrides)
+        assert task.metadata.get_value("mode") == "asset"
+        task.edit_property("metadata_overrides", {"mode": "shot"})
+        assert task.metadata.get_value("mode") == "shot"
 
     def test_adding_categories(self, project_manual_path, tik):
         self.test_creating_and_adding_new_tasks(project_manual_path, tik)
@@ -983,6 +1101,47 @@ class TestProject:
         # non existing task id
         assert sub.find_task_by_id(123123123123123123123) == -1
 
+    def test_project_index(self, project_manual_path, tik, monkeypatch):
+        from tik_manager4.objects.subproject import Subproject
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        sub1 = tik.project.create_sub_project("index_sub", parent_uid=sub.id)
+        sub1_task = tik.project.create_task(
+            "index_task", categories=["Model"], parent_uid=sub1.id
+        )
+        assert tik.project.find_sub_by_id(sub1.id) == sub1
+        assert tik.project.find_sub_by_path(sub1.path) == sub1
+        assert tik.project.find_task_by_id(sub1_task.id) == sub1_task
+        # tasks under a different branch should not be found
+        assert sub1.find_task_by_id(task.id) == -1
+
+        index_file = Path(tik.project.database_path, "project_index.json")
+        assert index_file.exists()
+
+        # warm start resolves the tasks without scanning any subproject
+        tik.set_project(project_manual_path)
+        assert tik.project.index.get_task(sub1_task.id).name == "index_task"
+        assert not tik.project.index.is_scanned(tik.project.find_sub_by_path(sub1.path))
+        assert tik.project.find_task_by_id(sub1_task.id).name == "index_task"
+
+        # deleted tasks are only returned with query_all
+        tik.project.find_sub_by_path(sub1.path).delete_task("index_task")
+        assert tik.project.find_task_by_id(sub1_task.id) == -1
+        assert tik.project.find_task_by_id(sub1_task.id, query_all=True) != -1
+        assert not tik.project.find_tasks_by_wildcard("index_*")
+
+        # indexed subprojects are not scanned again and queries don't write the index
+        scans = []
+        original_scan = Subproject.scan_tasks
+        monkeypatch.setattr(Subproject, "scan_tasks",
+                            lambda self, *args, **kwargs: scans.append(self) or original_scan(self, *args, **kwargs))
+        index_signature = index_file.stat().st_mtime_ns
+        assert tik.project.find_tasks_by_wildcard("missing_*") == []
+        assert [found.name for found in tik.project.find_tasks_by_wildcard(f"{task.name}*")] == [task.name]
+        assert scans == []
+        assert index_file.stat().st_mtime_ns == index_signature
+
     def test_find_works_by_wildcard(self, project_manual_path, tik, monkeypatch):
         self.test_creating_works_and_versions(project_manual_path, tik, monkeypatch)
         lod300_works = (
@@ -1342,6 +1501,52 @@ class TestProject:
             assert args[
                        0] is True, "set_management_handler should have been called with True"
 
+    def test_kitsu_batch_force_sync(self, project_path, tik):
+        from tik_manager4.management.kitsu.main import ProductionPlatform
+        self._new_empty_project(project_path, tik)
+        tik.set_project(project_path)
+        tik.project.settings.edit_property("management_platform", "kitsu")
+        tik.project.settings.edit_property("host_project_id", "p1")
+        tik.project.settings.apply_settings(force=True)
+
+        shot = {"id": "sh1", "name": "SH010", "parent_id": "sq1", "canceled": True,
+                "data": {"frame_in": 1001, "frame_out": 1100}}
+        gazu = MagicMock()
+        gazu.task.all_task_types_for_project.return_value = [
+            {"id": "tt1", "name": "Model"}, {"id": "tt2", "name": "Animation"}]
+        gazu.task.all_tasks_for_project.return_value = [
+            {"entity_id": "a1", "task_type_id": "tt1"},
+            {"entity_id": "sh1", "task_type_id": "tt2"}]
+        gazu.asset.all_asset_types_for_project.return_value = [
+            {"id": "at1", "name": "Characters"}]
+        gazu.asset.all_assets_for_project.return_value = [
+            {"id": "a1", "name": "hero", "entity_type_id": "at1", "canceled": False, "data": {}}]
+        gazu.shot.all_episodes_for_project.return_value = []
+        gazu.shot.all_sequences_for_project.return_value = [
+            {"id": "sq1", "name": "SQ010", "parent_id": None, "canceled": False, "data": {}}]
+        gazu.shot.all_shots_for_project.return_value = [shot]
+
+        platform = ProductionPlatform(tik)
+        platform.gazu = gazu
+        assert platform.force_sync() == (True, "Success")
+        assert platform.last_sync_report["Asset"]["created"] == 1
+        assert platform.last_sync_report["Shot"]["created"] == 1
+        assert platform.last_sync_report["Shot"]["omitted"] == 1
+        shot_task = tik.project.find_task_by_id("sh1")
+        assert shot_task.parent_sub.path == "Shots/SQ010"
+        assert list(shot_task.categories.keys()) == ["Animation"]
+        assert shot_task.state == "omitted"
+
+        # second run only updates, without any per-entity requests
+        shot["canceled"] = False
+        assert platform.force_sync() == (True, "Success")
+        assert platform.last_sync_report["Shot"]["updated"] == 1
+        assert platform.last_sync_report["Asset"]["updated"] == 1
+        assert tik.project.find_task_by_id("sh1").state == "active"
+        gazu.task.all_tasks_for_asset.assert_not_called()
+        gazu.task.all_tasks_for_shot.assert_not_called()
+        gazu.entity.get_entity_type.assert_not_called()
+
     def test_globalize_management_platform_unsets_handler(self, project_path, tik):
         """Test that no 'management_platform' unsets the management handler."""
         tik.set_project(project_path)
@@ -1398,3 +1603,681 @@ class TestProject:
         # check if the project is added to the templates
         assert "TestProject" in tik.user.commons.get_project_structures()
 
+
+    def test_incremental_scans(self, project_manual_path, tik, monkeypatch):
+        """Test the scans skip the folders which are not changed."""
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        category = task.categories["Model"]
+        assert list(sub.scan_tasks().keys()) == ["test_task"]
+        assert len(category.scan_works()) == 1
+
+        # age the folders to get them out of the racy window
+        past = time.time() - 60
+        category_folder = Path(category.get_abs_database_path())
+        for folder in (Path(sub.get_abs_database_path()), category_folder,
+                       *category_folder.rglob("*")):
+            if folder.is_dir():
+                os.utime(folder, (past, past))
+        sub.scan_tasks()
+        category.scan_works()
+
+        scandir_calls = []
+        original_scandir = os.scandir
+
+        def _counting_scandir(*args):
+            scandir_calls.append(args)
+            return original_scandir(*args)
+
+        monkeypatch.setattr(os, "scandir", _counting_scandir)
+        sub.scan_tasks()
+        category.scan_works()
+        work.publish.scan_publish_versions()
+        work.publish.scan_publish_versions()
+        assert not scandir_calls
+
+        # forced scans list the folders again
+        sub.scan_tasks(force=True)
+        category.scan_works(force=True)
+        assert len(scandir_calls) > 2
+
+        # changes made outside are picked up
+        task_2 = tik.project.create_task(
+            "test_task_2", categories=["Model"], parent_path=sub.path
+        )
+        Path(task_2.settings_file).unlink()
+        external = settings.Settings(task.settings_file)
+        external.edit_property("nice_name", "Nice Task")
+        external.apply_settings()
+        assert list(sub.scan_tasks().keys()) == ["test_task"]
+        assert sub.scan_tasks()["test_task"].nice_name == "Nice Task"
+
+        # files rewritten in place don't change the folder but are picked up
+        os.utime(sub.get_abs_database_path(), (past, past))
+        sub.scan_tasks()
+        content = Path(task.settings_file).read_text().replace("Nice Task", "Fine Task")
+        with open(task.settings_file, "r+") as task_file:
+            task_file.write(content)
+        os.utime(sub.get_abs_database_path(), (past, past))
+        assert sub.scan_tasks()["test_task"].nice_name == "Fine Task"
+
+        Path(work.settings_file).unlink()
+        assert category.scan_works() == {}
+
+    def test_work_version_journal(self, project_manual_path, tik):
+        """Test the work versions are appended to a journal in journal mode."""
+        from tik_manager4.objects.work import Work
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        category = task.categories["Model"]
+        work_path = Path(work.settings_file)
+        journal_path = Path(f"{work_path}.journal")
+        io.set_journal_folder(tik.project.database_path)
+        try:
+            work_signature = work_path.stat().st_mtime_ns
+            category.scan_works()
+            for _ in range(3):
+                work.new_version(notes="journaled")
+            assert journal_path.is_file()
+            assert work_path.stat().st_mtime_ns == work_signature
+
+            # other sessions read the versions back
+            other = Work(work_path)
+            assert [version.version for version in other.versions] == [1, 2, 3, 4]
+            assert other.get_version(4).notes == "journaled"
+
+            # edits are journaled and picked up by the scans
+            scanned = category.scan_works()[work_path]
+            work.get_version(2).notes = "edited"
+            work.apply_settings()
+            assert work_path.stat().st_mtime_ns == work_signature
+            assert other.is_modified()
+            assert category.scan_works()[work_path].get_version(2).notes == "edited"
+            assert scanned.get_version(2).notes == "edited"
+
+            # concurrent appenders see each other's versions
+            other.reload()
+            other.new_version(notes="from other")
+            work.get_version(1).notes = "edited too"
+            work.apply_settings()
+            assert work.get_last_version() == 5
+            assert work.get_version(5).notes == "from other"
+            assert Work(work_path).get_version(1).notes == "edited too"
+
+            # the same new version number is not appended twice
+            other.reload()
+            assert other.get_last_version() == work.get_last_version() == 5
+            assert other.new_version(notes="first") != -1
+            assert work.new_version(notes="second") == -1
+            assert work.get_last_version() == 6
+            assert work.get_version(6).notes == "first"
+            assert [version.notes for version in Work(work_path).versions].count("second") == 0
+
+            # non-version changes fold the journal into the work file
+            work.omit()
+            assert not journal_path.exists()
+            assert Work(work_path).version_count == 6
+            assert Work(work_path).state == "omitted"
+
+            # the journal is compacted after the limit
+            work.journal_limit = 2
+            work.new_version()
+            work.new_version()
+            assert journal_path.is_file()
+            work.new_version()
+            assert not journal_path.exists()
+            assert Work(work_path).version_count == 9
+        finally:
+            io.set_journal_folder(tik.project.database_path, False)
+
+        # migrating back to whole file writes
+        io.set_journal_folder(tik.project.database_path)
+        work.new_version()
+        io.set_journal_folder(tik.project.database_path, False)
+        assert journal_path.is_file()
+        assert Work(work_path).version_count == 10
+        assert tik.project.compact_work_journals() == 1
+        assert not journal_path.exists()
+        assert len(io.IO(str(work_path)).read()["versions"]) == 10
+
+    def test_lazy_work_versions(self, project_manual_path, tik):
+        """Test the work versions are created only when they are accessed."""
+        from tik_manager4.objects.work import Work
+
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        for nmb in range(4):
+            work.new_version(notes=f"version {nmb + 2}")
+        work.delete_version(2)
+
+        loaded = Work(work.settings_file)
+        assert loaded.version_count == 5
+        assert loaded.get_last_version() == 5
+        assert loaded.has_valid_versions()
+        assert len(loaded.versions) == 4
+        assert not loaded._version_objects
+
+        version = loaded.get_version(4)
+        assert version.notes == "version 4"
+        assert loaded.get_version(4) is version
+        assert loaded.all_versions[3] is version
+        assert [_version.version for _version in loaded.versions] == [1, 3, 4, 5]
+        assert [_version.version for _version in loaded.all_versions[-2:]] == [4, 5]
+
+        # only the edited versions are saved
+        version.notes = "edited"
+        loaded.apply_settings()
+        assert Work(work.settings_file).get_version(4).notes == "edited"
+        assert Work(work.settings_file).get_version(3).notes == "version 3"
+        assert Work(work.settings_file).get_version(2).deleted
+
+    def test_publish_manifest(self, project_manual_path, tik, monkeypatch):
+        """Test the publishes are listed from the manifest."""
+        from tik_manager4.objects.work import Work
+        from tik_manager4.objects import publish as publish_module
+
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        publisher = tik.project.snapshot_publisher
+        for nmb in range(3):
+            publisher.work_object = work
+            publisher.work_version = 1
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            publisher.publish(notes=f"publish {nmb + 1}")
+        assert work.publish.get_version(2).move_to_purgatory()[0]
+
+        manifest = work.publish.manifest
+        assert Path(manifest.file_path).parent == Path(work.publish.get_publish_data_folder())
+        assert [record["version_number"] for record in manifest.version_records()] == [1, 2, 3]
+        assert manifest.read()[2]["deleted"]
+        assert manifest.get_pointer("live")["version"] == 3
+
+        # listing and state checks do not read the publish files
+        created = []
+        original_init = publish_module.PublishVersion.__init__
+
+        def _counting_init(self, *args, **kwargs):
+            created.append(args[0])
+            original_init(self, *args, **kwargs)
+
+        monkeypatch.setattr(publish_module.PublishVersion, "__init__", _counting_init)
+        loaded = Work(work.settings_file)
+        assert loaded.state == "published"
+        loaded.publish.scan_publish_versions()
+        assert loaded.publish.get_last_version() == 3
+        assert len(loaded.publish.all_versions) == 4  # including LIVE
+        assert len(loaded.publish.versions) == 3
+        assert not created
+
+        version = loaded.publish.get_version(3)
+        assert version.notes == "publish 3"
+        assert loaded.publish.get_version(3) is version
+        assert loaded.publish.get_version(2) is None
+        assert loaded.publish.get_version(-1).nice_name == "LIVE"
+        assert len(created) == 2
+        monkeypatch.undo()
+
+        # publish files written without the manifest are picked up
+        Path(manifest.file_path).unlink(missing_ok=True)
+        Path(f"{manifest.file_path}.journal").unlink(missing_ok=True)
+        rebuilt = Work(work.settings_file)
+        assert rebuilt.state == "active"
+        rebuilt.publish.scan_publish_versions()
+        assert [_version.version for _version in rebuilt.publish.versions] == [1, 3, -1]
+        assert [record["version_number"] for record in manifest.version_records()] == [1, 2, 3]
+        assert manifest.get_pointer("live")["version"] == 3
+        assert Work(work.settings_file).state == "published"
+
+    def test_scene_index(self, project_manual_path, tik, monkeypatch):
+        """Test resolving the works from the scene paths through the index."""
+        from tik_manager4.objects import project as project_module
+
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        work.new_version(notes="second")
+        other = task.categories["Model"].create_work("other_work")
+        scene_path = work.get_abs_project_path(work.get_version(2).scene_path)
+        index = work.scene_index
+        assert index.read()[work.get_version(2).scene_path]["version"] == 2
+        assert index.read()[other.get_version(1).scene_path]["work_id"] == other.id
+
+        created = []
+        original_init = project_module.Work.__init__
+
+        def _counting_init(self, *args, **kwargs):
+            created.append(args[0])
+            original_init(self, *args, **kwargs)
+
+        monkeypatch.setattr(project_module.Work, "__init__", _counting_init)
+        found_work, version_number = tik.project.find_work_by_absolute_path(scene_path)
+        assert (found_work.id, version_number) == (work.id, 2)
+        assert found_work.parent_task.id == task.id
+        assert len(created) == 1
+
+        # localized copies resolve to the same work
+        relative_scene = Path(scene_path).relative_to(tik.project.absolute_path)
+        localized_path = Path("/tmp", "local_cache", tik.project.name, relative_scene)
+        found_work, version_number = tik.project.find_work_by_absolute_path(str(localized_path))
+        assert (found_work.id, version_number) == (work.id, 2)
+        assert len(created) == 2
+
+        # scenes missing from the index are searched and indexed
+        Path(index.file_path).unlink(missing_ok=True)
+        Path(f"{index.file_path}.journal").unlink(missing_ok=True)
+        updates = []
+        original_update = project_module.SceneIndex.update
+
+        def _counting_update(self, records):
+            updates.append(len(records))
+            return original_update(self, records)
+
+        monkeypatch.setattr(project_module.SceneIndex, "update", _counting_update)
+        found_work, version_number = tik.project.find_work_by_absolute_path(scene_path)
+        assert (found_work.id, version_number) == (work.id, 2)
+        assert work.get_version(2).scene_path in index.read()
+        # the searched works are indexed with a single update
+        assert len(updates) == 1
+        updates.clear()
+        missing_path = scene_path.replace("_v002", "_v099")
+        assert tik.project.find_work_by_absolute_path(missing_path) == (None, None)
+        assert len(updates) == 1
+        assert other.get_version(1).scene_path in index.read()
+
+        # a new version is indexed with its save
+        updates.clear()
+        work.new_version(notes="third")
+        assert len(updates) == 1
+        assert index.read()[work.get_version(3).scene_path]["version"] == 3
+
+        # deleted versions are not resolved
+        monkeypatch.undo()
+        work.delete_version(2)
+        assert tik.project.find_work_by_absolute_path(scene_path) == (None, None)
+
+    def test_deferred_startup(self, tik, monkeypatch):
+        """Test the deferred startup postpones the plugins and the management handler."""
+        from tik_manager4.objects.main import Main
+
+        commons_folder = tik.user.commons.folder_path
+        plugin_folder = Path(commons_folder, "plugins", "standalone", "extract")
+        plugin_folder.mkdir(parents=True, exist_ok=True)
+        (plugin_folder / "studio_extract.py").write_text(
+            "from tik_manager4.dcc.extract_core import ExtractCore\n\n"
+            "class StudioExtract(ExtractCore):\n"
+            "    name = 'studio_extract'\n"
+        )
+        monkeypatch.setattr(type(tik.dcc), "extracts", dict(tik.dcc.extracts))
+        tik.dcc.extracts.pop("studio_extract", None)
+
+        deferred = Main(common_folder=commons_folder, deferred=True)
+        assert not deferred.is_startup_finished
+        assert "studio_extract" not in deferred.dcc.extracts
+        # the settings of the commons are read on the first access
+        assert "_structures" not in deferred.user.commons.__dict__
+        assert deferred.user.commons.structures.settings_file.endswith("structures.json")
+
+        deferred.finish_startup()
+        assert deferred.is_startup_finished
+        assert "studio_extract" in deferred.dcc.extracts
+        # calling it again does nothing
+        deferred.finish_startup()
+
+        eager = Main(common_folder=commons_folder)
+        assert eager.is_startup_finished
+
+    def test_branch_materialization(self, project_manual_path, tik):
+        """Test the LIVE and PROMOTED elements are linked to the publishes."""
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        tik.project.settings.edit_property("branch_materialization", "Hardlink")
+        tik.project.settings.apply_settings(force=True)
+
+        publisher = tik.project.snapshot_publisher
+        published = []
+        for nmb in range(2):
+            publisher.work_object = work
+            publisher.work_version = 1
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            publisher.publish(notes=f"publish {nmb + 1}")
+            work.publish.scan_publish_versions()
+            version = work.publish.get_version(nmb + 1)
+            element_type = version.elements[0]["type"]
+            published.append(Path(version.get_element_path(element_type, relative=False)))
+
+        live_version = work.publish.get_version(-1)
+        live_path = Path(live_version.get_element_path(element_type, relative=False))
+        assert live_path.parent.name == "LIVE"
+        assert os.path.samefile(live_path, published[1])
+        # the previous publish is not changed by replacing the LIVE element
+        assert published[0].stat().st_nlink == 1
+        assert not published[0].stat().st_mode & 0o222
+
+        assert work.publish.get_version(1).promote().state == ValidationState.SUCCESS
+        promoted_path = Path(work.publish.get_version(0).get_element_path(element_type, relative=False))
+        assert promoted_path.parent.name == "PROMOTED"
+        assert os.path.samefile(promoted_path, published[0])
+
+        # the symlinks are relative to the branch folder
+        tik.project.settings.edit_property("branch_materialization", "Symlink")
+        tik.project.settings.apply_settings(force=True)
+        assert work.publish.get_version(2).promote().state == ValidationState.SUCCESS
+        assert promoted_path.is_symlink()
+        assert not Path(os.readlink(promoted_path)).is_absolute()
+        assert promoted_path.resolve() == published[1].resolve()
+        assert published[0].stat().st_nlink == 1
+
+    @pytest.mark.parametrize("ignore_readonly", [True, False])
+    def test_branch_materialization_keeps_protection(self, project_manual_path, tik, monkeypatch,
+                                                     ignore_readonly):
+        """Test replacing a linked LIVE element never unprotects the previous publish.
+
+        Emulates Windows, where the read-only files cannot be removed or
+        replaced.
+        """
+        import errno
+
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        tik.project.settings.edit_property("branch_materialization", "Hardlink")
+        tik.project.settings.apply_settings(force=True)
+
+        real_unlink = os.unlink
+        real_replace = os.replace
+
+        def is_protected(path):
+            return os.path.isfile(path) and not os.path.islink(path) and not os.stat(path).st_mode & 0o222
+
+        def windows_unlink(path, *args, **kwargs):
+            if is_protected(path):
+                raise PermissionError(errno.EACCES, "Access is denied", str(path))
+            return real_unlink(path, *args, **kwargs)
+
+        def windows_replace(source, target, *args, **kwargs):
+            if is_protected(target):
+                raise PermissionError(errno.EACCES, "Access is denied", str(target))
+            return real_replace(source, target, *args, **kwargs)
+
+        def delete_ignoring_readonly(path):
+            if ignore_readonly:
+                real_unlink(path)
+            return ignore_readonly
+
+        monkeypatch.setattr(utils, "CURRENT_PLATFORM", "Windows")
+        monkeypatch.setattr(utils, "_delete_ignoring_readonly", delete_ignoring_readonly)
+        monkeypatch.setattr(os, "unlink", windows_unlink)
+        monkeypatch.setattr(os, "replace", windows_replace)
+
+        publisher = tik.project.snapshot_publisher
+        published = []
+        for nmb in range(2):
+            publisher.work_object = work
+            publisher.work_version = 1
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            publisher.publish(notes=f"publish {nmb + 1}")
+            work.publish.scan_publish_versions()
+            version = work.publish.get_version(nmb + 1)
+            element_type = version.elements[0]["type"]
+            published.append(Path(version.get_element_path(element_type, relative=False)))
+
+        live_version = work.publish.get_version(-1)
+        live_path = Path(live_version.get_element_path(element_type, relative=False))
+        assert os.path.samefile(live_path, published[1])
+        # the previous publish is still write protected after the second make_live
+        assert not published[0].stat().st_mode & 0o222
+        assert not published[1].stat().st_mode & 0o222
+        if ignore_readonly:
+            assert published[0].stat().st_nlink == 1
+            assert [path.name for path in live_path.parent.iterdir()] == [live_path.name]
+
+    def test_sync_localized_versions(self, project_manual_path, tik, tmp_path, monkeypatch, capsys):
+        """Test syncing all the localized versions of the project to the origin."""
+        from tik_manager4.core.constants import SyncStates
+        from tik_manager4.dcc.standalone import tik4_sync
+        from tik_manager4.objects.version import PublishVersion
+        from tik_manager4.objects.work import Work
+
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        localization = tik.user.localization
+        localization.edit_property("enabled", True)
+        localization.edit_property("local_cache_folder", str(tmp_path / "local_cache"))
+        localization.edit_property("cache_publishes", True)
+
+        rig_work = task.categories["Rig"].create_work("rig_work")
+        rig_work.new_version()
+        model_work = task.categories["Model"].create_work("local_work")
+        publisher = tik.project.snapshot_publisher
+        publisher.work_object = model_work
+        publisher.work_version = 1
+        publisher.source_path = model_work.get_version(1).localized_path
+        try:
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            publisher.publish()
+        finally:
+            publisher.source_path = None
+
+        manager = tik.sync_manager
+        items = manager.discover()
+        # the versions created before the localization are not listed
+        assert sorted(item.key for item in items if item.kind == "work") == [
+            "test_subproject/test_task/Model/standalone/test_task_Model_local_work.twork#1",
+            "test_subproject/test_task/Rig/standalone/test_task_Rig_rig_work.twork#1",
+            "test_subproject/test_task/Rig/standalone/test_task_Rig_rig_work.twork#2",
+        ]
+        assert [item.kind for item in items].count("publish") == 1
+
+        # the headless command lists the versions without syncing
+        monkeypatch.setattr(tik_manager4, "initialize", lambda *args, **kwargs: tik)
+        assert tik4_sync.main(["--dry-run"]) == 0
+        assert "4 localized versions found" in capsys.readouterr().out
+
+        # a version which cannot be synced does not block the others
+        conflict = next(item for item in items if item.key.endswith("rig_work.twork#2"))
+        conflict_target = Path(conflict.version.get_abs_project_path())
+        conflict_target.parent.mkdir(parents=True, exist_ok=True)
+        conflict_target.write_text("conflict")
+        reports = []
+        state, msg = manager.sync(retries=0, progress_callback=reports.append)
+        assert not state
+        assert msg == "3 of 4 localized versions synced to the origin."
+        assert len(reports) == 4
+        states = manager.get_states()
+        assert states[conflict.key]["status"] == SyncStates.FAILED.value
+        assert "Origin cannot be overwritten" in states[conflict.key]["message"]
+
+        reloaded_rig = Work(rig_work.settings_file)
+        assert not reloaded_rig.get_version(1).localized
+        assert Path(reloaded_rig.get_version(1).get_abs_project_path()).is_file()
+        assert reloaded_rig.get_version(2).localized
+        publish_item = next(item for item in items if item.kind == "publish")
+        published = PublishVersion(publish_item.version.settings_file)
+        assert not published.localized
+        element_path = published.elements[0]["path"]
+        assert Path(published.get_abs_project_path(element_path)).exists()
+        assert not Path(publish_item.version.localized_path, element_path).exists()
+
+        # retry the failed one after resolving the conflict
+        conflict_target.unlink()
+        state, msg = manager.retry_failed(retries=0)
+        assert state, msg
+        assert msg == "1 of 1 localized versions synced to the origin."
+        assert all(record["status"] == SyncStates.SYNCED.value for record in manager.get_states().values())
+        assert not Work(rig_work.settings_file).get_version(2).localized
+        assert manager.discover() == []
+        assert manager.retry_failed() == (True, "Nothing to retry.")
+
+    def test_deduplicate_publishes(self, project_manual_path, tik, tmp_path):
+        """Test the identical published files are stored once."""
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        tik.project.settings.edit_property("deduplicate_publishes", True)
+        tik.project.settings.edit_property("branch_materialization", "Copy")
+        tik.project.settings.apply_settings(force=True)
+        source = tmp_path / "cache.abc"
+        source.write_bytes(os.urandom(256 * 1024))
+
+        publisher = tik.project.snapshot_publisher
+        published = []
+        for nmb in range(3):
+            publisher.work_object = work
+            publisher.work_version = 1
+            publisher.source_path = str(source)
+            try:
+                publisher.resolve()
+                publisher.reserve()
+                publisher.extract()
+                publisher.publish(notes=f"publish {nmb + 1}")
+            finally:
+                publisher.source_path = None
+            work.publish.scan_publish_versions()
+            published.append(work.publish.get_version(nmb + 1))
+            if nmb == 0:
+                # the Copy branch materialization is kept
+                live_version = work.publish.get_version(-1)
+                element_type = live_version.elements[0]["type"]
+                assert not os.path.samefile(
+                    live_version.get_element_path(element_type, relative=False),
+                    published[0].get_element_path(element_type, relative=False),
+                )
+                tik.project.settings.edit_property("branch_materialization", "Hardlink")
+                tik.project.settings.apply_settings(force=True)
+
+        element_paths = [
+            Path(version.get_element_path(version.elements[0]["type"], relative=False))
+            for version in published
+        ]
+        checksums = [version.elements[0]["blobs"] for version in published]
+        assert len({tuple(blobs.values()) for blobs in checksums}) == 1
+        assert os.path.samefile(element_paths[0], element_paths[2])
+        # the LIVE element is linked to the same blob as well
+        live_version = work.publish.get_version(-1)
+        live_path = Path(live_version.get_element_path(live_version.elements[0]["type"], relative=False))
+        assert os.path.samefile(live_path, element_paths[2])
+        assert [path.name for path in live_path.parent.iterdir()] == [live_path.name]
+
+        report = tik.project.blob_store.get_report()
+        assert report["blobs"] == 1
+        assert report["stored_bytes"] == 256 * 1024
+        assert report["saved_bytes"] == 3 * 256 * 1024
+        assert report["ratio"] == 4.0
+
+        # purging the deleted publishes frees the blobs nothing refers to
+        for version in published:
+            utils.delete(Path(version.get_element_path(version.elements[0]["type"], relative=False)))
+        utils.delete(live_path)
+        assert tik.purgatory.purge_origin()[0]
+        assert tik.project.blob_store.get_report()["blobs"] == 0
+        assert not any(tik.project.blob_store.root.iterdir())
+
+    def test_background_post_publish(self, project_manual_path, tik, tmp_path, monkeypatch):
+        """Test the post publish steps run in the background and can be retried."""
+        from tik_manager4.core.constants import PostPublishStates
+        from tik_manager4.objects import post_publish
+        from tik_manager4.objects.guard import Guard
+        from tik_manager4.objects.version import PublishVersion
+
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        monkeypatch.setattr(post_publish.QUEUE, "retries", 1)
+        monkeypatch.setattr(Guard, "_management_handler", None)
+        source = tmp_path / "cache.abc"
+        source.write_text("cache")
+
+        publisher = tik.project.snapshot_publisher
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.source_path = str(source)
+        try:
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            published = publisher.publish(
+                notes="background", management_task_id="task_id", background=True
+            )
+        finally:
+            publisher.source_path = None
+        assert published.post_publish_state == PostPublishStates.PENDING.value
+        assert post_publish.QUEUE.wait(timeout=30)
+
+        # without a management platform, only the upload fails
+        version = PublishVersion(published.settings_file)
+        assert version.post_publish_state == PostPublishStates.FAILED.value
+        pipeline = post_publish.PostPublishPipeline(version)
+        assert pipeline.get_failed_steps() == ["management_upload"]
+        assert [step["attempts"] for step in pipeline.steps] == [1, 2, 1]
+        assert version.is_live()
+        element_path = Path(version.get_element_path(version.elements[0]["type"], relative=False))
+        assert not element_path.stat().st_mode & 0o222
+
+        # retrying runs only the failed step
+        handler = MagicMock()
+        handler.publish_version.return_value = {"id": "management_id"}
+        monkeypatch.setattr(Guard, "_management_handler", handler)
+        assert post_publish.QUEUE.retry(version)[0]
+        assert post_publish.QUEUE.wait(timeout=30)
+        version = PublishVersion(published.settings_file)
+        assert version.post_publish_state == PostPublishStates.DONE.value
+        assert version.publish_id == "management_id"
+        assert handler.publish_version.call_count == 1
+        assert post_publish.QUEUE.retry(version) == (False, "Nothing to retry.")
+
+        # the publish version returned to the artist reads the worker results back
+        assert published.post_publish_state == PostPublishStates.PENDING.value
+        published.refresh()
+        assert published.post_publish_state == PostPublishStates.DONE.value
+        assert published.publish_id == "management_id"
+        assert published.is_live() == version.is_live()
+
+        # the worker and the artist do not overwrite each other's edits
+        pipeline = post_publish.PostPublishPipeline(published.settings_file)
+        stale = PublishVersion(published.settings_file)
+        published.edit_property("notes", "edited by the artist")
+        published.apply_settings()
+        pipeline.reset_failed()
+        pipeline.run(retries=0, background=True)
+        stale.edit_property("tags", ["stale"])
+        stale.apply_settings()
+        version = PublishVersion(published.settings_file)
+        assert version.notes == "edited by the artist"
+        assert version.get_property("tags") == ["stale"]
+        assert version.post_publish_state == PostPublishStates.DONE.value
+
+        # the inline runs write the states once at the end
+        saves = []
+        original_save = post_publish.PostPublishPipeline._save
+
+        def counting_save(pipeline, data):
+            saves.append(data["state"])
+            return original_save(pipeline, data)
+
+        monkeypatch.setattr(post_publish.PostPublishPipeline, "_save", counting_save)
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.source_path = str(source)
+        try:
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            published = publisher.publish(notes="inline", management_task_id="task_id", background=False)
+        finally:
+            publisher.source_path = None
+        assert saves == [PostPublishStates.DONE.value]
+        assert PublishVersion(published.settings_file).post_publish_state == PostPublishStates.DONE.value
@@ -1,4 +1,5 @@
 """Tests for the UI elements."""
+import gc
 import os
 import pytest
 
@@ -27,6 +28,17 @@ from tik_manager4.ui.widgets import common
 class TestUI:
     """Test UI."""
 
+    @pytest.fixture(scope='function', autouse=True)
+    def collect_garbage(self):
+        """Collect the closed windows of the previous test.
+
+        They live in reference cycles. Collecting them between the tests
+        prevents the garbage collector from deleting them in the middle of
+        a paint event of a later test.
+        """
+        gc.collect()
+        yield
+
     @pytest.fixture(scope='function')
     def main_object(self, tik, files):
         project_path = Path(utils.get_home_dir(), "t4_UI_test_project_DO_NOT_USE")
@@ -49,6 +61,7 @@ class TestUI:
         qtbot.addWidget(m)
         assert m.windowTitle() == f"{main.WINDOW_NAME} - Standalone"
         assert m.objectName() == f"{main.WINDOW_NAME} - Standalone"
+        m.close()
 
     def test_launch_ui_with_wrong_dcc(self, qtbot):
         # make sure all the modules are reloaded
@@ -322,3 +335,98 @@ class TestPySide6Compatibility:
         return tik
 
 
+
+    def test_background_task_loading(self, qtbot, main_object):
+        """Test the tasks are loaded on a worker thread in batches."""
+        import threading
+        from tik_manager4.ui.mcv.task_mcv import TikTaskView
+        from tik_manager4.ui.mcv.subproject_mcv import TikSubView
+
+        project_path = main_object.project.absolute_path
+        main_object.set_project(project_path)
+        sub = main_object.project.create_sub_project("loader", mode="asset", parent_path="")
+        for nmb in range(120):
+            main_object.project.create_task(f"task_{nmb}", categories=["Model"], parent_path=sub.path)
+        # start from a cold project
+        main_object.set_project(project_path)
+        sub = main_object.project.find_sub_by_path(sub.path)
+
+        view = TikTaskView()
+        qtbot.addWidget(view)
+        view.loader.batch_size = 25
+        batches = []
+        view.loader.batch_loaded.connect(lambda batch: batches.append(len(batch)))
+        scan_threads = set()
+
+        def _collect():
+            for task in TikSubView.collect_tasks([sub], recursive=True):
+                scan_threads.add(threading.current_thread())
+                yield task
+
+        with qtbot.waitSignal(view.loader.loading_finished, timeout=10000):
+            view.set_tasks(_collect())
+        assert view.model.rowCount() == 120
+        assert batches == [25, 25, 25, 25, 20]
+        assert threading.current_thread() not in scan_threads
+
+        # starting a new load cancels the running one
+        blocker = threading.Event()
+        tasks = list(sub.tasks.values())
+
+        def _slow():
+            yield tasks[0]
+            blocker.wait(5)
+            yield tasks[1]
+
+        view.set_tasks(_slow())
+        view.set_tasks(iter(tasks[2:3]))
+        blocker.set()
+        assert view.get_items_count() == 1
+        qtbot.wait(100)
+        assert view.model.rowCount() == 1
+
+    def test_lazy_subproject_model(self, qtbot, main_object):
+        """Test the subprojects are fetched level by level."""
+        from tik_manager4.ui.mcv.subproject_mcv import TikSubView
+
+        main_object.set_project(main_object.project.absolute_path)
+        project = main_object.project
+        project.create_sub_project("level_a", mode="asset", parent_path="")
+        project.create_sub_project("level_b", mode="asset", parent_path="level_a")
+        deep = project.create_sub_project("level_c", mode="asset", parent_path="level_a/level_b")
+
+        view = TikSubView(project)
+        qtbot.addWidget(view)
+        # only the project root is populated
+        assert view.get_items_count() == 1
+        assert view.model.hasChildren(view.model.root_item.index())
+
+        # selecting a deep subproject fetches its parents
+        assert view.select_by_id(deep.id)
+        assert view.get_selected_items()[0].subproject.id == deep.id
+        assert view.get_items_count() == 4
+
+        # display data is computed from the objects
+        item = view.model.find_item_by_id_column(deep.id)
+        assert item.text() == "level_c"
+        assert view.model.data(item.index(2)) == deep.path
+
+    def test_task_model_rows(self, qtbot):
+        """Test the task rows are computed from the task objects."""
+        from types import SimpleNamespace
+        from tik_manager4.ui.Qt import QtCore
+        from tik_manager4.ui.mcv.task_mcv import TikTaskModel
+
+        parent_sub = SimpleNamespace(id=1)
+        tasks = [
+            SimpleNamespace(name=f"task_{nmb}", nice_name=None, id=nmb, path=f"bench/task_{nmb}",
+                            type="asset", state="active", deleted=False, parent_sub=parent_sub)
+            for nmb in range(100)
+        ]
+        model = TikTaskModel()
+        model.append_tasks(tasks)
+        assert model.rowCount() == 100
+        for role in (QtCore.Qt.DisplayRole, QtCore.Qt.ForegroundRole,
+                     QtCore.Qt.FontRole, QtCore.Qt.DecorationRole):
+            model.data(model.index(0, 0), role)
+        assert model.data(model.index(50, 0)) == "task_50"
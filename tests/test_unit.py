@@ -379,3 +379,118 @@ def test_metadata_overrides():
     # override it
     metadata.override({"key1": "new_value1"})
     assert metadata.is_overridden("key1") == True
+
+
+def test_metadata_inheritance():
+    from tik_manager4.objects.metadata import Metadata
+    parent = Metadata({"fps": 25, "mode": "shot"})
+    child = parent.inherit({"fps": 30})
+    grand_child = child.inherit()
+
+    assert grand_child.get_value("fps") == 30
+    assert grand_child.get_value("mode") == "shot"
+    assert grand_child.is_overridden("fps") == False
+    assert child.is_overridden("fps") == True
+    assert child.get_overrides() == {"fps": 30}
+    assert dict(grand_child.get_all_items()) == {"fps": 30, "mode": "shot"}
+
+    # edits are visible through the chain and the cached views are refreshed
+    parent.override({"resolution": [1920, 1080]})
+    assert "resolution" in grand_child
+    assert len(grand_child) == 3
+    assert grand_child["resolution"].overridden == False
+    del child["fps"]
+    assert grand_child.get_value("fps") == 25
+
+    # copies are not affected by the later edits
+    snapshot = grand_child.copy()
+    parent.override({"fps": 24})
+    assert snapshot.get_value("fps") == 25
+    assert grand_child.get_value("fps") == 24
+
+
+def test_kitsu_concurrent_prefetch(tik, monkeypatch):
+    """Fetch the event details from a stub Kitsu server through the thread pool."""
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from tik_manager4.management.kitsu.main import ProductionPlatform
+    import gazu
+
+    stats = {"active": 0, "peak": 0, "ports": set()}
+    lock = threading.Lock()
+
+    class KitsuStub(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with lock:
+                stats["active"] += 1
+                stats["peak"] = max(stats["peak"], stats["active"])
+                stats["ports"].add(self.client_address[1])
+            time.sleep(0.05)
+            parts = self.path.split("?")[0].strip("/").split("/")
+            # /api/data/assets/<id> or /api/data/assets/<id>/tasks
+            if parts[-1] == "tasks":
+                body = [{"task_type_name": "Model", "entity_id": parts[-2]}]
+            else:
+                body = {"id": parts[-1], "name": f"asset_{parts[-1]}"}
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            with lock:
+                stats["active"] -= 1
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KitsuStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    old_host = gazu.get_host()
+    try:
+        monkeypatch.setitem(
+            tik.user.commons.management_settings._current_value,
+            "kitsu_max_connections", 4
+        )
+        gazu.set_host(f"http://127.0.0.1:{server.server_address[1]}/api")
+        platform = ProductionPlatform(tik)
+        platform.gazu = gazu
+        platform._configure_session()
+
+        asset_ids = [f"00000000-0000-0000-0000-{nmb:012d}" for nmb in range(10)]
+        events = [{"name": "asset:new", "data": {"asset_id": uid}} for uid in asset_ids]
+        jobs = platform._get_event_jobs(events)
+        assert len(jobs) == 20
+        results = platform.fetch_concurrently(jobs)
+    finally:
+        gazu.set_host(old_host)
+        server.shutdown()
+        server.server_close()
+
+    assert results[("entity", asset_ids[3])]["name"] == f"asset_{asset_ids[3]}"
+    assert results[("categories", asset_ids[7])][0]["task_type_name"] == "Model"
+    assert 1 < stats["peak"] <= 4
+    # the pooled session reuses the connections
+    assert len(stats["ports"]) <= 4
+
+
+def test_kitsu_sync_aborts_on_failed_requests(tik):
+    """A failed request aborts the Kitsu sync without stamping the project."""
+    from unittest.mock import MagicMock
+    from tik_manager4.management.kitsu.main import ProductionPlatform
+    from gazu.exception import ServerErrorException
+
+    tik.project.settings.edit_property("host_project_id", "kitsu_project")
+    tik.project.settings.edit_property("management_platform", "kitsu")
+    tik.project.settings.edit_property("last_sync", None)
+    platform = ProductionPlatform(tik)
+    platform.gazu = MagicMock()
+    platform.gazu.shot.all_shots_for_project.side_effect = ServerErrorException("down")
+
+    state, msg = platform.force_sync()
+    assert state is False
+    assert "shots" in msg
+    assert tik.project.settings.get("last_sync") is None
@@ -1,9 +1,21 @@
 import os
 from pathlib import Path
 from importlib import reload
+from tik_manager4.core import profiler
 from tik_manager4.objects import guard
 
-def initialize(dcc_name, common_folder=None):
+def initialize(dcc_name, common_folder=None, deferred=False):
+    """Initialize the Tik Manager for the given DCC.
+
+    Args:
+        dcc_name (str): The name of the DCC.
+        common_folder (str, optional): The commons folder to use.
+        deferred (bool, optional): If True, the steps not needed for the
+            first paint are postponed until 'Main.finish_startup' is called.
+
+    Returns:
+        Main: The main object.
+    """
     os.environ["TIK_DCC"] = dcc_name
     parent_folder = Path(__file__).parent.parent / "tik_manager4" / "external"
     os.environ["TIK_EXTERNAL_SOURCES"] = parent_folder.as_posix()
@@ -11,9 +23,14 @@ def initialize(dcc_name, common_folder=None):
     # the reload is necessary to make sure the dcc is reloaded
     # this makes sure when different dcc's are used in the same python session
     # for example, Maya and trigger.
-    import tik_manager4.objects.main
-    reload(tik_manager4.objects.main)
-    return tik_manager4.objects.main.Main(common_folder=common_folder)
+    with profiler.phase("import dcc"):
+        import tik_manager4.objects.main
+        reload(tik_manager4.objects.main)
+    with profiler.phase("main"):
+        tik = tik_manager4.objects.main.Main(common_folder=common_folder, deferred=deferred)
+    if not deferred:
+        profiler.PROFILER.report()
+    return tik
 
     # get the installation folder of tik_manager4
     # this is necessary to get the default settings
@@ -0,0 +1,188 @@
+"""Content addressed storage of the published files.
+
+Successive publishes often produce byte identical files. When the store
+is enabled, each published file is hashed and hard linked to its blob in
+the store ('<project>/.blobs/<ab>/<abcdef...>'). A file identical to an
+existing blob is replaced with a link to the blob, so its data is stored
+only once. The published files keep their paths, nothing reading them
+needs to know about the store.
+
+The link count of a blob is the number of its references plus one. Blobs
+without references are removed by the garbage collection.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import stat
+
+from tik_manager4.core import filelog
+from tik_manager4.core import transfer
+from tik_manager4.core import utils
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+DEFAULT_WORKERS = 8
+# smaller files are not worth a blob.
+MIN_SIZE = 64 * 1024
+
+
+class BlobStore:
+    """Content addressed store of the published files."""
+
+    folder_name = ".blobs"
+
+    def __init__(self, project_root, workers=DEFAULT_WORKERS, min_size=MIN_SIZE):
+        """Initialize the store.
+
+        Args:
+            project_root (str): The root folder of the project.
+            workers (int, optional): The maximum number of parallel hashes.
+            min_size (int, optional): Smaller files are not stored.
+        """
+        self.root = Path(project_root, self.folder_name)
+        self.workers = max(1, workers)
+        self.min_size = min_size
+
+    def get_blob_path(self, checksum):
+        """Return the path of the blob.
+
+        Args:
+            checksum (str): The checksum of the content.
+        """
+        return self.root / checksum[:2] / checksum
+
+    def _collect_files(self, paths):
+        """Return the files to store under the given files and folders."""
+        files = []
+        for path in paths:
+            path = Path(path)
+            if path.is_symlink():
+                continue
+            if path.is_file():
+                candidates = [path]
+            else:
+                candidates = [sub for sub in path.rglob("*") if sub.is_file() and not sub.is_symlink()]
+            files.extend(
+                candidate for candidate in candidates
+                if candidate.stat().st_size >= self.min_size
+            )
+        return files
+
+    def ingest(self, paths):
+        """Store the files and link them to their blobs.
+
+        The files are hashed in parallel. A file identical to an existing
+        blob is replaced with a link to it, a new content becomes a blob.
+
+        Args:
+            paths (list): The files and folders to store.
+
+        Returns:
+            dict: The checksums of the stored files by their paths. The files
+                which cannot be linked are left as they are and omitted.
+        """
+        files = self._collect_files(paths)
+        if not files:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(files))) as executor:
+            checksums = list(executor.map(transfer.file_checksum, files))
+        stored = {}
+        for file_path, checksum in zip(files, checksums):
+            try:
+                if self._link(file_path, checksum):
+                    stored[file_path] = checksum
+            except OSError as exc:
+                LOG.warning(f"Cannot store {file_path}: {exc}")
+        return stored
+
+    def _link(self, file_path, checksum):
+        """Link the file to its blob, creating the blob if it is new.
+
+        Returns:
+            bool: True if the file is linked to the blob, False otherwise.
+        """
+        blob = self.get_blob_path(checksum)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(file_path, blob)
+        except FileExistsError:
+            pass
+        except OSError as exc:
+            # the file system does not support the links.
+            LOG.warning(f"Cannot link {file_path} to the blob store: {exc}")
+            return False
+        else:
+            # the blobs are never modified. Protecting them protects the links.
+            os.chmod(blob, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+            return True
+        if os.path.samefile(file_path, blob):
+            return True
+        if blob.stat().st_size != file_path.stat().st_size:
+            LOG.warning(f"The blob {blob} does not match {file_path}. Skipping.")
+            return False
+        state, used = utils.materialize(blob, file_path, strategy="hardlink")
+        return state and used == "hardlink"
+
+    def _iter_blobs(self):
+        """Yield the blobs and their stats."""
+        if not self.root.is_dir():
+            return
+        for folder in self.root.iterdir():
+            if not folder.is_dir():
+                continue
+            for blob in folder.iterdir():
+                try:
+                    yield blob, blob.stat()
+                except OSError:
+                    continue
+
+    def collect_garbage(self):
+        """Remove the blobs which are not referenced by any file anymore.
+
+        Returns:
+            tuple: (number of removed blobs, number of freed bytes)
+        """
+        count = 0
+        freed = 0
+        for blob, stat_result in list(self._iter_blobs()):
+            if stat_result.st_nlink > 1:
+                continue
+            try:
+                os.chmod(blob, stat.S_IWRITE | stat.S_IREAD)
+                blob.unlink()
+            except OSError as exc:
+                LOG.warning(f"Cannot remove the blob {blob}: {exc}")
+                continue
+            count += 1
+            freed += stat_result.st_size
+        for folder in list(self.root.iterdir()) if self.root.is_dir() else []:
+            if folder.is_dir() and not any(folder.iterdir()):
+                folder.rmdir()
+        return count, freed
+
+    def get_report(self):
+        """Return the deduplication report of the store.
+
+        Returns:
+            dict: The number of blobs, the stored bytes, the bytes referenced
+                by the published files, the saved bytes and the ratio of the
+                referenced to the stored bytes.
+        """
+        blobs = 0
+        stored_bytes = 0
+        referenced_bytes = 0
+        for _blob, stat_result in self._iter_blobs():
+            references = stat_result.st_nlink - 1
+            if references < 1:
+                continue
+            blobs += 1
+            stored_bytes += stat_result.st_size
+            referenced_bytes += stat_result.st_size * references
+        return {
+            "blobs": blobs,
+            "stored_bytes": stored_bytes,
+            "referenced_bytes": referenced_bytes,
+            "saved_bytes": referenced_bytes - stored_bytes,
+            "ratio": referenced_bytes / stored_bytes if stored_bytes else 1.0,
+        }
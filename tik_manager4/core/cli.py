@@ -66,6 +66,19 @@ class FeedbackCLI:
                 return self.result
             print("Invalid option. Please try again.")
 
+    def show_progress(self, progress, label: str = "Copying") -> None:
+        """Prints the progress of a file transfer on a single line.
+
+        Can be passed as the progress callback of the file transfers.
+        """
+        finished = progress.done_files == progress.total_files
+        print(
+            f"\r{label}: {progress.percent:5.1f}% "
+            f"({progress.done_files}/{progress.total_files} files)",
+            end="\n" if finished else "",
+            flush=True,
+        )
+
 
 # Example usage
 if __name__ == "__main__":
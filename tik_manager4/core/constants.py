@@ -83,3 +83,24 @@ class BranchingModes(Enum):
     """Enumeration of branching modes."""
     ACTIVE = "Active Branches"
     PASSIVE = "Passive Branches"
+
+class MaterializationModes(Enum):
+    """Enumeration of the ways to create the elements of the active branches."""
+    COPY = "Copy"
+    AUTO = "Auto"
+    REFLINK = "Reflink"
+    HARDLINK = "Hardlink"
+    SYMLINK = "Symlink"
+
+class SyncStates(Enum):
+    """Enumeration of the states of the localized versions synced to the origin."""
+    PENDING = "pending"
+    SYNCED = "synced"
+    FAILED = "failed"
+
+class PostPublishStates(Enum):
+    """Enumeration of the states of the post publish steps."""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
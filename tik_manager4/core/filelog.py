@@ -1,12 +1,225 @@
 """Logging module for Tik Manager 4."""
 
+import atexit
 import logging
+import os
+import queue
+import sys
+import threading
+import time as _time
+import traceback
 from pathlib import Path
 
 from tik_manager4.core import utils
 
 import datetime
 
+
+class _LogWriter:
+    """Background writer of a single log file.
+
+    The log lines are queued by the loggers and written by a daemon thread
+    in batches over a single open file, so logging never waits for the
+    disk. Once the file grows over the size cap, it is rotated to
+    '<name>.log.1' before the next batch. A file which cannot be rotated
+    keeps growing and the rotation is tried again after another size cap.
+    """
+
+    # seconds to collect the lines of a batch after the first one.
+    batch_delay = 0.05
+
+    def __init__(self, file_path, header, size_cap):
+        """Initialize the writer.
+
+        Args:
+            file_path (Path): The path of the log file.
+            header (str): The name written on top of the new log files.
+            size_cap (int): The size in bytes after which the file is rotated.
+        """
+        self.file_path = Path(file_path)
+        self.header = header
+        self.size_cap = size_cap
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.RLock()
+        self._stream = None
+        self._size = 0
+        self._next_rotation = size_cap
+        self._thread = None
+        with self._lock:
+            if not self.file_path.is_file():
+                self._start_file(self.header)
+            elif self.file_path.stat().st_size > self.size_cap:
+                self._rotate()
+
+    def _open(self):
+        """Open the file for appending if it is not open yet."""
+        if self._stream is None:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            self._stream = open(self.file_path, "a", encoding="utf-8")
+            self._size = self._stream.tell()
+        return self._stream
+
+    def _close(self):
+        """Close the file."""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def _start_file(self, header):
+        """Write the header to the (new) file."""
+        line = "=" * len(header)
+        self._write_lines([line, header, line, ""])
+
+    def _write_lines(self, lines):
+        """Write the lines and flush the file."""
+        text = "".join(f"{line}\n" for line in lines)
+        stream = self._open()
+        stream.write(text)
+        stream.flush()
+        self._size += len(text.encode("utf-8"))
+
+    def _rotate(self):
+        """Move the file to the backup and start a new one."""
+        self._close()
+        try:
+            os.replace(self.file_path, f"{self.file_path}.1")
+        except OSError:
+            # in use by another process. Keep appending to the same file
+            # and try again after another size cap.
+            self._open()
+            self._next_rotation = self._size + self.size_cap
+            return
+        self._next_rotation = self.size_cap
+        self._start_file(self.header)
+
+    def write(self, line):
+        """Queue the line to be written."""
+        self._queue.put(line)
+        self._ensure_thread()
+
+    def _ensure_thread(self):
+        """Start the writer thread, again if it has died."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"Filelog-{self.file_path.name}", daemon=True
+                )
+                self._thread.start()
+
+    @staticmethod
+    def _report_error():
+        """Report the error of a batch the way logging.Handler.handleError does."""
+        if logging.raiseExceptions and sys.stderr:
+            try:
+                sys.stderr.write("--- Logging error ---\n")
+                traceback.print_exc(file=sys.stderr)
+            except OSError:
+                pass
+
+    def _run(self):
+        """Write the queued lines in batches."""
+        while True:
+            batch = [self._queue.get()]
+            if isinstance(batch[0], str):
+                _time.sleep(self.batch_delay)
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [item for item in batch if isinstance(item, str)]
+            try:
+                with self._lock:
+                    if lines:
+                        if self._size > self._next_rotation:
+                            self._rotate()
+                        self._write_lines(lines)
+            except Exception:  # pylint: disable=broad-except
+                # the lines of the batch are lost, the writer carries on.
+                self._report_error()
+            finally:
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+
+    def flush(self, timeout=5.0):
+        """Wait until the queued lines are written."""
+        if self._thread is None:
+            return
+        self._ensure_thread()
+        event = threading.Event()
+        self._queue.put(event)
+        event.wait(timeout)
+
+    def clear(self, header):
+        """Write the queued lines, then start the file over.
+
+        Args:
+            header (str): The name written on top of the new file.
+        """
+        self.flush()
+        with self._lock:
+            self._close()
+            if self.file_path.is_file():
+                self.file_path.unlink()
+            self._next_rotation = self.size_cap
+            self._start_file(header)
+
+    def close(self):
+        """Write the queued lines and close the file."""
+        self.flush()
+        with self._lock:
+            self._close()
+
+
+class _WriterHandler(logging.Handler):
+    """Passes the records of the Filelog objects to their writers.
+
+    The records of the other loggers propagating to the same logger are
+    not written to the file.
+    """
+
+    def emit(self, record):
+        writer = getattr(record, "log_writer", None)
+        if writer is None:
+            return
+        try:
+            writer.write(self.format(record))
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+
+_WRITERS = {}  # file path => _LogWriter
+_WRITERS_LOCK = threading.Lock()
+
+
+def _get_writer(file_path, header, size_cap):
+    """Return the writer of the log file, creating it on the first use."""
+    key = str(file_path)
+    writer = _WRITERS.get(key)
+    if writer is None:
+        with _WRITERS_LOCK:
+            writer = _WRITERS.get(key)
+            if writer is None:
+                writer = _WRITERS[key] = _LogWriter(file_path, header, size_cap)
+    return writer
+
+
+def flush():
+    """Write all the queued log lines."""
+    for writer in list(_WRITERS.values()):
+        writer.flush()
+
+
+@atexit.register
+def _close_writers():
+    """Write the queued log lines and close the files at exit."""
+    for writer in list(_WRITERS.values()):
+        writer.close()
+
+
 class Filelog:
     """Logging class handling file logging."""
     # FIXME(ckutlu): We should definitely rethink the need for global state as
@@ -22,13 +235,15 @@ class Filelog:
         self.file_path_obj = Path(self.file_dir, f"{self.file_name}.log")
         self.logger = logging.getLogger(self.file_name)
         self.logger.setLevel(logging.DEBUG)
+        if not any(isinstance(handler, _WriterHandler) for handler in self.logger.handlers):
+            self.logger.addHandler(_WriterHandler())
         self.log_name = logname if logname else self.file_name
         self.is_date = date
         self.is_time = time
-        if not self.file_path_obj.is_file():
-            self._welcome()
-        if self.get_size() > size_cap:
-            self.clear()
+        # the file is checked and rotated once per process.
+        self._writer = _get_writer(self.file_path_obj, self.log_name, size_cap)
+        self._extra = {"log_writer": self._writer}
+        self._now_cache = (None, "")
 
     @classmethod
     def __set_last_message(cls, msg, message_type):
@@ -49,6 +264,10 @@ class Filelog:
     def _get_now(self):
         """Return the current date and time in a formatted string."""
         if self.is_date or self.is_time:
+            # the stamp has a resolution of minutes.
+            minute = int(_time.time() // 60)
+            if self._now_cache[0] == minute:
+                return self._now_cache[1]
             now = datetime.datetime.now()
             now_data = []
             if self.is_date:
@@ -56,20 +275,11 @@ class Filelog:
             if self.is_time:
                 now_data.append(now.strftime("%H:%M"))
             now_string = " - ".join(now_data)
-            return "%s - " %now_string
+            self._now_cache = (minute, "%s - " %now_string)
+            return self._now_cache[1]
         else:
             return ""
 
-    def _welcome(self):
-        """Print welcome message to the log file."""
-        self._start_logging()
-        self.logger.debug("=" * len(self.log_name))
-        self.logger.debug(self.log_name)
-        self.logger.debug("=" * len(self.log_name))
-        self.logger.debug("")
-        self._end_logging()
-        return self.log_name
-
     def info(self, msg, *args):
         """Log an info message.
 
@@ -79,10 +289,8 @@ class Filelog:
         # use args to format the message mimicking the lazy logging
         msg = msg % args if args else msg
         stamped_msg = "%sINFO     : %s" %(self._get_now(), msg)
-        self._start_logging()
-        self.logger.info(stamped_msg)
+        self.logger.info(stamped_msg, extra=self._extra)
         self.__set_last_message(msg, "info")
-        self._end_logging()
         return msg
 
     def warning(self, msg, *args):
@@ -93,10 +301,8 @@ class Filelog:
         """
         msg = msg % args if args else msg
         stamped_msg = "%sWARNING  : %s" % (self._get_now(), msg)
-        self._start_logging()
-        self.logger.warning(stamped_msg)
+        self.logger.warning(stamped_msg, extra=self._extra)
         self.__set_last_message(msg, "warning")
-        self._end_logging()
         return msg
 
     def error(self, msg, *args, proceed=True):
@@ -108,10 +314,8 @@ class Filelog:
         """
         msg = msg % args if args else msg
         stamped_msg = "%sERROR    : %s" % (self._get_now(), msg)
-        self._start_logging()
-        self.logger.error(stamped_msg, exc_info=True)
+        self.logger.error(stamped_msg, exc_info=True, extra=self._extra)
         self.__set_last_message(msg, "error")
-        self._end_logging()
         if not proceed:
             raise msg
         return msg
@@ -124,10 +328,8 @@ class Filelog:
         """
         msg = msg % args if args else msg
         stamped_msg = "%sEXCEPTION: %s" % (self._get_now(), msg)
-        self._start_logging()
-        self.logger.exception(stamped_msg)
+        self.logger.exception(stamped_msg, extra=self._extra)
         self.__set_last_message(msg, "error")
-        self._end_logging()
         return msg
 
     def title(self, msg):
@@ -136,13 +338,10 @@ class Filelog:
         Args:
             msg (str): The title to create.
         """
-        self._start_logging()
-        self.logger.debug("")
-        self.logger.debug("="*(len(msg)))
-        self.logger.debug(msg)
-        self.logger.debug("="*(len(msg)))
-        # self.logger.debug("\n")
-        self._end_logging()
+        self.logger.debug("", extra=self._extra)
+        self.logger.debug("="*(len(msg)), extra=self._extra)
+        self.logger.debug(msg, extra=self._extra)
+        self.logger.debug("="*(len(msg)), extra=self._extra)
         return msg
 
     def header(self, msg):
@@ -151,41 +350,26 @@ class Filelog:
         Args:
             msg (str): The header to create.
         """
-        self._start_logging()
-        self.logger.debug("")
-        self.logger.debug(msg)
-        self.logger.debug("=" * (len(msg)))
-        # self.logger.debug("\n")
-        self._end_logging()
+        self.logger.debug("", extra=self._extra)
+        self.logger.debug(msg, extra=self._extra)
+        self.logger.debug("=" * (len(msg)), extra=self._extra)
         return msg
 
     def seperator(self):
         """Create a seperator in the log file."""
-        self._start_logging()
-        self.logger.debug("")
-        self.logger.debug("-"*30)
-        # self.logger.debug("\n")
-        self._end_logging()
+        self.logger.debug("", extra=self._extra)
+        self.logger.debug("-"*30, extra=self._extra)
         return True
 
+    def flush(self):
+        """Wait until the queued messages are written to the log file."""
+        self._writer.flush()
+
     def clear(self):
         """Clear the log file."""
-        if self.file_path_obj.is_file():
-            self.file_path_obj.unlink()
-        self._welcome()
-
-    def _start_logging(self):
-        """Prepare logger to write into log file."""
-        file_logger = logging.FileHandler(str(self.file_path_obj))
-        self.logger.addHandler(file_logger)
-
-    def _end_logging(self):
-        """Delete handlers once the logging into file finishes."""
-        for handler in self.logger.handlers:
-            self.logger.removeHandler(handler)
-            handler.flush()
-            handler.close()
+        self._writer.clear(self.log_name)
 
     def get_size(self):
         """Return the size of the log file."""
+        self._writer.flush()
         return self.file_path_obj.stat().st_size
@@ -1,14 +1,596 @@
 """I/O Module to handle read/write operations."""
 
+from collections import OrderedDict
 from pathlib import Path
 import json
 from json.decoder import JSONDecodeError
+import os
+import stat
+import threading
+import time
 from tik_manager4.core import filelog
 from tik_manager4.external import filelock as fl
 
 LOG = filelog.Filelog(logname=__name__)
 
 
+def _stdlib_dumps(data, compact):
+    """Serialize the data with the standard json module."""
+    if compact:
+        return json.dumps(data, separators=(",", ":"))
+    return json.dumps(data, indent=4)
+
+
+def _get_available_backends():
+    """Collect the json backends importable in this environment.
+
+    Returns:
+        dict: Backend names and (loads, dumps) function pairs. The dumps
+            functions take the data and the compact flag and return a string.
+    """
+    backends = {"json": (json.loads, _stdlib_dumps)}
+    try:
+        import ujson  # pylint: disable=import-outside-toplevel
+
+        def _ujson_dumps(data, compact):
+            return ujson.dumps(
+                data, indent=0 if compact else 4, escape_forward_slashes=False
+            )
+
+        backends["ujson"] = (ujson.loads, _ujson_dumps)
+    except ImportError:
+        pass
+    try:
+        import orjson  # pylint: disable=import-outside-toplevel
+
+        def _orjson_dumps(data, compact):
+            option = 0 if compact else orjson.OPT_INDENT_2
+            return orjson.dumps(data, option=option).decode("utf-8")
+
+        backends["orjson"] = (orjson.loads, _orjson_dumps)
+    except ImportError:
+        pass
+    return backends
+
+
+BACKENDS = _get_available_backends()
+_BACKEND_PREFERENCE = ["orjson", "ujson", "json"]
+_backend_name = "json"
+_loads, _dumps = BACKENDS["json"]
+
+
+def set_json_backend(name=None):
+    """Set the json backend used for reading and writing.
+
+    Args:
+        name (str, optional): Name of the backend. One of 'orjson', 'ujson'
+            or 'json'. If not provided or not available, the fastest
+            available backend is used.
+
+    Returns:
+        str: The name of the backend in use.
+    """
+    global _backend_name, _loads, _dumps  # pylint: disable=global-statement
+    if name not in BACKENDS:
+        if name:
+            LOG.warning(f"JSON backend '{name}' is not available.")
+        name = next(_name for _name in _BACKEND_PREFERENCE if _name in BACKENDS)
+    _backend_name = name
+    _loads, _dumps = BACKENDS[name]
+    return name
+
+
+def get_json_backend():
+    """Return the name of the json backend in use."""
+    return _backend_name
+
+
+# The backend can be forced with the TIK_JSON_BACKEND environment variable.
+set_json_backend(os.getenv("TIK_JSON_BACKEND"))
+
+# Folders whose files are written without indentation.
+_COMPACT_FOLDERS = set()
+
+
+def set_compact_folder(folder, state=True):
+    """Write the files under the folder compactly or pretty-printed.
+
+    Args:
+        folder (str): The folder path, e.g. the database of a project.
+        state (bool, optional): Compact if True, pretty-printed otherwise.
+    """
+    folder = str(Path(folder))
+    if state:
+        _COMPACT_FOLDERS.add(folder)
+    else:
+        _COMPACT_FOLDERS.discard(folder)
+
+
+def is_compact(file_path):
+    """Check if the file should be written compactly."""
+    parents = {str(parent) for parent in Path(file_path).parents}
+    return not parents.isdisjoint(_COMPACT_FOLDERS)
+
+
+# Folders whose work files keep their version records in a journal.
+_JOURNAL_FOLDERS = set()
+
+
+def set_journal_folder(folder, state=True):
+    """Append the version records of the files under the folder to journals.
+
+    Args:
+        folder (str): The folder path, e.g. the database of a project.
+        state (bool, optional): Journal the records if True, rewrite the
+            whole files otherwise.
+    """
+    folder = str(Path(folder))
+    if state:
+        _JOURNAL_FOLDERS.add(folder)
+    else:
+        _JOURNAL_FOLDERS.discard(folder)
+
+
+def is_journaled(file_path):
+    """Check if the records of the file should be appended to a journal."""
+    if not _JOURNAL_FOLDERS:
+        return False
+    parents = {str(parent) for parent in Path(file_path).parents}
+    return not parents.isdisjoint(_JOURNAL_FOLDERS)
+
+
+class JsonCache:
+    """Process-wide cache for the content of the database files.
+
+    Entries are validated against the stat signature (modification time
+    and size) of the file, so files changed by other processes or
+    workstations are read again. The file content is kept as text and
+    parsed on every hit, which is faster than copying the parsed data
+    and makes sure callers never share mutable objects.
+    Least recently used entries are evicted when the total size of the
+    cached content exceeds the byte budget.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """Initializes the JsonCache class.
+
+        Args:
+            max_bytes (int): The byte budget of the cache.
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path => (signature, content)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, file_path, signature):
+        """Return the cached content of the file.
+
+        Args:
+            file_path (str): The file path.
+            signature (tuple): The current stat signature of the file.
+
+        Returns:
+            str or None: The cached content if the file is unchanged,
+                None otherwise.
+        """
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(file_path)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, file_path, signature, content):
+        """Store the content of the file.
+
+        Args:
+            file_path (str): The file path.
+            signature (tuple): The stat signature of the file at read time.
+            content (str): The content of the file.
+        """
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(file_path)
+            self._entries[file_path] = (signature, content)
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def invalidate(self, file_path=None):
+        """Drop the file from the cache.
+
+        Args:
+            file_path (str, optional): The file path. If not provided,
+                the whole cache is cleared.
+        """
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                self._size = 0
+            else:
+                self._pop(str(file_path))
+
+    def _pop(self, file_path):
+        """Remove the entry without locking."""
+        entry = self._entries.pop(file_path, None)
+        if entry:
+            self._size -= len(entry[1])
+
+    def stats(self):
+        """Return the cache statistics."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def reset_stats(self):
+        """Reset the hit, miss and eviction counters."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+# The byte budget can be overridden with the TIK_JSON_CACHE_SIZE (bytes).
+CACHE = JsonCache(int(os.getenv("TIK_JSON_CACHE_SIZE", str(64 * 1024 * 1024))))
+
+
+class WriteQueue:
+    """Write-behind queue coalescing the writes to the same file.
+
+    While the queue is active (used as a context manager), the writes are
+    collected per file and only the last one is written when the queue is
+    flushed. The queue flushes itself after a short delay, when the
+    outermost context exits, or when a pending file is read back or
+    written directly through the IO class.
+
+    The queue is active only for the threads within the context. The
+    other threads keep writing right away. The writes failed on the
+    delayed flush are kept and retried, the flush on the context exit
+    raises the error to the caller.
+    """
+
+    def __init__(self, delay=0.5):
+        """Initializes the WriteQueue class.
+
+        Args:
+            delay (float): Seconds to wait before flushing the pending writes.
+        """
+        self.delay = delay
+        self._pending = OrderedDict()  # path => write function
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._timer = None
+
+    @property
+    def _depth(self):
+        """The context depth of the current thread."""
+        return getattr(self._local, "depth", 0)
+
+    @property
+    def active(self):
+        """Whether the writes of the current thread are deferred or not."""
+        return self._depth > 0
+
+    def is_pending(self, file_path):
+        """Check if there is a pending write for the file."""
+        return str(file_path) in self._pending
+
+    def enqueue(self, file_path, write_function):
+        """Defer the write of the file.
+
+        A pending write for the same file is replaced.
+
+        Args:
+            file_path (str): The file path.
+            write_function (callable): Function writing the file when called.
+        """
+        with self._lock:
+            file_path = str(file_path)
+            self._pending.pop(file_path, None)
+            self._pending[file_path] = write_function
+            self._start_timer()
+
+    def _start_timer(self):
+        """Schedule the delayed flush if it is not scheduled yet."""
+        if self._timer is None:
+            self._timer = threading.Timer(self.delay, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self, file_path=None):
+        """Write the pending files now.
+
+        Args:
+            file_path (str, optional): Only flush the given file. If not
+                provided, all pending writes are flushed.
+        """
+        with self._lock:
+            if file_path is not None:
+                write_function = self._pending.pop(str(file_path), None)
+                if write_function:
+                    write_function()
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            failed = self._write_pending()
+            if failed:
+                raise failed[0][2]
+
+    def _write_pending(self):
+        """Write all the pending files.
+
+        Returns:
+            list: The (file path, write function, exception) of the failed writes.
+        """
+        failed = []
+        while self._pending:
+            file_path, write_function = self._pending.popitem(last=False)
+            try:
+                write_function()
+            except Exception as exc:  # pylint: disable=broad-except
+                failed.append((file_path, write_function, exc))
+        return failed
+
+    def flush_folder(self, folder):
+        """Write the pending files under the given folder now.
+
+        Args:
+            folder (str): The folder path.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            folder = os.path.join(str(folder), "")
+            for file_path in [_path for _path in self._pending if _path.startswith(folder)]:
+                self.flush(file_path)
+
+    def _flush_on_timer(self):
+        """Flush the pending writes from the timer thread.
+
+        The failed writes are kept for the next delayed flush, unless they
+        are replaced by a newer write meanwhile.
+        """
+        with self._lock:
+            self._timer = None
+            for file_path, write_function, exc in self._write_pending():
+                LOG.warning(f"Deferred write of {file_path} failed, retrying: {exc}")
+                self._pending.setdefault(file_path, write_function)
+            if self._pending:
+                self._start_timer()
+
+    def __enter__(self):
+        self._local.depth = self._depth + 1
+        return self
+
+    def __exit__(self, *args):
+        self._local.depth = self._depth - 1
+        if not self._depth:
+            self.flush()
+
+
+WRITE_QUEUE = WriteQueue()
+
+
+def write_behind():
+    """Return the write-behind queue to be used as a context manager.
+
+    Example:
+        >>> with write_behind():
+        ...     task.omit()
+        ...     task.add_category("Model")  # both written once on exit
+    """
+    return WRITE_QUEUE
+
+
+def flush(file_path=None):
+    """Write the deferred files now.
+
+    Args:
+        file_path (str, optional): Only flush the given file. If not
+            provided, all pending writes are flushed.
+    """
+    WRITE_QUEUE.flush(file_path)
+
+
+# Folders modified within this window are listed again on the next scan.
+# Covers the file systems with coarse modified time resolution.
+_RACY_WINDOW_NS = 2 * 10**9
+
+
+class FolderScanner:
+    """Incremental scanner for the database files under a folder.
+
+    The listing of each scanned folder is kept together with the modified
+    time of the folder and the stat signatures of the collected files. A
+    folder is listed again only if its modified time changed. Adding,
+    removing or atomically replacing a file changes the modified time of
+    the folder, but rewriting a file in place does not. So the files of
+    an unchanged folder are still compared with their signatures, which
+    costs a stat call per file instead of a listing.
+    """
+
+    def __init__(self, folder, extension, recursive=False):
+        """Initializes the FolderScanner class.
+
+        Args:
+            folder (str): The folder to scan.
+            extension (str): The extension of the files to collect.
+            recursive (bool, optional): If True, the sub folders are scanned
+                as well.
+        """
+        self.folder = str(folder)
+        self.extension = extension
+        self._journal_extension = f"{extension}{Journal.suffix}"
+        self.recursive = recursive
+        self.paths = []
+        self.exists = False
+        # folder => (modified time, {file path: signature}, [sub folders])
+        self._folders = {}
+        self._scanned = False
+
+    def reset(self):
+        """Forget the collected listings."""
+        self.paths = []
+        self.exists = False
+        self._folders = {}
+        self._scanned = False
+
+    def scan(self, force=False):
+        """Scan the folder for changes.
+
+        Args:
+            force (bool, optional): If True, all folders are listed again
+                regardless of their modified times.
+
+        Returns:
+            set or None: The paths of the new or modified files since the
+                last scan. None if nothing has changed.
+        """
+        WRITE_QUEUE.flush_folder(self.folder)
+        modified = set()
+        folders = {}
+        changed = self._scan_folder(self.folder, force, folders, modified)
+        changed = changed or len(folders) != len(self._folders)
+        self.exists = self.folder in folders
+        self._folders = folders
+        if self._scanned and not changed:
+            return None
+        self._scanned = True
+        self.paths = [
+            Path(file_path)
+            for _modified_time, files, _sub_folders in folders.values()
+            for file_path in files
+        ]
+        return modified
+
+    def signatures(self):
+        """Return the stat signatures of the collected files by their paths.
+
+        The signatures are collected while listing the folders, so this
+        does not touch the file system.
+        """
+        return {
+            Path(file_path): signature
+            for _modified_time, files, _sub_folders in self._folders.values()
+            for file_path, signature in files.items()
+        }
+
+    def _scan_folder(self, folder, force, folders, modified):
+        """Collect the files of a single folder and its sub folders.
+
+        Args:
+            folder (str): The folder to scan.
+            force (bool): List the folder regardless of its modified time.
+            folders (dict): The collected folder listings.
+            modified (set): The collected new or modified file paths.
+
+        Returns:
+            bool: True if any of the folders has changed.
+        """
+        try:
+            modified_time = os.stat(folder).st_mtime_ns
+        except OSError:
+            return folder in self._folders
+        cached = self._folders.get(folder)
+        if (cached and cached[0] == modified_time and not force
+                and self._is_unchanged(cached[1])):
+            folders[folder] = cached
+            changed = False
+        else:
+            previous_files = cached[1] if cached else {}
+            files = {}
+            sub_folders = []
+            journals = {}
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.name.endswith(self.extension):
+                        try:
+                            _stat = entry.stat()
+                        except OSError:
+                            continue
+                        files[entry.path] = (_stat.st_mtime_ns, _stat.st_size)
+                    elif entry.name.endswith(self._journal_extension):
+                        try:
+                            _stat = entry.stat()
+                        except OSError:
+                            continue
+                        journals[entry.path[:-len(Journal.suffix)]] = (
+                            _stat.st_mtime_ns, _stat.st_size)
+                    elif self.recursive and entry.is_dir():
+                        sub_folders.append(entry.path)
+            for file_path, signature in journals.items():
+                # appending to the journal changes the file.
+                if file_path in files:
+                    files[file_path] += signature
+            for file_path, signature in files.items():
+                if previous_files.get(file_path) != signature:
+                    modified.add(Path(file_path))
+            if time.time_ns() - modified_time < _RACY_WINDOW_NS:
+                # too recent to be trusted.
+                modified_time = None
+            folders[folder] = (modified_time, files, sub_folders)
+            changed = (files.keys() != previous_files.keys()
+                       or bool(modified) or cached is None
+                       or cached[2] != sub_folders)
+        for sub_folder in folders[folder][2]:
+            changed = self._scan_folder(sub_folder, force, folders, modified) or changed
+        return changed
+
+    @staticmethod
+    def _is_unchanged(files):
+        """Check the files still match their collected signatures.
+
+        Args:
+            files (dict): The stat signatures of the files by their paths.
+                The signature of a journaled file ends with the signature
+                of its journal.
+
+        Returns:
+            bool: True if none of the files has changed.
+        """
+        for file_path, signature in files.items():
+            paths = (file_path, f"{file_path}{Journal.suffix}")
+            current = ()
+            for path in paths[:len(signature) // 2]:
+                try:
+                    _stat = os.stat(path)
+                except OSError:
+                    return False
+                current += (_stat.st_mtime_ns, _stat.st_size)
+            if current != signature:
+                return False
+        return True
+
+
+# Directories known to exist. Spares the mkdir calls on repeated writes.
+_KNOWN_DIRECTORIES = set()
+
+
+def invalidate_cache(file_path=None):
+    """Drop the file from the process-wide cache.
+
+    Args:
+        file_path (str, optional): The file path. If not provided, the
+            whole cache is cleared.
+    """
+    CACHE.invalidate(file_path)
+
+
 class IO:
     """Handler class for read/write operations."""
 
@@ -48,14 +630,36 @@ class IO:
             msg = f"IO module does not support this extension ({ext})"
             LOG.error(msg)
             raise ValueError(msg)
-        self._path_obj.parent.mkdir(parents=True, exist_ok=True)
+        # folders are created on the first write. Not here.
         self._string_path = str(self._path_obj)
 
-    def read(self, file_path=None):
+    def stat(self, file_path=None):
+        """Return the stat result of the file.
+
+        Args:
+            file_path (str, optional): The file path. Defaults to the file
+                path of the IO object.
+
+        Returns:
+            os.stat_result or None: The stat result if the file exists,
+                None otherwise.
+        """
+        _path_obj = Path(file_path) if file_path else self._path_obj
+        if WRITE_QUEUE.is_pending(_path_obj):
+            WRITE_QUEUE.flush(_path_obj)
+        try:
+            _stat = _path_obj.stat()
+        except OSError:
+            return None
+        return _stat if stat.S_ISREG(_stat.st_mode) else None
+
+    def read(self, file_path=None, stat_result=None):
         """Read the given file and return the data.
 
         Args:
             file_path (str): The file path to read from.
+            stat_result (os.stat_result, optional): Already collected stat
+                result of the file. Spares a stat call if provided.
 
         Raises:
             FileNotFoundError: If the file does not exist.
@@ -64,12 +668,26 @@ class IO:
             dict: The data read from the file.
         """
         _path_obj = Path(file_path) if file_path else self._path_obj
-        if _path_obj.is_file():
-            return self._load_json(str(_path_obj))
+        if WRITE_QUEUE.is_pending(_path_obj):
+            stat_result = None
+        _stat = stat_result or self.stat(str(_path_obj))
+        if _stat:
+            return self._load_json(
+                str(_path_obj), signature=(_stat.st_mtime_ns, _stat.st_size)
+            )
         msg = f"File does not exist => {str(_path_obj)}"
         LOG.error(msg)
         raise FileNotFoundError(msg)
 
+    def invalidate(self, file_path=None):
+        """Drop the file from the process-wide cache.
+
+        Args:
+            file_path (str, optional): The file path. Defaults to the
+                file path of the IO object.
+        """
+        CACHE.invalidate(file_path or self._string_path)
+
     def write(self, data, file_path=None):
         """Write the given data to the file.
 
@@ -81,25 +699,100 @@ class IO:
             fl.Timeout: If the file is locked by another process.
         """
         _path_obj = Path(file_path) if file_path else self._path_obj
+        # a pending deferred write must not land after this one.
+        if WRITE_QUEUE.is_pending(_path_obj):
+            WRITE_QUEUE.flush(_path_obj)
+        self._ensure_folder(_path_obj.parent)
+        try:
+            self._locked_write(data, _path_obj)
+        except FileNotFoundError:
+            # the folder is removed after it is memorized
+            self._ensure_folder(_path_obj.parent, force=True)
+            self._locked_write(data, _path_obj)
+
+    def update(self, data, file_path=None):
+        """Write the given keys into the file and keep its other keys.
+
+        The file is read and written while holding the file lock, so the
+        keys edited meanwhile by the other sessions are not overwritten.
+
+        Args:
+            data (dict): The keys and values to write.
+            file_path (str, optional): The file path. Defaults to the file
+                path of the IO object.
+
+        Raises:
+            fl.Timeout: If the file is locked by another process.
+
+        Returns:
+            dict: The updated content of the file.
+        """
+        _path_obj = Path(file_path) if file_path else self._path_obj
+        if WRITE_QUEUE.is_pending(_path_obj):
+            WRITE_QUEUE.flush(_path_obj)
+        self._ensure_folder(_path_obj.parent)
         _lock_path = f"{str(_path_obj)}.lock"
-        lock = fl.FileLock(_lock_path, timeout=3)
         try:
-            lock.acquire()
-            self._dump_json(data, str(_path_obj))
+            with fl.FileLock(_lock_path, timeout=3):
+                content = self._load_json(str(_path_obj)) if _path_obj.is_file() else {}
+                content.update(data)
+                self._dump_json(content, str(_path_obj))
+        except fl.Timeout as exc:
+            raise fl.Timeout("File is locked by another process") from exc
+        CACHE.invalidate(str(_path_obj))
+        return content
+
+    def _locked_write(self, data, path_obj):
+        """Write the data while holding the file lock.
+
+        Args:
+            data (dict): The data to write.
+            path_obj (Path): The file path object to write to.
+
+        Raises:
+            fl.Timeout: If the file is locked by another process.
+        """
+        _lock_path = f"{str(path_obj)}.lock"
+        try:
+            with fl.FileLock(_lock_path, timeout=3):
+                self._dump_json(data, str(path_obj))
         except fl.Timeout as exc:
             raise fl.Timeout("File is locked by another process") from exc
 
     @staticmethod
-    def _load_json(file_path):
+    def _ensure_folder(folder_obj, force=False):
+        """Create the folder if it is not known to exist.
+
+        Args:
+            folder_obj (Path): The folder path object.
+            force (bool, optional): If True, the memo is ignored.
+        """
+        folder = str(folder_obj)
+        if folder in _KNOWN_DIRECTORIES and not force:
+            return
+        folder_obj.mkdir(parents=True, exist_ok=True)
+        _KNOWN_DIRECTORIES.add(folder)
+
+    @staticmethod
+    def _load_json(file_path, signature=None):
         """Load the given json file.
 
         Args:
             file_path (str): The file path to load.
+            signature (tuple, optional): The stat signature of the file.
+                If provided, the content is served from and stored in
+                the process-wide cache.
         """
+        content = CACHE.get(file_path, signature) if signature else None
         try:
-            with open(file_path, "r") as f:
-                data = json.load(f)
+            if content is None:
+                with open(file_path, "r") as f:
+                    content = f.read()
+                data = _loads(content)
+                if signature:
+                    CACHE.put(file_path, signature, content)
                 return data
+            return _loads(content)
         except (ValueError, JSONDecodeError) as exc:
             msg = f"Corrupted file => {file_path}"
             LOG.error(msg)
@@ -118,13 +811,357 @@ class IO:
     def _dump_json(data, file_path):
         """Save the data to the json file.
 
+        The data is written to a temporary file next to the target which
+        then replaces the target, so readers never see a half-written file.
+
         Args:
             data (dict): The data to save.
             file_path (str): The file path to save.
         """
-        with open(file_path, "w") as f:
-            json.dump(data, f, indent=4)
+        compact = bool(_COMPACT_FOLDERS) and is_compact(file_path)
+        try:
+            content = _dumps(data, compact)
+        except (TypeError, ValueError, OverflowError):
+            # e.g. non-string keys or big integers which only json handles
+            content = _stdlib_dumps(data, compact)
+        temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                f.write(content)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
 
     def get_modified_time(self):
         """Get the modified time of the file"""
-        return self._path_obj.lstat().st_mtime
+        if WRITE_QUEUE.is_pending(self._path_obj):
+            WRITE_QUEUE.flush(self._path_obj)
+        return self._path_obj.stat().st_mtime
+
+
+class JournalConflict(Exception):
+    """Raised when a new record id is appended by another process first."""
+
+    def __init__(self, message, records):
+        """Initializes the JournalConflict exception.
+
+        Args:
+            message (str): The error message.
+            records (list): The records appended by others since the last
+                read. They are not read again, the caller must merge them.
+        """
+        super().__init__(message)
+        self.records = records
+
+
+class Journal:
+    """Append-only journal for the records of a list in a database file.
+
+    The records are kept one json document per line in a file next to the
+    database file (e.g. 'work.twork.journal'). Reading the database file
+    means reading the file and upserting the records of the journal into
+    the list by their id. Appending a record writes a single line instead
+    of the whole file. Compacting folds the records into the database file
+    and removes the journal.
+
+    Appends and compactions hold the lock of the database file, so
+    processes on different workstations can safely append to the same
+    journal. The journal remembers how far it has been read. Each append
+    first reads the records appended by the others since then, which
+    keeps the in-memory data of the appending process up to date.
+    """
+
+    suffix = ".journal"
+
+    def __init__(self, file_path, list_key, id_key):
+        """Initializes the Journal class.
+
+        Args:
+            file_path (str): The path of the database file.
+            list_key (str): The key of the list in the database file.
+            id_key (str): The key identifying the records in the list.
+        """
+        self.file_path = str(file_path)
+        self.journal_path = f"{self.file_path}{self.suffix}"
+        self.list_key = list_key
+        self.id_key = id_key
+        self.offset = 0
+        self.count = 0
+        self._signature = None
+
+    def _lock(self):
+        """Return the lock shared with the writes of the database file."""
+        return fl.FileLock(f"{self.file_path}.lock", timeout=3)
+
+    def exists(self):
+        """Check if the journal file exists."""
+        return os.path.isfile(self.journal_path)
+
+    def signature(self):
+        """Return the stat signature of the journal or None if it is missing."""
+        try:
+            _stat = os.stat(self.journal_path)
+        except OSError:
+            return None
+        return _stat.st_mtime_ns, _stat.st_size
+
+    def is_modified(self):
+        """Check if the journal has changed since it was last read."""
+        return self.signature() != self._signature
+
+    def read(self, offset=0):
+        """Read the records of the journal.
+
+        A last line without the line ending is an append in progress or
+        an append interrupted by a crash. It is not returned and the read
+        offset stays before it. Corrupted lines are skipped.
+
+        Args:
+            offset (int, optional): Byte offset to start reading from.
+
+        Returns:
+            list: The records after the offset.
+        """
+        try:
+            with open(self.journal_path, "rb") as f:
+                _stat = os.fstat(f.fileno())
+                if offset > _stat.st_size:
+                    # compacted and started over by another process.
+                    offset = 0
+                f.seek(offset)
+                content = f.read()
+        except OSError:
+            self.offset = 0
+            self._signature = None
+            return []
+        self._signature = (_stat.st_mtime_ns, _stat.st_size)
+        end = content.rfind(b"\n") + 1
+        self.offset = offset + end
+        records = []
+        for line in content[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(_loads(line))
+            except (ValueError, JSONDecodeError):
+                LOG.warning(f"Skipping a corrupted record in {self.journal_path}")
+        self.count = (self.count if offset else 0) + len(records)
+        return records
+
+    def merge(self, data, records):
+        """Upsert the records into the list of the data.
+
+        Args:
+            data (dict): The data of the database file. Updated in place.
+            records (list): The records to upsert.
+
+        Returns:
+            dict: The updated data.
+        """
+        if not records:
+            return data
+        items = data.setdefault(self.list_key, [])
+        positions = {item.get(self.id_key): idx for idx, item in enumerate(items)}
+        for record in records:
+            position = positions.get(record.get(self.id_key))
+            if position is None:
+                positions[record.get(self.id_key)] = len(items)
+                items.append(record)
+            else:
+                items[position] = record
+        return data
+
+    def append(self, records, base_modified_time=None, new_ids=()):
+        """Append the records to the journal.
+
+        Args:
+            records (list): The records to append.
+            base_modified_time (float, optional): Modified time of the
+                database file known by the caller. If the database file
+                has been rewritten since, e.g. compacted by another
+                process, nothing is appended.
+            new_ids (iterable, optional): Ids of the records created by the
+                caller. If another process has appended a record with one
+                of these ids since the last read, nothing is appended.
+
+        Raises:
+            fl.Timeout: If the file is locked by another process.
+            JournalConflict: If one of the new ids is taken by another
+                process.
+
+        Returns:
+            list or None: The records appended by others since the last
+                read or None if the database file has been rewritten.
+        """
+        lines = b"".join(
+            _dumps(record, True).encode("utf-8") + b"\n" for record in records
+        )
+        try:
+            with self._lock():
+                if (base_modified_time is not None
+                        and os.stat(self.file_path).st_mtime != base_modified_time):
+                    return None
+                others = self.read(self.offset)
+                taken = sorted(
+                    {record.get(self.id_key) for record in others} & set(new_ids)
+                )
+                if taken:
+                    raise JournalConflict(
+                        f"{self.id_key} {', '.join(str(uid) for uid in taken)} "
+                        f"is already appended to {self.journal_path} by another process",
+                        others,
+                    )
+                with open(self.journal_path, "a+b") as f:
+                    size = f.seek(0, os.SEEK_END)
+                    if size:
+                        f.seek(size - 1)
+                        if f.read(1) != b"\n":
+                            # close the leftover of an interrupted append.
+                            lines = b"\n" + lines
+                    f.write(lines)
+                    f.flush()
+                    _stat = os.fstat(f.fileno())
+        except fl.Timeout as exc:
+            raise fl.Timeout("File is locked by another process") from exc
+        self.offset = _stat.st_size
+        self.count += len(records)
+        self._signature = (_stat.st_mtime_ns, _stat.st_size)
+        # appending does not change the folder. Touch it for the scanners.
+        os.utime(os.path.dirname(self.journal_path))
+        return others
+
+    def compact(self, data=None):
+        """Fold the records into the database file and remove the journal.
+
+        Args:
+            data (dict, optional): The data to write. The records appended
+                by others since the last read are merged into it. If not
+                provided, the database file is read and all records are
+                merged.
+
+        Raises:
+            fl.Timeout: If the file is locked by another process.
+
+        Returns:
+            list: The records merged into the data.
+        """
+        try:
+            with self._lock():
+                if data is None:
+                    data = IO._load_json(self.file_path)  # pylint: disable=protected-access
+                    self.offset = 0
+                records = self.read(self.offset)
+                self.merge(data, records)
+                IO._dump_json(data, self.file_path)  # pylint: disable=protected-access
+                if os.path.exists(self.journal_path):
+                    os.remove(self.journal_path)
+        except fl.Timeout as exc:
+            raise fl.Timeout("File is locked by another process") from exc
+        CACHE.invalidate(self.file_path)
+        self.offset = 0
+        self.count = 0
+        self._signature = None
+        return records
+
+
+class RecordFile:
+    """Small database file of records keyed by their ids.
+
+    The records are kept as a list in the file. Updates are appended to
+    the journal of the file, so recording a change writes a single line.
+    The journal is folded into the file after a number of records.
+    Reading serves the records from memory until the file or its journal
+    changes.
+    """
+
+    # number of journal records after which the journal is folded into the file.
+    journal_limit = 100
+
+    def __init__(self, file_path, list_key, id_key):
+        """Initializes the RecordFile class.
+
+        Args:
+            file_path (str): The path of the database file.
+            list_key (str): The key of the list in the database file.
+            id_key (str): The key identifying the records in the list.
+        """
+        self.file_path = str(file_path)
+        self.list_key = list_key
+        self.id_key = id_key
+        self._journal = Journal(self.file_path, list_key, id_key)
+        self._records = {}
+        self._signature = None
+
+    def _file_signature(self):
+        """Return the stat signatures of the file and its journal."""
+        try:
+            _stat = os.stat(self.file_path)
+            base_signature = (_stat.st_mtime_ns, _stat.st_size)
+        except OSError:
+            base_signature = None
+        return base_signature, self._journal.signature()
+
+    def exists(self):
+        """Check if the file or its journal exists."""
+        return any(self._file_signature())
+
+    def read(self):
+        """Return the records by their ids.
+
+        The files are read again only if they have changed since the last
+        read. A corrupted file reads as empty.
+
+        Returns:
+            dict: The records.
+        """
+        signature = self._file_signature()
+        if signature == self._signature:
+            return self._records
+        data = {}
+        if signature[0] is not None:
+            try:
+                data = IO._load_json(self.file_path)  # pylint: disable=protected-access
+            except Exception:  # pylint: disable=broad-except
+                data = {}
+        self._journal.merge(data, self._journal.read())
+        self._records = {
+            record[self.id_key]: record for record in data.get(self.list_key, [])
+            if self.id_key in record
+        }
+        self._signature = signature
+        return self._records
+
+    def update(self, records):
+        """Upsert the records. Unchanged records are not written.
+
+        Args:
+            records (list): The records to upsert.
+
+        Returns:
+            bool: True if the records are written, False otherwise.
+        """
+        current = self.read()
+        records = [
+            record for record in records
+            if current.get(record.get(self.id_key)) != record
+        ]
+        if not records:
+            return True
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            self._journal.append(records)
+            if self._journal.count > self.journal_limit:
+                self.compact()
+        except (fl.Timeout, OSError) as exc:
+            LOG.warning(f"Cannot update the records of {self.file_path}: {exc}")
+            return False
+        self._signature = None
+        return True
+
+    def compact(self):
+        """Fold the journal into the file."""
+        self._signature = None
+        self._journal.compact({self.list_key: list(self.read().values())})
+        self._signature = None
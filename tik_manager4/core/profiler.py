@@ -0,0 +1,174 @@
+"""Startup profiler for Tik Manager 4.
+
+The profiler is disabled by default and costs nothing when disabled. It is
+enabled with the 'TIK_PROFILE_STARTUP' environment variable or with the
+'--profile-startup' flag of the standalone launcher:
+
+    TIK_PROFILE_STARTUP=1                   Report to the log and stdout.
+    TIK_PROFILE_STARTUP=/path/report.json   Also write the report as json.
+    --profile-startup[=/path/report.json]   Same as the environment variable.
+
+The phases are measured with the 'phase' context manager. Nested phases are
+named after their parents, e.g. 'main/user/commons'.
+"""
+
+from contextlib import contextmanager
+import json
+import os
+from pathlib import Path
+import time
+
+from tik_manager4.core import filelog
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+ENV_VAR = "TIK_PROFILE_STARTUP"
+CLI_FLAG = "--profile-startup"
+
+_OFF_VALUES = ("", "0", "false", "no", "off")
+_ON_VALUES = ("1", "true", "yes", "on")
+
+
+class StartupProfiler:
+    """Collects the timings of the startup phases."""
+
+    def __init__(self):
+        """Initialize the profiler."""
+        self.enabled = False
+        self.report_path = None
+        self._stack = []
+        self._phases = []
+        self._origin = None
+        self.configure_from_env()
+
+    def configure(self, enabled=True, report_path=None):
+        """Enable or disable the profiler.
+
+        Args:
+            enabled (bool): Whether the phases are measured.
+            report_path (str, optional): The json file to write the report to.
+        """
+        self.enabled = enabled
+        self.report_path = report_path
+        self.reset()
+
+    def configure_from_env(self):
+        """Configure the profiler from the environment variable."""
+        value = os.environ.get(ENV_VAR, "").strip()
+        if value.lower() in _OFF_VALUES:
+            self.configure(enabled=False)
+        elif value.lower() in _ON_VALUES:
+            self.configure(enabled=True)
+        else:
+            self.configure(enabled=True, report_path=value)
+
+    def configure_from_args(self, argv):
+        """Enable the profiler if the command line flag is in the arguments.
+
+        Args:
+            argv (list): The command line arguments.
+
+        Returns:
+            bool: True if the flag is found, False otherwise.
+        """
+        for arg in argv:
+            if arg == CLI_FLAG:
+                self.configure(enabled=True, report_path=self.report_path)
+                return True
+            if arg.startswith(f"{CLI_FLAG}="):
+                self.configure(enabled=True, report_path=arg.split("=", 1)[1])
+                return True
+        return False
+
+    def reset(self):
+        """Forget the measured phases."""
+        self._stack = []
+        self._phases = []
+        self._origin = None
+
+    @contextmanager
+    def phase(self, name):
+        """Measure the duration of the code block.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        if self._origin is None:
+            self._origin = start
+        self._stack.append(name)
+        full_name = "/".join(self._stack)
+        depth = len(self._stack) - 1
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            self._phases.append(
+                {
+                    "name": full_name,
+                    "depth": depth,
+                    "start": start - self._origin,
+                    "duration": time.perf_counter() - start,
+                }
+            )
+
+    @property
+    def phases(self):
+        """Return the measured phases in the order they started."""
+        return sorted(self._phases, key=lambda entry: entry["start"])
+
+    @property
+    def total(self):
+        """Return the total duration of the top level phases in seconds."""
+        return sum(entry["duration"] for entry in self._phases if entry["depth"] == 0)
+
+    def format_report(self):
+        """Return the report as a text table."""
+        lines = ["Startup Profile", "=" * 56]
+        for entry in self.phases:
+            label = "  " * entry["depth"] + entry["name"].rsplit("/", 1)[-1]
+            lines.append(f"{label:<44}{entry['duration'] * 1000:>9.1f} ms")
+        lines.append("-" * 56)
+        lines.append(f"{'total':<44}{self.total * 1000:>9.1f} ms")
+        return "\n".join(lines)
+
+    def report(self):
+        """Report the measured phases and start over.
+
+        The report is logged, printed and written to the report path
+        if defined.
+
+        Returns:
+            dict: The report data or None if there is nothing to report.
+        """
+        if not self.enabled or not self._phases or self._stack:
+            return None
+        data = {"total": self.total, "phases": self.phases}
+        text = self.format_report()
+        for line in text.splitlines():
+            LOG.info(line)
+        print(text)
+        if self.report_path:
+            try:
+                _path = Path(self.report_path)
+                _path.parent.mkdir(parents=True, exist_ok=True)
+                _path.write_text(json.dumps(data, indent=4))
+            except OSError as exc:
+                LOG.warning(f"Cannot write the startup profile to {self.report_path}: {exc}")
+        self.reset()
+        return data
+
+
+PROFILER = StartupProfiler()
+
+
+def phase(name):
+    """Measure the code block with the global startup profiler.
+
+    Args:
+        name (str): The name of the phase.
+    """
+    return PROFILER.phase(name)
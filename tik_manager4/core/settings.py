@@ -1,5 +1,6 @@
 """Module to handle settings data."""
 from copy import deepcopy
+from functools import partial
 from tik_manager4.core import io
 
 
@@ -34,9 +35,10 @@ class Settings:
         """Set the settings file path."""
         self._filepath = file_path
         self._io.file_path = file_path
-        if self._io.file_exists(file_path):
-            self._time_stamp = self._io.get_modified_time()
-            self.initialize(self._io.read())
+        _stat = self._io.stat()
+        if _stat:
+            self._time_stamp = _stat.st_mtime
+            self.initialize(self._io.read(stat_result=_stat))
 
     def reload(self):
         """Reload the settings from file."""
@@ -112,10 +114,70 @@ class Settings:
         if not self.is_settings_changed() and not force:
             return False
         self._original_value = deepcopy(self._current_value)
-        self._io.write(self._original_value)
+        if io.WRITE_QUEUE.active:
+            io.WRITE_QUEUE.enqueue(
+                self._io.file_path, partial(self._write, self._original_value)
+            )
+        else:
+            self._write(self._original_value)
+        return True
+
+    def apply_properties(self, *keys):
+        """Write only the given properties to the settings file.
+
+        The other properties are read back from the file instead of being
+        overwritten, so the edits of the other sessions are kept. The
+        unsaved edits of the other properties stay unsaved.
+
+        Args:
+            *keys (str): The property keys to write.
+
+        Returns:
+            dict: The updated content of the file.
+        """
+        data = {key: deepcopy(self._current_value[key]) for key in keys if key in self._current_value}
+        content = self._io.update(data)
         self._time_stamp = self._io.get_modified_time()
+        self._merge(content, written=data.keys())
+        return content
+
+    def refresh(self):
+        """Read back the properties changed in the file since it was read.
+
+        Unlike reload, the unsaved edits are kept.
+
+        Returns:
+            bool: True if the file is changed, False otherwise.
+        """
+        _stat = self._io.stat()
+        if not _stat or _stat.st_mtime == self._time_stamp:
+            return False
+        self._time_stamp = _stat.st_mtime
+        self._merge(self._io.read(stat_result=_stat))
         return True
 
+    def _merge(self, content, written=()):
+        """Take the properties from the file content unless edited here.
+
+        Args:
+            content (dict): The content of the settings file.
+            written (iterable, optional): The keys just written to the file.
+        """
+        for key, value in content.items():
+            if key not in written and self._current_value.get(key) == self._original_value.get(key):
+                self._current_value[key] = deepcopy(value)
+            self._original_value[key] = deepcopy(value)
+
+    def _write(self, data):
+        """Write the data to the settings file.
+
+        Args:
+            data (dict): The data to write.
+        """
+        self._io.write(data)
+        self._io.invalidate()
+        self._time_stamp = self._io.get_modified_time()
+
     def reset_settings(self):
         """Revert back the unsaved changes to the original state."""
         self._current_value = deepcopy(self._original_value)
@@ -0,0 +1,470 @@
+"""File transfer engine.
+
+Copies files and folders with a pool of workers. Many small files are
+copied in parallel and large files are copied in parallel chunks. The
+completed files and chunks are written to a journal next to the target,
+so an interrupted transfer resumes where it left off instead of starting
+over.
+
+Example:
+    >>> state, msg = Transfer(source, target, verify=True).run()
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import time
+from typing import NamedTuple
+
+from tik_manager4.core import filelog
+from tik_manager4.core import utils
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+DEFAULT_WORKERS = 8
+CHUNK_SIZE = 64 * 1024 * 1024
+BLOCK_SIZE = 1024 * 1024
+# small files are copied in batches to keep the per task overhead low.
+BATCH_FILES = 32
+
+
+class TransferProgress(NamedTuple):
+    """Progress of a transfer passed to the progress callbacks."""
+    done_bytes: int
+    total_bytes: int
+    done_files: int
+    total_files: int
+
+    @property
+    def percent(self):
+        """Return the completed percentage by size."""
+        if not self.total_bytes:
+            return 100.0 if self.done_files == self.total_files else 0.0
+        return 100.0 * self.done_bytes / self.total_bytes
+
+
+def file_checksum(file_path):
+    """Return the checksum of the file.
+
+    Args:
+        file_path (str): The path of the file.
+
+    Returns:
+        str: The hexadecimal blake2b digest of the file.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    with open(file_path, "rb") as _file:
+        for block in iter(lambda: _file.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _remove_file(file_path):
+    """Remove the existing file instead of writing into it.
+
+    The file may be write protected or linked to other files. Its
+    protection is shared by the links, so it is never cleared.
+    """
+    utils.unlink_file(file_path)
+
+
+class TransferJournal:
+    """Append-only record of the completed files and chunks of a transfer.
+
+    One json document per line. The first line identifies the transfer.
+    A last line without the line ending is an interrupted write and is
+    ignored.
+    """
+
+    def __init__(self, source, target):
+        """Initialize the journal.
+
+        Args:
+            source (Path): The source file or folder.
+            target (Path): The target file or folder.
+        """
+        self.source = source
+        self.target = target
+        self.file_path = target.parent / f".{target.name}.tik_transfer"
+        self._stream = None
+
+    def exists(self):
+        """Check if there is an interrupted transfer to resume."""
+        return self.file_path.is_file()
+
+    def read(self):
+        """Read the completed entries.
+
+        Returns:
+            dict: The entries by their (path, chunk) keys. Chunk is None for
+                the completed files. Empty if the journal belongs to another
+                transfer.
+        """
+        entries = {}
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as _file:
+                lines = _file.read().split("\n")
+        except OSError:
+            return entries
+        # the last element is the unterminated line, if any.
+        for number, line in enumerate(lines[:-1]):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if number == 0:
+                if entry.get("source") != self.source.as_posix():
+                    return {}
+                continue
+            entries[(entry["path"], entry.get("chunk"))] = entry
+        return entries
+
+    def open(self, resume):
+        """Open the journal for appending.
+
+        Args:
+            resume (bool): If False, the journal is started over.
+        """
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._stream = open(self.file_path, "a" if resume else "w", encoding="utf-8")
+        if not resume:
+            self.add({"source": self.source.as_posix(), "target": self.target.as_posix()})
+
+    def add(self, *entries):
+        """Append the entries."""
+        self._stream.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        self._stream.flush()
+
+    def close(self):
+        """Close the journal, keeping it for a resume."""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def remove(self):
+        """Close and remove the journal of the completed transfer."""
+        self.close()
+        try:
+            self.file_path.unlink()
+        except OSError as exc:
+            LOG.warning(f"Cannot remove the transfer journal {self.file_path}: {exc}")
+
+
+class _TransferFile:
+    """A file of the transfer."""
+
+    __slots__ = ("path", "source", "target", "size", "mtime_ns", "chunks", "pending_chunks")
+
+    def __init__(self, path, source, target, stat_result):
+        self.path = path
+        self.source = source
+        self.target = target
+        self.size = stat_result.st_size
+        self.mtime_ns = stat_result.st_mtime_ns
+        self.chunks = 0
+        self.pending_chunks = set()
+
+    @property
+    def part(self):
+        """The file receiving the chunks."""
+        return self.target.with_name(f"{self.target.name}.tik_part")
+
+    def entry(self, chunk=None, checksum=None):
+        """Return the journal entry of the file or one of its chunks."""
+        entry = {"path": self.path, "size": self.size, "mtime_ns": self.mtime_ns}
+        if chunk is not None:
+            entry["chunk"] = chunk
+        if checksum:
+            entry["checksum"] = checksum
+        return entry
+
+    def matches(self, entry):
+        """Check if the journal entry is written for the current source."""
+        return entry.get("size") == self.size and entry.get("mtime_ns") == self.mtime_ns
+
+
+class _InlineExecutor:
+    """Runs the tasks in the calling thread, in place of the worker pool."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    @staticmethod
+    def submit(function, *args):
+        """Run the function and return its completed future."""
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except BaseException as exc:  # pylint: disable=broad-except
+            future.set_exception(exc)
+        return future
+
+
+class Transfer:
+    """Copies a file or a folder with a pool of workers."""
+
+    def __init__(
+        self,
+        source,
+        target,
+        workers=DEFAULT_WORKERS,
+        chunk_size=CHUNK_SIZE,
+        verify=False,
+        progress_callback=None,
+        clean=False,
+    ):
+        """Initialize the transfer.
+
+        Args:
+            source (str): The source file or folder.
+            target (str): The target file or folder.
+            workers (int, optional): The maximum number of parallel copies.
+            chunk_size (int, optional): The files larger than this are copied
+                in parallel chunks of this size.
+            verify (bool, optional): Compare the checksums of the copied files
+                with the sources.
+            progress_callback (callable, optional): Called with a
+                TransferProgress from the calling thread as the transfer
+                advances.
+            clean (bool, optional): Remove the existing target folder before
+                copying, unless the transfer is resumed.
+        """
+        self.source = Path(source)
+        self.target = Path(target)
+        self.workers = max(1, workers)
+        self.chunk_size = max(BLOCK_SIZE, chunk_size)
+        self.verify = verify
+        self.progress_callback = progress_callback
+        self.clean = clean
+        self.journal = TransferJournal(self.source, self.target)
+        self.progress = TransferProgress(0, 0, 0, 0)
+        self.resumed = False
+        self._last_report = 0.0
+
+    def _collect(self):
+        """Return the folders and the files to transfer."""
+        if self.source.is_file():
+            return [], [_TransferFile("", self.source, self.target, self.source.stat())]
+        folders = [self.target]
+        files = []
+        for folder, folder_names, file_names in os.walk(self.source, followlinks=True):
+            relative_folder = Path(folder).relative_to(self.source)
+            target_folder = self.target / relative_folder
+            folders.extend(target_folder / name for name in folder_names)
+            for file_name in file_names:
+                source_file = Path(folder, file_name)
+                files.append(
+                    _TransferFile(
+                        (relative_folder / file_name).as_posix(),
+                        source_file,
+                        target_folder / file_name,
+                        source_file.stat(),
+                    )
+                )
+        return folders, files
+
+    def _report(self, force=False):
+        """Call the progress callback, at most ten times a second."""
+        if not self.progress_callback:
+            return
+        now = time.monotonic()
+        if force or now - self._last_report >= 0.1:
+            self._last_report = now
+            self.progress_callback(self.progress)
+
+    def _advance(self, nbytes=0, nfiles=0):
+        """Update the progress."""
+        self.progress = self.progress._replace(
+            done_bytes=self.progress.done_bytes + nbytes,
+            done_files=self.progress.done_files + nfiles,
+        )
+        self._report()
+
+    def _copy_file(self, item):
+        """Copy a whole file. Runs in the workers."""
+        _remove_file(item.target)
+        shutil.copy2(item.source, item.target)
+        return self._verify(item, item.target)
+
+    def _copy_batch(self, items):
+        """Copy the small files one after another. Runs in the workers.
+
+        Returns:
+            list: The (item, checksum) pairs of the copied files. Stops at the
+                first failure, which is returned as the last pair.
+        """
+        results = []
+        for item in items:
+            try:
+                results.append((item, self._copy_file(item)))
+            except OSError as exc:
+                results.append((item, exc))
+                break
+        return results
+
+    def _copy_chunk(self, item, chunk):
+        """Copy a chunk of a large file into its part file. Runs in the workers."""
+        offset = chunk * self.chunk_size
+        remaining = min(self.chunk_size, item.size - offset)
+        length = remaining
+        with open(item.source, "rb") as source_file, open(item.part, "r+b") as part_file:
+            source_file.seek(offset)
+            part_file.seek(offset)
+            while remaining:
+                block = source_file.read(min(BLOCK_SIZE, remaining))
+                if not block:
+                    raise OSError(f"Source file is changed during the transfer: {item.source}")
+                part_file.write(block)
+                remaining -= len(block)
+        return length
+
+    def _finalize_chunked(self, item):
+        """Replace the target with the completed part file. Runs in the workers."""
+        checksum = self._verify(item, item.part)
+        _remove_file(item.target)
+        os.replace(item.part, item.target)
+        shutil.copystat(item.source, item.target)
+        return checksum
+
+    def _verify(self, item, copied_file):
+        """Compare the checksums of the source and the copy if requested.
+
+        Returns:
+            str: The checksum or None if the verification is not requested.
+        """
+        if not self.verify:
+            return None
+        checksum = file_checksum(item.source)
+        if file_checksum(copied_file) != checksum:
+            raise OSError(f"Checksum mismatch after copying {item.source}")
+        return checksum
+
+    def _prepare_chunks(self, item, entries):
+        """Create the part file and return the chunks left to copy."""
+        item.chunks = -(-item.size // self.chunk_size)
+        done = {
+            chunk for chunk in range(item.chunks)
+            if item.matches(entries.get((item.path, chunk), {}))
+        }
+        if not (item.part.is_file() and item.part.stat().st_size == item.size):
+            done = set()
+            with open(item.part, "wb") as part_file:
+                part_file.truncate(item.size)
+        self._advance(nbytes=sum(min(self.chunk_size, item.size - chunk * self.chunk_size) for chunk in done))
+        item.pending_chunks = set(range(item.chunks)) - done
+        return sorted(item.pending_chunks)
+
+    def run(self):
+        """Run the transfer.
+
+        Returns:
+            tuple: (True, message) or (False, error message). The journal
+                of a failed transfer is kept to resume it on the next run.
+        """
+        if not self.source.exists():
+            return False, f"Source file or folder does not exist: {self.source}"
+        try:
+            folders, files = self._collect()
+        except OSError as exc:
+            return False, f"Error reading the source: {exc}"
+
+        self.resumed = self.journal.exists()
+        entries = self.journal.read() if self.resumed else {}
+        if self.resumed and not entries:
+            # the journal of another transfer.
+            self.resumed = False
+        try:
+            if self.clean and not self.resumed and self.target.is_dir():
+                # the files may be write protected or linked to published files.
+                utils._remove_link(self.target)  # pylint: disable=protected-access
+            for folder in folders:
+                folder.mkdir(parents=True, exist_ok=True)
+            self.target.parent.mkdir(parents=True, exist_ok=True)
+            self.journal.open(resume=self.resumed)
+        except OSError as exc:
+            self.journal.close()
+            return False, f"Error preparing the target: {exc}"
+
+        self.progress = TransferProgress(0, sum(item.size for item in files), 0, len(files))
+        error = None
+        # a single file which is not chunked is copied in the calling thread.
+        parallel = self.workers > 1 and (len(files) > 1 or self.progress.total_bytes > self.chunk_size)
+        with (ThreadPoolExecutor(max_workers=self.workers) if parallel else _InlineExecutor()) as executor:
+            tasks = {}
+            batch = []
+            batch_size = 0
+            try:
+                for item in files:
+                    entry = entries.get((item.path, None))
+                    if entry and item.matches(entry) and item.target.is_file() \
+                            and item.target.stat().st_size == item.size:
+                        self._advance(nbytes=item.size, nfiles=1)
+                        continue
+                    if item.size > self.chunk_size:
+                        for chunk in self._prepare_chunks(item, entries):
+                            tasks[executor.submit(self._copy_chunk, item, chunk)] = (item, chunk)
+                        if not item.pending_chunks:
+                            tasks[executor.submit(self._finalize_chunked, item)] = (item, "final")
+                    else:
+                        batch.append(item)
+                        batch_size += item.size
+                        if len(batch) == BATCH_FILES or batch_size >= self.chunk_size:
+                            tasks[executor.submit(self._copy_batch, batch)] = (None, "batch")
+                            batch = []
+                            batch_size = 0
+                if batch:
+                    tasks[executor.submit(self._copy_batch, batch)] = (None, "batch")
+
+                while tasks:
+                    done, _ = wait(list(tasks), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        item, chunk = tasks.pop(future)
+                        result = future.result()
+                        if chunk == "batch":
+                            copied = [pair for pair in result if not isinstance(pair[1], OSError)]
+                            self.journal.add(
+                                *(copied_item.entry(checksum=checksum) for copied_item, checksum in copied)
+                            )
+                            self._advance(
+                                nbytes=sum(copied_item.size for copied_item, _ in copied),
+                                nfiles=len(copied),
+                            )
+                            if len(copied) < len(result):
+                                raise result[-1][1]
+                            continue
+                        if chunk == "final":
+                            self.journal.add(item.entry(checksum=result))
+                            self._advance(nfiles=1)
+                            continue
+                        self.journal.add(item.entry(chunk=chunk))
+                        self._advance(nbytes=result)
+                        item.pending_chunks.discard(chunk)
+                        if not item.pending_chunks:
+                            tasks[executor.submit(self._finalize_chunked, item)] = (item, "final")
+            except (OSError, ValueError) as exc:
+                error = exc
+                for future in tasks:
+                    future.cancel()
+
+        if error is not None:
+            self.journal.close()
+            LOG.error(f"Transfer of {self.source} to {self.target} is interrupted: {error}")
+            return False, f"Error copying {self.source}: {error}"
+
+        if folders:
+            # match the folder times of the source like copytree.
+            for folder in reversed(folders):
+                source_folder = self.source / folder.relative_to(self.target)
+                try:
+                    shutil.copystat(source_folder, folder)
+                except OSError:
+                    pass
+        self.journal.remove()
+        self._report(force=True)
+        return True, f"{self.source} copied to {self.target}."
@@ -1,6 +1,8 @@
 """Cross-platform utility functions."""
+import errno
 import os
 import sys
+from collections import deque
 import importlib.util
 import logging
 from pathlib import Path
@@ -9,6 +11,7 @@ import platform
 import subprocess
 import re
 import unicodedata
+import uuid
 
 from tik_manager4.external import fileseq
 
@@ -103,8 +106,27 @@ def sanitize_text(text, allow_spaces=False):
 
     return sanitized_text
 
-def copy(source, target, force=True, raise_error=False):
-    """"Copy the source file or folder to the target location."""
+def copy(source, target, force=True, raise_error=False, progress_callback=None, verify=False):
+    """"Copy the source file or folder to the target location.
+
+    The files are copied by the transfer engine. Folders are copied with a
+    pool of workers and large files in parallel chunks. An interrupted copy
+    of the same source resumes on the next call.
+
+    Args:
+        source (str): The source file or folder.
+        target (str): The target file or folder.
+        force (bool, optional): If True, overwrites the existing target.
+        raise_error (bool, optional): If True, raises the errors instead of
+            returning them.
+        progress_callback (callable, optional): Called with a
+            transfer.TransferProgress as the copy advances.
+        verify (bool, optional): If True, compares the checksums of the
+            copied files with the sources.
+
+    Returns:
+        tuple: (bool, message)
+    """
     source = Path(source)
     if not source.exists():
         if raise_error:
@@ -116,20 +138,17 @@ def copy(source, target, force=True, raise_error=False):
         if raise_error:
             raise FileExistsError(f"Target file or folder already exists: {target}")
         return False, f"Target file or folder already exists: {target}"
-    else:
-        # unlock the target if it exists
-        if target.exists():
-            ret, msg = write_unprotect(target)
-            if not ret:
-                return False, f"Error removing write protection: {msg}"
 
     # Ensure the target's parent directory exists
     target.parent.mkdir(parents=True, exist_ok=True)
 
+    # the transfer engine logs through filelog, which imports this module.
+    from tik_manager4.core import transfer  # pylint: disable=import-outside-toplevel
+    engine = transfer.Transfer(
+        source, target, progress_callback=progress_callback, verify=verify, clean=True
+    )
     # Perform the copy operation
     if source.is_file() or source.is_symlink():
-        # make sure the parent of the target exists
-        target.parent.mkdir(parents=True, exist_ok=True)
         # first check if there is a temporary lock file. If so, remove it.
         temp_lock_file = target.with_suffix(target.suffix + ".lock_tik_temp")
         if target.exists():
@@ -140,34 +159,45 @@ def copy(source, target, force=True, raise_error=False):
                     LOG.warning(exc, exc_info=True)
             # rename the target to a temporary file to avoid overwriting issues
             os.rename(str(target), temp_lock_file)
-        try:
-            shutil.copy2(str(source), str(target))
-        except OSError as exc:
+        state, msg = engine.run()
+        if not state:
             if raise_error:
-                raise OSError(f"Error copying file: {exc}")
-            return False, f"Error copying file: {exc}"
+                raise OSError(f"Error copying file: {msg}")
+            return False, f"Error copying file: {msg}"
         # if the copy was successful, try to remove the temporary lock file
         if temp_lock_file.exists():
             try:
-                temp_lock_file.unlink()
+                _remove_link(temp_lock_file)
             except OSError as exc:
                 LOG.warning(f"Error removing temporary lock file: {exc}", exc_info=True)
     elif source.is_dir():
-        # Use copytree with dirs_exist_ok=True for Python 3.8+
-        # For older versions, use shutil.copytree and handle existing directories
-        if hasattr(shutil, "copytree") and hasattr(shutil.copytree, "dirs_exist_ok"):
-            shutil.copytree(str(source), str(target), dirs_exist_ok=True)
-        else:
-            if target.exists():
-                shutil.rmtree(target)
-            shutil.copytree(str(source), str(target))
+        state, msg = engine.run()
+        if not state:
+            if raise_error:
+                raise OSError(msg)
+            return False, msg
     return True, f"{source} copied to {target}."
 
-def move(source, target, force=True, raise_error=False):
+def move(source, target, force=True, raise_error=False, progress_callback=None, verify=False):
     """Move the source file or folder to the target location.
 
     If force is True, any existing file or folder at the target location
-    will be removed before the move operation.
+    will be removed before the move operation. Moves across volumes are
+    copied by the transfer engine, then the source is removed.
+
+    Args:
+        source (str): The source file or folder.
+        target (str): The target file or folder.
+        force (bool, optional): If True, removes the existing target.
+        raise_error (bool, optional): If True, raises the errors instead of
+            returning them.
+        progress_callback (callable, optional): Called with a
+            transfer.TransferProgress as a copy across volumes advances.
+        verify (bool, optional): If True, compares the checksums of the
+            files copied across volumes with the sources.
+
+    Returns:
+        tuple: (bool, message)
     """
     source = Path(source)
     if not source.exists():
@@ -186,7 +216,21 @@ def move(source, target, force=True, raise_error=False):
     target.parent.mkdir(parents=True, exist_ok=True)
 
     # Perform the move operation
-    shutil.move(str(source), str(target))
+    if target.is_dir() or source.stat().st_dev == target.parent.stat().st_dev:
+        shutil.move(str(source), str(target))
+        return True, f"{source} moved to {target}."
+
+    from tik_manager4.core import transfer  # pylint: disable=import-outside-toplevel
+    state, msg = transfer.Transfer(
+        source, target, progress_callback=progress_callback, verify=verify
+    ).run()
+    if not state:
+        if raise_error:
+            raise OSError(msg)
+        return False, msg
+    ret, msg = delete(source)
+    if not ret:
+        return False, f"{source} copied to {target} but cannot be removed: {msg}"
     return True, f"{source} moved to {target}."
 
 def delete(file_or_folder):
@@ -209,6 +253,228 @@ def delete(file_or_folder):
             return False, f"Permission denied: {e}"
     return True, f"{file_or_folder} deleted."
 
+LINK_STRATEGIES = ("reflink", "hardlink", "symlink")
+# (strategy, source device, target device) combinations found unsupported.
+_UNSUPPORTED_LINKS = set()
+_UNSUPPORTED_ERRORS = (
+    errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL, errno.ENOTTY, errno.EPERM, errno.ENOSYS
+)
+_FICLONE = 0x40049409
+
+
+def materialize(source, target, strategy="copy"):
+    """Materialize the source file or folder at the target location.
+
+    Link strategies share the data with the source instead of duplicating it:
+
+        reflink: Copy-on-write clones. Btrfs, XFS, APFS...
+        hardlink: Hard links of the files. Source and target must be on the
+            same volume. The files share their permissions with the source.
+        symlink: A single link relative to the target folder.
+        auto: Reflink, then hardlink.
+        copy: Duplicate the data.
+
+    The strategy is verified on the first use for each pair of volumes and
+    the unsupported ones fall back to copy. The existing target is replaced,
+    never written through, so the files linked to it are not affected.
+
+    Args:
+        source (str): The source file or folder.
+        target (str): The target file or folder.
+        strategy (str, optional): One of the strategies above.
+
+    Returns:
+        tuple: (True, used strategy) or (False, error message).
+    """
+    source = Path(source)
+    target = Path(target)
+    if not source.exists():
+        return False, f"Source file or folder does not exist: {source}"
+    strategy = strategy.lower()
+    candidates = {"auto": ["reflink", "hardlink"], "copy": []}.get(strategy, [strategy])
+    if any(candidate not in LINK_STRATEGIES for candidate in candidates):
+        return False, f"Unknown materialization strategy: {strategy}"
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    devices = (source.stat().st_dev, target.parent.stat().st_dev)
+    for candidate in candidates:
+        if (candidate, *devices) in _UNSUPPORTED_LINKS:
+            continue
+        try:
+            _link_to_target(candidate, source, target)
+            return True, candidate
+        except (OSError, NotImplementedError) as exc:
+            if getattr(exc, "errno", errno.ENOSYS) in _UNSUPPORTED_ERRORS:
+                _UNSUPPORTED_LINKS.add((candidate, *devices))
+            LOG.warning(f"Cannot {candidate} {source} to {target}, falling back: {exc}")
+
+    # the existing target may be linked to another publish. Remove it
+    # instead of copying over it.
+    if target.exists() or target.is_symlink():
+        try:
+            _remove_link(target)
+        except OSError as exc:
+            return False, f"Error removing the existing target: {exc}"
+    state, msg = copy(source, target)
+    if not state:
+        return False, msg
+    return True, "copy"
+
+
+def unlink_file(file_path):
+    """Remove the file or link without clearing its write protection.
+
+    The file may be a hardlink of a write protected published file. The
+    protection belongs to the file data, so clearing it to remove the link
+    would unprotect the published file as well. Windows refuses to remove
+    read-only files; there the file is deleted ignoring the read-only
+    attribute or, where that is not supported, moved aside.
+
+    Args:
+        file_path (str or Path): The file or link to remove.
+    """
+    try:
+        os.unlink(file_path)
+        return
+    except FileNotFoundError:
+        return
+    except PermissionError:
+        if CURRENT_PLATFORM != "Windows":
+            raise
+    if _delete_ignoring_readonly(file_path):
+        return
+    file_path = Path(file_path)
+    aside = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex[:8]}.tik_old")
+    # renaming is allowed for the read-only files.
+    os.replace(file_path, aside)
+    LOG.warning(f"Cannot remove the write protected {file_path}. Moved to {aside}.")
+
+
+def _delete_ignoring_readonly(file_path):
+    """Delete the file on Windows ignoring its read-only attribute.
+
+    Returns:
+        bool: True if the file is deleted, False if it is not supported.
+    """
+    import ctypes  # pylint: disable=import-outside-toplevel
+    from ctypes import wintypes  # pylint: disable=import-outside-toplevel
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    kernel32.CreateFileW.argtypes = (
+        wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+        wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE,
+    )
+    delete_access = 0x00010000
+    share_all = 0x1 | 0x2 | 0x4
+    open_existing = 3
+    # open the link itself, not the file it points to.
+    open_flags = 0x00200000 | 0x02000000
+    handle = kernel32.CreateFileW(str(file_path), delete_access, share_all, None, open_existing, open_flags, None)
+    if handle in (None, wintypes.HANDLE(-1).value):
+        return False
+    try:
+        # FileDispositionInfoEx: DELETE | POSIX_SEMANTICS | IGNORE_READONLY_ATTRIBUTE
+        flags = wintypes.ULONG(0x1 | 0x2 | 0x10)
+        return bool(kernel32.SetFileInformationByHandle(handle, 21, ctypes.byref(flags), ctypes.sizeof(flags)))
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _is_folder(path):
+    """Check if the path is a folder and not a link to a folder."""
+    return path.is_dir() and not path.is_symlink()
+
+
+def _remove_link(path):
+    """Remove the file, link or folder without changing the linked data."""
+    if not _is_folder(path):
+        unlink_file(path)
+        return
+    for folder, folder_names, file_names in os.walk(path, topdown=False):
+        for name in file_names:
+            unlink_file(Path(folder, name))
+        for name in folder_names:
+            sub_folder = Path(folder, name)
+            if sub_folder.is_symlink():
+                unlink_file(sub_folder)
+            else:
+                sub_folder.rmdir()
+    path.rmdir()
+
+
+def _link_to_target(strategy, source, target):
+    """Create the link next to the target, verify it and replace the target."""
+    temp = target.with_name(f".{target.name}.tik_temp")
+    if temp.exists() or temp.is_symlink():
+        _remove_link(temp)
+    try:
+        if strategy == "symlink":
+            relative_source = os.path.relpath(source, target.parent)
+            os.symlink(relative_source, temp, target_is_directory=source.is_dir())
+            if temp.resolve() != source.resolve():
+                raise OSError(errno.EINVAL, f"Symlink is not resolving to the source: {temp}")
+        elif source.is_dir():
+            for folder, _, file_names in os.walk(source):
+                relative_folder = Path(folder).relative_to(source)
+                (temp / relative_folder).mkdir(parents=True, exist_ok=True)
+                for file_name in file_names:
+                    _link_file(strategy, Path(folder, file_name), temp / relative_folder / file_name)
+        else:
+            _link_file(strategy, source, temp)
+        _replace_target(temp, target)
+    except BaseException:
+        if temp.exists() or temp.is_symlink():
+            _remove_link(temp)
+        raise
+
+
+def _link_file(strategy, source, target):
+    """Hardlink or clone a single file and verify it."""
+    if strategy == "hardlink":
+        os.link(source, target)
+        if not os.path.samefile(source, target):
+            raise OSError(errno.EINVAL, f"Hardlink is not pointing to the source: {target}")
+        return
+    _clone_file(source, target)
+    shutil.copystat(source, target)
+    if os.stat(target).st_size != os.stat(source).st_size:
+        raise OSError(errno.EINVAL, f"Clone size is not matching the source: {target}")
+
+
+def _clone_file(source, target):
+    """Create a copy-on-write clone of the file."""
+    if sys.platform.startswith("linux"):
+        import fcntl  # pylint: disable=import-outside-toplevel
+        with open(source, "rb") as source_file, open(target, "wb") as target_file:
+            fcntl.ioctl(target_file.fileno(), _FICLONE, source_file.fileno())
+    elif sys.platform == "darwin":
+        import ctypes  # pylint: disable=import-outside-toplevel
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.clonefile(os.fsencode(source), os.fsencode(target), 0):
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+    else:
+        raise OSError(errno.EOPNOTSUPP, f"Reflinks are not supported on {CURRENT_PLATFORM}")
+
+
+def _replace_target(temp, target):
+    """Replace the target with the temporary file or folder."""
+    # folders cannot replace or be replaced by files and links.
+    if _is_folder(target) or (_is_folder(temp) and target.is_symlink()):
+        _remove_link(target)
+    elif not _is_folder(temp) and target.exists() and os.path.samestat(os.lstat(temp), os.lstat(target)):
+        # renaming a hardlink over another link of the same file does nothing.
+        _remove_link(temp)
+        return
+    try:
+        os.replace(temp, target)
+    except PermissionError:
+        # write protected targets cannot be replaced on Windows.
+        _remove_link(target)
+        os.replace(temp, target)
+
+
 def write_protect(file_or_folder):
     """Write protect the file or folder."""
     path = Path(file_or_folder)
@@ -303,4 +569,46 @@ def remove_key(data, key):
     elif isinstance(data, list):
         return [remove_key(item, key) for item in data]
     else:
-        return data
\ No newline at end of file
+        return data
+
+
+def walk_tree(root, get_children, prune=None, max_depth=None,
+              depth_first=False, include_root=True):
+    """Walk a tree iteratively, visiting each node once.
+
+    The visited nodes are tracked by identity, so the cost does not depend
+    on the size or the equality of the nodes.
+
+    Args:
+        root (object): The root node.
+        get_children (callable): Function returning the children of a node.
+        prune (callable, optional): Function called with each node. If it
+            returns True, the node and everything below it are skipped.
+        max_depth (int, optional): Maximum depth to walk. The root is at
+            depth 0. Walks the whole tree if not provided.
+        depth_first (bool, optional): Walk depth first (pre-order) instead
+            of breadth first.
+        include_root (bool, optional): Whether to yield the root or not.
+
+    Yields:
+        tuple: The node, its parent (None for the root) and its depth.
+    """
+    # keep the nodes alive so that their ids are not reused during the walk
+    visited = {}
+    pending = deque([(root, None, 0)])
+    pop = pending.pop if depth_first else pending.popleft
+    while pending:
+        node, parent, depth = pop()
+        if id(node) in visited:
+            continue
+        visited[id(node)] = node
+        if prune is not None and prune(node):
+            continue
+        if parent is not None or include_root:
+            yield node, parent, depth
+        if max_depth is not None and depth >= max_depth:
+            continue
+        children = [(child, node, depth + 1) for child in get_children(node)]
+        if depth_first:
+            children.reverse()
+        pending.extend(children)
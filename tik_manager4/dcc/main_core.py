@@ -247,26 +247,25 @@ class MainCore():
         """Open main menu with DCC custom commands."""
         pass
 
-    def collect_common_plugins(self):
-        """Collect common plugins for the DCC"""
-        extract_module_files = self.guard.commons.collect_common_modules(self.name.lower(), "extract")
-        ingests_module_files = self.guard.commons.collect_common_modules(self.name.lower(), "ingest")
-        validations_module_files = self.guard.commons.collect_common_modules(self.name.lower(), "validation")
-        extensions_module_files = self.guard.commons.collect_common_modules(self.name.lower(), "extension")
-
-        extract_classes = self.collect_classes(extract_module_files, module_type = ExtractCore)
-        ingest_classes = self.collect_classes(ingests_module_files, module_type = IngestCore)
-        validation_classes = self.collect_classes(validations_module_files, module_type = ValidateCore)
-        extension_classes = self.collect_classes(extensions_module_files, module_type = ExtensionCore)
-
-        for key, value in extract_classes.items():
-            self.add_extract(key, value)
-        for key, value in ingest_classes.items():
-            self.add_ingest(key, value)
-        for key, value in validation_classes.items():
-            self.add_validation(key, value)
-        for key, value in extension_classes.items():
-            self.add_extension(key, value)
+    def collect_common_plugins(self, plugin_types=None):
+        """Collect common plugins for the DCC
+
+        Args:
+            plugin_types (list, optional): The plugin types to collect.
+                Any of 'extract', 'ingest', 'validation' and 'extension'.
+                Defaults to all.
+        """
+        collectors = {
+            "extract": (ExtractCore, self.add_extract),
+            "ingest": (IngestCore, self.add_ingest),
+            "validation": (ValidateCore, self.add_validation),
+            "extension": (ExtensionCore, self.add_extension),
+        }
+        for plugin_type in plugin_types or list(collectors.keys()):
+            module_type, add_method = collectors[plugin_type]
+            module_files = self.guard.commons.collect_common_modules(self.name.lower(), plugin_type)
+            for key, value in self.collect_classes(module_files, module_type=module_type).items():
+                add_method(key, value)
 
     @staticmethod
     def collect_classes(file_paths, module_type: object):
@@ -1,6 +1,6 @@
 from pathlib import Path
-import shutil
 
+from tik_manager4.core import utils
 from tik_manager4.dcc.extract_core import ExtractCore
 
 class Snapshot(ExtractCore):
@@ -24,5 +24,5 @@ class Snapshot(ExtractCore):
     def _extract_default(self):
         """Extract method for any non-specified category"""
         _file_path = self.resolve_output()
-        shutil.copyfile(self._source_path, _file_path)
+        utils.copy(self._source_path, _file_path, raise_error=True)
         return _file_path
\ No newline at end of file
@@ -1,6 +1,6 @@
 from pathlib import Path
-import shutil
 
+from tik_manager4.core import utils
 from tik_manager4.dcc.extract_core import ExtractCore
 
 class SnapshotBundle(ExtractCore):
@@ -25,7 +25,6 @@ class SnapshotBundle(ExtractCore):
     def _extract_default(self):
         """Extract method for any non-specified category"""
         _folder_path = self.resolve_output()
-        # first delete the folder if it exists
-        shutil.rmtree(_folder_path, ignore_errors=True)
-        shutil.copytree(self._source_path, _folder_path)
+        # the existing folder is replaced.
+        utils.copy(self._source_path, _folder_path, raise_error=True)
         return _folder_path
\ No newline at end of file
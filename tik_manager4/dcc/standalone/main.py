@@ -1,9 +1,9 @@
 import sys
 from pathlib import Path
 import subprocess
-import shutil
 
 import logging
+from tik_manager4.core import utils
 from tik_manager4.dcc.main_core import MainCore
 from tik_manager4.ui.Qt import QtWidgets, QtGui, QtCore
 from tik_manager4.dcc.standalone import extract
@@ -41,12 +41,8 @@ class Dcc(MainCore):
             LOG.warning(f"Source path does not exist: {source_path}")
             return None
 
-        if Path(source_path).is_file():
-            # if it is a file, copy it to the destination
-            shutil.copyfile(source_path, file_path)
-        else:
-            # if it is a folder, copy it to the destination
-            shutil.copytree(source_path, file_path)
+        # copy the file or the folder to the destination
+        utils.copy(source_path, file_path, raise_error=True)
 
         return file_path
 
@@ -3,11 +3,15 @@
 # PyInstaller "tik_manager.py" -w -y --clean
 # Move the executable and _internal folder to the root folder for the CSS to work
 
+# Pass --profile-startup[=<report.json>] to report the startup phase timings.
+
 import sys
+from tik_manager4.core import profiler
 from tik_manager4.ui.Qt import QtWidgets
 from tik_manager4.ui import main
 
 if __name__ == "__main__":
+    profiler.PROFILER.configure_from_args(sys.argv)
     app = QtWidgets.QApplication(sys.argv)
     tik = main.launch()
     sys.exit(app.exec_())
@@ -0,0 +1,79 @@
+"""Sync all the localized versions of a project to the origin without the UI.
+
+Usage:
+    python tik4_sync.py [--project PATH] [--commons PATH] [--workers N] [--retries N]
+                        [--failed] [--dry-run]
+
+The localization settings of the current user are used. The exit code is
+1 if any of the versions cannot be synced.
+"""
+
+import argparse
+import sys
+
+import tik_manager4
+from tik_manager4.core.constants import SyncStates
+
+
+def _print_item(item):
+    """Print the state of a sync item."""
+    line = f"[{item.status.value.upper():<7}] {item.name}"
+    if item.status == SyncStates.FAILED and item.message:
+        line += f": {item.message}"
+    print(line, flush=True)
+
+
+def main(argv=None):
+    """Run the sync.
+
+    Args:
+        argv (list, optional): The command line arguments.
+
+    Returns:
+        int: The exit code.
+    """
+    parser = argparse.ArgumentParser(
+        description="Sync the localized work and publish versions to the origin."
+    )
+    parser.add_argument("--project", help="The project to sync. Defaults to the last project of the user.")
+    parser.add_argument("--commons", help="The commons folder. Defaults to the one of the user.")
+    parser.add_argument("--workers", type=int, help="The maximum number of concurrent syncs.")
+    parser.add_argument("--retries", type=int, help="The number of retries of a failing sync.")
+    parser.add_argument("--failed", action="store_true", help="Retry only the versions failed before.")
+    parser.add_argument("--dry-run", action="store_true", help="List and validate the versions without syncing.")
+    args = parser.parse_args(argv)
+
+    tik = tik_manager4.initialize("Standalone", common_folder=args.commons)
+    if args.project:
+        state, msg = tik.set_project(args.project)
+        if not state:
+            print(msg)
+            return 1
+    manager = tik.sync_manager
+    if manager.local_project_folder is None:
+        print("Local cache folder not set.")
+        return 1
+
+    if args.dry_run:
+        items = manager.discover()
+        manager.validate(items)
+        for item in items:
+            _print_item(item)
+        print(f"{len(items)} localized versions found in {manager.local_project_folder}.")
+        return 1 if any(item.status == SyncStates.FAILED for item in items) else 0
+
+    options = {"progress_callback": _print_item}
+    if args.workers is not None:
+        options["workers"] = args.workers
+    if args.retries is not None:
+        options["retries"] = args.retries
+    if args.failed:
+        state, msg = manager.retry_failed(**options)
+    else:
+        state, msg = manager.sync(**options)
+    print(msg)
+    return 0 if state else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
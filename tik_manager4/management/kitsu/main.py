@@ -4,6 +4,8 @@ import logging
 import json
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from copy import deepcopy
 from datetime import datetime
@@ -11,6 +13,7 @@ from datetime import datetime
 from tik_manager4.core.cryptor import CryptorError
 from tik_manager4.core.cryptor import Cryptor
 from tik_manager4.core.constants import DataTypes
+from tik_manager4.core import io
 from tik_manager4.core import utils
 from tik_manager4.management.management_core import ManagementCore
 from tik_manager4.management.enums import EventType
@@ -25,8 +28,9 @@ kitsu_folder = (external_folder / "kitsu").as_posix()
 if kitsu_folder not in sys.path:
     sys.path.append(kitsu_folder)
 
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
-from gazu.exception import ServerErrorException
+from gazu.exception import ServerErrorException, RouteNotFoundException
 
 LOG = logging.getLogger(__name__)
 logging.basicConfig(level=logging.DEBUG)
@@ -52,6 +56,7 @@ class ProductionPlatform(ManagementCore):
         self.gazu = None
         self.is_authenticated = False
         self.user = None
+        self.last_sync_report = {}
 
     @property
     def host(self):
@@ -65,10 +70,17 @@ class ProductionPlatform(ManagementCore):
             host = host[:-1]
         return f"{host}/api"
 
+    @property
+    def max_connections(self):
+        """Maximum number of concurrent requests to the Kitsu server."""
+        value = self.tik_main.user.commons.management_settings.get("kitsu_max_connections")
+        return max(1, int(value or 8))
+
     def authenticate(self):
         """Authenticate the user."""
         self.gazu = importlib.import_module("gazu")
         self.gazu.set_host(self.host_api)
+        self._configure_session()
         os.environ["CGWIRE_HOST"] = self.host_api
         # first check if there is a token stored in resume settings.
         token = self.tik_main.user.resume.get("kitsu_token")
@@ -104,6 +116,48 @@ class ProductionPlatform(ManagementCore):
 
         return self.gazu, "Success"
 
+    def _configure_session(self):
+        """Size the connection pool of the shared gazu session.
+
+        All gazu requests go through the same requests.Session. The pool is
+        sized to the maximum concurrent requests so that the connections are
+        reused by the prefetch workers instead of being dropped.
+        """
+        session = self.gazu.client.default_client.session
+        adapter = HTTPAdapter(
+            pool_connections=self.max_connections,
+            pool_maxsize=self.max_connections
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    def fetch_concurrently(self, jobs):
+        """Run the gazu requests through a bounded thread pool.
+
+        Args:
+            jobs (dict): Dictionary of keys and (function, arguments) tuples.
+
+        Returns:
+            dict: The results of the requests with the same keys. Requests
+                failed with a route or server error are None.
+        """
+        results = {}
+        if not jobs:
+            return results
+        with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+            futures = {
+                executor.submit(function, *args): key
+                for key, (function, args) in jobs.items()
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    results[key] = future.result()
+                except (RouteNotFoundException, ServerErrorException):
+                    LOG.warning(f"Request failed for {key}", exc_info=True)
+                    results[key] = None
+        return results
+
     def logout(self):
         """Logout the user."""
         if self.is_authenticated:
@@ -179,41 +233,81 @@ class ProductionPlatform(ManagementCore):
             LOG.error("Project is not linked to a Kitsu project.")
             return False, "Project is not linked to a Kitsu project."
 
-        all_assets = self.get_all_assets(project_id)
-        all_episodes = self.get_all_episodes(project_id)
-        all_sequences = self.get_all_sequences(project_id)
-        all_shots = self.get_all_shots(project_id)
+        # pull everything from Kitsu up front and diff it against a single
+        # snapshot of the tik tree instead of querying per entity.
+        start = time.perf_counter()
+        data = self.fetch_concurrently({
+            "assets": (self.get_all_assets, (project_id,)),
+            "episodes": (self.get_all_episodes, (project_id,)),
+            "sequences": (self.get_all_sequences, (project_id,)),
+            "shots": (self.get_all_shots, (project_id,)),
+            "task_types": (self.gazu.task.all_task_types_for_project, (project_id,)),
+            "tasks": (self.gazu.task.all_tasks_for_project, (project_id,)),
+            "asset_types": (self.gazu.asset.all_asset_types_for_project, (project_id,)),
+        })
+        # a partial sync would omit the missing entities and stamp the
+        # project as synced.
+        failed = sorted(key for key, value in data.items() if value is None)
+        if failed:
+            msg = f"Sync is aborted. Cannot fetch the {', '.join(failed)} from Kitsu."
+            LOG.error(msg)
+            return False, msg
+        all_assets = data["assets"]
+        all_episodes = data["episodes"]
+        all_sequences = data["sequences"]
+        all_shots = data["shots"]
+
+        snapshot = SyncSnapshot(self.gazu, self.tik_main, project_id)
+        snapshot.set_project_data(
+            task_types=data["task_types"],
+            kitsu_tasks=data["tasks"],
+            asset_types=data["asset_types"],
+            episodes=all_episodes,
+            sequences=all_sequences,
+        )
+        LOG.info(f"Kitsu data fetched in {time.perf_counter() - start:.2f} seconds.")
+
+        start = time.perf_counter()
+        snapshot.build()
+        LOG.info(f"Tik snapshot built in {time.perf_counter() - start:.2f} seconds.")
 
         assets_sub = self._get_assets_sub()
         shots_sub = self._get_shots_sub()
 
-        for asset in all_assets:
-            sync_block = SyncBlock(self.gazu, self.tik_main, project_id)
-            sync_block.event_type = EventType.NEW_ASSET
-            sync_block.kitsu_data = asset
-            sync_block.subproject = assets_sub
-            sync_block.execute()
-
-        for episode in all_episodes:
-            sync_block = SyncBlock(self.gazu, self.tik_main, project_id)
-            sync_block.event_type = EventType.NEW_EPISODE
-            sync_block.kitsu_data = episode
-            sync_block.subproject = shots_sub
-            sync_block.execute()
-
-        for sequence in all_sequences:
-            sync_block = SyncBlock(self.gazu, self.tik_main, project_id)
-            sync_block.event_type = EventType.NEW_SEQUENCE
-            sync_block.kitsu_data = sequence
-            sync_block.subproject = shots_sub
-            sync_block.execute()
-
-        for shot in all_shots:
-            sync_block = SyncBlock(self.gazu, self.tik_main, project_id)
-            sync_block.event_type = EventType.NEW_SHOT
-            sync_block.kitsu_data = shot
-            sync_block.subproject = shots_sub
-            sync_block.execute()
+        sync_queue = [
+            ("Asset", all_assets, EventType.NEW_ASSET, assets_sub),
+            ("Episode", all_episodes, EventType.NEW_EPISODE, shots_sub),
+            ("Sequence", all_sequences, EventType.NEW_SEQUENCE, shots_sub),
+            ("Shot", all_shots, EventType.NEW_SHOT, shots_sub),
+        ]
+        # coalesce the multiple writes to the same database files
+        # and save the project structure once
+        with io.write_behind(), self.tik_main.project.batch():
+            for entity_type, entities, event_type, subproject in sync_queue:
+                start = time.perf_counter()
+                for entity in entities:
+                    existing = snapshot.get_task(entity["id"]) != -1
+                    sync_block = SyncBlock(self.gazu, self.tik_main, project_id)
+                    sync_block.snapshot = snapshot
+                    sync_block.event_type = event_type
+                    sync_block.kitsu_data = entity
+                    sync_block.subproject = subproject
+                    sync_block.execute()
+                    if snapshot.get_task(entity["id"]) == -1:
+                        snapshot.count(entity_type, "skipped")
+                        continue
+                    snapshot.count(entity_type, "updated" if existing else "created")
+                    if entity.get("canceled"):
+                        snapshot.count(entity_type, "omitted")
+                snapshot.set_duration(entity_type, time.perf_counter() - start)
+
+        self.last_sync_report = snapshot.report
+        for entity_type, stats in snapshot.report.items():
+            LOG.info(
+                f"{entity_type}: {stats['created']} created, "
+                f"{stats['updated']} updated, {stats['omitted']} omitted, "
+                f"{stats['skipped']} skipped in {stats['seconds']:.2f} seconds."
+            )
 
         self.tik_main.project.settings.edit_property("last_sync", sync_stamp)
         self.tik_main.project.settings.apply_settings(force=True)
@@ -345,70 +439,98 @@ class ProductionPlatform(ManagementCore):
                              "asset:delete", "shot:delete", "sequence:delete",
                              "asset:update", "shot:update", "sequence:update",
                              "task:new", "task:delete"]
-        for event in reversed(events):
+        events = [event for event in reversed(events) if event.get("name") in valid_event_types]
 
+        # fetch the details of all entities in the events up front
+        snapshot = SyncSnapshot(self.gazu, self.tik_main, project["id"])
+        details = self.fetch_concurrently(self._get_event_jobs(events))
+        for (request, entity_id), result in details.items():
+            if request == "categories" and result is not None:
+                snapshot.set_categories(entity_id, result)
+
+        for event in events:
             event_type = event.get("name")
-            if event_type not in valid_event_types:
-                continue
-            try:
-                sync_block = SyncBlock(self.gazu, self.tik_main, project)
-                if event_type == "asset:new":
-                    sync_block.event_type = EventType.NEW_ASSET
-                    asset_data = self.gazu.asset.get_asset(event["data"]["asset_id"])
-                    sync_block.kitsu_data = asset_data
-                    sync_block.subproject = assets_sub
-                    # sync_block.categories = asset_categories
-                elif event_type == "shot:new":
-                    sync_block.event_type = EventType.NEW_SHOT
-                    shot_data = self.gazu.shot.get_shot(event["data"]["shot_id"])
-                    sync_block.kitsu_data = shot_data
-                    sync_block.subproject = shots_sub
-                    # sync_block.categories = shot_categories
-                elif event_type == "sequence:new":
-                    sync_block.event_type = EventType.NEW_SEQUENCE
-                    sequence_data = self.gazu.shot.get_sequence(event["data"]["sequence_id"])
-                    sync_block.kitsu_data = sequence_data
-                    sync_block.subproject = shots_sub
-                elif event_type == "asset:update":
-                    sync_block.event_type = EventType.UPDATE_ASSET
-                    asset_data = self.gazu.asset.get_asset(event["data"]["asset_id"])
-                    sync_block.kitsu_data = asset_data
-                elif event_type == "shot:update":
-                    sync_block.event_type = EventType.UPDATE_SHOT
-                    shot_data = self.gazu.shot.get_shot(event["data"]["shot_id"])
-                    sync_block.kitsu_data = shot_data
-                elif event_type == "sequence:update":
-                    sync_block.event_type = EventType.UPDATE_SEQUENCE
-                    sequence_data = self.gazu.shot.get_sequence(event["data"]["sequence_id"])
-                    sync_block.kitsu_data = sequence_data
-                elif event_type == "asset:delete":
-                    # if the asset deleted we cannot request the kitsu data.
-                    sync_block.event_type = EventType.DELETE_ASSET
-                    sync_block.kitsu_data = event
-                elif event_type == "shot:delete":
-                    # if the shot deleted we cannot request the kitsu data.
-                    sync_block.event_type = EventType.DELETE_SHOT
-                    sync_block.kitsu_data = event
-                elif event_type == "sequence:delete":
-                    # if the sequence deleted we cannot request the kitsu data.
-                    sync_block.event_type = EventType.DELETE_SEQUENCE
-                    sync_block.kitsu_data = event
-                elif event_type == "task:new":
-                    task_data = self.gazu.task.get_task(event["data"]["task_id"])
-                    sync_block.event_type = EventType.NEW_TASK
-                    sync_block.kitsu_data = task_data # this is the task data
-                elif event_type == "task:delete":
-                    # task_data = self.gazu.task.get_task(event["data"]["task_id"])
-                    # if the tasks is deleted, we cannot reach the task data.
-                    # in this case. we will use the event data.
-                    sync_block.event_type = EventType.DELETE_TASK
-                    sync_block.kitsu_data = event
-            except self.gazu.exception.RouteNotFoundException:
-                LOG.warning(f"Route not found for event: {event}", exc_info=True, stack_info=True)
+            sync_block = SyncBlock(self.gazu, self.tik_main, project)
+            sync_block.snapshot = snapshot
+            if event_type == "asset:new":
+                sync_block.event_type = EventType.NEW_ASSET
+                sync_block.kitsu_data = details.get(("entity", event["data"]["asset_id"]))
+                sync_block.subproject = assets_sub
+                # sync_block.categories = asset_categories
+            elif event_type == "shot:new":
+                sync_block.event_type = EventType.NEW_SHOT
+                sync_block.kitsu_data = details.get(("entity", event["data"]["shot_id"]))
+                sync_block.subproject = shots_sub
+                # sync_block.categories = shot_categories
+            elif event_type == "sequence:new":
+                sync_block.event_type = EventType.NEW_SEQUENCE
+                sync_block.kitsu_data = details.get(("entity", event["data"]["sequence_id"]))
+                sync_block.subproject = shots_sub
+            elif event_type == "asset:update":
+                sync_block.event_type = EventType.UPDATE_ASSET
+                sync_block.kitsu_data = details.get(("entity", event["data"]["asset_id"]))
+            elif event_type == "shot:update":
+                sync_block.event_type = EventType.UPDATE_SHOT
+                sync_block.kitsu_data = details.get(("entity", event["data"]["shot_id"]))
+            elif event_type == "sequence:update":
+                sync_block.event_type = EventType.UPDATE_SEQUENCE
+                sync_block.kitsu_data = details.get(("entity", event["data"]["sequence_id"]))
+            elif event_type == "asset:delete":
+                # if the asset deleted we cannot request the kitsu data.
+                sync_block.event_type = EventType.DELETE_ASSET
+                sync_block.kitsu_data = event
+            elif event_type == "shot:delete":
+                # if the shot deleted we cannot request the kitsu data.
+                sync_block.event_type = EventType.DELETE_SHOT
+                sync_block.kitsu_data = event
+            elif event_type == "sequence:delete":
+                # if the sequence deleted we cannot request the kitsu data.
+                sync_block.event_type = EventType.DELETE_SEQUENCE
+                sync_block.kitsu_data = event
+            elif event_type == "task:new":
+                sync_block.event_type = EventType.NEW_TASK
+                sync_block.kitsu_data = details.get(("task", event["data"]["task_id"])) # this is the task data
+            elif event_type == "task:delete":
+                # if the tasks is deleted, we cannot reach the task data.
+                # in this case. we will use the event data.
+                sync_block.event_type = EventType.DELETE_TASK
+                sync_block.kitsu_data = event
+
+            if not sync_block.kitsu_data:
+                LOG.warning(f"Route not found for event: {event}")
                 continue
 
             yield sync_block
 
+    def _get_event_jobs(self, events):
+        """Collect the requests needed to resolve the given events.
+
+        Args:
+            events (list): List of Kitsu event dictionaries.
+
+        Returns:
+            dict: Request jobs to be used with fetch_concurrently.
+        """
+        entity_requests = {
+            "asset": (self.gazu.asset.get_asset, self.gazu.task.all_tasks_for_asset),
+            "shot": (self.gazu.shot.get_shot, self.gazu.task.all_tasks_for_shot),
+            "sequence": (self.gazu.shot.get_sequence, self.gazu.task.all_tasks_for_sequence),
+        }
+        jobs = {}
+        for event in events:
+            entity_type, action = event["name"].split(":")
+            if action == "delete":
+                continue
+            if entity_type == "task":
+                task_id = event["data"]["task_id"]
+                jobs[("task", task_id)] = (self.gazu.task.get_task, (task_id,))
+                continue
+            entity_id = event["data"][f"{entity_type}_id"]
+            get_entity, get_tasks = entity_requests[entity_type]
+            jobs[("entity", entity_id)] = (get_entity, (entity_id,))
+            jobs[("categories", entity_id)] = (get_tasks, (entity_id,))
+        return jobs
+
     def sync_project(self):
         """Sync the project with the Kitsu project."""
         project_id = self.tik_main.project.settings.get("host_project_id")
@@ -430,8 +552,9 @@ class ProductionPlatform(ManagementCore):
                                             shot_categories
                                             )
 
-        for sync_block in sync_blocks:
-            sync_block.execute()
+        with io.write_behind(), self.tik_main.project.batch():
+            for sync_block in sync_blocks:
+                sync_block.execute()
 
         # Update the last sync date
         self.tik_main.project.settings.edit_property("last_sync", self.date_stamp())
@@ -493,6 +616,14 @@ class ProductionPlatform(ManagementCore):
                 "tooltip": "If an Asset or Shot has an empty name, it will be skipped during initial project creation or sync. Otherwise, id will be used as the name.",
                 "type": DataTypes.BOOLEAN.value,
                 "value": False,
+            },
+            "kitsu_max_connections": {
+                "display_name": "Maximum Concurrent Requests",
+                "tooltip": "Number of requests sent to the Kitsu server in parallel while fetching data for sync.",
+                "type": DataTypes.INTEGER.value,
+                "value": 8,
+                "minimum": 1,
+                "maximum": 64,
             }
         }
 
@@ -575,6 +706,140 @@ class ProductionPlatform(ManagementCore):
 
         return {"id": new_comment["object_id"]}
 
+class SyncSnapshot:
+    """In-memory snapshot of the tik project and the Kitsu data for batch syncs.
+
+    All Kitsu entities and task lists are fetched once and all tik tasks are
+    collected in a single pass over the project. The sync blocks using the
+    snapshot resolve everything from these tables instead of querying the
+    Kitsu server and rescanning the tik project for every entity.
+    """
+
+    def __init__(self, gazu_instance, tik_main, project_id):
+        self.gazu = gazu_instance
+        self.tik_main = tik_main
+        self.project_id = project_id
+        self._tik_tasks = {}  # task id => tik task object
+        self._categories = {}  # kitsu entity id => list of task type names
+        self._asset_types = {}  # kitsu entity type id => name
+        self._sequences = {}
+        self._episodes = {}
+        self._all_categories = False
+        self._built = False
+        self.report = {}
+
+    def set_project_data(self, task_types, kitsu_tasks, asset_types, episodes, sequences):
+        """Fill the lookup tables with the data fetched for the whole project.
+
+        Args:
+            task_types (list): Task types of the project.
+            kitsu_tasks (list): All Kitsu tasks of the project.
+            asset_types (list): Asset types of the project.
+            episodes (list): Episodes of the project.
+            sequences (list): Sequences of the project.
+        """
+        task_type_names = {task_type["id"]: task_type["name"] for task_type in task_types}
+        for kitsu_task in kitsu_tasks:
+            type_name = kitsu_task.get("task_type_name") or task_type_names.get(
+                kitsu_task.get("task_type_id")
+            )
+            if not type_name:
+                continue
+            self._categories.setdefault(kitsu_task["entity_id"], []).append(type_name)
+        # every entity of the project is covered from now on
+        self._all_categories = True
+        for asset_type in asset_types:
+            self._asset_types[asset_type["id"]] = asset_type["name"]
+        self._episodes = {episode["id"]: episode for episode in episodes}
+        self._sequences = {sequence["id"]: sequence for sequence in sequences}
+
+    def set_categories(self, entity_id, kitsu_tasks):
+        """Store the task type names of a single Kitsu entity.
+
+        Args:
+            entity_id (str): Id of the Kitsu entity.
+            kitsu_tasks (list): The Kitsu tasks of the entity.
+        """
+        self._categories[entity_id] = [task["task_type_name"] for task in kitsu_tasks]
+
+    def build(self):
+        """Collect all tik tasks of the project in a single pass."""
+        self._tik_tasks = {}
+        queue = [self.tik_main.project]
+        while queue:
+            sub = queue.pop()
+            queue.extend(sub.subs.values())
+            for task in sub.scan_tasks().values():
+                self._tik_tasks[task.id] = task
+        self._built = True
+
+    def get_task(self, uid):
+        """Return the tik task with the given id, including the deleted ones.
+
+        Args:
+            uid (str): Id of the task.
+
+        If the snapshot is not built, the project is queried instead.
+
+        Returns:
+            Task or int: The task object if found, -1 otherwise.
+        """
+        if not self._built:
+            return self.tik_main.project.find_task_by_id(uid, query_all=True)
+        return self._tik_tasks.get(uid, -1)
+
+    def register_task(self, task):
+        """Add a newly created tik task to the snapshot."""
+        if self._built:
+            self._tik_tasks[task.id] = task
+
+    def get_categories(self, entity_id):
+        """Return the task type names of the Kitsu entity.
+
+        Returns:
+            list or None: The task type names, None if they are not fetched.
+        """
+        if entity_id in self._categories:
+            return list(self._categories[entity_id])
+        if self._all_categories:
+            return []
+        return None
+
+    def get_asset_type_name(self, entity_type_id):
+        """Return the name of the asset type. Fetches the unknown ones."""
+        if entity_type_id not in self._asset_types:
+            asset_type = self.gazu.entity.get_entity_type(entity_type_id) or {}
+            self._asset_types[entity_type_id] = asset_type.get("name", None)
+        return self._asset_types[entity_type_id]
+
+    def get_sequence(self, sequence_id):
+        """Return the Kitsu sequence data. Fetches the unknown ones."""
+        if sequence_id not in self._sequences:
+            self._sequences[sequence_id] = self.gazu.shot.get_sequence(sequence_id)
+        return self._sequences[sequence_id]
+
+    def get_episode(self, episode_id):
+        """Return the Kitsu episode data. Fetches the unknown ones."""
+        if episode_id not in self._episodes:
+            self._episodes[episode_id] = self.gazu.shot.get_episode(episode_id)
+        return self._episodes[episode_id]
+
+    def _get_stats(self, entity_type):
+        """Return the report entry of the entity type."""
+        return self.report.setdefault(
+            entity_type,
+            {"created": 0, "updated": 0, "omitted": 0, "skipped": 0, "seconds": 0.0},
+        )
+
+    def count(self, entity_type, action):
+        """Increment the counter of the action for the entity type."""
+        self._get_stats(entity_type)[action] += 1
+
+    def set_duration(self, entity_type, seconds):
+        """Set the elapsed time for the entity type."""
+        self._get_stats(entity_type)["seconds"] = seconds
+
+
 class SyncBlock:
     """Class to store and execute sync blocks."""
     metadata_pairing = {
@@ -609,6 +874,7 @@ class SyncBlock:
         self._kitsu_data = None
         self._subproject = None
         self._categories = None
+        self.snapshot = None # optional SyncSnapshot used by batch syncs
         self._skip_empty_entity_names = self.tik_main.user.commons.management_settings.get("skip_empty_entity_names")
         self._validate_hierarchy = True # if True, it will validate existing of the parent entities
 
@@ -666,6 +932,50 @@ class SyncBlock:
         """Execute the sync block."""
         self.function_mapping[self.event_type]()
 
+    def _find_task(self, uid):
+        """Find the tik task by id, including the deleted ones.
+
+        Uses the snapshot if the sync block is a part of a batch sync.
+        """
+        if self.snapshot:
+            return self.snapshot.get_task(uid)
+        return self.tik_main.project.find_task_by_id(uid, query_all=True)
+
+    def _register_task(self, task):
+        """Add the newly created task to the snapshot if there is one."""
+        if self.snapshot:
+            self.snapshot.register_task(task)
+
+    def _sync_task(self, tik_task, category_names, metadata_overrides=None):
+        """Apply the Kitsu state to the tik task with a single write.
+
+        Args:
+            tik_task (Task): The tik task to update.
+            category_names (list): The categories that should exist.
+            metadata_overrides (dict, optional): The metadata overrides to
+                sync. If None, metadata overrides are not touched.
+        """
+        existing_categories = tik_task.categories.keys()
+        for category in category_names:
+            if category not in existing_categories:
+                tik_task.add_category(category, apply=False)
+
+        if self.kitsu_data["canceled"]:
+            tik_task.omit(apply=False)
+        else:
+            tik_task.revive(apply=False)
+
+        if metadata_overrides is not None:
+            for key, value in metadata_overrides.items():
+                if value:
+                    tik_task._metadata_overrides[key] = value
+                elif tik_task._metadata_overrides.get(key):
+                    tik_task._metadata_overrides.pop(key)
+            tik_task.edit_property("metadata_overrides", tik_task._metadata_overrides)
+
+        # only writes if something is actually changed
+        tik_task.apply_settings()
+
     def _new_asset(self):
         """Create a new asset in the tik project from the Kitsu data."""
         # this requires the asset data, asset subproject and asset categories to be defined.
@@ -677,8 +987,11 @@ class SyncBlock:
             if self._skip_empty_entity_names:
                 return None
             asset_name = asset_id
-        asset_type_dict = self.gazu.entity.get_entity_type(self.kitsu_data["entity_type_id"])
-        asset_type = asset_type_dict.get("name", None)
+        if self.snapshot:
+            asset_type = self.snapshot.get_asset_type_name(self.kitsu_data["entity_type_id"])
+        else:
+            asset_type_dict = self.gazu.entity.get_entity_type(self.kitsu_data["entity_type_id"])
+            asset_type = asset_type_dict.get("name", None)
 
         if asset_type:
             if self.subproject.subs.get(asset_type) is None:
@@ -695,28 +1008,30 @@ class SyncBlock:
         metadata_overrides = self._retrieve_metadata_overrides(
             self.kitsu_data.get("data"))
 
-        task = sub.find_task_by_id(asset_id, query_all=True)
-
-        if task == -1:
-            category_names = self.__get_asset_categories(asset_id)
-            task = sub.add_task(
-                asset_name,
-                categories=category_names,
-                metadata_overrides=metadata_overrides,
-                uid=asset_id,
-                force_edit=True
-            )
+        if self.snapshot:
+            task = self.snapshot.get_task(asset_id)
         else:
+            task = sub.find_task_by_id(asset_id, query_all=True)
+
+        if task != -1:
             self._update_asset()
+            return task
 
+        category_names = self.__get_asset_categories(asset_id)
+        task = sub.add_task(
+            asset_name,
+            categories=category_names,
+            metadata_overrides=metadata_overrides,
+            uid=asset_id,
+            force_edit=True
+        )
         if task == -1:
             LOG.warning(f"Task creation failed for {asset_name}")
             return None
+        self._register_task(task)
 
         if self.kitsu_data["canceled"]:
             task.omit()
-        else:
-            task.revive()
 
         return task
 
@@ -731,13 +1046,19 @@ class SyncBlock:
                 return None
             shot_name = shot_id
         # sequence = self.gazu.entity.get_entity(self.kitsu_data["parent_id"])
-        kitsu_sequence = self.gazu.shot.get_sequence(self.kitsu_data["parent_id"])
         query_sub = self.subproject
 
         # check the sequence tik-task is there or not. Assume the subs are created if the task is there.
-        sequence_tik_task = query_sub.find_task_by_id(self.kitsu_data["parent_id"], query_all=True)
+        if self.snapshot:
+            sequence_tik_task = self.snapshot.get_task(self.kitsu_data["parent_id"])
+        else:
+            sequence_tik_task = query_sub.find_task_by_id(self.kitsu_data["parent_id"], query_all=True)
         if sequence_tik_task == -1:
             # create the sequence
+            if self.snapshot:
+                kitsu_sequence = self.snapshot.get_sequence(self.kitsu_data["parent_id"])
+            else:
+                kitsu_sequence = self.gazu.shot.get_sequence(self.kitsu_data["parent_id"])
             sequence_task, query_sub = self._new_sequence(data=kitsu_sequence)
         else:
             query_sub = sequence_tik_task.parent_sub
@@ -745,28 +1066,30 @@ class SyncBlock:
         metadata_overrides = self._retrieve_metadata_overrides(self.kitsu_data.get("data"))
         metadata_overrides.update({"mode": "shot"})
 
-        task = query_sub.find_task_by_id(shot_id, query_all=True)
-
-        if task == -1:
-            category_names = self.__get_shot_categories(shot_id)
-            task = query_sub.add_task(
-                shot_name,
-                categories=category_names,
-                metadata_overrides=metadata_overrides,
-                uid=shot_id,
-                force_edit=True
-            )
+        if self.snapshot:
+            task = self.snapshot.get_task(shot_id)
         else:
+            task = query_sub.find_task_by_id(shot_id, query_all=True)
+
+        if task != -1:
             self._update_shot()
+            return task
 
+        category_names = self.__get_shot_categories(shot_id)
+        task = query_sub.add_task(
+            shot_name,
+            categories=category_names,
+            metadata_overrides=metadata_overrides,
+            uid=shot_id,
+            force_edit=True
+        )
         if task == -1:
             LOG.warning(f"Task creation failed for {shot_name}")
             return None
+        self._register_task(task)
 
         if self.kitsu_data["canceled"]:
             task.omit()
-        else:
-            task.revive()
 
         return task
 
@@ -782,8 +1105,11 @@ class SyncBlock:
         episode_id = data.get("parent_id", None)
         query_sub = self.subproject
         if episode_id:
-            episode = self.gazu.shot.get_episode(episode_id)
-            episode_tik_task = self.tik_main.project.find_task_by_id(episode_id)
+            if self.snapshot:
+                episode = self.snapshot.get_episode(episode_id)
+            else:
+                episode = self.gazu.shot.get_episode(episode_id)
+            episode_tik_task = self._find_task(episode_id)
             if episode_tik_task == -1:
                 episode_tik_task, query_sub = self._new_episode(data=episode)
             else:
@@ -846,7 +1172,9 @@ class SyncBlock:
         # we override the episode tik-task to be a shot.
         metadata_overrides.update({"mode": "shot"})
 
-        query_sub.scan_tasks()
+        # the snapshot already holds the scanned tasks
+        if not self.snapshot:
+            query_sub.scan_tasks()
         task = query_sub.all_tasks.get(tik_subproject_name, None)
         if not task:
             category_names = self._get_entity_categories(entity_id, entity_type)
@@ -858,6 +1186,10 @@ class SyncBlock:
             )
             if task == -1:
                 return None
+            self._register_task(task)
+            if is_canceled:
+                task.omit()
+            return task, query_sub
 
         if is_canceled:
             task.omit()
@@ -871,18 +1203,12 @@ class SyncBlock:
         This function assumes that the asset is already in the tik project.
         """
         asset_id = self.kitsu_data["id"]
-        tik_task = self.tik_main.project.find_task_by_id(asset_id)
+        tik_task = self._find_task(asset_id)
+        if tik_task == -1:
+            return
 
         category_names = self.__get_asset_categories(asset_id)
-        existing_categories = tik_task.categories.keys()
-        for category in category_names:
-            if category not in existing_categories:
-                tik_task.add_category(category)
-
-        if self.kitsu_data["canceled"]:
-            tik_task.omit()
-        else:
-            tik_task.revive()
+        self._sync_task(tik_task, category_names)
 
     def _update_shot(self):
         """Sync the properties of the shot with the one in Kitsu Server.
@@ -890,56 +1216,24 @@ class SyncBlock:
         This function assumes that the shot is already in the tik project.
         """
         shot_id = self.kitsu_data["id"]
-        tik_task = self.tik_main.project.find_task_by_id(shot_id)
+        tik_task = self._find_task(shot_id)
+        if tik_task == -1:
+            return
 
         category_names = self.__get_shot_categories(shot_id)
-        existing_categories = tik_task.categories.keys()
-        for category in category_names:
-            if category not in existing_categories:
-                tik_task.add_category(category)
-
-        if self.kitsu_data["canceled"]:
-            tik_task.omit()
-        else:
-            tik_task.revive()
-
         metadata_overrides = self._retrieve_metadata_overrides(self.kitsu_data.get("data"))
-
-        for key, value in metadata_overrides.items():
-            if value:
-                tik_task._metadata_overrides[key] = value
-            elif tik_task._metadata_overrides.get(key):
-                tik_task._metadata_overrides.pop(key)
-
-        tik_task.edit_property("metadata_overrides", tik_task._metadata_overrides)
-        tik_task.apply_settings()
+        self._sync_task(tik_task, category_names, metadata_overrides=metadata_overrides)
 
     def _update_sequence(self):
         """Sync the properties of the sequence with the one in Kitsu Server."""
         sequence_id = self.kitsu_data["id"]
-        tik_task = self.tik_main.project.find_task_by_id(sequence_id)
+        tik_task = self._find_task(sequence_id)
+        if tik_task == -1:
+            return
 
         category_names = self.__get_sequence_categories(sequence_id)
-        existing_categories = tik_task.categories.keys()
-        for category in category_names:
-            if category not in existing_categories:
-                tik_task.add_category(category)
-
-        if self.kitsu_data["canceled"]:
-            tik_task.omit()
-        else:
-            tik_task.revive()
-
         metadata_overrides = self._retrieve_metadata_overrides(self.kitsu_data.get("data"))
-
-        for key, value in metadata_overrides.items():
-            if value:
-                tik_task._metadata_overrides[key] = value
-            elif tik_task._metadata_overrides.get(key):
-                tik_task._metadata_overrides.pop(key)
-
-        tik_task.edit_property("metadata_overrides", tik_task._metadata_overrides)
-        tik_task.apply_settings()
+        self._sync_task(tik_task, category_names, metadata_overrides=metadata_overrides)
 
     def _update_episode(self):
         """Sync the properties of the episode with the one in Kitsu Server."""
@@ -1092,21 +1386,33 @@ class SyncBlock:
 
     def __get_asset_categories(self, asset_id):
         """Get the asset categories from the Kitsu server."""
+        categories = self.snapshot.get_categories(asset_id) if self.snapshot else None
+        if categories is not None:
+            return categories
         all_tasks = self.gazu.task.all_tasks_for_asset(asset_id)
         return [task["task_type_name"] for task in all_tasks]
 
     def __get_shot_categories(self, shot_id):
         """Get the shot categories from the Kitsu server."""
+        categories = self.snapshot.get_categories(shot_id) if self.snapshot else None
+        if categories is not None:
+            return categories
         all_tasks = self.gazu.task.all_tasks_for_shot(shot_id)
         return [task["task_type_name"] for task in all_tasks]
 
     def __get_sequence_categories(self, sequence_id):
         """Get the sequence categories from the Kitsu server."""
+        categories = self.snapshot.get_categories(sequence_id) if self.snapshot else None
+        if categories is not None:
+            return categories
         all_tasks = self.gazu.task.all_tasks_for_sequence(sequence_id)
         return [task["task_type_name"] for task in all_tasks]
 
     def __get_episode_categories(self, episode_id):
         """Get the episode categories from the Kitsu server."""
+        categories = self.snapshot.get_categories(episode_id) if self.snapshot else None
+        if categories is not None:
+            return categories
         all_tasks = self.gazu.task.all_tasks_for_episode(episode_id)
         return [task["task_type_name"] for task in all_tasks]
 
@@ -204,11 +204,12 @@ class ProductionPlatform(ManagementCore):
         asset_categories = self._get_asset_categories()
         shot_categories = self._get_shot_categories()
 
-        for asset in all_assets:
-            self._sync_new_asset(asset, assets_sub, asset_categories)
+        with self.tik_main.project.batch():
+            for asset in all_assets:
+                self._sync_new_asset(asset, assets_sub, asset_categories)
 
-        for shot in all_shots:
-            self._sync_new_shot(shot, shots_sub, shot_categories)
+            for shot in all_shots:
+                self._sync_new_shot(shot, shots_sub, shot_categories)
 
         self.tik_main.project.settings.edit_property("last_sync", sync_stamp)
         self.tik_main.project.settings.apply_settings(force=True)
@@ -274,11 +275,12 @@ class ProductionPlatform(ManagementCore):
 
         ####
 
-        for asset in all_assets:
-            self._sync_new_asset(asset, assets_sub, asset_categories)
+        with self.tik_main.project.batch():
+            for asset in all_assets:
+                self._sync_new_asset(asset, assets_sub, asset_categories)
 
-        for shot in all_shots:
-            self._sync_new_shot(shot, shots_sub, shot_categories)
+            for shot in all_shots:
+                self._sync_new_shot(shot, shots_sub, shot_categories)
 
         # tag the project as management driven
         self.tik_main.project.settings.edit_property("management_driven", True)
@@ -122,15 +122,20 @@ class LocalizeMixin(Entity):
         """Sync the entity to the origin.
 
         This will copy the entity to the origin path. Sync is single direction.
+        The files moved by an interrupted sync are skipped, so the sync can
+        be run again.
         """
         if not self.localized:
             LOG.error("Entity is not localized.")
             return False
         LOG.info("Syncing...")
         if self.object_type == ObjectType.WORK_VERSION:
-            ret, msg = utils.move(self.localized_path,  self.get_abs_project_path(), force=False)
-            if not ret:
-                return False, msg
+            source = Path(self.localized_path)
+            target = Path(self.get_abs_project_path())
+            if not self._is_moved(source, target):
+                ret, msg = utils.move(source.as_posix(), target.as_posix(), force=False)
+                if not ret:
+                    return False, msg
             self._localized = False
             self._localized_path = ""
         elif self.object_type == ObjectType.PUBLISH_VERSION:
@@ -140,11 +145,13 @@ class LocalizeMixin(Entity):
                        self._elements]
             targets = [Path(self.get_abs_project_path(el["path"])) for el in
                        self._elements]
-            list_of_errors = list(self.validate_paths(sources, targets))
+            pending = [(source, target) for source, target in zip(sources, targets)
+                       if not self._is_moved(source, target)]
+            list_of_errors = list(self.validate_paths(*zip(*pending))) if pending else []
             if list_of_errors:
                 return False, list_of_errors
 
-            for source, target in zip(sources, targets):
+            for source, target in pending:
                 ret, msg = utils.move(source.as_posix(), target.as_posix(), force=False)
                 if not ret:
                     return False, msg
@@ -159,6 +166,11 @@ class LocalizeMixin(Entity):
             return False, msg
         return True, "Sync successful."
 
+    @staticmethod
+    def _is_moved(source, target):
+        """Check if the source is already moved to the target."""
+        return not source.exists() and target.exists()
+
     # A helper function to validate paths before attempting the actual move
     def validate_paths(self, sources, targets):
         """Validate that all source files exist and can be moved to target locations."""
@@ -6,12 +6,14 @@ Category object is responsible for handling the works and publishes under a task
 """
 
 from pathlib import Path
+import threading
 from fnmatch import fnmatch
 
 from tik_manager4.core.constants import ObjectType
 from tik_manager4.objects.entity import Entity
 from tik_manager4.objects.work import Work
 from tik_manager4.core import filelog
+from tik_manager4.core import io
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
@@ -24,6 +26,8 @@ class Category(Entity):
         super().__init__(**kwargs)
         definition = definition or {}
         self._works = {}
+        self._work_scanner = None
+        self._scan_lock = threading.RLock()
         self._publishes = {}
         self.type = definition.get("type", None)
         self.display_name = definition.get("display_name", None)
@@ -61,30 +65,47 @@ class Category(Entity):
                 matched_items.append(work)
         return matched_items
 
-    def scan_works(self):
+    def scan_works(self, force=False):
         """Scan the category folder and return the works.
 
+        The folders are listed again only if they have changed since the
+        last scan.
+
+        Args:
+            force (bool, optional): If True, the folders are listed even if
+                they have not changed.
+
         Returns:
             dict: Dictionary of works under the category.
         """
-        # get all files recursively, regardless of the dcc
-        search_dir = self.get_abs_database_path()
-        _work_paths = list(Path(search_dir).rglob("**/*.twork"))
-
-        # add the file if it is new. if it is not new,
-        # check the modified time and update if necessary
-        for w_path, _w_data in dict(self._works).items():
-            if w_path not in _work_paths:
-                self._works.pop(w_path)
-        for _work_path in _work_paths:
-            existing_work = self._works.get(_work_path, None)
-            if not existing_work:
-                work = Work(absolute_path=_work_path, parent_task=self.parent_task)
-                self._works[_work_path] = work
-            else:
-                if existing_work.is_modified():
-                    existing_work.reload()
-        return self._works
+        with self._scan_lock:
+            # get all files recursively, regardless of the dcc
+            search_dir = self.get_abs_database_path()
+            if self._work_scanner is None or self._work_scanner.folder != search_dir:
+                self._work_scanner = io.FolderScanner(search_dir, ".twork", recursive=True)
+            modified_paths = self._work_scanner.scan(force=force)
+            if modified_paths is None:
+                return self._works
+            _work_paths = self._work_scanner.paths
+            # the dictionary is replaced at the end, so it is safe to read
+            # the works from other threads during the scan.
+            _works = dict(self._works)
+
+            # add the file if it is new. if it is not new,
+            # check the modified time and update if necessary
+            for w_path in list(_works):
+                if w_path not in _work_paths:
+                    _works.pop(w_path)
+            for _work_path in _work_paths:
+                existing_work = _works.get(_work_path, None)
+                if not existing_work:
+                    work = Work(absolute_path=_work_path, parent_task=self.parent_task)
+                    _works[_work_path] = work
+                else:
+                    if _work_path in modified_paths and existing_work.is_modified():
+                        existing_work.reload()
+            self._works = _works
+            return self._works
 
     def is_empty(self):
         """Check if the category is empty.
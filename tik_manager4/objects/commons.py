@@ -1,5 +1,6 @@
 """Commons module for tik_manager4 package."""
 
+import os
 from pathlib import Path
 import shutil
 import uuid
@@ -8,16 +9,51 @@ from tik_manager4.core.settings import Settings
 from tik_manager4 import defaults
 
 
+class _CommonsFile:
+    """Settings file of the commons folder, read on the first access."""
+
+    def __init__(self, file_name):
+        """Initialize the descriptor.
+
+        Args:
+            file_name (str): The name of the settings file.
+        """
+        self.file_name = file_name
+        self.attribute = None
+
+    def __set_name__(self, owner, name):
+        self.attribute = f"_{name}"
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        if not instance.__dict__.get("is_valid"):
+            # an invalid commons folder has no settings.
+            return None
+        settings = instance.__dict__.get(self.attribute)
+        if settings is None:
+            settings = Settings(file_path=str(Path(instance._folder_path, self.file_name)))
+            instance.__dict__[self.attribute] = settings
+        return settings
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.attribute] = value
+
+
 class Commons:
-    """Class to handle the common settings and user data"""
-    # exportSettings = None
-    # importSettings = None
-    user_defaults = None
-    project_settings = None
-    users = None
-    template = None
-    structures = None
-    metadata = None
+    """Class to handle the common settings and user data.
+
+    The settings files are read on their first access.
+    """
+    category_definitions = _CommonsFile("category_definitions.json")
+    user_defaults = _CommonsFile("user_defaults.json")
+    project_settings = _CommonsFile("project_settings.json")
+    preview_settings = _CommonsFile("preview_settings.json")
+    users = _CommonsFile("users.json")
+    template = _CommonsFile("templates.json")
+    structures = _CommonsFile("structures.json")
+    metadata = _CommonsFile("metadata.json")
+    management_settings = _CommonsFile("management_settings.json")
 
     def __init__(self, folder_path):
         """Initialize the Commons class."""
@@ -33,7 +69,12 @@ class Commons:
     @property
     def id(self):
         """Return the commons id."""
-        return self.management_settings.get_property("commons_id")
+        commons_id = self.management_settings.get_property("commons_id")
+        if not commons_id:
+            commons_id = str(uuid.uuid1().hex)
+            self.management_settings.add_property("commons_id", commons_id)
+            self.management_settings.apply_settings()
+        return commons_id
 
     @property
     def name(self):
@@ -46,10 +87,17 @@ class Commons:
         Returns:
             bool: True if the folder is valid, False otherwise.
         """
+        # list the folder once instead of checking each file.
+        try:
+            existing = set(os.listdir(self._folder_path))
+        except OSError:
+            existing = set()
         # copy the default template files to common folder
         for default_file in defaults.all:
             _default_file_path = Path(default_file)
             base_name = _default_file_path.name
+            if base_name in existing:
+                continue
             _common_file_path = Path(self._folder_path, base_name)
             if not _common_file_path.is_file():
                 try:
@@ -57,39 +105,6 @@ class Commons:
                 except PermissionError:
                     return False
 
-        self.category_definitions = Settings(
-            file_path=str(Path(self._folder_path, "category_definitions.json"))
-        )
-        self.user_defaults = Settings(
-            file_path=str(Path(self._folder_path, "user_defaults.json"))
-        )
-        self.project_settings = Settings(
-            file_path=str(Path(self._folder_path, "project_settings.json"))
-        )
-        self.preview_settings = Settings(
-            file_path=str(Path(self._folder_path, "preview_settings.json"))
-        )
-        self.users = Settings(
-            file_path=str(Path(self._folder_path, "users.json"))
-        )
-        self.template = Settings(
-            file_path=str(Path(self._folder_path, "templates.json"))
-        )
-        self.structures = Settings(
-            file_path=str(Path(self._folder_path, "structures.json"))
-        )
-        self.metadata = Settings(
-            file_path=str(Path(self._folder_path, "metadata.json"))
-        )
-        self.management_settings = Settings(
-            file_path=str(Path(self._folder_path, "management_settings.json"))
-        )
-        if not self.management_settings.get_property("commons_id"):
-            self.management_settings.add_property("commons_id", str(uuid.uuid1().hex))
-            # # add the folder name as the commons_name
-            # self.management_settings.add_property("commons_name", Path(self._folder_path).name)
-            self.management_settings.apply_settings()
-
         return True
 
     def check_user_permission_level(self, user_name):
@@ -0,0 +1,270 @@
+"""Project-wide entity index.
+
+Keeps lookup tables for subprojects and tasks so that the ``find_*`` methods
+of the subproject objects don't need to traverse and scan the whole tree for
+every single query.
+"""
+
+from fnmatch import fnmatch
+from pathlib import Path
+import threading
+
+from tik_manager4.core.settings import Settings
+from tik_manager4.core import filelog
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+
+class EntityIndex:
+    """Lookup tables for the subprojects and tasks of a project.
+
+    Subprojects are always fully indexed since they are all defined in the
+    project structure. Tasks are registered as they are created or scanned,
+    optionally warm-started from a persistent index file.
+
+    Task entries are stored as (subproject path, task name) pairs which is
+    enough to resolve the task file without scanning any folders.
+
+    The task tables can be updated from the worker threads scanning the
+    subprojects for the UI.
+    """
+
+    def __init__(self, project):
+        """Initialize the EntityIndex.
+
+        Args:
+            project (Project): The project object owning the index.
+        """
+        self._project = project
+        self._subs_by_id = {}
+        self._subs_by_path = {}
+        self._task_paths = {}  # task id => (subproject path, task name)
+        self._tasks = {}  # (subproject path, task name) => Task object
+        self._task_names = {}  # task name => set of task ids
+        self._scanned_subs = set()  # subproject paths with scanned tasks
+        self._store = Settings()
+        self._file_path = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _normalize(path):
+        """Normalize the relative path used as a key."""
+        path = Path(path or "").as_posix()
+        return "" if path == "." else path
+
+    def clear(self):
+        """Clear all the lookup tables."""
+        self._subs_by_id = {}
+        self._subs_by_path = {}
+        self._task_paths = {}
+        self._tasks = {}
+        self._task_names = {}
+        self._scanned_subs = set()
+        self._dirty = False
+
+    @property
+    def is_dirty(self):
+        """Whether the task table changed since the last save or load."""
+        return self._dirty
+
+    # Subprojects
+
+    def register_sub(self, sub):
+        """Add the subproject to the index.
+
+        Args:
+            sub (Subproject): The subproject object.
+        """
+        self._subs_by_id[sub.id] = sub
+        self._subs_by_path[self._normalize(sub.path)] = sub
+
+    def register_sub_tree(self, sub):
+        """Add the subproject and all its children to the index.
+
+        Args:
+            sub (Subproject): The top subproject object.
+        """
+        stack = [sub]
+        while stack:
+            current = stack.pop()
+            self.register_sub(current)
+            stack.extend(current.subs.values())
+
+    def unregister_sub(self, sub):
+        """Remove the subproject from the index.
+
+        Args:
+            sub (Subproject): The subproject object.
+        """
+        if self._subs_by_id.get(sub.id) is sub:
+            self._subs_by_id.pop(sub.id)
+        path = self._normalize(sub.path)
+        if self._subs_by_path.get(path) is sub:
+            self._subs_by_path.pop(path)
+        self._scanned_subs.discard(path)
+
+    def get_sub_by_id(self, uid):
+        """Return the indexed subproject with the given id or None."""
+        sub = self._subs_by_id.get(uid)
+        if sub is not None and sub.id != uid:
+            self._subs_by_id.pop(uid, None)
+            return None
+        return sub
+
+    def get_sub_by_path(self, path):
+        """Return the indexed subproject with the given path or None."""
+        path = self._normalize(path)
+        sub = self._subs_by_path.get(path)
+        if sub is not None and self._normalize(sub.path) != path:
+            self._subs_by_path.pop(path, None)
+            return None
+        return sub
+
+    def get_sub_paths(self):
+        """Return all indexed subproject paths."""
+        return list(self._subs_by_path.keys())
+
+    # Tasks
+
+    def register_task(self, sub, name, task):
+        """Add the task to the index.
+
+        Args:
+            sub (Subproject): The parent subproject of the task.
+            name (str): The name of the task (stem of the task file).
+            task (Task): The task object.
+        """
+        key = (self._normalize(sub.path), name)
+        uid = task.id
+        with self._lock:
+            if self._task_paths.get(uid) != key:
+                self._task_paths[uid] = key
+                self._dirty = True
+            self._tasks[key] = task
+            self._task_names.setdefault(name, set()).add(uid)
+
+    def unregister_task(self, sub, name):
+        """Remove the task from the index.
+
+        Args:
+            sub (Subproject): The parent subproject of the task.
+            name (str): The name of the task.
+        """
+        key = (self._normalize(sub.path), name)
+        with self._lock:
+            self._tasks.pop(key, None)
+            for uid in list(self._task_names.get(name, ())):
+                if self._task_paths.get(uid) == key:
+                    self._drop_task_id(uid)
+
+    def _drop_task_id(self, uid):
+        """Remove the task id from the lookup tables."""
+        with self._lock:
+            key = self._task_paths.pop(uid, None)
+            if key is None:
+                return
+            self._dirty = True
+            ids = self._task_names.get(key[1])
+            if ids:
+                ids.discard(uid)
+                if not ids:
+                    self._task_names.pop(key[1])
+
+    def mark_scanned(self, sub):
+        """Mark the tasks of the subproject as fully indexed."""
+        self._scanned_subs.add(self._normalize(sub.path))
+
+    def is_scanned(self, sub):
+        """Check if the tasks of the subproject are fully indexed."""
+        return self._normalize(sub.path) in self._scanned_subs
+
+    def get_task(self, uid):
+        """Resolve the task with the given id.
+
+        The task object is loaded from its file if it is not in memory yet.
+        Stale entries (removed files, changed ids) are dropped.
+
+        Args:
+            uid (int or str): Unique id of the task.
+
+        Returns:
+            Task or None: The task object if found, None otherwise.
+        """
+        key = self._task_paths.get(uid)
+        if key is None:
+            return None
+        sub_path, name = key
+        sub = self.get_sub_by_path(sub_path)
+        if sub is None:
+            # the subproject may not be built yet
+            sub = self._project.find_sub_by_path(sub_path)
+        if sub is None or sub == -1:
+            self._drop_task_id(uid)
+            return None
+        task = sub.load_task(name)
+        if task is None or task.id != uid:
+            self._drop_task_id(uid)
+            return None
+        return task
+
+    def get_task_ids_by_wildcard(self, wildcard):
+        """Return the ids of the tasks whose names are matching the wildcard.
+
+        Args:
+            wildcard (str): The wildcard to match.
+
+        Returns:
+            list: List of task ids.
+        """
+        ids = []
+        with self._lock:
+            for name, name_ids in self._task_names.items():
+                if fnmatch(name, wildcard):
+                    ids.extend(name_ids)
+        return ids
+
+    # Persistence
+
+    def load(self, file_path):
+        """Warm-start the task table from the persistent index file.
+
+        The file path is remembered and used by the subsequent save calls.
+
+        Args:
+            file_path (str): The absolute path of the index file.
+
+        Returns:
+            bool: True if the index file is loaded, False otherwise.
+        """
+        self._file_path = file_path
+        if not Path(file_path).is_file():
+            return False
+        try:
+            self._store.settings_file = file_path
+            entries = self._store.get_property("tasks", [])
+        except Exception:  # pylint: disable=broad-except
+            LOG.warning(f"Project index cannot be read: {file_path}")
+            return False
+        for uid, sub_path, name in entries:
+            self._task_paths.setdefault(uid, (sub_path, name))
+            self._task_names.setdefault(name, set()).add(uid)
+        self._dirty = False
+        return True
+
+    def save(self):
+        """Write the task table to the persistent index file if changed.
+
+        Does nothing if the index is not persistent or not modified.
+        """
+        if not self._file_path or not self._dirty:
+            return
+        self._store.settings_file = self._file_path
+        with self._lock:
+            entries = [
+                [uid, sub_path, name]
+                for uid, (sub_path, name) in self._task_paths.items()
+            ]
+        self._store.set_data({"tasks": entries})
+        self._store.apply_settings(force=True)
+        self._dirty = False
@@ -5,9 +5,9 @@ import json
 from pathlib import Path
 import uuid
 
-from tik_manager4.core import filelog, settings, utils
+from tik_manager4.core import filelog, profiler, settings, utils
 from tik_manager4.core.constants import ValidationState, ValidationResult
-from tik_manager4.objects import user, project, purgatory
+from tik_manager4.objects import user, project, purgatory, sync_manager
 from tik_manager4 import dcc
 from tik_manager4 import management
 from tik_manager4.external.packaging.version import Version
@@ -26,23 +26,36 @@ class Main:
     log = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
 
-    def __init__(self, common_folder=None):
-        """Initialize."""
+    def __init__(self, common_folder=None, deferred=False):
+        """Initialize.
+
+        Args:
+            common_folder (str, optional): The commons folder to use.
+            deferred (bool, optional): If True, the steps which are not
+                needed to show the project are postponed until
+                'finish_startup' is called.
+        """
         # set either the latest project or the default one
         # always make sure the default project exists, in case of urgent fall back
-        self.user = user.User(common_directory=common_folder)
-        self.project = project.Project()
+        self._deferred_steps = {}
+        self._deferring = deferred
+        with profiler.phase("user"):
+            self.user = user.User(common_directory=common_folder)
+        with profiler.phase("project"):
+            self.project = project.Project()
         self.project.guard.set_dcc(dcc.NAME)
         self.project.guard.set_dcc_handler(self.dcc)
         self.project.guard.set_commons(self.user.commons)
         self.project.guard.set_localize_settings(self.user.localization)
         self.all_dcc_extensions = dcc.EXTENSION_DICT
         self.purgatory = purgatory.Purgatory(self)
+        self.sync_manager = sync_manager.SyncManager(self)
 
         self.default_project = Path(utils.get_home_dir(), "TM4_default")
 
-        if not (self.default_project / "tikDatabase" / "project_structure.json").exists():
-            self._create_default_project()
+        with profiler.phase("default project"):
+            if not (self.default_project / "tikDatabase" / "project_structure.json").exists():
+                self._create_default_project()
 
         _project = self.default_project.as_posix()
         if self.user.get_recent_projects():
@@ -52,11 +65,43 @@ class Main:
                 if Path(_project, "tikDatabase", "project_structure.json").exists():
                     break
 
-        self.set_project(str(_project))
+        with profiler.phase("set project"):
+            self.set_project(str(_project))
 
-        self.globalize_management_platform()
+        with profiler.phase("management platform"):
+            self.globalize_management_platform()
+
+        if deferred:
+            # the extensions are building the menus, collect them right away.
+            with profiler.phase("common extensions"):
+                self.dcc.collect_common_plugins(plugin_types=["extension"])
+            self._deferred_steps["common plugins"] = lambda: self.dcc.collect_common_plugins(
+                plugin_types=["extract", "ingest", "validation"])
+        else:
+            with profiler.phase("common plugins"):
+                self.dcc.collect_common_plugins()
+        self._deferring = False
 
-        self.dcc.collect_common_plugins()
+    @property
+    def is_startup_finished(self):
+        """Return True if there are no postponed startup steps."""
+        return not self._deferred_steps
+
+    def finish_startup(self):
+        """Run the startup steps postponed by the deferred startup.
+
+        Safe to call more than once, the steps are run only once. Reports
+        the startup profile if the profiler is enabled.
+        """
+        if not self._deferred_steps:
+            return
+        with profiler.phase("deferred"):
+            while self._deferred_steps:
+                name = next(iter(self._deferred_steps))
+                step = self._deferred_steps.pop(name)
+                with profiler.phase(name):
+                    step()
+        profiler.PROFILER.report()
 
     def fallback_to_default_project(self):
         """Fallback to the default project."""
@@ -67,7 +112,16 @@ class Main:
             self.set_project(self.default_project.as_posix())
 
     def globalize_management_platform(self):
-        """Globalize the management platform."""
+        """Globalize the management platform.
+
+        During the deferred startup, the handler is created after the
+        startup with 'finish_startup'.
+        """
+        if self._deferring:
+            self.project.guard.set_management_handler(None)
+            self._deferred_steps["management platform"] = self._globalize_deferred_management_platform
+            return
+        self._deferred_steps.pop("management platform", None)
         management_platform = self.project.settings.get("management_platform", None)
         if management_platform:
             self.project.guard.set_management_handler(
@@ -75,6 +129,14 @@ class Main:
         else:
             self.project.guard.set_management_handler(None)
 
+    def _globalize_deferred_management_platform(self):
+        """Globalize the management platform unless it is resolved already."""
+        handler = self.project.guard.management_handler
+        if handler and handler.name == self.project.settings.get("management_platform"):
+            self._deferred_steps.pop("management platform", None)
+            return
+        self.globalize_management_platform()
+
     def _create_default_project(self):
         """Create a default project."""
         # this does not require any permissions
@@ -1,4 +1,5 @@
 """Module to hold and manage metadata."""
+from collections.abc import MutableMapping
 import dataclasses
 from typing import Union
 
@@ -9,19 +10,99 @@ class Metaitem:
     value: Union[str, int, float, bool, list, dict, None]
     overridden: bool
 
-class Metadata(dict):
-    """Metadata class."""
-    def __init__(self, data_dictionary):
+class Metadata(MutableMapping):
+    """Layered metadata.
+
+    Each metadata holds only its own items and a reference to the parent
+    metadata. Inherited values are looked up through the parent chain, so
+    inheriting costs as much as the own items. The flattened view used
+    for iteration is built on demand and cached until any metadata is
+    edited.
+    """
+
+    # increased on every edit to invalidate the cached flattened views.
+    _generation = 0
+
+    def __init__(self, data_dictionary=None, parent=None):
         """Initialize Metadata object.
         Args:
             data_dictionary (dict): The dictionary to initialize the metadata with.
+            parent (Metadata, optional): The metadata to inherit the values from.
         """
-        super().__init__(data_dictionary)
+        self._items = {}
+        self._parent = parent
+        self._flat = None
+        self._flat_generation = -1
 
         # create a Metaitem for each key in the data_dictionary
-        for key, val in data_dictionary.items():
+        for key, val in (data_dictionary or {}).items():
             self.add_item(key, val)
 
+    @classmethod
+    def _edited(cls):
+        """Invalidate the cached flattened views."""
+        Metadata._generation += 1
+
+    @property
+    def parent(self):
+        """The metadata inheriting the values from."""
+        return self._parent
+
+    @parent.setter
+    def parent(self, metadata):
+        self._parent = metadata
+        self._edited()
+
+    def _flattened(self):
+        """Return the cached dictionary of all own and inherited items."""
+        if self._flat is None or self._flat_generation != Metadata._generation:
+            flat = {}
+            if self._parent is not None:
+                # inherited items are never overridden on this level
+                flat = {
+                    key: Metaitem(value, overridden=False)
+                    for key, value in self._parent.get_all_items()
+                }
+            flat.update(self._items)
+            self._flat = flat
+            self._flat_generation = Metadata._generation
+        return self._flat
+
+    def _lookup(self, key):
+        """Find the item of the key through the parent chain."""
+        metadata = self
+        while metadata is not None:
+            item = metadata._items.get(key)  # pylint: disable=protected-access
+            if item is not None:
+                return item
+            metadata = metadata._parent  # pylint: disable=protected-access
+        return None
+
+    def __getitem__(self, key):
+        if key in self._items:
+            return self._items[key]
+        return self._flattened()[key]
+
+    def __setitem__(self, key, item):
+        self._items[key] = item
+        self._edited()
+
+    def __delitem__(self, key):
+        del self._items[key]
+        self._edited()
+
+    def __contains__(self, key):
+        return self._lookup(key) is not None
+
+    def __iter__(self):
+        return iter(self._flattened())
+
+    def __len__(self):
+        return len(self._flattened())
+
+    def __repr__(self):
+        return f"Metadata({dict(self.get_all_items())})"
+
     def add_item(self, key, value, overridden=False):
         """Add an item to the metadata.
 
@@ -39,7 +120,7 @@ class Metadata(dict):
 
     def get_all_items(self):
         """Return all items in the metadata."""
-        for key, val in self.items():
+        for key, val in self._flattened().items():
             yield key, val.value
 
     def get_value(self, key, fallback_value=None):
@@ -49,8 +130,9 @@ class Metadata(dict):
             key (str): The key to get the value of.
             fallback_value (any): The value to return if the key is not found.
         """
-        if key in self:
-            return self[key].value
+        item = self._lookup(key)
+        if item is not None:
+            return item.value
         return fallback_value
 
     def is_overridden(self, key):
@@ -62,19 +144,35 @@ class Metadata(dict):
         Returns:
             bool: True if the key is overridden, False otherwise.
         """
-        if key in self:
-            return self[key].overridden
+        if key in self._items:
+            return self._items[key].overridden
         return False
 
+    def get_overrides(self):
+        """Return the overridden values of this level as a dictionary."""
+        return {
+            key: item.value for key, item in self._items.items() if item.overridden
+        }
+
     def override(self, data_dictionary):
         """Override the metadata with a new dictionary.
 
         Args:
             data_dictionary (dict): The dictionary to override the metadata with.
         """
-        # clear metadata
         for key, data in data_dictionary.items():
-            self[key] = Metaitem(data, overridden=True)
+            self._items[key] = Metaitem(data, overridden=True)
+        self._edited()
+
+    def inherit(self, data_dictionary=None):
+        """Return a child metadata inheriting from this one.
+
+        Args:
+            data_dictionary (dict, optional): The overridden values of the child.
+        """
+        child = Metadata(parent=self)
+        child.override(data_dictionary or {})
+        return child
 
     def copy(self):
         """Return a copy of the metadata."""
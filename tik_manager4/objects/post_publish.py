@@ -0,0 +1,395 @@
+"""Post publish pipeline.
+
+Only the publish steps which need the open scene (extraction, thumbnail
+and preview capture) keep the artist waiting. The rest of the publish is
+a pipeline of steps which can run on a background worker:
+
+    store_elements: Links the published files to the blob store.
+    write_protect: Write protects the published files.
+    convert_preview: Converts the captured preview to mp4.
+    management_upload: Publishes the version to the management platform.
+    make_live: Makes the version the LIVE version.
+
+The state of each step is kept in the publish version file ('post_publish'
+property), so the UI can show it and the failed steps can be retried
+later, also from another session. The pipeline writes only the properties
+it edits, so the edits made meanwhile to the publish version are kept.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from pathlib import Path
+
+from tik_manager4.core import cli
+from tik_manager4.core import filelog
+from tik_manager4.core import utils
+from tik_manager4.core.blob_store import BlobStore
+from tik_manager4.core.constants import PostPublishStates
+from tik_manager4.objects.preview import Preview, PreviewContext
+from tik_manager4.objects.version import PublishVersion
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+DEFAULT_RETRIES = 2
+# seconds to wait for the queued steps when the application exits. Kept
+# short not to hang the DCC on quit. The interrupted steps can be retried.
+EXIT_TIMEOUT = 2
+
+
+class _BackgroundFeedback(cli.FeedbackCLI):
+    """Feedback which never waits for an answer.
+
+    The questions of the background steps are answered with 'ignore', so
+    the step fails and can be retried instead of blocking the worker.
+    """
+
+    def pop_question(self, title="Question", text="", details="", buttons=None, modal=True):
+        LOG.warning(f"{title}: {text}")
+        return "ignore"
+
+
+class PostPublishPipeline:
+    """The post publish steps of a publish version."""
+
+    property_name = "post_publish"
+
+    def __init__(self, publish_version):
+        """Initialize the pipeline.
+
+        Args:
+            publish_version (PublishVersion or str): The publish version or
+                the path of its file.
+        """
+        if not isinstance(publish_version, PublishVersion):
+            publish_version = PublishVersion(str(publish_version))
+        self.publish_version = publish_version
+
+    @property
+    def data(self):
+        """The persisted states of the steps."""
+        return self.publish_version.get_property(self.property_name) or {"state": "", "steps": []}
+
+    @property
+    def steps(self):
+        """The step records. Name, state, attempts, message and arguments."""
+        return self.data["steps"]
+
+    @property
+    def state(self):
+        """The overall state of the pipeline."""
+        return self.data["state"]
+
+    def add_step(self, step, **kwargs):
+        """Add a step to the pipeline.
+
+        Args:
+            step (str): The name of the step.
+            **kwargs: The arguments of the step. Must be serializable.
+        """
+        if not hasattr(self, f"_{step}"):
+            raise ValueError(f"Unknown post publish step: {step}")
+        data = self.data
+        data["steps"].append({
+            "name": step,
+            "state": PostPublishStates.PENDING.value,
+            "attempts": 0,
+            "message": "",
+            "args": kwargs,
+        })
+        data["state"] = PostPublishStates.PENDING.value
+        self.publish_version.add_property(self.property_name, data)
+
+    def get_failed_steps(self):
+        """Return the names of the failed steps."""
+        return [step["name"] for step in self.steps if step["state"] == PostPublishStates.FAILED.value]
+
+    def reset_failed(self):
+        """Mark the failed and interrupted steps as pending to run them again.
+
+        Returns:
+            bool: True if there is anything to run, False otherwise.
+        """
+        data = self.data
+        pending = False
+        for step in data["steps"]:
+            if step["state"] != PostPublishStates.DONE.value:
+                step["state"] = PostPublishStates.PENDING.value
+                pending = True
+        if pending:
+            data["state"] = PostPublishStates.PENDING.value
+            self._save(data)
+        return pending
+
+    def _save(self, data):
+        """Write the states and the properties edited by the steps.
+
+        The other properties are read back from the file instead of being
+        overwritten.
+        """
+        self.publish_version.add_property(self.property_name, data)
+        self.publish_version.apply_settings()
+
+    def run(self, retries=DEFAULT_RETRIES, background=False):
+        """Run the pending steps in order.
+
+        A failing step is retried with a backoff. The remaining steps run
+        even if a step fails, the failed steps are kept for a later retry.
+
+        Args:
+            retries (int, optional): The number of retries of a failing step.
+            background (bool, optional): If True, the states are written
+                after each step so the progress is visible from the other
+                sessions. Otherwise they are written once at the end.
+
+        Returns:
+            tuple: (bool, message). False if any of the steps failed.
+        """
+        data = self.data
+        data["state"] = PostPublishStates.RUNNING.value
+        if background:
+            self._save(data)
+        for step in data["steps"]:
+            if step["state"] == PostPublishStates.DONE.value:
+                continue
+            step["state"] = PostPublishStates.RUNNING.value
+            for attempt in range(retries + 1):
+                step["attempts"] += 1
+                try:
+                    state, msg = getattr(self, f"_{step['name']}")(**step["args"])
+                except Exception as exc:  # pylint: disable=broad-except
+                    state, msg = False, str(exc)
+                step["message"] = "" if state else msg
+                if state:
+                    break
+                LOG.warning(f"Post publish step '{step['name']}' failed on "
+                            f"{self.publish_version.name} v{self.publish_version.version:03d}: {msg}")
+                if attempt < retries:
+                    time.sleep(0.5 * (attempt + 1))
+            step["state"] = PostPublishStates.DONE.value if state else PostPublishStates.FAILED.value
+            if background:
+                self._save(data)
+
+        failed = self.get_failed_steps()
+        data["state"] = PostPublishStates.FAILED.value if failed else PostPublishStates.DONE.value
+        self._save(data)
+        self.publish_version.update_manifest()
+        if failed:
+            return False, f"Post publish steps failed: {', '.join(failed)}"
+        return True, "Post publish steps completed."
+
+    def _get_element_paths(self):
+        """Return the absolute paths of the published elements."""
+        publish_folder = Path(self.publish_version.get_output_path())
+        return [publish_folder / element["path"] for element in self.publish_version.elements]
+
+    def _store_elements(self):
+        """Link the published files to the blob store of the project.
+
+        The checksums of the stored files are kept in the elements.
+        """
+        publish_folder = Path(self.publish_version.get_output_path())
+        elements = self.publish_version.elements
+        element_paths = self._get_element_paths()
+        stored = BlobStore(self.publish_version.guard.project_root).ingest(element_paths)
+        for element, element_path in zip(elements, element_paths):
+            blobs = {
+                file_path.relative_to(publish_folder).as_posix(): checksum
+                for file_path, checksum in stored.items()
+                if file_path == element_path or element_path in file_path.parents
+            }
+            if blobs:
+                element["blobs"] = blobs
+        self.publish_version.edit_property("elements", elements)
+        return True, f"{len(stored)} files stored."
+
+    def _write_protect(self):
+        """Write protect the published files."""
+        for element_path in self._get_element_paths():
+            if not element_path.exists():
+                continue
+            result = utils.write_protect(element_path)
+            if result and not result[0]:
+                return result
+        return True, "Write protection applied."
+
+    def _convert_preview(self, path, nice_name, fps=None, start_frame=1):
+        """Convert the preview to mp4 and register the converted one.
+
+        Args:
+            path (str): The absolute path of the captured preview.
+            nice_name (str): The name of the preview in the previews.
+            fps (float, optional): The frame rate of the image sequences.
+            start_frame (int, optional): The first frame of the sequences.
+        """
+        preview_handler = Preview(
+            PreviewContext(frame_range=(start_frame, start_frame), version_number=self.publish_version.version),
+            self.publish_version,
+            settings=self.publish_version.guard.preview_settings.properties,
+            feedback=_BackgroundFeedback(),
+        )
+        ffmpeg = preview_handler._check_ffmpeg()  # pylint: disable=protected-access
+        if not ffmpeg:
+            return False, "FFMPEG not found."
+        converted_path = preview_handler._convert_preview(path, ffmpeg, overwrite=True, fps=fps)  # pylint: disable=protected-access
+        if not converted_path:
+            return False, "Conversion failed."
+        preview_handler.register_data({nice_name: (Path("previews") / Path(converted_path).name).as_posix()})
+        return True, converted_path
+
+    def _management_upload(self, task_id, status=None, description="", entity_type=None,
+                           entity_id=None, path=None, name=None, project_id=None, email=None):
+        """Publish the version to the management platform.
+
+        The thumbnail and the (converted) preview are read from the publish
+        version when the step runs.
+        """
+        guard = self.publish_version.guard
+        if not guard.management_handler:
+            return False, "No management platform connection."
+        thumbnail = None
+        if self.publish_version.thumbnail:
+            thumbnail = self.publish_version.get_abs_database_path(self.publish_version.thumbnail)
+            if not Path(thumbnail).exists():
+                thumbnail = None
+        preview = None
+        if self.publish_version.previews:
+            preview = self.publish_version.get_abs_project_path(
+                list(self.publish_version.previews.values())[0]
+            )
+            if not Path(preview).exists():
+                preview = None
+        management_version = guard.management_handler.publish_version(
+            entity_type=entity_type,
+            entity_id=entity_id,
+            task_id=task_id,
+            name=name,
+            path=path,
+            project_id=project_id,
+            status=status,
+            description=description,
+            thumbnail=thumbnail,
+            preview=preview,
+            email=email,
+            publish_version=self.publish_version.version,
+        )
+        self.publish_version.edit_property("publish_id", management_version["id"])
+        self.publish_version.init_properties()
+        return True, "Published to the management platform."
+
+    def _make_live(self):
+        """Make the version the LIVE version unless a later one is live."""
+        live_version = self.publish_version._live_object.get_property("version_number", 0)  # pylint: disable=protected-access
+        if live_version and live_version > self.publish_version.version:
+            return True, f"Version {live_version} is already live."
+        self.publish_version.make_live()
+        return True, "Version is live."
+
+
+class PostPublishQueue:
+    """Runs the post publish pipelines one by one on a daemon thread.
+
+    The pipelines run in the order they are submitted, so the LIVE version
+    always ends up being the last published one.
+    """
+
+    def __init__(self, retries=DEFAULT_RETRIES):
+        """Initialize the queue.
+
+        Args:
+            retries (int, optional): The number of retries of a failing step.
+        """
+        self.retries = retries
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._active = set()
+        self.results = {}  # file path => (bool, message) of the last run
+
+    def submit(self, publish_version):
+        """Queue the pipeline of the publish version.
+
+        Args:
+            publish_version (PublishVersion): The publish version.
+        """
+        path = str(publish_version.settings_file)
+        with self._lock:
+            self._active.add(path)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="PostPublish", daemon=True)
+                self._thread.start()
+        self._queue.put(path)
+
+    def is_active(self, publish_version):
+        """Check if the pipeline of the publish version is queued or running."""
+        return str(publish_version.settings_file) in self._active
+
+    @property
+    def pending(self):
+        """The file paths of the queued and running pipelines."""
+        with self._lock:
+            return sorted(self._active)
+
+    def retry(self, publish_version):
+        """Queue the failed and interrupted steps of the publish version again.
+
+        Args:
+            publish_version (PublishVersion): The publish version.
+
+        Returns:
+            tuple: (bool, message)
+        """
+        if self.is_active(publish_version):
+            return False, "The post publish steps are already running."
+        pipeline = PostPublishPipeline(publish_version.settings_file)
+        if not pipeline.reset_failed():
+            return False, "Nothing to retry."
+        self.submit(publish_version)
+        return True, "Post publish steps queued."
+
+    def _run(self):
+        """Run the queued pipelines."""
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            try:
+                self.results[item] = PostPublishPipeline(item).run(retries=self.retries, background=True)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOG.error(f"Post publish of {item} failed: {exc}")
+                self.results[item] = (False, str(exc))
+            with self._lock:
+                self._active.discard(item)
+
+    def wait(self, timeout=None):
+        """Wait until the queued pipelines are completed.
+
+        Args:
+            timeout (float, optional): The maximum seconds to wait.
+
+        Returns:
+            bool: True if all the pipelines are completed, False on timeout.
+        """
+        if self._thread is None:
+            return True
+        event = threading.Event()
+        self._queue.put(event)
+        return event.wait(timeout)
+
+
+QUEUE = PostPublishQueue()
+
+
+@atexit.register
+def _wait_at_exit():
+    """Give the queued post publish steps a short chance to complete at exit.
+
+    The steps interrupted by the exit stay in the publish version file and
+    can be retried.
+    """
+    if QUEUE.wait(timeout=EXIT_TIMEOUT):
+        return
+    for path in QUEUE.pending:
+        LOG.warning(f"Post publish steps of {path} are interrupted. They can be retried later.")
@@ -188,8 +188,15 @@ class Preview:
         """
         self._settings = value
 
-    def generate(self, show_after=True):
-        """Generate the preview."""
+    def generate(self, show_after=True, convert=True):
+        """Generate the preview.
+
+        Args:
+            show_after (bool, optional): Play the preview after generation.
+            convert (bool, optional): Convert the preview to mp4 if the
+                settings ask for it. When False, the captured preview is
+                registered and the conversion is left to the caller.
+        """
         if not self._verify_context():
             return False
 
@@ -210,8 +217,7 @@ class Preview:
             LOG.error("Preview generation failed.")
             return False
 
-        suffix = Path(abs_path).suffix
-        if self._settings.get("PostConversion", False) and suffix != ".mp4":
+        if convert and self.needs_conversion(abs_path):
             self._message_callback("Converting the preview to MP4 format.")
             ffmpeg = self._check_ffmpeg()
             if ffmpeg:
@@ -236,6 +242,11 @@ class Preview:
             utils.execute(abs_path)
         return abs_path
 
+    def needs_conversion(self, preview_file_abs_path):
+        """Check if the preview file should be converted to mp4."""
+        suffix = Path(preview_file_abs_path).suffix
+        return bool(self._settings.get("PostConversion", False)) and suffix != ".mp4"
+
     def register_data(self, preview_data):
         """Register the preview data to the database object."""
         if self.database_obj.object_type == ObjectType.WORK:
@@ -307,13 +318,15 @@ class Preview:
             except OSError:
                 return False
 
-    def _convert_preview(self, preview_file_abs_path, ffmpeg, overwrite=False):
+    def _convert_preview(self, preview_file_abs_path, ffmpeg, overwrite=False, fps=None):
         """Convert the preview file to a compatible format.
 
         Args:
             preview_file_abs_path (str): Absolute path of the preview file.
             ffmpeg (str): Path to the ffmpeg executable.
             overwrite (bool): If True, overwrite the existing file.
+            fps (float, optional): Frame rate of the image sequences. Read
+                from the dcc if not provided.
 
         Returns:
             str: Absolute path of the converted file.
@@ -344,7 +357,7 @@ class Preview:
             flag_start = [ffmpeg, "-i", str(_file_path)]
         else:
             # get the frame rate from dcc
-            fps = self.database_obj.dcc_handler.get_scene_fps()
+            fps = fps or self.database_obj.dcc_handler.get_scene_fps()
             # the incoming _file_path needs to have %04d in it in order to be recognized as a sequence
             flag_start = [ffmpeg, "-r", str(fps), "-start_number", str(self.context.frame_range[0]), "-i", str(_file_path)]
             # remove the digits section from the file name e.g. test_v001.0001.jpg -> test_v001.jpg
@@ -3,14 +3,19 @@
 Inherits from Subproject and adds project specific methods and properties.
 """
 
+import os
+from contextlib import contextmanager
 from pathlib import Path
 
 from tik_manager4.core.constants import ObjectType
 from tik_manager4.objects.publisher import Publisher, SnapshotPublisher
 from tik_manager4.core import filelog
+from tik_manager4.core import io
+from tik_manager4.core.blob_store import BlobStore
 from tik_manager4.core.settings import Settings
+from tik_manager4.objects.index import EntityIndex
 from tik_manager4.objects.subproject import Subproject
-from tik_manager4.objects.work import Work
+from tik_manager4.objects.work import Work, SceneIndex
 
 
 class Project(Subproject):
@@ -34,6 +39,10 @@ class Project(Subproject):
         self.preview_settings = Settings()
         self.category_definitions = Settings()
         self.metadata_definitions = Settings()
+        self.index = EntityIndex(self)
+        self._batch_depth = 0
+        self._batch_structure_changed = False
+        self._batch_new_subs = []
         self._path = path
         self._database_path = None
         self._name = name
@@ -64,6 +73,21 @@ class Project(Subproject):
         """Return the database path of the project."""
         return self._database_path
 
+    @property
+    def blob_store(self):
+        """Return the content addressed store of the published files."""
+        return BlobStore(self.absolute_path)
+
+    @property
+    def deduplicate_publishes(self):
+        """Whether the published files are kept in the blob store."""
+        return bool(self.settings.get("deduplicate_publishes", False))
+
+    @property
+    def background_post_publish(self):
+        """Whether the post publish steps run in the background."""
+        return bool(self.settings.get("background_post_publish", False))
+
     def get_project(self):
         """Return the project object."""
         # We are overriding the method to return the project itself
@@ -72,12 +96,66 @@ class Project(Subproject):
     def save_structure(self):
         """Save the project structure to the database.
 
-        Project structure is the tree of subprojects.
+        Project structure is the tree of subprojects. Inside a batch, the
+        structure is saved once when the batch ends.
         """
+        if self._batch_depth:
+            self._batch_structure_changed = True
+            return
         self.structure._current_value = self.get_sub_tree()
         self.create_folders(root=self.database_path)
         self.create_folders(root=self.absolute_path)
         self.structure.apply_settings()
+        self.save_index()
+
+    def save_index(self):
+        """Save the entity index to the database if it is persistent."""
+        if self._batch_depth:
+            return
+        self.index.save()
+
+    @property
+    def in_batch(self):
+        """Whether the project is in a batch or not."""
+        return bool(self._batch_depth)
+
+    @contextmanager
+    def batch(self):
+        """Context manager to create or edit many subprojects and tasks at once.
+
+        The project structure and the index are saved only once when the
+        outermost batch ends, and only the folders of the newly created
+        subprojects are created. Batches can be nested.
+
+        The structure is saved even if an exception is raised inside the
+        batch, since the task files are already written at that point. The
+        bulk methods roll back their own changes before that happens.
+
+        Example:
+            >>> with project.batch():
+            ...     for nmb in range(3000):
+            ...         sub = project.create_sub_project(f"SH{nmb:04d}", parent_path="Shots")
+            ...         project.create_task("Layout", ["Layout"], parent_uid=sub.id)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._commit_batch()
+
+    def _commit_batch(self):
+        """Save the changes collected during the batch."""
+        new_subs, self._batch_new_subs = self._batch_new_subs, []
+        if self._batch_structure_changed:
+            self._batch_structure_changed = False
+            self.structure._current_value = self.get_sub_tree()
+            for root in (self.database_path, self.absolute_path):
+                for sub in new_subs:
+                    Path(root, sub.path).mkdir(parents=True, exist_ok=True)
+            self.structure.apply_settings()
+        self.save_index()
 
     def _set(self, absolute_path, commons_id=None):
         """Set the project path and initialize the project structure."""
@@ -94,10 +172,19 @@ class Project(Subproject):
             _database_path_obj / "project_structure.json"
         )
         self.set_sub_tree(self.structure.properties)
+        self.index.register_sub(self)
         self.guard.set_project_root(self.absolute_path)
         self.guard.set_database_root(self.database_path)
         # get project settings
         self.settings.settings_file = str(_database_path_obj / "project_settings.json")
+        if self.settings.get_property("persistent_index", True):
+            self.index.load(str(_database_path_obj / "project_index.json"))
+        io.set_compact_folder(
+            self._database_path, self.settings.get_property("compact_database", False)
+        )
+        io.set_journal_folder(
+            self._database_path, self.settings.get_property("work_version_journal", False)
+        )
         project_commons_id = self.settings.get_property("commons_id", None)
         project_commons_name = self.settings.get_property("commons_name", "")
         if project_commons_id and project_commons_id != commons_id:
@@ -185,10 +272,102 @@ class Project(Subproject):
         )
         if new_sub == -1:
             return -1
+        if self._batch_depth:
+            self._batch_new_subs.append(new_sub)
+            self.save_structure()
+            return new_sub
         self.save_structure()
         self.create_folders(self._database_path)
         return new_sub
 
+    def create_sub_projects_bulk(self, entries):
+        """Create many subprojects and save the project structure once.
+
+        All entries are validated before anything is created. The parent of
+        an entry can be an existing subproject or one created by a previous
+        entry in the list. If an entry fails, the subprojects created by the
+        previous entries are removed again before the structure is saved.
+
+        Args:
+            entries (list): List of dictionaries with the keyword arguments of
+                the ``create_sub_project`` method. 'name' and either
+                'parent_uid' or 'parent_path' are required.
+
+        Returns:
+            list or int: List of created subproject objects if successful,
+                -1 otherwise.
+        """
+        if self.check_permissions(level=2) != 1:
+            return -1
+        new_paths = set()
+        for entry in entries:
+            name = entry.get("name")
+            if not name:
+                self.log.error(f"Subproject name is missing: {entry}")
+                return -1
+            parent_uid = entry.get("parent_uid")
+            if parent_uid is not None:
+                parent = self.find_sub_by_id(parent_uid)
+                if parent == -1:
+                    self.log.error(f"Parent subproject does not exist: {parent_uid}")
+                    return -1
+                parent_path = parent.path
+            else:
+                parent_path = entry.get("parent_path")
+                if parent_path is None:
+                    self.log.error(f"Requires at least a parent uid or parent path: {entry}")
+                    return -1
+                parent_path = parent_path.strip("/")
+                if parent_path not in new_paths and self.find_sub_by_path(parent_path) == -1:
+                    self.log.error(f"Parent subproject does not exist: {parent_path}")
+                    return -1
+            path = f"{parent_path}/{name}".strip("/")
+            if path in new_paths:
+                self.log.error(f"Subproject is defined more than once: {path}")
+                return -1
+            if parent_path not in new_paths:
+                existing = self.find_sub_by_path(path)
+                if existing != -1 and not existing.deleted:
+                    self.log.error(f"Subproject already exists: {path}")
+                    return -1
+            new_paths.add(path)
+
+        created = []
+        with self.batch():
+            try:
+                for entry in entries:
+                    parent = self.__validate_and_get_sub(
+                        entry.get("parent_uid"), entry.get("parent_path")
+                    )
+                    previous = parent.subs.get(entry["name"]) if parent != -1 else None
+                    new_sub = self.create_sub_project(**entry)
+                    if new_sub == -1:
+                        self._rollback_sub_projects(created)
+                        return -1
+                    created.append((new_sub, previous.metadata if previous else None))
+            except Exception:
+                self._rollback_sub_projects(created)
+                raise
+        return [sub for sub, _metadata in created]
+
+    def _rollback_sub_projects(self, created):
+        """Undo the subprojects created by a failed bulk call.
+
+        Args:
+            created (list): List of (subproject, previous metadata) pairs.
+                The previous metadata is None for the newly built subprojects
+                and the metadata of the deleted subproject for the revived ones.
+        """
+        for sub, metadata in reversed(created):
+            if sub in self._batch_new_subs:
+                self._batch_new_subs.remove(sub)
+            if metadata is not None:
+                sub.replace_metadata(metadata)
+                metadata.add_item("deleted", True, overridden=True)
+                continue
+            sub.parent.subs.pop(sub.name, None)
+            self.index.unregister_sub(sub)
+
     def edit_sub_project(self, uid=None, path=None, name=None, **properties):
         """Edit a subproject and store it in persistent database.
 
@@ -225,6 +404,7 @@ class Project(Subproject):
         sub_tree.update(properties)
 
         sub.set_sub_tree(sub_tree)
+        self.index.register_sub_tree(sub)
         self.save_structure()
         return 1
 
@@ -252,8 +432,73 @@ class Project(Subproject):
             return -1
         parent_sub = self.__validate_and_get_sub(parent_uid, parent_path)
         task = parent_sub.add_task(name, categories=categories, metadata_overrides=metadata_overrides)
+        self.save_index()
         return task
 
+    def create_tasks_bulk(self, entries):
+        """Create many tasks and save the index once.
+
+        All parents are validated before any task is created. If an entry
+        fails, the tasks created by the previous entries are removed again.
+
+        Args:
+            entries (list): List of dictionaries with the keyword arguments of
+                the ``create_task`` method. 'name' and either 'parent_uid'
+                or 'parent_path' are required.
+
+        Returns:
+            list or int: List of created task objects if successful,
+                -1 otherwise.
+        """
+        if self.check_permissions(level=2) != 1:
+            return -1
+        for entry in entries:
+            if not entry.get("name"):
+                self.log.error(f"Task name is missing: {entry}")
+                return -1
+            if not entry.get("parent_uid") and not entry.get("parent_path"):
+                self.log.error(f"Requires at least a parent uid or parent path: {entry}")
+                return -1
+            if self.__validate_and_get_sub(entry.get("parent_uid"), entry.get("parent_path")) == -1:
+                return -1
+
+        created = []
+        with self.batch():
+            try:
+                for entry in entries:
+                    parent = self.__validate_and_get_sub(
+                        entry.get("parent_uid"), entry.get("parent_path")
+                    )
+                    task_io = io.IO(parent.get_abs_database_path(f"{entry['name']}.ttask"))
+                    previous = task_io.read() if task_io.stat() else None
+                    task = self.create_task(**entry)
+                    if task == -1:
+                        self._rollback_tasks(created)
+                        return -1
+                    created.append((task, previous))
+            except Exception:
+                self._rollback_tasks(created)
+                raise
+        return [task for task, _data in created]
+
+    def _rollback_tasks(self, created):
+        """Undo the tasks created by a failed bulk call.
+
+        Args:
+            created (list): List of (task, previous data) pairs. The previous
+                data is None for the new task files and the content of the
+                task file for the revived ones.
+        """
+        for task, data in reversed(created):
+            task_io = io.IO(task.settings_file)
+            if data is not None:
+                task_io.write(data)
+            elif task_io.stat():
+                Path(task.settings_file).unlink()
+            task_io.invalidate()
+            # drops or reloads the task along with its index entry
+            task.parent_sub.load_task(task.name)
+
     def __validate_and_get_sub(self, parent_uid, parent_path):
         """
         Confirms either parent_uid or parent_path provided (other than none) and returns
@@ -297,9 +542,40 @@ class Project(Subproject):
             # If the project name is not found, return None or handle as needed
             return None
 
+    def compact_work_journals(self):
+        """Fold the version journals of all works into their work files.
+
+        The journals are read back transparently in both storage modes.
+        Compacting them is only needed to migrate a project back to the
+        whole file writes, or to hand the work files to tools which are
+        not aware of the journals.
+
+        Returns:
+            int: The number of compacted journals.
+        """
+        suffix = f".twork{io.Journal.suffix}"
+        count = 0
+        for root, _dirs, files in os.walk(self.database_path):
+            for file_name in files:
+                if not file_name.endswith(suffix):
+                    continue
+                work_path = os.path.join(root, file_name[:-len(io.Journal.suffix)])
+                if not os.path.isfile(work_path):
+                    self.log.warning(f"Skipping the journal without a work file: {file_name}")
+                    continue
+                io.Journal(work_path, "versions", "version_number").compact()
+                count += 1
+        return count
+
     def find_work_by_absolute_path(self, file_path):
         """Using the absolute path of the scene file return work object and version number.
 
+        The scene index of the category is looked up first. The works of
+        the category are searched only for the scenes missing from the
+        index, and the scenes of the searched works are added to it at
+        once. The localized copies of a scene resolve to the same index
+        record, which is keyed by the path relative to the category.
+
         Args:
             file_path: (String) Absolute path of the scene file.
 
@@ -318,18 +594,35 @@ class Project(Subproject):
             self.log.error("File path is not under the project root")
             return None, None
         database_path = Path(self.get_abs_database_path(str(relative_path)))
-        work_files = database_path.glob("*.twork")
-        for work_file in work_files:
+        resolved_path = Path(work_path.stem, base_name).as_posix()
+        scene_index = SceneIndex(database_path)
+        record = scene_index.read().get(resolved_path)
+        if record:
+            work_file = database_path / record["work"]
+            work_obj = Work(work_file) if work_file.exists() else None
+            if work_obj and work_obj.id == record["work_id"]:
+                version = work_obj.get_version(record["version"])
+                if version and not version.deleted and version.scene_path == resolved_path:
+                    parent_task = self.find_task_by_id(record["task_id"])
+                    work_obj.set_parent_task(parent_task)
+                    return work_obj, version.version
+        index_records = []
+        found = (None, None)
+        for work_file in database_path.glob("*.twork"):
             work_obj = Work(work_file)
+            index_records.extend(work_obj.get_scene_records())
             for nmb, version in enumerate(work_obj.versions):
-                resolved_path = Path(work_path.stem, base_name).as_posix()
                 if version.scene_path == resolved_path:
                     # if this the the version and work that we are looking for
                     # find its parent and define it within the work object
                     parent_task = self.find_task_by_id(work_obj.task_id)
                     work_obj.set_parent_task(parent_task)
-                    return work_obj, version.version or nmb
-        return None, None
+                    found = (work_obj, version.version or nmb)
+                    break
+            if found[0]:
+                break
+        scene_index.update(index_records)
+        return found
 
     def get_current_work(self):
         """Get the current work object AND version by resolving the current scene.
@@ -2,18 +2,51 @@
 """Publish object module."""
 
 
+from collections.abc import Sequence
 from pathlib import Path
+import threading
 
 from tik_manager4.core.settings import Settings
 from tik_manager4.objects.version import PromotedVersion
 from tik_manager4.core.constants import ObjectType, BranchingModes
-from tik_manager4.objects.version import PublishVersion, LiveVersion
+from tik_manager4.objects.version import PublishVersion, LiveVersion, PublishManifest
 from tik_manager4.mixins.localize import LocalizeMixin
 from tik_manager4.core import filelog
+from tik_manager4.core import io
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
 
+class PublishVersions(Sequence):
+    """Read-only list of publish versions created on access.
+
+    Serves the versions of a publish from the records of its manifest.
+    The PublishVersion objects are created only for the accessed items.
+    """
+
+    def __init__(self, publish, keys):
+        """Initialize the list.
+
+        Args:
+            publish (Publish): The publish object.
+            keys (list): The file paths of the versions. 'live' and
+                'promoted' for the LIVE and PROMOTED versions.
+        """
+        self._publish = publish
+        self._keys = keys
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._publish._version_object(key) for key in self._keys[item]]  # pylint: disable=protected-access
+        return self._publish._version_object(self._keys[item])  # pylint: disable=protected-access
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} versions of {self._publish.name})"
+
+
 class Publish(LocalizeMixin):
     """Class to represent a publish.
 
@@ -31,22 +64,24 @@ class Publish(LocalizeMixin):
         self._dcc_handler = work_object.guard.dcc_handler
         self.work_object = work_object
 
+        # PublishVersion objects by their file paths, created on demand.
         self._publish_versions = {}
+        # manifest records by the file paths of the publish versions.
+        self._records = {}
+        self._scanned = False
 
-        # _folder = Path(self.settings_file).parent
+        # search directory is resolved from the work object
+        self._folder = Path(self.work_object.get_abs_database_path("publish", self.work_object.name))
+        # live.json and promoted.json are read when a version is created.
         self._live_object = None
         self._promoted_object = None
-        _folder = Path(self.work_object.get_abs_database_path("publish", self.work_object.name))
-        live_file = _folder / "live.json"
-        if live_file.exists():
-            self._live_object = Settings(live_file)
-
-        promoted_file = _folder / "promoted.json"
-        if promoted_file.exists():
-            self._promoted_object = Settings(promoted_file)
+        self._branch_objects_loaded = False
 
         self._live_version = None
         self._promoted_version = None
+        self.manifest = PublishManifest(self._folder)
+        self._scanner = io.FolderScanner(self._folder, ".tpub")
+        self._scan_lock = threading.RLock()
 
     @property
     def name(self):
@@ -76,14 +111,12 @@ class Publish(LocalizeMixin):
     @property
     def versions(self):
         """Versions of the publish."""
-        all_versions = self.all_versions
-        return [version for version in all_versions if not version.deleted]
+        return PublishVersions(self, self._version_keys(include_deleted=False))
 
     @property
     def all_versions(self):
         """All versions of the publish, including the deleted ones."""
-        # self.scan_publish_versions()
-        return list(self._publish_versions.values())
+        return PublishVersions(self, self._version_keys(include_deleted=True))
 
     def get_versions(self):
         """Convenience method to get the versions with a forced scan."""
@@ -152,7 +185,9 @@ class Publish(LocalizeMixin):
     def get_last_version(self):
         """Return the last publish version."""
         # find the latest publish version
-        _publish_version_numbers = [data.version for data in self.all_versions]
+        _publish_version_numbers = [
+            record["version_number"] for record in self._get_records().values()
+        ]
         return 0 if not _publish_version_numbers else max(_publish_version_numbers)
 
     def get_publish_data_folder(self):
@@ -165,68 +200,214 @@ class Publish(LocalizeMixin):
 
     def get_live_version(self):
         """Get the live version among the published versions."""
-        for version in reversed(list(self._publish_versions.values())):
-            if version.is_live():
-                return version
-        return None
+        if self._live_version is None:
+            path = self._pointed_path("live")
+            self._live_version = self._version_object(path) if path else None
+        return self._live_version
 
     def get_promoted_version(self):
         """Get the promoted version among the published versions."""
-        for version in reversed(list(self._publish_versions.values())):
-            if version.is_promoted():
-                return version
+        if self._promoted_version is None:
+            path = self._pointed_path("promoted")
+            self._promoted_version = self._version_object(path) if path else None
+        return self._promoted_version
 
-    def scan_publish_versions(self):
-        """Return the publish versions in the publish folder."""
-        # search directory is resolved from the work object
-        _search_dir = Path(self.get_publish_data_folder())
-        if not _search_dir.exists():
-            return {}
-        _publish_version_paths = list(_search_dir.glob("*.tpub"))
-
-        for _p_path, _p_data in dict(self._publish_versions).items():
-            if _p_path not in _publish_version_paths:
-                self._publish_versions.pop(_p_path)
-
-        for _publish_version_path in _publish_version_paths:
-            existing_publish = self._publish_versions.get(_publish_version_path, None)
-            if not existing_publish:
-                _publish = PublishVersion(
-                    _publish_version_path,
-                    live_object=self._live_object,
-                    promoted_object=self._promoted_object
-                )
-                self._publish_versions[_publish_version_path] = _publish
-            else:
-                if existing_publish.is_modified():
-                    existing_publish.reload()
+    def _get_records(self):
+        """Return the manifest records by the file paths of the versions.
+
+        Until the folder is scanned, the records are served from the
+        manifest alone.
+        """
+        if self._scanned:
+            return self._records
+        return {
+            self._folder / record["file"]: record
+            for record in self.manifest.version_records() if "file" in record
+        }
+
+    def _pointed_path(self, name, records=None):
+        """Return the file path of the live or promoted version.
+
+        Args:
+            name (str): 'live' or 'promoted'.
+            records (dict, optional): The records to search in.
 
-        # make a similar caching for live and promoted versions. The process is costly
-        # and we don't want to do it every time.
+        Returns:
+            Path or None: The file path of the version.
+        """
+        pointer = self.manifest.get_pointer(name)
+        if not pointer:
+            return None
+        records = self._get_records() if records is None else records
+        for path, record in records.items():
+            if record.get("publish_id") == pointer.get("publish_id"):
+                return path
+        return None
 
-        self._live_version = self.get_live_version()
-        self._promoted_version = self.get_promoted_version()
+    def _version_keys(self, include_deleted):
+        """Return the keys of the versions ordered by the version numbers.
 
+        Args:
+            include_deleted (bool): If True, the deleted versions are included.
+
+        Returns:
+            list: The file paths of the versions, followed by 'live' and
+                'promoted' for the LIVE and PROMOTED versions.
+        """
+        records = self._get_records()
+        keys = [
+            path for path, record in records.items()
+            if include_deleted or not record.get("deleted")
+        ]
         # check the project settings for the active branches.
         branching_mode = self.guard.project_settings.get("branching_mode", BranchingModes.ACTIVE.value)
         if branching_mode == BranchingModes.ACTIVE.value:
-            if self._live_version and self._live_object:
+            for name in ("live", "promoted"):
+                path = self._pointed_path(name, records)
+                if path and (include_deleted or not records[path].get("deleted")):
+                    keys.append(name)
+        return keys
+
+    def _load_branch_objects(self):
+        """Read the live.json and promoted.json files if they exist."""
+        if self._branch_objects_loaded:
+            return
+        live_file = self._folder / "live.json"
+        self._live_object = Settings(live_file) if live_file.exists() else None
+        promoted_file = self._folder / "promoted.json"
+        self._promoted_object = Settings(promoted_file) if promoted_file.exists() else None
+        self._branch_objects_loaded = True
+
+    def _version_object(self, key):
+        """Return the PublishVersion object of the key, creating it if needed.
+
+        Args:
+            key (Path or str): The file path of the version, 'live' or
+                'promoted'.
+        """
+        version_obj = self._publish_versions.get(key)
+        if version_obj is not None:
+            return version_obj
+        with self._scan_lock:
+            self._load_branch_objects()
+            if {"live": self._live_object, "promoted": self._promoted_object}.get(key, True) is None:
+                # the branch is created after the last scan.
+                self._branch_objects_loaded = False
+                self._load_branch_objects()
+            if key == "live":
                 # Create a LIVE version merging the live version with live data
                 # This is a temporary version and not saved to disk.
-                live_version = LiveVersion(self._live_version.settings_file)
-                # live_version._elements = live_version._live_object.get("elements")
-                live_version._elements = self._live_object.get("elements")
-                self._publish_versions["live"] = live_version
-
-            if self._promoted_version and self._promoted_object:
+                version_obj = LiveVersion(
+                    str(self._pointed_path("live")),
+                    live_object=self._live_object,
+                    promoted_object=self._promoted_object,
+                    manifest=self.manifest,
+                )
+                version_obj._elements = self._live_object.get("elements")
+            elif key == "promoted":
                 # Create a PROMOTED version merging the promoted version with promoted data
                 # This is a temporary version and not saved to disk.
-                promoted_version = PromotedVersion(self._promoted_version.settings_file)
-                # promoted_version._elements = promoted_version._promoted_object.get("elements")
-                promoted_version._elements = self._promoted_object.get("elements")
-                self._publish_versions["promoted"] = promoted_version
+                version_obj = PromotedVersion(
+                    str(self._pointed_path("promoted")),
+                    live_object=self._live_object,
+                    promoted_object=self._promoted_object,
+                    manifest=self.manifest,
+                )
+                version_obj._elements = self._promoted_object.get("elements")
+            else:
+                version_obj = PublishVersion(
+                    str(key),
+                    live_object=self._live_object,
+                    promoted_object=self._promoted_object,
+                    manifest=self.manifest,
+                )
+            self._publish_versions[key] = version_obj
+        return version_obj
+
+    def scan_publish_versions(self, force=False):
+        """Scan the publish versions in the publish folder.
+
+        The folder is listed again only if it has changed since the
+        last scan. The versions are served from the manifest. Only the
+        files written without updating the manifest are read, and their
+        records are added to the manifest.
 
-        return self._publish_versions
+        Args:
+            force (bool, optional): If True, the folder is listed even if it
+                has not changed.
+
+        Returns:
+            dict: The manifest records by the file paths of the versions.
+        """
+        with self._scan_lock:
+            modified_paths = self._scanner.scan(force=force)
+            if not self._scanner.exists:
+                return {}
+            if modified_paths is None and self._scanned:
+                return self._records
+            modified_paths = modified_paths or set()
+            manifest_records = {
+                self._folder / record["file"]: record
+                for record in self.manifest.version_records() if "file" in record
+            }
+            self._branch_objects_loaded = False
+            self._load_branch_objects()
+
+            # the dictionaries are replaced, so it is safe to read the
+            # versions from other threads during the scan.
+            _records = {}
+            _publish_versions = {}
+            refreshed = []
+            for _path, signature in self._scanner.signatures().items():
+                record = manifest_records.get(_path)
+                existing_publish = self._publish_versions.get(_path)
+                if existing_publish is not None:
+                    if _path in modified_paths and existing_publish.is_modified():
+                        existing_publish.reload()
+                    _publish_versions[_path] = existing_publish
+                if record is None or tuple(record.get("signature") or ()) != signature:
+                    # written without updating the manifest.
+                    publish_obj = existing_publish or PublishVersion(
+                        str(_path),
+                        live_object=self._live_object,
+                        promoted_object=self._promoted_object,
+                        manifest=self.manifest,
+                    )
+                    _publish_versions[_path] = publish_obj
+                    record = publish_obj.to_manifest_record()
+                    refreshed.append(record)
+                _records[_path] = record
+
+            if refreshed:
+                refreshed.extend(self._missing_pointers())
+                self.manifest.update(refreshed)
+
+            self._records = dict(
+                sorted(_records.items(), key=lambda item: item[1]["version_number"])
+            )
+            self._publish_versions = _publish_versions
+            self._live_version = None
+            self._promoted_version = None
+            self._scanned = True
+            return self._records
+
+    def _missing_pointers(self):
+        """Return the pointer records missing from the manifest.
+
+        Publishes made before the manifest have the live and promoted
+        versions only in the live.json and promoted.json files.
+        """
+        pointers = []
+        for name, settings_object in (("live", self._live_object),
+                                      ("promoted", self._promoted_object)):
+            if not settings_object or self.manifest.get_pointer(name):
+                continue
+            pointers.append({
+                "version_number": name,
+                "publish_id": settings_object.get_property("publish_id"),
+                "version": settings_object.get_property("version_number"),
+            })
+        return pointers
 
     def get_version(self, version_number):
         """Return the publish version.
@@ -234,9 +415,16 @@ class Publish(LocalizeMixin):
         Args:
             version_number (int): The version number.
         """
-        for version in self.versions:
-            if version.version == version_number:
-                return version
+        records = self._get_records()
+        for key in self._version_keys(include_deleted=False):
+            if key == "live":
+                number = -1
+            elif key == "promoted":
+                number = 0
+            else:
+                number = records[key]["version_number"]
+            if number == version_number:
+                return self._version_object(key)
         return None
 
     def load_version(
@@ -430,6 +618,11 @@ class Publish(LocalizeMixin):
 
         # clear the publish versions
         self._publish_versions = {}
+        self._records = {}
+        self._scanned = False
+        self._live_version = None
+        self._promoted_version = None
+        self._scanner.reset()
         return 1, "success"
 
     def check_owner_permissions(self, version_number=None):
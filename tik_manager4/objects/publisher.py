@@ -8,9 +8,9 @@ import logging
 from pathlib import Path
 
 from tik_manager4.core import filelog
-from tik_manager4.core import utils
 
 from tik_manager4.objects.preview import Preview
+from tik_manager4.objects import post_publish
 from tik_manager4.dcc.standalone import main as standalone
 from tik_manager4.objects.publish import PublishVersion
 from tik_manager4.objects.guard import Guard
@@ -149,7 +149,9 @@ class Publisher:
         if _publish_file_path.exists():
             raise ValueError(f"Publish file already exists. {_publish_file_path}")
 
-        self._published_object = PublishVersion(str(_publish_file_path))
+        self._published_object = PublishVersion(
+            str(_publish_file_path), manifest=self._work_object.publish.manifest
+        )
 
         self._published_object.add_property("name", self._work_object.name)
         self._published_object.add_property("creator", self._work_object.guard.user)
@@ -177,6 +179,7 @@ class Publisher:
 
         self._published_object.apply_settings()  # make sure the file is created
         self._published_object.init_properties()  # make sure the properties are initialized
+        self._published_object.update_manifest()
         self._published_object._dcc_handler.pre_publish()
 
     def validate(self):
@@ -196,7 +199,6 @@ class Publisher:
         extract_object.extract_name = f"{self._work_object.name}"  # define the extract name
         extract_object.version_string = f"v{self._publish_version:03d}"  # define the version string
         extract_object.extract()
-        utils.write_protect(extract_object.resolve_output())
 
     def extract(self):
         """Extract the elements.
@@ -213,10 +215,15 @@ class Publisher:
                 preview_context=None,
                 message_callback=None,
                 management_task_id=None,
-                management_task_status_to=None
+                management_task_status_to=None,
+                background=None,
                 ):
         """Finalize the publish by updating the reserved slot.
 
+        The steps which need the open scene (thumbnail and preview capture)
+        run right away. The rest run as the post publish pipeline, either
+        before returning or in the background.
+
         Args:
             notes (str, optional): The notes to add to the publish.
             preview_context (PreviewContext, optional): The preview context.
@@ -224,10 +231,14 @@ class Publisher:
             management_task_id (str, optional): The management task id.
             management_task_status_to (str, optional): When defined, the task
                 on management platform will be set to the given value.
+            background (bool, optional): Run the post publish steps in the
+                background. Defaults to the project setting.
 
         Returns:
             PublishVersion: The published object.
         """
+        if background is None:
+            background = self._project_object.background_post_publish
         self.warnings = []
         # use either given message callback function or a generic logging function
         message_callback = message_callback or logging.getLogger(__name__).info
@@ -265,52 +276,74 @@ class Publisher:
             notes = "[Auto Generated]"
         self._published_object.add_property("notes", notes)
 
-        abs_thumbnail_path = self._generate_thumbnail()
+        pipeline = post_publish.PostPublishPipeline(self._published_object)
+        if self._project_object.deduplicate_publishes and not self._published_object.can_localize():
+            pipeline.add_step("store_elements")
+        pipeline.add_step("write_protect")
+
+        self._generate_thumbnail()
 
-        preview_abs_path = None
         if preview_context:
             message_callback(f"Generating preview")
             try:
-                preview_abs_path = self._generate_preview(preview_context, message_callback)
+                self._generate_preview(preview_context, message_callback, pipeline=pipeline if background else None)
             except Exception as e:  # pylint: disable=broad-except
                 message_callback("Preview generation failed.")
                 self.warnings.append("Preview generation failed. See the log for details.")
                 LOG.error(f"Preview generation failed: {e}")
 
         if management_task_id:
-            management_platform = self._project_object.settings.get(
-                "management_platform", "Management Platform")
-            message_callback(f"Publishing to {management_platform}")
-            try:
-                self.publish_to_management(
-                    management_task_id,
-                    management_task_status_to,
-                    description=notes,
-                    thumbnail=abs_thumbnail_path,
-                    preview=preview_abs_path,
-                )
-            except Exception as e:  # pylint: disable=broad-except
-                msg = f"Publish to {management_platform} failed. See the log for details."
-                message_callback(msg)
-                self.warnings.append(msg)
-                LOG.error(f"Publish to {management_platform} failed: {e}")
+            pipeline.add_step(
+                "management_upload",
+                **self._get_management_args(management_task_id, management_task_status_to, description=notes)
+            )
+        pipeline.add_step("make_live")
 
         self._published_object.apply_settings(force=True)
-        self._published_object.make_live()
+        self._published_object.init_properties()
+        self._published_object.update_manifest()
+
+        if background:
+            post_publish.QUEUE.submit(self._published_object)
+            message_callback("Post publish steps continue in the background")
+        else:
+            message_callback("Finalizing the publish")
+            state, msg = pipeline.run(retries=0)
+            if not state:
+                message_callback(msg)
+                self.warnings.append(f"{msg}. See the log for details.")
 
         # hook for post publish can be defined in per dcc handler.
         message_callback("Performing post publish operations")
         self._published_object._dcc_handler.post_publish()
         return self._published_object
 
-    def _generate_preview(self, preview_context, message_callback=None):
-        """Generate the preview."""
+    def _generate_preview(self, preview_context, message_callback=None, pipeline=None):
+        """Generate the preview.
+
+        Args:
+            preview_context (PreviewContext): The preview context.
+            message_callback (function, optional): The message callback function.
+            pipeline (PostPublishPipeline, optional): When given, the
+                conversion of the preview is added to the pipeline instead
+                of running right away.
+        """
         if not preview_context.enabled:
             return
         preview_handler = Preview(preview_context, self._published_object)
         preview_handler.settings = self._published_object.guard.preview_settings.properties
         preview_handler.set_message_callback(message_callback)
-        return preview_handler.generate(show_after=False)
+        abs_path = preview_handler.generate(show_after=False, convert=pipeline is None)
+        if abs_path and pipeline and preview_handler.needs_conversion(abs_path):
+            # the frame rate is read from the scene before it is gone.
+            pipeline.add_step(
+                "convert_preview",
+                path=str(abs_path),
+                nice_name=preview_handler.resolve_preview_name()[0],
+                fps=self._dcc_handler.get_scene_fps(),
+                start_frame=preview_context.frame_range[0],
+            )
+        return abs_path
 
     def _generate_thumbnail(self):
         """Generate the thumbnail."""
@@ -394,13 +427,23 @@ class Publisher:
             )
         return None
 
+    def _get_management_args(self, management_task_id, status, description=""):
+        """Return the arguments of the management upload step."""
+        return {
+            "task_id": management_task_id,
+            "status": status,
+            "description": description,
+            "entity_type": self.task_object.type,
+            "entity_id": self._work_object.task_id,
+            "path": self.relative_scene_path,
+            "name": self.publish_name,
+            "project_id": self._project_object.settings.get("host_project_id"),
+            "email": self.guard.email,
+        }
+
     def publish_to_management(self, management_task_id, status, description="", thumbnail=None, preview=None):
         """Publish the data to the management system."""
-        entity_type = self.task_object.type
-        entity_id = self._work_object.task_id
-        path = self.relative_scene_path
-        name = self.publish_name
-        project_id = self._project_object.settings.get("host_project_id")
+        args = self._get_management_args(management_task_id, status, description=description)
 
         # Check if the thumbnail and preview paths are existing
         if thumbnail and not Path(thumbnail).exists():
@@ -411,19 +454,10 @@ class Publisher:
             LOG.warning(f"Preview path does not exist: {preview}")
             preview = None
 
-        user_email = self.guard.email
         management_version = self.guard.management_handler.publish_version(
-            entity_type=entity_type,
-            entity_id=entity_id,
-            task_id=management_task_id,
-            name=name,
-            path=path,
-            project_id=project_id,
-            status=status,
-            description=description,
+            **args,
             thumbnail=thumbnail,
             preview=preview,
-            email=user_email,
             publish_version=self._publish_version
         )
         self._published_object.edit_property("publish_id", management_version["id"])
@@ -460,7 +494,7 @@ class SnapshotPublisher(Publisher):
 
     def __init__(self, *args):
         """Initialize the SnapshotPublisher object."""
-        super(SnapshotPublisher, self).__init__(args)
+        super(SnapshotPublisher, self).__init__(*args)
         # this overrides the dcc handler which resolved on inherited
         # class to standalone
         self._dcc_handler = standalone.Dcc()
@@ -13,13 +13,17 @@ class Purgatory(object):
     def purge_origin(self):
         """Purge all the entities in origin project purgatory"""
         purgatory_folder = Path(self.main.project.absolute_path) / ".purgatory"
+        # the blobs of the purged publishes are not referenced anymore
+        blob_store = self.main.project.blob_store
         if not purgatory_folder.exists():
+            blob_store.collect_garbage()
             return True, "Origin Project Purgatory already empty."
         # delete the purgatory folder
         try:
             shutil.rmtree(purgatory_folder)
         except Exception as exc:
             return False, f"Error purging purgatory: {exc}"
+        blob_store.collect_garbage()
         return True, "Origin Purgatory purged successfully."
 
     def purge_local(self):
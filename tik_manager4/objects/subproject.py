@@ -3,12 +3,15 @@
 
 from pathlib import Path
 import shutil
+import threading
 
 from fnmatch import fnmatch
 
 from tik_manager4.core.constants import ObjectType
 import tik_manager4.objects.task
 from tik_manager4.core import filelog
+from tik_manager4.core import io
+from tik_manager4.core import utils
 from tik_manager4.objects.metadata import Metadata
 from tik_manager4.objects.entity import Entity
 from tik_manager4.objects.task import Task
@@ -16,6 +19,40 @@ from tik_manager4.objects.task import Task
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
 
+def _get_subs(sub):
+    """Return the child subprojects of a subproject for walking the tree."""
+    return list(sub.subs.values())
+
+
+def _get_tree_nodes(node):
+    """Return the children of a subproject or a structure dictionary.
+
+    The children which are not materialized yet are returned as their
+    structure dictionaries, so walking the tree does not build them.
+    """
+    if isinstance(node, dict):
+        return node.get("subs", [])
+    # pylint: disable=protected-access
+    raw_subs = node._raw_subs
+    if raw_subs is not None:
+        return raw_subs
+    return list(node._sub_projects.values())
+
+
+def _get_node_id(node):
+    """Return the id of a subproject or a structure dictionary."""
+    if isinstance(node, dict):
+        return node.get("id", None)
+    return node.id
+
+
+def _get_node_path(node):
+    """Return the relative path of a subproject or a structure dictionary."""
+    if isinstance(node, dict):
+        return Path(node.get("path", None) or "").as_posix()
+    return node.path
+
+
 class Subproject(Entity):
     """Subproject object to hold subproject data and hierarchy.
 
@@ -34,8 +71,12 @@ class Subproject(Entity):
         super(Subproject, self).__init__(**kwargs)
         self.__parent_sub = parent_sub
         self._sub_projects: dict = {}
+        # structure dictionaries of the children which are not built yet.
+        self._raw_subs = None
         self._tasks: dict = {}
-        self._metadata = metadata or Metadata({})
+        self._task_scanner = None
+        self._scan_lock = threading.RLock()
+        self._metadata = metadata if metadata is not None else Metadata({})
 
     @property
     def parent(self):
@@ -44,9 +85,34 @@ class Subproject(Entity):
 
     @property
     def subs(self):
-        """All subprojects as dictionary."""
+        """All subprojects as dictionary.
+
+        The child subprojects are built on the first access.
+        """
+        if self._raw_subs is not None:
+            self._materialize_subs()
         return self._sub_projects
 
+    def _materialize_subs(self):
+        """Build the child subprojects from their structure dictionaries."""
+        with self._scan_lock:
+            if self._raw_subs is None:
+                return
+            for data in self._raw_subs:
+                properties = {
+                    key: value for key, value in data.items()
+                    if key not in ("id", "name", "path", "subs")
+                }
+                _metadata = self.metadata.inherit(properties)
+                sub_project = self.__build_sub_project(
+                    data.get("name", None), self, _metadata, data.get("id", None)
+                )
+                # define the path separately
+                sub_project._relative_path = data.get("path", None)
+                sub_project._raw_subs = data.get("subs", [])
+            # other threads see the children only when they are all built
+            self._raw_subs = None
+
     @property
     def tasks(self):
         """Return all NON-DELETED tasks under the subproject as dictionary where each key
@@ -86,6 +152,28 @@ class Subproject(Entity):
         # traverse up until the project is found
         return self.__parent_sub.get_project()
 
+    def _get_index(self):
+        """Return the entity index of the owning project if there is one."""
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        return getattr(root, "index", None)
+
+    def _is_ancestor_of(self, sub):
+        """Check if this subproject is the given subproject or one of its parents.
+
+        Args:
+            sub (Subproject): The subproject to check.
+
+        Returns:
+            bool: True if the subproject is under this one, False otherwise.
+        """
+        while sub is not None:
+            if sub is self:
+                return True
+            sub = sub.parent
+        return False
+
     def revive(self):
         """Revive the subproject if it is deleted.
         This is a soft recover. DATABASE IS NOT TOUCHED.
@@ -106,67 +194,58 @@ class Subproject(Entity):
     def replace_metadata(self, metadata):
         """Replace the metadata with the given one."""
         self._metadata = metadata
+        # children inherit from the new metadata
+        for sub in self._sub_projects.values():
+            sub.metadata.parent = metadata
 
     def get_sub_tree(self):
         """Return the subproject tree as a dictionary."""
-        visited = []
-        queue = []
-
         # start with the initial dictionary with self subproject
         all_data = {
             "id": self.id,
             "name": self.name,
             "path": self.path,
             # "deleted": self.deleted,
-            "subs": [],  # this will be filled with the while loop
+            "subs": [],  # this will be filled while walking the tree
         }
 
-        for key, metaitem in self.metadata.items():
-            if metaitem.overridden:
-                all_data[key] = metaitem.value
-
-        # add the initial dictionary and self into the queue
-        # Each queue item is a list.
-        # first element is the dictionary point and second is the subproject object
-        queue.append([all_data, self])
-
-        while queue:
-            current = queue.pop(0)
-            parent = current[0]
-            sub = current[1]
-
-            for neighbour in list(sub.subs.values()):
-                if neighbour not in visited:
-                    sub_data = {
-                        "id": neighbour.id,
-                        "name": neighbour.name,
-                        "path": neighbour.path,
-                        "subs": [],  # this will be filled with the while loop
-                    }
-                    # add the deleted flag only if there is a key for it.
-                    for key, metaitem in neighbour.metadata.items():
-                        if metaitem.overridden:
-                            sub_data[key] = metaitem.value
-
-                    parent["subs"].append(sub_data)
-                    visited.append(neighbour)
-                    queue.append([sub_data, neighbour])
+        all_data.update(self.metadata.get_overrides())
+
+        # dictionaries of the visited subprojects by their object ids
+        tree_data = {id(self): all_data}
+        for node, parent, _depth in utils.walk_tree(
+                self, _get_tree_nodes, prune=lambda node: isinstance(node, dict)):
+            if parent is not None:
+                sub_data = {
+                    "id": node.id,
+                    "name": node.name,
+                    "path": node.path,
+                    "subs": [],  # this will be filled while walking the tree
+                }
+                # add the deleted flag only if there is a key for it.
+                sub_data.update(node.metadata.get_overrides())
+                tree_data[id(parent)]["subs"].append(sub_data)
+                tree_data[id(node)] = sub_data
+            raw_subs = node._raw_subs  # pylint: disable=protected-access
+            if raw_subs is not None:
+                # the children are not built, nothing could have changed.
+                tree_data[id(node)]["subs"] = list(raw_subs)
 
         return all_data
 
     def set_sub_tree(self, data):
         """Create the subproject from the data dictionary.
 
-        This is for building back the hierarchy from json data.
+        This is for building back the hierarchy from json data. The child
+        subprojects are built when they are first accessed.
 
         Args:
             data (dict): The dictionary data to build the subproject.
         """
         # first clear the subprojects
         self._sub_projects = {}
+        self._raw_subs = list(data.get("subs", []))
         persistent_keys = ["id", "name", "path", "subs"]
-        visited = []
-        queue = []
         self.id = data.get("id", None)
         self._name = data.get("name", None)
         self._relative_path = data.get("path", None)
@@ -174,51 +253,41 @@ class Subproject(Entity):
         # get all remaining keys as metadata
         # inherit parents metadata
         if self.__parent_sub:
-            self._metadata = Metadata(
-                dict(self.__parent_sub.metadata.get_all_items())
-            ) or Metadata({})
+            self._metadata = self.__parent_sub.metadata.inherit()
 
         for key, value in data.items():
             if key not in persistent_keys:
                 self._metadata.add_item(key, value, overridden=True)
 
-        # append the subproject object and pointer for json as a queue element
-        queue.append([self, data.get("subs", [])])
-
-        while queue:
-            current = queue.pop(0)
-            sub = current[0]
-            data_position = current[1]
-
-            for neighbour in data_position:
-                if neighbour not in visited:
-                    _deleted = neighbour.get("deleted", False)
-                    _id = neighbour.get("id", None)
-                    _name = neighbour.get("name", None)
-                    _relative_path = neighbour.get("path", None)
+    def _find_in_tree(self, predicate):
+        """Find the first subproject matching the predicate below this one.
 
-                    # TODO take a look at this if it can be improved
-                    _metadata = Metadata(
-                        dict(sub.metadata.get_all_items())
-                    ) or Metadata({})
-                    properties = {}
-                    for key, value in neighbour.items():
-                        if key not in persistent_keys:
-                            properties[key] = value
+        The structure dictionaries of the subprojects which are not built
+        yet are checked first and only the branch leading to the match is
+        built.
 
-                    _metadata.override(properties)
-                    sub_project = sub.__build_sub_project(_name, sub, _metadata, _id)
-
-                    # define the path and categories separately
-                    sub_project._relative_path = _relative_path
-
-                    # add and override metadata
-                    for key, metaitem in sub_project.metadata.items():
-                        if neighbour.get(key, None):
-                            sub_project.metadata[key].overridden = True
+        Args:
+            predicate (callable): Function called with each subproject or
+                structure dictionary.
 
-                    visited.append(neighbour)
-                    queue.append([sub_project, neighbour.get("subs", [])])
+        Returns:
+            Subproject or int: The subproject object if found, -1 otherwise.
+        """
+        parents = {}
+        for node, parent, _depth in utils.walk_tree(self, _get_tree_nodes, include_root=False):
+            parents[id(node)] = parent
+            if not predicate(node):
+                continue
+            branch = []
+            while isinstance(node, dict):
+                branch.append(node)
+                node = parents[id(node)]
+            for data in reversed(branch):
+                node = node.subs.get(data.get("name", None))
+                if node is None:
+                    return -1
+            return node
+        return -1
 
     def __build_sub_project(self, name, parent_sub, metadata, uid):
         """Build a nested subproject.
@@ -238,6 +307,9 @@ class Subproject(Entity):
         )
         sub_pr.path = str(Path(self.path, name))
         self._sub_projects[name] = sub_pr
+        index = self._get_index()
+        if index is not None:
+            index.register_sub(sub_pr)
         return sub_pr
 
     def add_sub_project(self, name, parent_sub=None, uid=None, **properties):
@@ -264,13 +336,11 @@ class Subproject(Entity):
         if state != 1:
             return -1
 
-        # TODO look at this if it can be improved
-        _metadata = Metadata(dict(self.metadata.get_all_items())) or Metadata({})
         # eliminate the None values
         properties = {k: v for k, v in properties.items() if v is not None}
-        _metadata.override(properties)
+        _metadata = self.metadata.inherit(properties)
 
-        if name in self._sub_projects:
+        if name in self.subs:
             # check if it is deleted
             if self._sub_projects[name].deleted:
                 self._sub_projects[name].revive()
@@ -289,42 +359,95 @@ class Subproject(Entity):
 
         return new_sub
 
-    def scan_tasks(self):
+    def scan_tasks(self, force=False):
         """Scan the subproject for tasks.
 
+        The folder is listed again only if it has changed since the
+        last scan.
+
+        Args:
+            force (bool, optional): If True, the folder is listed even if it
+                has not changed.
+
         Returns:
             dict: The tasks under the subproject.
         """
-        _tasks_search_dir = Path(self.get_abs_database_path())
-        _task_paths = list(_tasks_search_dir.glob("*.ttask"))
-
-        # add the file if it is new. if it is not new,
-        # check the modified time and update if necessary
-        for _task_path in _task_paths:
-            _task_name = _task_path.stem
-            existing_task = self._tasks.get(_task_name, None)
-            if not existing_task:
-                _task = Task(absolute_path=_task_path, parent_sub=self)
-                self._tasks[_task_name] = _task
-            else:
-                if existing_task.is_modified():
-                    existing_task.refresh()
-
-        # if the lengths are not matching that means some tasks are deleted
-        if len(_task_paths) != len(self._tasks):
-            # get the task names
-            _task_names = [_task_path.stem for _task_path in _task_paths]
-            # get the task names that are not in the _task_names
-            _deleted_task_names = [
-                task_name
-                for task_name in self._tasks.keys()
-                if task_name not in _task_names
-            ]
-            # delete the tasks
-            for _deleted_task_name in _deleted_task_names:
-                del self._tasks[_deleted_task_name]
+        with self._scan_lock:
+            _tasks_search_dir = self.get_abs_database_path()
+            if self._task_scanner is None or self._task_scanner.folder != _tasks_search_dir:
+                self._task_scanner = io.FolderScanner(_tasks_search_dir, ".ttask")
+            modified_paths = self._task_scanner.scan(force=force)
+            if modified_paths is None:
+                return self._tasks
+            _task_paths = self._task_scanner.paths
+            index = self._get_index()
+            # the dictionary is replaced at the end, so it is safe to read
+            # the tasks from other threads during the scan.
+            _tasks = dict(self._tasks)
+
+            # add the file if it is new. if it is not new,
+            # check the modified time and update if necessary
+            for _task_path in _task_paths:
+                _task_name = _task_path.stem
+                existing_task = _tasks.get(_task_name, None)
+                if not existing_task:
+                    _task = Task(absolute_path=_task_path, parent_sub=self)
+                    _tasks[_task_name] = _task
+                else:
+                    if _task_path in modified_paths and existing_task.is_modified():
+                        existing_task.refresh()
+                if index is not None:
+                    index.register_task(self, _task_name, _tasks[_task_name])
+
+            # if the lengths are not matching that means some tasks are deleted
+            if len(_task_paths) != len(_tasks):
+                # get the task names
+                _task_names = [_task_path.stem for _task_path in _task_paths]
+                # get the task names that are not in the _task_names
+                _deleted_task_names = [
+                    task_name
+                    for task_name in _tasks.keys()
+                    if task_name not in _task_names
+                ]
+                # delete the tasks
+                for _deleted_task_name in _deleted_task_names:
+                    del _tasks[_deleted_task_name]
+                    if index is not None:
+                        index.unregister_task(self, _deleted_task_name)
+
+            self._tasks = _tasks
+            if index is not None:
+                index.mark_scanned(self)
+            return self._tasks
+
+    def load_task(self, name):
+        """Load a single task of the subproject without scanning the folder.
 
-        return self._tasks
+        Args:
+            name (str): Name of the task.
+
+        Returns:
+            Task or None: The task object if the task file exists,
+                None otherwise.
+        """
+        _task_path = Path(self.get_abs_database_path(f"{name}.ttask"))
+        with self._scan_lock:
+            existing_task = self._tasks.get(name, None)
+            if not _task_path.is_file():
+                if existing_task:
+                    del self._tasks[name]
+                    index = self._get_index()
+                    if index is not None:
+                        index.unregister_task(self, name)
+                return None
+            if not existing_task:
+                self._tasks[name] = Task(absolute_path=_task_path, parent_sub=self)
+            elif existing_task.is_modified():
+                existing_task.refresh()
+            index = self._get_index()
+            if index is not None:
+                index.register_task(self, name, self._tasks[name])
+            return self._tasks[name]
 
     def add_task(self,
                  name,
@@ -372,6 +495,7 @@ class Subproject(Entity):
             _task.revive()
             _task.edit(categories=categories, metadata_overrides=metadata_overrides, uid=uid)
             self._tasks[name] = _task
+            self.__register_task(name, _task)
             return _task
 
         _task_id = uid or self.generate_id()
@@ -403,8 +527,15 @@ class Subproject(Entity):
 
         _task.apply_settings()
         self._tasks[name] = _task
+        self.__register_task(name, _task)
         return _task
 
+    def __register_task(self, name, task):
+        """Register the task to the project index if there is one."""
+        index = self._get_index()
+        if index is not None:
+            index.register_task(self, name, task)
+
     @staticmethod
     def is_task_empty(task):
         """Check all categories and return True if all are empty.
@@ -443,6 +574,8 @@ class Subproject(Entity):
                 f"Sending task {task_name} " f"and everything underneath to purgatory."
             )
         task.destroy()
+        # deleted tasks stay in the index with their flag for query_all lookups.
+        self.__register_task(task_name, task)
 
         return True, "success"
 
@@ -450,6 +583,10 @@ class Subproject(Entity):
         """Return the tasks matching the wildcard.
 
         Search recursively for all subprojects and the tasks inside them.
+        The project index is used when available. Only the subprojects
+        which are not indexed yet get scanned, the others are answered
+        by the index even if nothing matches. The index file is not
+        written by the query.
 
         Args:
             wildcard (str): The wildcard to match.
@@ -458,17 +595,35 @@ class Subproject(Entity):
         Returns:
             list: List of tasks matching the wildcard.
         """
-        _tasks = self.get_tasks_by_wildcard(wildcard, query_all=query_all)
-        queue = list(self.subs.values())
-        while queue:
-            current = queue.pop(0)
-            queue.extend(list(current.subs.values()))
-            _tasks.extend(current.get_tasks_by_wildcard(wildcard))
-        return _tasks
+        index = self._get_index()
+        if index is None:
+            _tasks = []
+            for current, _parent, _depth in utils.walk_tree(self, _get_subs):
+                _tasks.extend(current.get_tasks_by_wildcard(wildcard, query_all=query_all))
+            return _tasks
+
+        _tasks = {}
+        for current, _parent, _depth in utils.walk_tree(self, _get_subs):
+            if not index.is_scanned(current):
+                # scanning indexes the subproject for the next queries.
+                for task in current.get_tasks_by_wildcard(wildcard, query_all=query_all):
+                    _tasks[task.id] = task
+        for uid in index.get_task_ids_by_wildcard(wildcard):
+            if uid in _tasks:
+                continue
+            task = index.get_task(uid)
+            if task is None or not self._is_ancestor_of(task.parent_sub):
+                continue
+            if query_all or not task.deleted:
+                _tasks[uid] = task
+        return list(_tasks.values())
 
     def find_task_by_id(self, uid, query_all=False):
         """Find the task by id.
 
+        The project index is used when available. Falls back to scanning
+        the subprojects if the task is not indexed.
+
         Args:
             uid (int): Unique id of the task.
             query_all (bool, optional): If True, returns deleted tasks as well.
@@ -476,15 +631,20 @@ class Subproject(Entity):
         Returns:
             Task or int: The task object if successful, -1 otherwise.
         """
+        index = self._get_index()
+        if index is not None:
+            task = index.get_task(uid)
+            if task is not None and self._is_ancestor_of(task.parent_sub):
+                if query_all or not task.deleted:
+                    return task
+                return -1
+
         # first check if the task is under this subproject
         _search = self.get_task_by_id(uid, query_all=query_all)
         if _search != -1:
             return _search
-        queue = list(self.subs.values())
-        while queue:
-            current = queue.pop(0)
-            queue.extend(list(current.subs.values()))
-            _search = current.get_task_by_id(uid)
+        for current, _parent, _depth in utils.walk_tree(self, _get_subs, include_root=False):
+            _search = current.get_task_by_id(uid, query_all=query_all)
             if _search != -1:
                 return _search
         return -1
@@ -501,13 +661,15 @@ class Subproject(Entity):
         """
         if self.id == uid:
             return self
-        queue = list(self.subs.values())
-        while queue:
-            current = queue.pop(0)
-            if current.id == uid:
-                return current
-            queue.extend(list(current.subs.values()))
-        return -1
+        index = self._get_index()
+        if index is not None:
+            sub = index.get_sub_by_id(uid)
+            if sub is not None and self._is_ancestor_of(sub):
+                return sub
+        sub = self._find_in_tree(lambda node: _get_node_id(node) == uid)
+        if sub != -1 and index is not None:
+            index.register_sub(sub)
+        return sub
 
     def find_sub_by_path(self, path):
         """Find the subproject by path.
@@ -521,13 +683,15 @@ class Subproject(Entity):
         """
         if path in ("", "."):  # this is root
             return self
-        queue = list(self.subs.values())
-        while queue:
-            current = queue.pop(0)
-            if current.path == path:
-                return current
-            queue.extend(list(current.subs.values()))
-        return -1
+        index = self._get_index()
+        if index is not None:
+            sub = index.get_sub_by_path(path)
+            if sub is not None and sub is not self and self._is_ancestor_of(sub):
+                return sub
+        sub = self._find_in_tree(lambda node: _get_node_path(node) == path)
+        if sub != -1 and index is not None:
+            index.register_sub(sub)
+        return sub
 
     def find_subs_by_wildcard(self, wildcard):
         """Find the subproject by wildcard.
@@ -538,16 +702,11 @@ class Subproject(Entity):
         Returns:
             list: List of subprojects matching the wildcard.
         """
-        subs = []
-        queue = list(self.subs.values())
-        visited = []
-        while queue:
-            current = queue.pop(0)
-            if fnmatch(current.name, wildcard):
-                subs.append(current)
-            if current not in visited:
-                queue.extend(list(current.subs.values()))
-        return subs
+        return [
+            current
+            for current, _parent, _depth in utils.walk_tree(self, _get_subs, include_root=False)
+            if fnmatch(current.name, wildcard)
+        ]
 
     def get_uid_by_path(self, path):
         """Get the uid of the subproject by path.
@@ -690,7 +849,8 @@ class Subproject(Entity):
                 current subproject is used.
         """
         sub = sub or self
-        folder = Path(root, sub.path)
-        if not folder.exists():
-            folder.mkdir(parents=True, exist_ok=True)
-        _ = [sub.create_folders(root, sub=sub) for sub in sub.subs.values()]
+        # the subprojects which are not built yet are not built for this
+        for node, _parent, _depth in utils.walk_tree(sub, _get_tree_nodes):
+            folder = Path(root, _get_node_path(node))
+            if not folder.exists():
+                folder.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,299 @@
+"""Bulk sync of the localized versions to the origin.
+
+The work and publish versions created while the localization is enabled
+live in the local cache folder until they are synced to the origin. The
+sync manager finds all of them in the local cache of the current project,
+validates them up front and syncs them concurrently.
+
+The state of each version is kept in a journal in the local cache folder
+('.tik_sync.json'), so the failed ones can be retried later, also from
+the headless command ('dcc/standalone/tik4_sync.py').
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import os
+from pathlib import Path
+import time
+
+from tik_manager4.core import filelog
+from tik_manager4.core import io
+from tik_manager4.core.constants import SyncStates
+from tik_manager4.objects.version import PublishVersion
+from tik_manager4.objects.work import Work
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 2
+
+
+class SyncItem:
+    """A localized work or publish version to sync."""
+
+    def __init__(self, key, version, work=None):
+        """Initialize the item.
+
+        Args:
+            key (str): The unique key of the item in the journal.
+            version (WorkVersion or PublishVersion): The localized version.
+            work (Work, optional): The work of the work versions. The work
+                database is saved after its versions are synced.
+        """
+        self.key = key
+        self.version = version
+        self.work = work
+        self.status = SyncStates.PENDING
+        self.attempts = 0
+        self.message = ""
+
+    @property
+    def kind(self):
+        """The kind of the item. 'work' or 'publish'."""
+        return "work" if self.work else "publish"
+
+    @property
+    def name(self):
+        """Nice name of the item."""
+        owner = self.work.name if self.work else self.version.name
+        return f"{owner} v{self.version.version:03d} ({self.kind})"
+
+    def get_paths(self):
+        """Return the local sources and the origin targets of the item."""
+        if self.work:
+            return [Path(self.version.localized_path)], [Path(self.version.get_abs_project_path())]
+        publish_base = Path(self.version.localized_path)
+        sources = [publish_base / element["path"] for element in self.version.elements]
+        targets = [Path(self.version.get_abs_project_path(element["path"]))
+                   for element in self.version.elements]
+        return sources, targets
+
+    def to_record(self):
+        """Return the journal record of the item."""
+        return {
+            "key": self.key,
+            "kind": self.kind,
+            "name": self.name,
+            "status": self.status.value,
+            "attempts": self.attempts,
+            "message": self.message,
+            "time": datetime.now().isoformat(timespec="seconds"),
+        }
+
+
+class SyncManager:
+    """Syncs all the localized versions of the current project to the origin."""
+
+    journal_name = ".tik_sync.json"
+
+    def __init__(self, main_object):
+        """Initialize the sync manager.
+
+        Args:
+            main_object (Main): The main object.
+        """
+        self.main = main_object
+        self._journal = None
+
+    @property
+    def local_project_folder(self):
+        """The local cache folder of the current project. None if not set."""
+        local_cache_folder = self.main.user.localization.get("local_cache_folder", None)
+        if not local_cache_folder:
+            return None
+        return Path(local_cache_folder, self.main.project.name)
+
+    @property
+    def journal(self):
+        """The journal keeping the states of the synced items."""
+        local_folder = self.local_project_folder
+        if not local_folder:
+            return None
+        journal_path = local_folder / self.journal_name
+        if self._journal is None or self._journal.file_path != str(journal_path):
+            self._journal = io.RecordFile(journal_path, "items", "key")
+        return self._journal
+
+    def discover(self):
+        """Find the localized work and publish versions of the project.
+
+        Only the database folders mirrored in the local cache folder are
+        read.
+
+        Returns:
+            list: The SyncItem objects.
+        """
+        local_folder = self.local_project_folder
+        if not local_folder or not local_folder.is_dir():
+            return []
+        database_folder = Path(self.main.project.database_path)
+        items = []
+        for folder, folder_names, _file_names in os.walk(local_folder):
+            relative_folder = Path(folder).relative_to(local_folder)
+            if relative_folder == Path("."):
+                folder_names[:] = [name for name in folder_names if name != ".purgatory"]
+            try:
+                entries = sorted(os.scandir(database_folder / relative_folder), key=lambda entry: entry.name)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.endswith(".twork"):
+                    items.extend(self._collect_work(entry.path, local_folder))
+                elif entry.name.endswith(".tpub"):
+                    items.extend(self._collect_publish(entry.path, local_folder))
+        return items
+
+    def _collect_work(self, work_file, local_folder):
+        """Return the localized versions of the work."""
+        work = Work(work_file)
+        relative_path = Path(work_file).relative_to(self.main.project.database_path).as_posix()
+        return [
+            SyncItem(f"{relative_path}#{version.version}", version, work=work)
+            for version in work.versions
+            if version.localized and self._is_under(version.localized_path, local_folder)
+        ]
+
+    def _collect_publish(self, publish_file, local_folder):
+        """Return the publish version if it is localized."""
+        version = PublishVersion(publish_file)
+        if version.deleted or not version.localized:
+            return []
+        if not self._is_under(version.localized_path, local_folder):
+            return []
+        relative_path = Path(publish_file).relative_to(self.main.project.database_path).as_posix()
+        return [SyncItem(relative_path, version)]
+
+    @staticmethod
+    def _is_under(path, folder):
+        """Check if the path is under the folder."""
+        return bool(path) and Path(path).is_relative_to(folder)
+
+    def validate(self, items):
+        """Validate all the items up front.
+
+        The items which cannot be synced are marked as failed.
+
+        Args:
+            items (list): The SyncItem objects.
+
+        Returns:
+            dict: The error messages by the item keys.
+        """
+        errors = {}
+        for item in items:
+            sources, targets = item.get_paths()
+            pending = [(source, target) for source, target in zip(sources, targets)
+                       if not item.version._is_moved(source, target)]  # pylint: disable=protected-access
+            if not pending:
+                continue
+            messages = list(item.version.validate_paths(*zip(*pending)))
+            if messages:
+                errors[item.key] = messages
+                item.status = SyncStates.FAILED
+                item.message = "\n".join(messages)
+        return errors
+
+    def sync(self, items=None, workers=DEFAULT_WORKERS, retries=DEFAULT_RETRIES, progress_callback=None):
+        """Sync the localized versions to the origin.
+
+        The versions of the same work are synced one after another and the
+        work is saved once. Everything else is synced concurrently.
+
+        Args:
+            items (list, optional): The SyncItem objects to sync. All the
+                localized versions of the project if not provided.
+            workers (int, optional): The maximum number of concurrent syncs.
+            retries (int, optional): The number of retries of a failing sync.
+            progress_callback (callable, optional): Called with each SyncItem
+                from the calling thread as it is synced or failed.
+
+        Returns:
+            tuple: (bool, message). False if any of the items failed.
+        """
+        if self.local_project_folder is None:
+            return False, "Local cache folder not set."
+        items = self.discover() if items is None else items
+        if not items:
+            return True, "Nothing to sync."
+
+        self.validate(items)
+        self._record(items)
+        groups = {}
+        for item in items:
+            if item.status == SyncStates.PENDING:
+                groups.setdefault(id(item.work) if item.work else item.key, []).append(item)
+        for item in items:
+            if item.status == SyncStates.FAILED and progress_callback:
+                progress_callback(item)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [executor.submit(self._sync_group, group, retries) for group in groups.values()]
+            for future in as_completed(futures):
+                group = future.result()
+                self._record(group)
+                for item in group:
+                    if progress_callback:
+                        progress_callback(item)
+
+        failed = [item for item in items if item.status == SyncStates.FAILED]
+        synced = len(items) - len(failed)
+        msg = f"{synced} of {len(items)} localized versions synced to the origin."
+        if failed:
+            LOG.warning(f"{msg} Failed: {', '.join(item.name for item in failed)}")
+            return False, msg
+        LOG.info(msg)
+        return True, msg
+
+    def _sync_group(self, group, retries):
+        """Sync the items of a group one after another. Runs in the workers."""
+        for item in group:
+            for attempt in range(retries + 1):
+                item.attempts += 1
+                try:
+                    state, msg = item.version.sync()
+                except Exception as exc:  # pylint: disable=broad-except
+                    state, msg = False, str(exc)
+                if state:
+                    item.status = SyncStates.SYNCED
+                    item.message = ""
+                    break
+                item.status = SyncStates.FAILED
+                item.message = "\n".join(msg) if isinstance(msg, list) else str(msg)
+                if attempt < retries:
+                    time.sleep(0.5 * (attempt + 1))
+        synced_work = next(
+            (item.work for item in group if item.work and item.status == SyncStates.SYNCED), None
+        )
+        if synced_work:
+            synced_work.apply_settings(force=True)
+        return group
+
+    def _record(self, items):
+        """Write the states of the items to the journal."""
+        self.journal.update([item.to_record() for item in items])
+
+    def get_states(self):
+        """Return the journal records of the last sync of each item.
+
+        Returns:
+            dict: The records by the item keys.
+        """
+        journal = self.journal
+        if not journal:
+            return {}
+        return dict(journal.read())
+
+    def retry_failed(self, workers=DEFAULT_WORKERS, retries=DEFAULT_RETRIES, progress_callback=None):
+        """Sync the items which failed in the previous syncs.
+
+        Returns:
+            tuple: (bool, message). False if any of the items failed.
+        """
+        failed_keys = {
+            key for key, record in self.get_states().items()
+            if record.get("status") == SyncStates.FAILED.value
+        }
+        items = [item for item in self.discover() if item.key in failed_keys]
+        if not items:
+            return True, "Nothing to retry."
+        return self.sync(items, workers=workers, retries=retries, progress_callback=progress_callback)
@@ -58,6 +58,7 @@ class Task(Settings, Entity):
         self._works = {}
         self._publishes = {}
         self._metadata_overrides = metadata_overrides or self.get_property("metadata_overrides", default={})
+        self._metadata = None
         self._task_id = self.get_property("task_id") or task_id
         self._relative_path = self.get_property("path") or path
         self._file_name = self.get_property("file_name") or file_name
@@ -116,12 +117,17 @@ class Task(Settings, Entity):
 
     @property
     def metadata(self):
-        """Metadata of the task."""
-        if self._parent_sub:
-            _metadata = self._parent_sub.metadata.copy()
-            _metadata.override(self._metadata_overrides)
-            return _metadata
-        return Metadata(self._metadata_overrides)
+        """Metadata of the task.
+
+        The overrides of the task on top of the parent subproject metadata.
+        """
+        parent_metadata = self._parent_sub.metadata if self._parent_sub else None
+        if self._metadata is None or self._metadata.parent is not parent_metadata:
+            if parent_metadata is None:
+                self._metadata = Metadata(self._metadata_overrides)
+            else:
+                self._metadata = parent_metadata.inherit(self._metadata_overrides)
+        return self._metadata
 
     @property
     def state(self):
@@ -133,19 +139,45 @@ class Task(Settings, Entity):
         """Deleted state of the task."""
         return self._deleted
 
-    def omit(self):
-        """Omit the task."""
+    def edit_property(self, key, val):
+        """Update the property key with given value.
+
+        Editing the metadata overrides refreshes the task metadata.
+
+        Args:
+            key (str): The property key to update.
+            val (any): The value to update the key with.
+        """
+        super().edit_property(key, val)
+        if key == "metadata_overrides":
+            self._metadata_overrides = val
+            self._metadata = None
+
+    def omit(self, apply=True):
+        """Omit the task.
+
+        Args:
+            apply (bool, optional): If False, the change is not written to
+                the database until the settings are applied.
+        """
         self._state = "omitted"
         self.edit_property("state", self._state)
-        self.apply_settings()
+        if apply:
+            self.apply_settings()
+
+    def revive(self, apply=True):
+        """Revive the task.
 
-    def revive(self):
-        """Revive the task."""
+        Args:
+            apply (bool, optional): If False, the change is not written to
+                the database until the settings are applied.
+        """
         self._state = "active"
         self.edit_property("state", self._state)
         self._deleted = False
         self.edit_property("deleted", self._deleted)
-        self.apply_settings()
+        if apply:
+            self.apply_settings()
 
     def build_categories(self, category_list):
         """Create category objects.
@@ -168,11 +200,13 @@ class Task(Settings, Entity):
 
         return self._categories
 
-    def add_category(self, category):
+    def add_category(self, category, apply=True):
         """Add a category to the task.
 
         Args:
             category (str): Category name
+            apply (bool, optional): If False, the change is not written to
+                the database until the settings are applied.
 
         Returns:
             Category: The category object
@@ -190,7 +224,8 @@ class Task(Settings, Entity):
             return -1
         self._categories[category] = Category(name=category, parent_task=self)
         self._current_value["categories"] = list(self._categories.keys())
-        self.apply_settings()
+        if apply:
+            self.apply_settings()
         return self._categories[category]
 
     def edit(self, nice_name=None, categories=None, metadata_overrides=None, uid=None):
@@ -234,7 +269,6 @@ class Task(Settings, Entity):
             self._categories = self.build_categories(categories)
             self.edit_property("categories", list(categories))
         if metadata_overrides is not None: # explicitly check for None
-            self._metadata_overrides = metadata_overrides
             self.edit_property("metadata_overrides", metadata_overrides)
         if uid and uid != self.id:
             self._task_id = uid
@@ -1,13 +1,20 @@
 """Work and Publish objects."""
 
+import os
+import sys
+from copy import deepcopy
 from datetime import datetime
 from pathlib import Path
+from typing import NamedTuple
 
 from tik_manager4.core import utils
-from tik_manager4.core.constants import ObjectType, ColorCodes, ValidationResult, ValidationState, BranchingModes
+from tik_manager4.core.constants import (
+    ObjectType, ColorCodes, ValidationResult, ValidationState, BranchingModes, MaterializationModes
+)
 from tik_manager4.core.settings import Settings
 from tik_manager4.mixins.localize import LocalizeMixin
 from tik_manager4.core import filelog
+from tik_manager4.core import io
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
@@ -22,7 +29,8 @@ class PublishVersion(Settings, LocalizeMixin):
     object_type = ObjectType.PUBLISH_VERSION
     promote_class = False
 
-    def __init__(self, absolute_path, name=None, path=None, live_object=None, promoted_object=None):
+    def __init__(self, absolute_path, name=None, path=None, live_object=None, promoted_object=None,
+                 manifest=None):
         """Initialize the publish version object.
 
         Args:
@@ -31,6 +39,8 @@ class PublishVersion(Settings, LocalizeMixin):
                 Defaults to None.
             path (str, optional): The relative path of the publish version.
                 Defaults to None.
+            manifest (PublishManifest, optional): The manifest of the
+                publish folder. Created on demand if not provided.
         """
         super().__init__()
         self._dcc_handler = self.guard.dcc_handler
@@ -54,6 +64,7 @@ class PublishVersion(Settings, LocalizeMixin):
         self._localized: bool = False
         self._localized_path: str = ""
         self._deleted: bool = False
+        self._post_publish: dict = {}
 
         self.modified_time = None  # to compare and update if necessary
 
@@ -66,6 +77,7 @@ class PublishVersion(Settings, LocalizeMixin):
 
         self._live_object = live_object or Settings(live_file)
         self._promoted_object = promoted_object or Settings(promoted_file)
+        self._manifest = manifest
 
     def init_properties(self):
         """Initialize the properties of the publish."""
@@ -87,6 +99,45 @@ class PublishVersion(Settings, LocalizeMixin):
         self._localized = self.get_property("localized", self._localized)
         self._localized_path = self.get_property("localized_path", self._localized_path)
         self._deleted = self.get_property("deleted", self._deleted)
+        self._post_publish = self.get_property("post_publish", self._post_publish)
+
+    def apply_settings(self, force=False):
+        """Write the edited properties to the publish version file.
+
+        Only the edited properties are written. The others are read back
+        from the file, so the post publish steps running in the background
+        and this object do not overwrite each other.
+
+        Args:
+            force (bool): Whether to write the file even if nothing is edited.
+
+        Returns:
+            bool: True if the settings were written to file, False otherwise.
+        """
+        if not self._io.stat():
+            return super().apply_settings(force=force)
+        keys = [
+            key for key, value in self._current_value.items()
+            if key not in self._original_value or value != self._original_value[key]
+        ]
+        if not keys and not force:
+            return False
+        self.apply_properties(*keys)
+        self.init_properties()
+        return True
+
+    def refresh(self):
+        """Read back the changes of the other sessions, e.g. the post publish states.
+
+        Returns:
+            bool: True if the file is changed, False otherwise.
+        """
+        if self._live_object:
+            self._live_object.refresh()
+        if not super().refresh():
+            return False
+        self.init_properties()
+        return True
 
     @property
     def creator(self):
@@ -128,6 +179,16 @@ class PublishVersion(Settings, LocalizeMixin):
         """Return the nice name of the publish version."""
         return str(self.version)
 
+    @property
+    def post_publish(self):
+        """The states of the post publish steps."""
+        return self._post_publish
+
+    @property
+    def post_publish_state(self):
+        """The overall state of the post publish steps. Empty if there are none."""
+        return (self._post_publish or {}).get("state", "")
+
     @property
     def notes(self):
         """Notes of the publish version."""
@@ -202,6 +263,35 @@ class PublishVersion(Settings, LocalizeMixin):
         """The deleted status of the publish version."""
         return self._deleted
 
+    @property
+    def manifest(self):
+        """The manifest of the publish folder."""
+        if self._manifest is None:
+            self._manifest = PublishManifest(Path(self.settings_file).parent)
+        return self._manifest
+
+    def to_manifest_record(self):
+        """Return the summary of the publish version for the manifest."""
+        try:
+            _stat = os.stat(self.settings_file)
+            signature = [_stat.st_mtime_ns, _stat.st_size]
+        except OSError:
+            signature = None
+        return {
+            "version_number": self._version,
+            "publish_id": self._publish_id,
+            "file": Path(self.settings_file).name,
+            "user": self._creator,
+            "deleted": self._deleted,
+            # live and promoted versions replace the elements in memory.
+            "elements": self.get_property("elements", self._elements),
+            "signature": signature,
+        }
+
+    def update_manifest(self):
+        """Write the summary of the publish version to the manifest."""
+        return self.manifest.update([self.to_manifest_record()])
+
     def _get_live_folder(self):
         """Return the PATH object of the LIVE folder."""
         # resolve the LIVE folder
@@ -214,6 +304,26 @@ class PublishVersion(Settings, LocalizeMixin):
         promoted_folder = Path(self.get_abs_project_path()).parent / "PROMOTED"
         return promoted_folder
 
+    def _materialize_element(self, publish_path, branch_path):
+        """Create the branch element from the published element.
+
+        The project setting 'branch_materialization' defines whether the
+        element is copied or linked.
+
+        Args:
+            publish_path (Path): The published element.
+            branch_path (Path): The element in the LIVE or PROMOTED folder.
+
+        Returns:
+            tuple: (True, used strategy) or (False, error message).
+        """
+        strategy = self.guard.project_settings.get(
+            "branch_materialization", MaterializationModes.COPY.value)
+        state, msg = utils.materialize(publish_path, branch_path, strategy=strategy)
+        if not state:
+            LOG.error(f"Error materializing {publish_path} to {branch_path}: {msg}")
+        return state, msg
+
     def is_deleted(self):
         """Convenience method to check if the publish version is deleted."""
         return self._deleted
@@ -263,10 +373,8 @@ class PublishVersion(Settings, LocalizeMixin):
             else:
                 live_element_name = f"{element_type.upper()}_{self._name}{publish_path.suffix}"
                 live_path = live_folder / live_element_name
-                state, msg = utils.copy(publish_path.as_posix(), live_path.as_posix())
+                state, msg = self._materialize_element(publish_path, live_path)
                 if not state:
-                    # TODO: FIX - TEST - STREAMLINE
-                    LOG.error(f"Error copying {publish_path} to {live_path}: {msg}")
                     return ValidationResult(ValidationState.ERROR, msg, False)
             # get the relative path against the project path
 
@@ -291,7 +399,8 @@ class PublishVersion(Settings, LocalizeMixin):
 
         # if the active branch method is selected, use it
         if self.guard.project_settings.get("branching_mode", BranchingModes.ACTIVE.value):
-            self._make_live_with_active_branching()
+            if self._make_live_with_active_branching() is None:
+                self.manifest.update([self.manifest.pointer_record("live", self)])
             return
         # otherwise, use the default method
         _data = {
@@ -303,6 +412,7 @@ class PublishVersion(Settings, LocalizeMixin):
         }
         self._live_object.set_data(_data)
         self._live_object.apply_settings(force=True)
+        self.manifest.update([self.manifest.pointer_record("live", self)])
 
 
     def is_promoted(self):
@@ -358,9 +468,8 @@ class PublishVersion(Settings, LocalizeMixin):
             else:
                 promoted_element_name = f"{element_type.upper()}_{self._name}{publish_path.suffix}"
                 promoted_path = promoted_folder / promoted_element_name
-                state, msg = utils.copy(publish_path.as_posix(), promoted_path.as_posix())
+                state, msg = self._materialize_element(publish_path, promoted_path)
                 if not state:
-                    LOG.error(f"Error copying {publish_path} to {promoted_path}: {msg}")
                     return ValidationResult(ValidationState.ERROR, msg, False)
             # get the relative path against the project path
 
@@ -393,6 +502,7 @@ class PublishVersion(Settings, LocalizeMixin):
 
             if result.state != ValidationState.SUCCESS:
                 return result
+            self.manifest.update([self.manifest.pointer_record("promoted", self)])
             return ValidationResult(ValidationState.SUCCESS, "Success")
 
         # otherwise, use the default method
@@ -405,6 +515,7 @@ class PublishVersion(Settings, LocalizeMixin):
         }
         self._promoted_object.set_data(_data)
         self._promoted_object.apply_settings(force=True)
+        self.manifest.update([self.manifest.pointer_record("promoted", self)])
         return ValidationResult(ValidationState.SUCCESS, "Success")
 
     def get_element_by_type(self, element_type):
@@ -488,6 +599,7 @@ class PublishVersion(Settings, LocalizeMixin):
         self._deleted = True
         self.edit_property("deleted", True)
         self.apply_settings(force=True)
+        self.update_manifest()
         return True, "Success"
 
     def resurrect(self):
@@ -507,6 +619,7 @@ class PublishVersion(Settings, LocalizeMixin):
         self._deleted = False
         self.edit_property("deleted", False)
         self.apply_settings(force=True)
+        self.update_manifest()
         return True, "Success"
 
     def get_display_color(self):
@@ -545,6 +658,7 @@ class PublishVersion(Settings, LocalizeMixin):
             "deleted": self._deleted,
             "live": self.is_live(),
             "promoted": self.promote_class or self.is_promoted(),
+            "post_publish": self.post_publish_state,
         }
 
     def get_creation_date(self):
@@ -649,6 +763,119 @@ class PromotedVersion(PublishVersion):
         """
         return ColorCodes.PROMOTED.value
 
+def _intern(value):
+    """Share the repeating strings (users, formats, etc.) between records."""
+    return sys.intern(value) if type(value) is str else value  # pylint: disable=unidiomatic-typecheck
+
+
+class WorkVersionRecord(NamedTuple):
+    """Compact record of a stored work version.
+
+    Works keep their versions as records and create the WorkVersion
+    objects only for the versions asked for.
+    """
+
+    version_number: int = 0
+    user: str = ""
+    scene_path: str = ""
+    file_format: str = ""
+    notes: str = ""
+    dcc_version: str = "NA"
+    localized: bool = False
+    localized_path: str = ""
+    previews: dict = None
+    thumbnail: str = ""
+    workstation: str = ""
+    deleted: bool = False
+
+    @classmethod
+    def from_dict(cls, dictionary):
+        """Create the record from the version dictionary.
+
+        Args:
+            dictionary (dict): The version dictionary.
+        """
+        return cls(
+            dictionary.get("version_number", 0),
+            _intern(dictionary.get("user", "")),
+            dictionary.get("scene_path", ""),
+            _intern(dictionary.get("file_format", "")),
+            dictionary.get("notes", ""),
+            _intern(dictionary.get("dcc_version", "NA")),
+            dictionary.get("localized", False),
+            dictionary.get("localized_path", ""),
+            dictionary.get("previews") or None,
+            dictionary.get("thumbnail", ""),
+            _intern(dictionary.get("workstation", "")),
+            dictionary.get("deleted", False),
+        )
+
+    def to_dict(self):
+        """Convert the record to a version dictionary."""
+        data = dict(zip(self._fields, self))
+        data["previews"] = deepcopy(self.previews) if self.previews else {}
+        return data
+
+
+class PublishManifest(io.RecordFile):
+    """Summary of the publish versions in a publish folder.
+
+    The manifest ('manifest.json' next to the .tpub files) keeps a small
+    record for each publish version: number, id, user, file name, deleted
+    state, elements and the stat signature of the .tpub file at the time
+    the record is written. The live and promoted versions are kept as
+    pointer records with the keys 'live' and 'promoted'.
+
+    Listing the publishes and checking their states only reads the
+    manifest. Records that fail to be written are written again by the
+    next scan of the publish folder.
+    """
+
+    file_name = "manifest.json"
+    pointer_keys = ("live", "promoted")
+
+    def __init__(self, folder):
+        """Initialize the manifest.
+
+        Args:
+            folder (str): The publish data folder.
+        """
+        self.folder = Path(folder)
+        super().__init__(self.folder / self.file_name, "versions", "version_number")
+
+    def version_records(self):
+        """Return the version records sorted by their version numbers."""
+        return sorted(
+            (record for key, record in self.read().items() if key not in self.pointer_keys),
+            key=lambda record: record["version_number"],
+        )
+
+    def get_pointer(self, name):
+        """Return the pointer record of the live or promoted version.
+
+        Args:
+            name (str): 'live' or 'promoted'.
+
+        Returns:
+            dict or None: The pointer record.
+        """
+        return self.read().get(name)
+
+    @staticmethod
+    def pointer_record(name, publish_version):
+        """Create the pointer record of the live or promoted version.
+
+        Args:
+            name (str): 'live' or 'promoted'.
+            publish_version (PublishVersion): The publish version.
+        """
+        return {
+            "version_number": name,
+            "publish_id": publish_version.publish_id,
+            "version": publish_version.version,
+        }
+
+
 class WorkVersion(LocalizeMixin):
     """WorkVersion object class.
 
@@ -4,24 +4,77 @@
 
 import socket
 import shutil
+from collections.abc import Sequence
 from pathlib import Path
 
 from tik_manager4.core.constants import ObjectType
 from tik_manager4.dcc.standalone.main import Dcc as StandaloneDcc
 from tik_manager4.core.settings import Settings
 from tik_manager4.core import filelog
+from tik_manager4.core import io
 from tik_manager4.objects.publish import Publish
-from tik_manager4.objects.version import WorkVersion
+from tik_manager4.objects.version import WorkVersion, WorkVersionRecord
 from tik_manager4.mixins.localize import LocalizeMixin
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
 
+class WorkVersions(Sequence):
+    """Read-only list of work versions created on access.
+
+    Serves the versions of a work from its compact records. The
+    WorkVersion objects are created only for the accessed items.
+    """
+
+    def __init__(self, work, indices):
+        """Initialize the list.
+
+        Args:
+            work (Work): The work object.
+            indices (list): Indices of the records in the list.
+        """
+        self._work = work
+        self._indices = indices
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._work._version_at(idx) for idx in self._indices[item]]  # pylint: disable=protected-access
+        return self._work._version_at(self._indices[item])  # pylint: disable=protected-access
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} versions of {self._work.name})"
+
+
+class SceneIndex(io.RecordFile):
+    """Index of the work version scenes in a category folder.
+
+    Maps the scene paths of the work versions (relative to the category,
+    e.g. 'test_work/test_work_v001.ma') to the work file, work id,
+    version number and task id. The origin and localized copies of a
+    scene share the same scene path, so both resolve through the index.
+    """
+
+    file_name = "scene_index.json"
+
+    def __init__(self, folder):
+        """Initialize the index.
+
+        Args:
+            folder (str): The category folder in the database.
+        """
+        super().__init__(Path(folder, self.file_name), "scenes", "scene_path")
+
+
 class Work(Settings, LocalizeMixin):
     """Work object to handle works and publishes."""
 
     _standalone_handler = StandaloneDcc()
     object_type = ObjectType.WORK
+    # number of journal records after which the journal is folded into the file.
+    journal_limit = 100
 
     def __init__(self, absolute_path, name=None, path=None, parent_task=None):
         """Initialize the Work object.
@@ -33,6 +86,11 @@ class Work(Settings, LocalizeMixin):
             parent_task (Task): Parent task object.
         """
         super(Work, self).__init__()
+        self._journal = io.Journal(absolute_path, "versions", "version_number")
+        self._records = []  # compact records of the versions
+        self._version_objects = {}  # record index => created WorkVersion
+        self._unsaved = set()  # record indices of the new versions
+        self._scene_index = None
         self.settings_file = Path(absolute_path)
         self._dcc_handler = self.guard.dcc_handler
         self._name = name
@@ -40,7 +98,6 @@ class Work(Settings, LocalizeMixin):
         self._category = None
         self._dcc = self.guard.dcc
         self._dcc_version = None
-        self._versions = []
         self._work_id = self._id
         self._task_name = None
         self._task_id = None
@@ -59,6 +116,18 @@ class Work(Settings, LocalizeMixin):
         self.init_publish()
 
 
+    def initialize(self, data):
+        """Initialize the settings data without copying the versions.
+
+        Args:
+            data (dict): The data to initialize the settings with.
+        """
+        data = dict(data or {})
+        version_dicts = data.pop("versions", None)
+        super(Work, self).initialize(data)
+        if version_dicts is not None:
+            self._current_value["versions"] = version_dicts
+
     def init_properties(self):
         """Initialize the properties of the work from the inherited dictionary."""
         self._name = self.get_property("name", self._name)
@@ -70,11 +139,142 @@ class Work(Settings, LocalizeMixin):
         self._task_name = self.get_property("task_name", self._task_name)
         self._task_id = self.get_property("task_id")
         self._relative_path = self.get_property("path", self._relative_path)
-        self._versions = [WorkVersion(self._relative_path, version, self) for version in self.get_property("versions", [])]
+        # versions are kept as records, not in the settings data.
+        self._original_value.pop("versions", None)
+        data = {"versions": self._current_value.pop("versions", None) or []}
+        self._journal.merge(data, self._journal.read())
+        self._records = [WorkVersionRecord.from_dict(version) for version in data["versions"]]
+        self._version_objects = {}
+        self._unsaved = set()
         self._software_version = self.get_property("softwareVersion")
         self._state = self.get_property("state", self._state)
         # keeping the 'working' state for backward compatibility.
 
+    def _version_at(self, idx):
+        """Return the version object of the record at the index.
+
+        Args:
+            idx (int): Index of the record.
+
+        Returns:
+            WorkVersion: The version object. Created on the first access.
+        """
+        version_obj = self._version_objects.get(idx)
+        if version_obj is None:
+            version_obj = WorkVersion(
+                self._relative_path, self._records[idx].to_dict(), self
+            )
+            self._version_objects[idx] = version_obj
+        return version_obj
+
+    def _is_deleted(self, idx):
+        """Check if the version at the index is deleted."""
+        version_obj = self._version_objects.get(idx)
+        if version_obj is not None:
+            return version_obj.deleted
+        return self._records[idx].deleted
+
+    def _add_version(self, version_obj):
+        """Add a new version object to the work."""
+        idx = len(self._records)
+        self._records.append(WorkVersionRecord.from_dict(version_obj.to_dict()))
+        self._version_objects[idx] = version_obj
+        self._unsaved.add(idx)
+
+    @property
+    def scene_index(self):
+        """Scene index of the category folder of the work."""
+        if self._scene_index is None:
+            self._scene_index = SceneIndex(self.settings_file.parent)
+        return self._scene_index
+
+    def get_scene_records(self, records=None):
+        """Return the scene index records of the versions.
+
+        Args:
+            records (list, optional): WorkVersionRecord objects. Defaults to
+                all versions.
+
+        Returns:
+            list: The scene index records.
+        """
+        work_file = self.settings_file.name
+        return [
+            {
+                "scene_path": record.scene_path,
+                "work": work_file,
+                "work_id": self._work_id,
+                "version": record.version_number,
+                "task_id": self._task_id,
+            }
+            for record in (self._records if records is None else records)
+            if record.scene_path
+        ]
+
+    def index_scenes(self):
+        """Add the scenes of all versions to the scene index."""
+        self.scene_index.update(self.get_scene_records())
+
+    def _changed_versions(self):
+        """Return the new and edited versions.
+
+        Only the created version objects can be edited, the others are
+        compared with nothing.
+
+        Returns:
+            list: (record index, version dictionary) tuples.
+        """
+        changed = []
+        for idx, version_obj in sorted(self._version_objects.items()):
+            version_dict = version_obj.to_dict()
+            if idx in self._unsaved or version_dict != self._records[idx].to_dict():
+                changed.append((idx, version_dict))
+        return changed
+
+    def _mark_saved(self, changed):
+        """Update the records of the saved versions.
+
+        Args:
+            changed (list): (record index, version dictionary) tuples.
+        """
+        new_records = []
+        for idx, version_dict in changed:
+            self._records[idx] = WorkVersionRecord.from_dict(version_dict)
+            if idx in self._unsaved:
+                new_records.append(self._records[idx])
+        self._unsaved.clear()
+        # the scenes of the new versions are indexed with the same save.
+        scene_records = self.get_scene_records(new_records)
+        if scene_records:
+            self.scene_index.update(scene_records)
+
+    def _discard_unsaved(self):
+        """Remove the new versions which are not saved yet."""
+        for idx in sorted(self._unsaved, reverse=True):
+            del self._records[idx]
+            self._version_objects.pop(idx, None)
+        self._unsaved.clear()
+
+    def _merge_journal_records(self, records):
+        """Upsert the version records appended to the journal by others.
+
+        Args:
+            records (list): Version dictionaries.
+        """
+        if not records:
+            return
+        positions = {record.version_number: idx for idx, record in enumerate(self._records)}
+        for version_dict in records:
+            idx = positions.get(version_dict.get("version_number"))
+            if idx is None:
+                positions[version_dict.get("version_number")] = len(self._records)
+                self._records.append(WorkVersionRecord.from_dict(version_dict))
+                continue
+            self._records[idx] = WorkVersionRecord.from_dict(version_dict)
+            version_obj = self._version_objects.get(idx)
+            if version_obj is not None:
+                version_obj.from_dict(self._records[idx].to_dict())
+
     def init_publish(self):
         self.publish = Publish(
             self
@@ -137,17 +337,19 @@ class Work(Settings, LocalizeMixin):
     def versions(self):
         """Versions of the work in a list."""
         # filter out the deleted versions
-        return [version for version in self._versions if not version.deleted]
+        return WorkVersions(
+            self, [idx for idx in range(len(self._records)) if not self._is_deleted(idx)]
+        )
 
     @property
     def all_versions(self):
         """All versions of the work including deleted ones."""
-        return self._versions
+        return WorkVersions(self, range(len(self._records)))
 
     @property
     def version_count(self):
         """Total number of versions belonging to the work."""
-        return len(self._versions)
+        return len(self._records)
 
     @property
     def deleted(self):
@@ -156,8 +358,8 @@ class Work(Settings, LocalizeMixin):
 
     def has_valid_versions(self):
         """Check if the work has at least one valid version."""
-        for version in self._versions:
-            if not version.deleted:
+        for idx in range(len(self._records)):
+            if not self._is_deleted(idx):
                 return True
         return False
 
@@ -167,6 +369,10 @@ class Work(Settings, LocalizeMixin):
         self._task_id = task_obj.id
         self._task_name = task_obj.name
 
+    def is_modified(self):
+        """Check if the file or its journal has been modified since initialization."""
+        return super(Work, self).is_modified() or self._journal.is_modified()
+
     def reload(self):
         """Reload the work from file."""
         self.__init__(
@@ -191,9 +397,8 @@ class Work(Settings, LocalizeMixin):
     def get_last_version(self):
         """Return the last version of the work."""
         # First try to get the last version from the versions list. If not found, return 0.
-        if self._versions:
-            # return self._versions[-1].version
-            return self.all_versions[-1].version # same as _versions but more explicit
+        if self._records:
+            return self._records[-1].version_number
         else:
             return 0
 
@@ -203,9 +408,9 @@ class Work(Settings, LocalizeMixin):
         Args:
             version_number (int): Version number.
         """
-        for version in self._versions:
-            if version.version == version_number:
-                return version
+        for idx, record in enumerate(self._records):
+            if record.version_number == version_number:
+                return self._version_at(idx)
 
     def new_version_from_path(self, file_path, notes="", dry_version=False):
         """Register a given path (file or folder) as a new version of the work.
@@ -267,15 +472,102 @@ class Work(Settings, LocalizeMixin):
             "dcc_version": "NA",
         }
         version_obj = WorkVersion(self.path, version_dict, self)
-        self._versions.append(version_obj)
-        self.apply_settings()
+        self._add_version(version_obj)
+        try:
+            self.apply_settings()
+        except io.JournalConflict as exc:
+            LOG.error(f"Version {version_number} is created by another session. {exc}")
+            return -1
         return version_obj
 
     def apply_settings(self, force=False):
-        """Override the apply settings to add version serialization before."""
-        self.edit_property("versions",
-                           [version.to_dict() for version in self._versions])
-        super(Work, self).apply_settings(force=force)
+        """Override the apply settings to add version serialization before.
+
+        If the work lives in a journaled database, the new and changed
+        versions are appended to the journal of the work instead of
+        rewriting the whole file.
+        """
+        changed = self._changed_versions()
+        if not force and not changed and not self.is_settings_changed():
+            return
+        if not force and io.is_journaled(self.settings_file):
+            if self._append_to_journal(changed):
+                return
+        versions = [
+            self._version_objects[idx].to_dict() if idx in self._version_objects
+            else record.to_dict() for idx, record in enumerate(self._records)
+        ]
+        self._current_value["versions"] = versions
+        try:
+            super(Work, self).apply_settings(force=True)
+        finally:
+            # a deferred write keeps the written dictionary.
+            self._current_value.pop("versions", None)
+            self._original_value = {
+                key: value for key, value in self._original_value.items()
+                if key != "versions"
+            }
+        self._mark_saved(changed)
+
+    def _append_to_journal(self, changed):
+        """Append the new and changed versions to the journal.
+
+        Args:
+            changed (list): (record index, version dictionary) tuples.
+
+        Raises:
+            io.JournalConflict: If another session has appended one of the
+                new version numbers first. The new versions are discarded
+                and the versions of the other session are loaded instead.
+
+        Returns:
+            bool: True if the changes are saved, False if the whole file
+                needs to be written.
+        """
+        if self._time_stamp is None or self.is_settings_changed():
+            return False
+        if self._journal.count + len(changed) > self.journal_limit:
+            return False
+        records = [version_dict for _idx, version_dict in changed]
+        new_numbers = [
+            version_dict["version_number"] for idx, version_dict in changed
+            if idx in self._unsaved
+        ]
+        try:
+            others = self._journal.append(
+                records, base_modified_time=self._time_stamp, new_ids=new_numbers
+            )
+        except io.JournalConflict as exc:
+            self._discard_unsaved()
+            self._merge_journal_records(exc.records)
+            raise
+        if others is None:
+            # rewritten by another process since.
+            return False
+        self._mark_saved(changed)
+        # the own edits are appended after the others. Keep them.
+        own_numbers = {record["version_number"] for record in records}
+        self._merge_journal_records(
+            [record for record in others
+             if record.get("version_number") not in own_numbers]
+        )
+        return True
+
+    def _write(self, data):
+        """Write the data and fold the journal into the file if there is one.
+
+        Args:
+            data (dict): The data to write.
+        """
+        if not self._journal.exists():
+            super(Work, self)._write(data)
+            return
+        self._merge_journal_records(self._journal.compact(data))
+        self._time_stamp = self._io.get_modified_time()
+
+    def compact_journal(self):
+        """Fold the journal of the work into the work file."""
+        self.apply_settings(force=True)
 
     def new_version(self, file_format=None, notes="", ignore_checks=True, from_selection=False):
         """Create a new version of the work.
@@ -356,8 +648,12 @@ class Work(Settings, LocalizeMixin):
             version_dict["localized"] = is_localized
             version_dict["localized_path"] = output_path
         version_obj = WorkVersion(self.path, version_dict, self)
-        self._versions.append(version_obj)
-        self.apply_settings()
+        self._add_version(version_obj)
+        try:
+            self.apply_settings()
+        except io.JournalConflict as exc:
+            LOG.error(f"Version {version_number} is created by another session. {exc}")
+            return -1
         self._dcc_handler.post_save()
         return version_obj
 
@@ -464,8 +760,8 @@ class Work(Settings, LocalizeMixin):
                 return False, msg
             else:
                 # check creators for all versions
-                for version in self._versions:
-                    if version.user != self.guard.user:
+                for record in self._records:
+                    if record.user != self.guard.user:
                         msg = (
                             "You do not have the permission to delete this work.\n"
                             "There are other versions created by other user(s).\n"
@@ -66,6 +66,7 @@ class Feedback:
     def __init__(self, parent=None):
         self.parent = parent
         self.result = None
+        self._progress_dialog = None
 
     def pop_info(
         self,
@@ -171,6 +172,27 @@ class Feedback:
                 self.result = key
                 return key
 
+    def show_progress(self, progress, label: str = "Copying") -> None:
+        """Shows the progress of a file transfer in a progress dialog.
+
+        Can be passed as the progress callback of the file transfers. The
+        dialog is closed when all the files are transferred.
+        """
+        if self._progress_dialog is None:
+            self._progress_dialog = QtWidgets.QProgressDialog(label, None, 0, 100, self.parent)
+            self._progress_dialog.setWindowTitle(label)
+            self._progress_dialog.setMinimumDuration(500)
+            self._progress_dialog.setAutoClose(False)
+        self._progress_dialog.setLabelText(
+            f"{label}: {progress.done_files}/{progress.total_files} files"
+        )
+        self._progress_dialog.setValue(int(progress.percent))
+        QtWidgets.QApplication.processEvents()
+        if progress.done_files == progress.total_files:
+            self._progress_dialog.close()
+            self._progress_dialog.deleteLater()
+            self._progress_dialog = None
+
     def browse_directory(self, modal: bool = True) -> Optional[str]:
         """Browse for a directory. Deprecated: Consider moving to a utility function."""
         dlg = QtWidgets.QFileDialog(parent=self.parent)
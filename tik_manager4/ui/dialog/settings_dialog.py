@@ -5,7 +5,7 @@ import sys  # This is required for the 'frozen' attribute DO NOT REMOVE
 from pathlib import Path
 import logging
 
-from tik_manager4.core.constants import DataTypes, BranchingModes
+from tik_manager4.core.constants import DataTypes, BranchingModes, MaterializationModes
 
 from tik_manager4.ui.Qt import QtWidgets, QtCore
 from tik_manager4.ui.widgets.validated_string import ValidatedString
@@ -480,7 +480,65 @@ class SettingsDialog(QtWidgets.QDialog):
                            "Active branches are overwritten duplicates of specific published versions.\n"
                            "Passive branches method won't overwrite the branch but still keep\n"
                            "track of the versions that the branches are originated from.\n",
-            }
+            },
+            "branch_materialization": {
+                "display_name": "Branch Materialization",
+                "type": DataTypes.COMBO.value,
+                "items": [mode.value for mode in MaterializationModes],
+                "value": self.main_object.project.settings.get_property(
+                    "branch_materialization", MaterializationModes.COPY.value),
+                "tooltip": "How the elements of the active LIVE and PRO branches are created.\n"
+                           "Copy: Duplicates the published files.\n"
+                           "Reflink: Copy-on-write clones, on the file systems supporting it.\n"
+                           "Hardlink: Links the published files. Requires the same volume.\n"
+                           "Symlink: Relative links to the published files or folders.\n"
+                           "Auto: Reflink, then Hardlink.\n"
+                           "Unsupported methods fall back to Copy.\n",
+            },
+            "deduplicate_publishes": {
+                "display_name": "Deduplicate Publishes",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("deduplicate_publishes", False),
+                "tooltip": "Keeps the published files in a content addressed store under the project.\n"
+                           "Files identical to the previously published ones are stored once and\n"
+                           "linked. Requires hard link support on the project volume.\n"
+                           "The Copy branch materialization still copies the files. Use the\n"
+                           "Hardlink branch materialization to link them as well.\n",
+            },
+            "background_post_publish": {
+                "display_name": "Background Post Publish",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("background_post_publish", False),
+                "tooltip": "Runs the publish steps which do not need the open scene in the background.\n"
+                           "Preview conversion, management upload, write protection and LIVE\n"
+                           "materialization continue after the publish dialog returns.\n"
+                           "The states are shown on the versions and failed steps can be retried.\n",
+            },
+            "persistent_index": {
+                "display_name": "Persistent Index",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("persistent_index", True),
+                "tooltip": "Store the task index of the project in the database.\n"
+                           "Speeds up finding tasks by id or name on large projects.\n",
+            },
+            "compact_database": {
+                "display_name": "Compact Database Files",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("compact_database", False),
+                "tooltip": "Write the database files without indentation.\n"
+                           "Smaller files which are faster to read and write on large projects.\n"
+                           "Takes effect the next time the project is set.\n",
+            },
+            "work_version_journal": {
+                "display_name": "Work Version Journal",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("work_version_journal", False),
+                "tooltip": "Append the new and edited work versions to a journal next to the work file\n"
+                           "instead of rewriting the whole work file on every save.\n"
+                           "Journals are folded into the work files periodically and are read\n"
+                           "in both modes, so the setting can be switched any time.\n"
+                           "Takes effect the next time the project is set.\n",
+            },
         }
 
         # fill the content
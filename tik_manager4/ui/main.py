@@ -28,7 +28,7 @@ import tik_manager4
 import tik_manager4._version as version
 from tik_manager4.core.constants import ValidationResult, ValidationState
 from tik_manager4 import management
-from tik_manager4.core import utils
+from tik_manager4.core import profiler, utils
 from tik_manager4.management.exceptions import SyncError
 from tik_manager4.ui import pick
 from tik_manager4.ui.Qt import QtWidgets, QtCore, QtGui
@@ -60,11 +60,16 @@ WINDOW_NAME = f"Tik Manager {version.__version__}"
 
 
 def launch(dcc="Standalone", dont_show=False):
-    """Launch the main UI."""
+    """Launch the main UI.
+
+    The steps which are not needed to show the window are run right after
+    the first paint.
+    """
     window_name = f"Tik Manager {version.__version__} - {dcc}"
     all_widgets = QtWidgets.QApplication.allWidgets()
-    tik = tik_manager4.initialize(dcc)
+    tik = tik_manager4.initialize(dcc, deferred=True)
     if tik.dcc.custom_launcher:
+        tik.finish_startup()
         return tik.dcc.launch(tik, window_name=window_name, dont_show=dont_show)
     parent = tik.dcc.get_main_window()
     for entry in all_widgets:
@@ -76,9 +81,14 @@ def launch(dcc="Standalone", dont_show=False):
             pass
     app = QtWidgets.QApplication.instance()
     app.setAttribute(QtCore.Qt.AA_DontUseNativeMenuBar)
-    main_ui_obj = MainUI(tik, parent=parent, window_name=window_name)
-    if not dont_show:
-        main_ui_obj.show()
+    with profiler.phase("ui"):
+        main_ui_obj = MainUI(tik, parent=parent, window_name=window_name)
+    if dont_show:
+        tik.finish_startup()
+    else:
+        with profiler.phase("show"):
+            main_ui_obj.show()
+        QtCore.QTimer.singleShot(0, tik.finish_startup)
     return main_ui_obj
 
 
@@ -397,7 +407,7 @@ class MainUI(QtWidgets.QMainWindow):
         self.tasks_mcv.task_view.task_resurrected.connect(self.refresh_project)
 
         self.tasks_mcv.task_view.refresh_requested.connect(
-            self.subprojects_mcv.sub_view.get_tasks
+            lambda: self.subprojects_mcv.sub_view.get_tasks(force=True)
         )
         self.tasks_mcv.task_view.new_task_requested.connect(self.subprojects_mcv.sub_view.new_task)
 
@@ -1255,12 +1265,7 @@ class MainUI(QtWidgets.QMainWindow):
 if __name__ == "__main__":
     import sys
 
+    profiler.PROFILER.configure_from_args(sys.argv)
     app = QtWidgets.QApplication(sys.argv)
-    from time import time
-
-    start = time()
     launch()
-    end = time()
-    LOG.info("Took %s seconds", (end - start))
-    print("Took %s seconds", (end - start))
     sys.exit(app.exec_())
@@ -10,12 +10,20 @@ from tik_manager4.ui.dialog.work_dialog import NewVersionDialog
 from tik_manager4.ui.widgets.common import HorizontalSeparator, TikIconButton
 from tik_manager4.ui.widgets.style import ColorKeepingDelegate
 from tik_manager4.ui.mcv.filter import FilterModel, FilterWidget
+from tik_manager4.ui.mcv.loader import BackgroundLoader
+from tik_manager4.ui.mcv.object_model import (
+    TikModelItem,
+    TikObjectModel,
+    cached_color,
+    cached_font,
+    cached_icon,
+)
 
-from tik_manager4.ui import pick
 
 
-class TikWorkItem(QtGui.QStandardItem):
-    """Custom QStandardItem for the work items in the category view."""
+class TikWorkItem(TikModelItem):
+    """Item for the work objects in the category view."""
+    __slots__ = ()
     state_color_dict = {
         "active": (255, 255, 0),
         # "working": (255, 255, 0),
@@ -24,64 +32,39 @@ class TikWorkItem(QtGui.QStandardItem):
         "promoted": (0, 255, 0),
     }
 
-    def __init__(self, work_obj):
-        """Initialize the item with the given work object.
-        Args:
-            work_obj (tik_manager4.object.work.Work):
-                The work object to be represented by this item.
-        """
-        super(TikWorkItem, self).__init__()
-
-        self.tik_obj = work_obj
-        #
-        self.fnt = QtGui.QFont("Open Sans", 10)
-        self.fnt.setBold(False)
-
-        self.setEditable(False)
-
-        self.setFont(self.fnt)
-        self.setText(work_obj.name)
-        self.state = None
-        self.refresh()
-        self.setIcon(pick.icon(self.tik_obj.dcc.lower()))
-
-
-    def refresh(self):
-        """Refresh the item state."""
-        self.set_state(self.tik_obj.state)
+    @property
+    def state(self):
+        """The state of the work."""
+        return self.tik_obj.state
 
-    def set_state(self, state):
-        """Define the state of the work item.
-        Args:
-            state (str): The state of the work item.
-                Possible values are:
-                    "active": The work is currently being worked on.
-                    "published": The work is published.
-                    "omitted": The work is omitted.
-                    "promoted": The work is promoted.
-        """
-        self.state = state
+    def foreground(self):
+        """Return the text color of the item."""
         if self.tik_obj.deleted:
             _state_color = (255, 0, 0)
         else:
-            _state_color = self.state_color_dict.get(state, (255, 255, 0))
-        # cross out omitted items
-        self.fnt.setStrikeOut(state == "omitted")
-        self.setFont(self.fnt)
-        # if the work not saved with the same dcc of the current dcc, make it italic
+            _state_color = self.state_color_dict.get(self.state, (255, 255, 0))
+        # if the work not saved with the same dcc of the current dcc, dim it
         if not self.dcc_check():
-            self.fnt.setItalic(True)
-            self.setFont(self.fnt)
             _state_color = tuple(int(x * 0.5) for x in _state_color)
-        self.setForeground(QtGui.QColor(*_state_color))
+        return _state_color
+
+    def font(self):
+        """Return the font of the item."""
+        # cross out omitted items, italic if the dcc is not matching
+        return cached_font(10, italic=not self.dcc_check(), strike_out=self.state == "omitted")
+
+    def icon(self):
+        """Return the icon of the item."""
+        return cached_icon(self.tik_obj.dcc.lower())
 
     def dcc_check(self):
         """Check if the dcc of the work matches the dcc of the current session."""
         return self.tik_obj.dcc.lower() == self.tik_obj.guard.dcc.lower()
 
 
-class TikPublishItem(QtGui.QStandardItem):
-    """Custom QStandardItem for the publish items in the category view."""
+class TikPublishItem(TikWorkItem):
+    """Item for the publish objects in the category view."""
+    __slots__ = ()
     state_color_dict = {
         "active": (0, 255, 255),
         "published": (0, 255, 255),
@@ -89,89 +72,61 @@ class TikPublishItem(QtGui.QStandardItem):
         "promoted": (0, 255, 0),
     }
 
-    def __init__(self, publish_obj):
-        """Initialize the item with the given publish object.
-        Args:
-            publish_obj (tik_manager4.object.publish.Publish):
-                The publish object to be represented by this item.
-        """
-        super(TikPublishItem, self).__init__()
-
-        self.tik_obj = publish_obj
-
-        self.fnt = QtGui.QFont("Open Sans", 10)
-        self.fnt.setBold(False)
-        self.setEditable(False)
-
-        self.setFont(self.fnt)
-        self.setText(str(publish_obj.name))
-        self.state = None
-        self.setIcon(pick.icon("published"))
-        self.refresh()
-
-    def refresh(self):
-        """Refresh the item state."""
-        self.set_state(self.tik_obj.state)
-
-    def set_state(self, state):
-        """Define the state of the publish item.
-        Args:
-            state (str): The state of the publish item.
-                Possible values are:
-                    "active": The work is currently being worked on.
-                    "published": The work is published.
-                    "omitted": The work is omitted.
-                    "promoted": The work is promoted.
-        Returns:
-
-        """
-        self.state = state
-        if self.tik_obj.deleted:
-            _state_color = (255, 0, 0)
-        else:
-            _state_color = self.state_color_dict.get(state, (255, 255, 0))
-        # cross out omitted items
-        self.fnt.setStrikeOut(state == "omitted")
-        self.setFont(self.fnt)
-        # if the work not saved with the same dcc of the current dcc, make it italic
-        if not self.dcc_check():
-            self.fnt.setItalic(True)
-            self.setFont(self.fnt)
-            _state_color = tuple(int(x * 0.5) for x in _state_color)
-        self.setForeground(QtGui.QColor(*_state_color))
+    def icon(self):
+        """Return the icon of the item."""
+        return cached_icon("published")
 
     def dcc_check(self):
         """Check if the dcc of the work matches the dcc of the current session."""
         return self.tik_obj.dcc == self.tik_obj.guard.dcc
 
 
-class TikCategoryColumnItem(QtGui.QStandardItem):
-    """Custom QStandardItem for the category columns in the category view."""
-    def __init__(self, text):
-        """Initialize the item with the given text.
-        Args:
-            text (str): The text to be displayed in the item.
-        """
-        super(TikCategoryColumnItem, self).__init__(text)
-        self.setEditable(False)
-
-
-class TikCategoryModel(QtGui.QStandardItemModel):
-    """Custom QStandardItemModel for the category view."""
+class TikCategoryModel(TikObjectModel):
+    """Item model for the works and publishes of a category."""
     columns = ["name", "id", "path", "creator", "dcc", "date", "version count"]
 
     def __init__(self):
         """Initialize the model."""
         super(TikCategoryModel, self).__init__()
         self.purgatory_mode = False
-        self.setHorizontalHeaderLabels(self.columns)
 
         self._works = []
         self._publishes = []
 
-    def clear(self):
-        """Clear the model."""
-        self.setRowCount(0)
+    def item_data(self, item, column, role):
+        """Return the data of the work or publish for the given column and role."""
+        if role == QtCore.Qt.DisplayRole:
+            return self._display_text(item, column)
+        if column != 0:
+            return None
+        if role == QtCore.Qt.ForegroundRole:
+            return cached_color(item.foreground())
+        if role == QtCore.Qt.FontRole:
+            return item.font()
+        if role == QtCore.Qt.DecorationRole:
+            return item.icon()
+        return None
+
+    @staticmethod
+    def _display_text(item, column):
+        """Format the text of the given column."""
+        tik_obj = item.tik_obj
+        is_publish = isinstance(item, TikPublishItem)
+        if column == 0:
+            return str(tik_obj.name)
+        if column == 1:
+            return str(tik_obj.publish_id if is_publish else tik_obj.id)
+        if column == 2:
+            return tik_obj.path
+        if column == 3:
+            return "NA" if is_publish else tik_obj.creator
+        if column == 4:
+            return tik_obj.dcc
+        if column == 5:
+            if is_publish:
+                return "NA"
+            return datetime.fromtimestamp(tik_obj.date_modified).strftime("%Y/%m/%d %H:%M:%S")
+        return str(tik_obj.version_count)
 
     def set_works(self, works_list):
         """Set the works to the model.
@@ -179,7 +134,7 @@ class TikCategoryModel(QtGui.QStandardItemModel):
             works_list (list): A list of work objects.
         """
         # TODO: validate
-        self._works = works_list
+        self._works = list(works_list)
         self.populate()
 
     def set_publishes(self, publishes_list):
@@ -187,9 +142,25 @@ class TikCategoryModel(QtGui.QStandardItemModel):
         Args:
             publishes_list (list): A list of publish objects.
         """
-        self._publishes = publishes_list
+        self._publishes = list(publishes_list)
         self.populate(publishes=True)
 
+    def add_works(self, works_list):
+        """Append the works to the model without clearing it.
+        Args:
+            works_list (list): A list of work objects.
+        """
+        self._works.extend(works_list)
+        self.append_rows([TikWorkItem(work) for work in works_list])
+
+    def add_publishes(self, publishes_list):
+        """Append the publishes to the model without clearing it.
+        Args:
+            publishes_list (list): A list of publish objects.
+        """
+        self._publishes.extend(publishes_list)
+        self.append_rows([TikPublishItem(publish) for publish in publishes_list])
+
     def populate(self, publishes=False):
         """Populate the model with the works or publishes.
         Args:
@@ -198,11 +169,9 @@ class TikCategoryModel(QtGui.QStandardItemModel):
         """
         self.clear()
         if not publishes:
-            for work in self._works:
-                self.append_work(work)
+            self.append_rows([TikWorkItem(work) for work in self._works])
         else:
-            for publish in self._publishes:
-                self.append_publish(publish)
+            self.append_rows([TikPublishItem(publish) for publish in self._publishes])
 
     def append_publish(self, publish):
         """Append a publish to the model.
@@ -213,17 +182,7 @@ class TikCategoryModel(QtGui.QStandardItemModel):
             TikPublishItem: The item that represents the publish
                 in the model.
         """
-        _item = TikPublishItem(publish)
-        pid = TikCategoryColumnItem(str(publish.publish_id))
-        path = TikCategoryColumnItem(publish.path)
-        creator = TikCategoryColumnItem("NA")
-        dcc = TikCategoryColumnItem(publish.dcc)
-        date = TikCategoryColumnItem("NA")
-        version_count = TikCategoryColumnItem(str(publish.version_count))
-
-        self.appendRow([_item, pid, path, creator, dcc, date, version_count])
-
-        return _item
+        return self.appendRow(TikPublishItem(publish))
 
     def append_work(self, work):
         """Append a work to the model.
@@ -234,19 +193,7 @@ class TikCategoryModel(QtGui.QStandardItemModel):
             TikWorkItem: The item that represents the work
                 in the model.
         """
-        _item = TikWorkItem(work)
-        pid = TikCategoryColumnItem(str(work.id))
-        path = TikCategoryColumnItem(work.path)
-        creator = TikCategoryColumnItem(work.creator)
-        dcc = TikCategoryColumnItem(work.dcc)
-        date = TikCategoryColumnItem(
-            datetime.fromtimestamp(work.date_modified).strftime("%Y/%m/%d %H:%M:%S")
-        )
-        version_count = TikCategoryColumnItem(str(work.version_count))
-
-        self.appendRow([_item, pid, path, creator, dcc, date, version_count])
-
-        return _item
+        return self.appendRow(TikWorkItem(work))
 
 
 class TikCategoryView(QtWidgets.QTreeView):
@@ -311,6 +258,40 @@ class TikCategoryView(QtWidgets.QTreeView):
 
         self.expandAll()
 
+        # works and publishes are collected on a worker thread.
+        self.loader = BackgroundLoader(parent=self)
+        self.loader.batch_loaded.connect(self._append_batch)
+        self.loader.loading_finished.connect(self.expandAll)
+        self._loading_publishes = False
+
+    def load_items(self, function, *args, publishes=False, **kwargs):
+        """Clear the model and load the items collected by the function.
+
+        The function is called on a worker thread. Any running load is
+        cancelled.
+
+        Args:
+            function (callable): Function returning the works or publishes.
+            *args: Positional arguments of the function.
+            publishes (bool, optional): If True, the items are publishes.
+            **kwargs: Keyword arguments of the function.
+        """
+        self.loader.cancel()
+        self._loading_publishes = publishes
+        self.model.clear()
+        if publishes:
+            self.model._publishes = []
+        else:
+            self.model._works = []
+        self.loader.start(function, *args, **kwargs)
+
+    def _append_batch(self, items):
+        """Append a batch of loaded items to the model."""
+        if self._loading_publishes:
+            self.model.add_publishes(items)
+        else:
+            self.model.add_works(items)
+
     def dragEnterEvent(self, event):
         """Override the drag enter event to accept file drops."""
         if event.mimeData().hasUrls():
@@ -343,6 +324,7 @@ class TikCategoryView(QtWidgets.QTreeView):
         Returns:
             bool: True if the item is found and selected, False otherwise.
         """
+        self.loader.wait()
         for row in range(self.model.rowCount()):
             idx = self.model.index(row, 1)
             if idx.data() == str(unique_id):
@@ -872,7 +854,21 @@ class TikCategoryWidget(QtWidgets.QWidget):
 
         self.pre_tab = None
 
-        self.refresh_btn.clicked.connect(lambda: self.refresh())
+        self.refresh_btn.clicked.connect(lambda: self.refresh(force=True))
+        self.work_tree_view.loader.loading_started.connect(lambda: self.set_loading_state(True))
+        self.work_tree_view.loader.progress.connect(lambda count: self.set_loading_state(True, count))
+        self.work_tree_view.loader.loading_finished.connect(lambda: self.set_loading_state(False))
+
+    def set_loading_state(self, state, count=0):
+        """Show the loading state on the header.
+        Args:
+            state (bool): Whether the items are loading or not.
+            count (int, optional): Number of items loaded so far.
+        """
+        if not state:
+            self.label.setText("Works")
+            return
+        self.label.setText(f"Works (loading {count}...)" if count else "Works (loading...)")
 
     def set_purgatory_mode(self, state):
         """Set the show all state.
@@ -943,8 +939,7 @@ class TikCategoryWidget(QtWidgets.QWidget):
         # clear the layout
         self.category_tab_widget.blockSignals(True)
         self.category_tab_widget.clear()
-        for key, category in categories.items():
-            category.scan_works()
+        for key in categories:
             self.pre_tab = QtWidgets.QWidget()
             self.pre_tab.setObjectName(key)
             self.category_tab_widget.addTab(self.pre_tab, key)
@@ -965,10 +960,12 @@ class TikCategoryWidget(QtWidgets.QWidget):
         )
 
 
-    def on_category_change(self, index):
+    def on_category_change(self, index, force=False):
         """Update works and publishes when category changed.
         Args:
             index (int): The index of the category tab.
+            force (bool, optional): If True, the folders are scanned even if
+                they have not changed.
         """
         if not self.task:
             return
@@ -976,44 +973,59 @@ class TikCategoryWidget(QtWidgets.QWidget):
         self._last_category = self.category_tab_widget.tabText(index)
         if not self._last_category:
             return
-        if self._purgatory_mode:
-            works = self.task.categories[self._last_category].all_works
-        else:
-            works = self.task.categories[self._last_category].works
-        if self.mode == 0 and self._last_category:
-            self.work_tree_view.model.set_works(works.values())
+        category = self.task.categories[self._last_category]
+        if self.mode == 0:
+            self.work_tree_view.load_items(self._collect_works, category, force=force)
         else:
-            _publishes = self._collect_publishes(works)
-            self.work_tree_view.model.set_publishes(_publishes)
-
-    def _collect_publishes(self, works):
-        """Collect the publishes from the works."""
-        works_objects = works.values()
-        if not works_objects:
-            return []
-        for work_obj in works_objects:
-            work_obj.publish.scan_publish_versions()
+            self.work_tree_view.load_items(
+                self._collect_publishes, category, force=force, publishes=True
+            )
+
+    def _collect_works(self, category, force=False):
+        """Collect the works of the category. Runs on a worker thread.
+        Args:
+            category (tik_manager4.objects.category.Category): The category.
+            force (bool, optional): If True, the folders are scanned even if
+                they have not changed.
+        Returns:
+            list: The work objects.
+        """
+        category.scan_works(force=force)
         if self._purgatory_mode:
-            return [
-                work_obj.publish
-                for work_obj in works.values()
-                if work_obj.publish.all_versions
-            ]
-        else:
-            return [
-                work_obj.publish
-                for work_obj in works.values()
-                if work_obj.publish.versions
-            ]
+            return list(category.all_works.values())
+        return list(category.works.values())
+
+    def _collect_publishes(self, category, force=False):
+        """Yield the publishes of the category. Runs on a worker thread.
+        Args:
+            category (tik_manager4.objects.category.Category): The category.
+            force (bool, optional): If True, the folders are scanned even if
+                they have not changed.
+        Yields:
+            tik_manager4.objects.publish.Publish: The publish objects.
+        """
+        for work_obj in self._collect_works(category, force=force):
+            work_obj.publish.scan_publish_versions(force=force)
+            if self._purgatory_mode:
+                if work_obj.publish.all_versions:
+                    yield work_obj.publish
+            elif work_obj.publish.versions:
+                yield work_obj.publish
 
     @QtCore.Slot()
-    def refresh(self):
-        """Refresh the current category."""
+    def refresh(self, force=False):
+        """Refresh the current category.
+
+        Args:
+            force (bool, optional): If True, the folders are scanned even if
+                they have not changed.
+        """
         current_category_index = self.category_tab_widget.currentIndex()
-        self.on_category_change(current_category_index)
+        self.on_category_change(current_category_index, force=force)
 
     def clear(self):
         """Refresh the layout."""
+        self.work_tree_view.loader.cancel()
         self.category_tab_widget.blockSignals(True)
         self.category_tab_widget.clear()
         self.work_tree_view.model.clear()
@@ -0,0 +1,163 @@
+"""Background loader to populate the models without blocking the UI.
+
+The object-layer scans (tasks, works, publishes) can be slow on network
+storages. The loader iterates them on the global thread pool and streams the
+collected objects back to the main thread in batches.
+"""
+
+from collections import deque
+import threading
+
+from tik_manager4.ui.Qt import QtCore
+from tik_manager4.core import filelog
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+
+class _LoaderJob(QtCore.QRunnable):
+    """Runnable iterating the loader function on a worker thread."""
+
+    def __init__(self, loader, token, function, args, kwargs):
+        """Initialize the job.
+
+        Args:
+            loader (BackgroundLoader): The owner loader.
+            token (int): The token identifying the load request.
+            function (callable): Function returning an iterable of objects.
+            args (tuple): Positional arguments of the function.
+            kwargs (dict): Keyword arguments of the function.
+        """
+        super(_LoaderJob, self).__init__()
+        self.setAutoDelete(True)
+        self.loader = loader
+        self.token = token
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+
+    def run(self):
+        """Collect the objects and hand them over in batches."""
+        batch = []
+        error = None
+        try:
+            for obj in self.function(*self.args, **self.kwargs):
+                if self.cancelled.is_set():
+                    break
+                batch.append(obj)
+                if len(batch) >= self.loader.batch_size:
+                    self.loader.put(self.token, batch)
+                    batch = []
+        except Exception as exc:  # pylint: disable=broad-except
+            error = str(exc)
+            LOG.error(f"Background loading failed: {error}")
+        if batch and not self.cancelled.is_set():
+            self.loader.put(self.token, batch)
+        self.loader.put(self.token, None, error=error)
+        self.done.set()
+
+
+class BackgroundLoader(QtCore.QObject):
+    """Streams the objects collected on a worker thread to the main thread.
+
+    Only the last started load is delivered. Starting a new load cancels the
+    running one and the batches of the cancelled loads are dropped.
+    """
+
+    batch_loaded = QtCore.Signal(list)
+    loading_started = QtCore.Signal()
+    progress = QtCore.Signal(int)
+    loading_finished = QtCore.Signal()
+    loading_failed = QtCore.Signal(str)
+    _ready = QtCore.Signal()
+
+    def __init__(self, batch_size=50, parent=None):
+        """Initialize the loader.
+
+        Args:
+            batch_size (int, optional): Number of objects delivered at once.
+            parent (QtCore.QObject, optional): The parent object.
+        """
+        super(BackgroundLoader, self).__init__(parent)
+        self.batch_size = batch_size
+        self._token = 0
+        self._job = None
+        self._count = 0
+        self._results = deque()
+        self._ready.connect(self._deliver, QtCore.Qt.QueuedConnection)
+
+    @property
+    def is_loading(self):
+        """Whether there is a running load or not."""
+        return self._job is not None
+
+    def start(self, function, *args, **kwargs):
+        """Start collecting the objects on the thread pool.
+
+        Args:
+            function (callable): Function returning an iterable of objects.
+                It is called on a worker thread.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+        """
+        self.cancel()
+        self._token += 1
+        self._count = 0
+        self._job = _LoaderJob(self, self._token, function, args, kwargs)
+        self.loading_started.emit()
+        QtCore.QThreadPool.globalInstance().start(self._job)
+
+    def cancel(self):
+        """Cancel the running load. Its pending batches are dropped."""
+        if self._job is None:
+            return
+        self._job.cancelled.set()
+        self._job = None
+        self._token += 1
+        self.loading_finished.emit()
+
+    def wait(self, timeout=None):
+        """Block until the running load is finished and deliver the results.
+
+        Args:
+            timeout (float, optional): Seconds to wait. Waits until the end
+                of the load if not provided.
+
+        Returns:
+            bool: True if the load is finished, False if timed out.
+        """
+        job = self._job
+        if job is None:
+            return True
+        if not job.done.wait(timeout):
+            return False
+        self._deliver()
+        return True
+
+    def put(self, token, batch, error=None):
+        """Queue a batch for delivery. Called from the worker thread.
+
+        Args:
+            token (int): The token of the load.
+            batch (list or None): The objects. None marks the end of the load.
+            error (str, optional): The error message if the load failed.
+        """
+        self._results.append((token, batch, error))
+        self._ready.emit()
+
+    def _deliver(self):
+        """Emit the queued batches of the current load on the main thread."""
+        while self._results:
+            token, batch, error = self._results.popleft()
+            if token != self._token:
+                continue
+            if batch is not None:
+                self._count += len(batch)
+                self.batch_loaded.emit(batch)
+                self.progress.emit(self._count)
+                continue
+            self._job = None
+            if error:
+                self.loading_failed.emit(error)
+            self.loading_finished.emit()
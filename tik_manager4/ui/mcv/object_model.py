@@ -0,0 +1,284 @@
+"""Base item model backed directly by the objects of the object layer.
+
+The items only hold a reference to their object. Display data (texts,
+colors, fonts and icons) is computed on demand when the view asks for it,
+so the cost of populating a model does not depend on the number of columns.
+Children can be fetched lazily by overriding ``fetch_children``.
+"""
+
+from tik_manager4.ui.Qt import QtCore, QtGui
+from tik_manager4.core import utils
+from tik_manager4.ui import pick
+
+_ICONS = {}
+_FONTS = {}
+_COLORS = {}
+
+
+def cached_icon(icon_name):
+    """Return the icon with the given name, creating it only once."""
+    _icon = _ICONS.get(icon_name)
+    if _icon is None:
+        _icon = _ICONS[icon_name] = pick.icon(icon_name)
+    return _icon
+
+
+def cached_font(size, bold=False, italic=False, strike_out=False):
+    """Return the 'Open Sans' font with the given properties."""
+    key = (size, bold, italic, strike_out)
+    _font = _FONTS.get(key)
+    if _font is None:
+        _font = QtGui.QFont("Open Sans", size)
+        _font.setBold(bold)
+        _font.setItalic(italic)
+        _font.setStrikeOut(strike_out)
+        _FONTS[key] = _font
+    return _font
+
+
+def cached_color(rgba):
+    """Return the QColor for the given rgb(a) tuple."""
+    _color = _COLORS.get(rgba)
+    if _color is None:
+        _color = _COLORS[rgba] = QtGui.QColor(*rgba)
+    return _color
+
+
+class TikModelItem:
+    """Lightweight node of the object models.
+
+    Mimics the parts of the QStandardItem interface used by the views.
+    """
+
+    __slots__ = ("tik_obj", "model", "_parent", "children", "fetched")
+
+    def __init__(self, tik_obj):
+        """Initialize the item.
+
+        Args:
+            tik_obj (object): The object represented by the item.
+        """
+        self.tik_obj = tik_obj
+        self.model = None
+        self._parent = None
+        self.children = []
+        self.fetched = True
+
+    def parent(self):
+        """Return the parent item or None for the top level items."""
+        if self._parent is None or self._parent is self.model.invisible_root:
+            return None
+        return self._parent
+
+    def row(self):
+        """Return the row of the item under its parent."""
+        if self._parent is None:
+            return 0
+        return self._parent.children.index(self)
+
+    def child(self, row):
+        """Return the child item at the given row."""
+        return self.children[row]
+
+    def rowCount(self):  # pylint: disable=invalid-name
+        """Return the number of the fetched children."""
+        return len(self.children)
+
+    def index(self, column=0):
+        """Return the model index of the item."""
+        return self.model.indexFromItem(self, column)
+
+    def text(self):
+        """Return the display text of the first column."""
+        return self.model.item_data(self, 0, QtCore.Qt.DisplayRole)
+
+    def refresh(self):
+        """Notify the views that the object of the item changed."""
+        if self.model is not None:
+            self.model.item_changed(self)
+
+
+class TikObjectModel(QtCore.QAbstractItemModel):
+    """Item model computing the display data from the objects on demand."""
+
+    columns = []
+
+    def __init__(self, parent=None):
+        """Initialize the model."""
+        super(TikObjectModel, self).__init__(parent)
+        self.invisible_root = TikModelItem(None)
+        self.invisible_root.model = self
+
+    # Hooks for the subclasses
+
+    def item_data(self, item, column, role):
+        """Return the data of the item for the given column and role.
+
+        Args:
+            item (TikModelItem): The item.
+            column (int): The column index.
+            role (int): The Qt item data role.
+        """
+        return None
+
+    def fetch_children(self, item):
+        """Return the child items of a lazily populated item."""
+        return []
+
+    def has_unfetched_children(self, item):
+        """Check if a lazily populated item has children to fetch."""
+        return False
+
+    # QAbstractItemModel interface
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        """Return the index of the item at the given row and column."""
+        parent_item = self.itemFromIndex(parent) or self.invisible_root
+        if 0 <= row < len(parent_item.children) and 0 <= column < len(self.columns):
+            return self.createIndex(row, column, parent_item.children[row])
+        return QtCore.QModelIndex()
+
+    def parent(self, index=None):
+        """Return the parent index of the given index."""
+        if index is None:
+            # QObject.parent
+            return super(TikObjectModel, self).parent()
+        item = self.itemFromIndex(index)
+        if item is None:
+            return QtCore.QModelIndex()
+        return self.indexFromItem(item._parent)  # pylint: disable=protected-access
+
+    def rowCount(self, parent=QtCore.QModelIndex()):  # pylint: disable=invalid-name
+        """Return the number of fetched rows under the parent."""
+        if parent.isValid() and parent.column() > 0:
+            return 0
+        parent_item = self.itemFromIndex(parent) or self.invisible_root
+        return len(parent_item.children)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):  # pylint: disable=invalid-name
+        """Return the number of columns."""
+        return len(self.columns)
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):  # pylint: disable=invalid-name
+        """Check if the parent has children, fetched or not."""
+        if parent.isValid() and parent.column() > 0:
+            return False
+        parent_item = self.itemFromIndex(parent) or self.invisible_root
+        if not parent_item.fetched:
+            return self.has_unfetched_children(parent_item)
+        return bool(parent_item.children)
+
+    def canFetchMore(self, parent):  # pylint: disable=invalid-name
+        """Check if the children of the parent are not fetched yet."""
+        parent_item = self.itemFromIndex(parent) or self.invisible_root
+        return not parent_item.fetched
+
+    def fetchMore(self, parent):  # pylint: disable=invalid-name
+        """Fetch the children of the parent."""
+        parent_item = self.itemFromIndex(parent) or self.invisible_root
+        self.fetch_item(parent_item)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """Return the data for the index computed from the object."""
+        item = self.itemFromIndex(index)
+        if item is None:
+            return None
+        return self.item_data(item, index.column(), role)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):  # pylint: disable=invalid-name
+        """Return the column names as the header labels."""
+        if (orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole
+                and 0 <= section < len(self.columns)):
+            return self.columns[section]
+        return None
+
+    def flags(self, index):
+        """Items are selectable but not editable."""
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+    # Item interface
+
+    def itemFromIndex(self, index):  # pylint: disable=invalid-name
+        """Return the item of the given index or None."""
+        if index is None or not index.isValid() or index.model() is not self:
+            return None
+        return index.internalPointer()
+
+    def indexFromItem(self, item, column=0):  # pylint: disable=invalid-name
+        """Return the index of the given item."""
+        if item is None or item is self.invisible_root:
+            return QtCore.QModelIndex()
+        return self.createIndex(item.row(), column, item)
+
+    def item(self, row, column=0):
+        """Return the top level item at the given row."""
+        if 0 <= row < len(self.invisible_root.children):
+            return self.invisible_root.children[row]
+        return None
+
+    def fetch_item(self, item):
+        """Fetch the children of the item if they are not fetched yet."""
+        if item.fetched:
+            return
+        item.fetched = True
+        self.append_rows(self.fetch_children(item), item)
+
+    def append_rows(self, items, parent_item=None):
+        """Append the items under the parent item with a single insertion.
+
+        Args:
+            items (list): List of TikModelItem objects.
+            parent_item (TikModelItem, optional): The parent item. Defaults
+                to the invisible root.
+        """
+        if not items:
+            return
+        parent_item = parent_item or self.invisible_root
+        first = len(parent_item.children)
+        self.beginInsertRows(self.indexFromItem(parent_item), first, first + len(items) - 1)
+        for item in items:
+            item.model = self
+            item._parent = parent_item  # pylint: disable=protected-access
+        parent_item.children.extend(items)
+        self.endInsertRows()
+
+    def appendRow(self, item, parent_item=None):  # pylint: disable=invalid-name
+        """Append a single item under the parent item."""
+        self.append_rows([item], parent_item)
+        return item
+
+    def removeRow(self, row, parent=QtCore.QModelIndex()):  # pylint: disable=invalid-name
+        """Remove the item at the given row."""
+        parent_item = self.itemFromIndex(parent) or self.invisible_root
+        if not 0 <= row < len(parent_item.children):
+            return False
+        self.beginRemoveRows(parent, row, row)
+        parent_item.children.pop(row)
+        self.endRemoveRows()
+        return True
+
+    def clear(self):
+        """Remove all the items."""
+        self.beginResetModel()
+        self.invisible_root.children = []
+        self.endResetModel()
+
+    def setRowCount(self, count):  # pylint: disable=invalid-name
+        """Only clearing the model (count 0) is supported."""
+        if count == 0:
+            self.clear()
+
+    def iter_items(self):
+        """Yield all the fetched items depth first."""
+        for item, _parent, _depth in utils.walk_tree(
+                self.invisible_root, lambda item: item.children,
+                depth_first=True, include_root=False):
+            yield item
+
+    def item_changed(self, item):
+        """Emit the dataChanged signal for the whole row of the item."""
+        self.dataChanged.emit(
+            self.indexFromItem(item, 0), self.indexFromItem(item, len(self.columns) - 1)
+        )
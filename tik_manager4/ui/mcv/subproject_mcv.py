@@ -1,74 +1,47 @@
-from tik_manager4.ui.Qt import QtWidgets, QtCore, QtGui
+from tik_manager4.ui.Qt import QtWidgets, QtCore
 import tik_manager4.ui.dialog.subproject_dialog
 import tik_manager4.ui.dialog.task_dialog
 from tik_manager4.ui.widgets.common import HorizontalSeparator, TikIconButton
 from tik_manager4.ui.widgets.style import ColorKeepingDelegate
 from tik_manager4.ui.mcv.filter import FilterModel, FilterWidget
+from tik_manager4.ui.mcv.object_model import (
+    TikModelItem,
+    TikObjectModel,
+    cached_color,
+    cached_font,
+    cached_icon,
+)
 from tik_manager4.ui.dialog.feedback import Feedback
 import tik_manager4
-from tik_manager4.ui import pick
+from tik_manager4.core import utils
 
 
-class TikSubItem(QtGui.QStandardItem):
-    def __init__(self, sub_obj):
-        super(TikSubItem, self).__init__()
-
-        self.subproject = sub_obj
-        self.setText(sub_obj.name)
-        self.refresh()
-
-    def refresh(self):
-        if self.subproject.deleted:
-            self.setForeground(QtGui.QColor(255, 0, 0))
-            self.setFont(QtGui.QFont("Open Sans", 12, italic=True))
-            _icon = pick.icon(f"{self.subproject.type}-ghost.png")
-            self.setIcon(_icon)
-        else:
-            self.setForeground(QtGui.QColor(255, 255, 255))
-            self.setFont(QtGui.QFont("Open Sans", 12, italic=False))
-            _icon = pick.icon(f"{self.subproject.type}.png")
-            self.setIcon(_icon)
-
+class TikSubItem(TikModelItem):
+    """Item for the subproject objects. The children are fetched on demand."""
+    __slots__ = ()
 
-class TikColumnItem(QtGui.QStandardItem):
-    def __init__(self, name, overridden=False):
-        super(TikColumnItem, self).__init__()
-
-        self.setEditable(False)
-        self.setText(name)
-        self.set_overridden(overridden)
-
-    def set_value(self, value):
-        self.setText(str(value))
-
-    def set_overridden(self, value):
-        if value:
-            self.tag_overridden()
-        else:
-            self.tag_normal()
+    def __init__(self, sub_obj):
+        super(TikSubItem, self).__init__(sub_obj)
+        self.fetched = False
 
-    def tag_overridden(self):
-        fnt = QtGui.QFont("Open Sans", 10)
-        fnt.setBold(False)
-        # make it yellow
-        self.setForeground(QtGui.QColor(255, 255, 0))
-        self.setFont(fnt)
+    @property
+    def subproject(self):
+        """The subproject object of the item."""
+        return self.tik_obj
 
-    def tag_normal(self):
-        fnt = QtGui.QFont("Open Sans", 10)
-        fnt.setBold(False)
-        self.setFont(fnt)
+    @subproject.setter
+    def subproject(self, sub_obj):
+        self.tik_obj = sub_obj
 
 
-class TikSubModel(QtGui.QStandardItemModel):
+class TikSubModel(TikObjectModel):
     def __init__(self, structure_object):
         super(TikSubModel, self).__init__()
         self.columns = ["name", "id", "path"] + list(
             structure_object.metadata_definitions.properties.keys()
         )
-        self.setHorizontalHeaderLabels(self.columns)
 
-        self.purgatory_mode =False
+        self.purgatory_mode = False
         self.project = None
         self.root_item = None
         self.set_data(structure_object)
@@ -77,105 +50,107 @@ class TikSubModel(QtGui.QStandardItemModel):
         self.project = structure_object
 
     def populate(self):
-        self.setRowCount(0)
-        visited = []
-        queue = []
-
-        # start with the initial dictionary with self subproject
-        all_data = {
-            "id": self.project.id,
-            "name": self.project.name,
-            "path": self.project.path,
-            "tasks": self.project.tasks,
-            "subs": [],  # this will be filled with the while loop
-        }
-
-        # add the initial dictionary and self into the queue
-        # Each queue item is a list.
-        # first element is the dictionary point and second is the subproject object
-        parent_row = self
+        """Reset the model to the project root.
+
+        The subprojects are fetched level by level as they are expanded.
+        """
+        self.beginResetModel()
         self.root_item = TikSubItem(self.project)
-        # make the self.root_item invisible
-        self.root_item.setForeground(QtGui.QColor(0, 0, 0, 0))
-        self.root_item.setText("Project Root")
-        parent_row.appendRow(self.root_item)
-        queue.append([all_data, self.project, self.root_item])
-
-        while queue:
-            current = queue.pop(0)
-            parent = current[0]
-            sub = current[1]
-            parent_row = current[2]
-
-            for neighbour in list(sub.subs.values()):
-                if neighbour not in visited:
-                    sub_data = {
-                        "id": neighbour.id,
-                        "name": neighbour.name,
-                        "path": neighbour.path,
-                        "tasks": neighbour.tasks,
-                        "deleted": neighbour.deleted,
-                        "subs": [],  # this will be filled with the while loop
-                    }
-                    if sub_data["deleted"] and not self.purgatory_mode:
-                        continue
-                    parent["subs"].append(sub_data)
-                    _item = self.append_sub(neighbour, parent_row)
-
-                    # add tasks
-                    visited.append(neighbour)
-                    queue.append([sub_data, neighbour, _item])
-
-        return all_data
+        self.root_item.model = self
+        self.root_item._parent = self.invisible_root  # pylint: disable=protected-access
+        self.invisible_root.children = [self.root_item]
+        self.endResetModel()
+
+    def _is_visible(self, sub_obj):
+        """Deleted subprojects are only visible in purgatory mode."""
+        return self.purgatory_mode or not sub_obj.deleted
+
+    def fetch_children(self, item):
+        return [
+            TikSubItem(sub) for sub in list(item.subproject.subs.values())
+            if self._is_visible(sub)
+        ]
+
+    def has_unfetched_children(self, item):
+        return any(self._is_visible(sub) for sub in list(item.subproject.subs.values()))
+
+    def _fetched_children(self, item):
+        """Return the children of the item, fetching them if needed."""
+        self.fetch_item(item)
+        return item.children
+
+    def fetch_all(self):
+        """Fetch the whole tree."""
+        for _item in utils.walk_tree(self.invisible_root, self._fetched_children):
+            pass
+
+    def item_data(self, item, column, role):
+        sub_obj = item.subproject
+        if role == QtCore.Qt.DisplayRole:
+            if column == 0:
+                return "Project Root" if item is self.root_item else sub_obj.name
+            if column == 1:
+                return str(sub_obj.id)
+            if column == 2:
+                return sub_obj.path
+            return str(sub_obj.metadata.get_value(self.columns[column], ""))
+        if role == QtCore.Qt.FontRole:
+            if column == 0:
+                return cached_font(12, italic=sub_obj.deleted)
+            return cached_font(10)
+        if role == QtCore.Qt.ForegroundRole:
+            if column == 0:
+                if item is self.root_item:
+                    # make the root item invisible
+                    return cached_color((0, 0, 0, 0))
+                return cached_color((255, 0, 0) if sub_obj.deleted else (255, 255, 255))
+            if column > 2 and sub_obj.metadata.is_overridden(self.columns[column]):
+                # make it yellow
+                return cached_color((255, 255, 0))
+            return None
+        if role == QtCore.Qt.DecorationRole and column == 0:
+            if sub_obj.deleted:
+                return cached_icon(f"{sub_obj.type}-ghost.png")
+            return cached_icon(f"{sub_obj.type}.png")
+        return None
 
     def append_sub(self, sub_obj, parent):
-        _sub_item = TikSubItem(sub_obj)
-        # generate the column texts
-        # name, id and path are mandatory, start with them
-        _row = [_sub_item, TikColumnItem(str(sub_obj.id)), TikColumnItem(sub_obj.path)]
-        for column in self.columns[3:]:  # skip the first 3 columns which are mandatory
-            # get the override status
-            _column_value = sub_obj.metadata.get_value(column, "")
-            _overridden = sub_obj.metadata.is_overridden(column)
-            _column_item = TikColumnItem(str(_column_value), _overridden)
-            _row.append(_column_item)
-
-        parent.appendRow(_row)
-        return _sub_item
+        """Add the subproject under the parent item.
+
+        Nothing is added if the children of the parent are not fetched yet.
+        The subproject is picked up when they are fetched.
+        """
+        if not parent.fetched:
+            return None
+        return self.appendRow(TikSubItem(sub_obj), parent)
 
     def update_item(self, item, sub_obj):
         """Update the item with the new subproject object"""
         item.subproject = sub_obj
-        item.setText(sub_obj.name)
-
-        # get the parent item
-        _parent = item.parent()
-
-        # get the row of the item
-        _row = item.row()
-
-        for index, column in enumerate(self.columns):
-            if _parent:
-                _column_item = _parent.child(_row, index)
-            else:
-                _column_item = self.item(_row, index)
-            if isinstance(_column_item, TikColumnItem):
-                _column_value = sub_obj.metadata.get_value(column, "")
-                _overridden = sub_obj.metadata.is_overridden(column)
-                _column_item.set_overridden(_overridden)
-                _column_item.set_value(str(_column_value))
+        item.refresh()
 
     def find_item_by_id_column(self, unique_id):
-        """Search entire tree and find the matching item."""
-
-        # get EVERY item in this model
-        _all_items = self.findItems(
-            "*", QtCore.Qt.MatchWildcard | QtCore.Qt.MatchRecursive
-        )
-        for x in _all_items:
-            if isinstance(x, TikSubItem):
-                if x.subproject.id == unique_id:
-                    return x
+        """Find the item of the subproject, fetching its parents if needed."""
+        if self.root_item is None:
+            return None
+        sub = self.project.find_sub_by_id(unique_id)
+        if not isinstance(sub, tik_manager4.objects.subproject.Subproject):
+            return None
+        chain = []
+        while sub is not None and sub.id != self.project.id:
+            chain.append(sub)
+            sub = sub.parent
+        if sub is None:
+            return None
+        item = self.root_item
+        for sub in reversed(chain):
+            self.fetch_item(item)
+            item = next(
+                (child for child in item.children if child.subproject.id == sub.id), None
+            )
+            if item is None:
+                return None
+        return item
 
 
 class TikSubView(QtWidgets.QTreeView):
@@ -257,26 +232,9 @@ class TikSubView(QtWidgets.QTreeView):
         index = self.proxy_model.mapFromSource(self.model.index(0, 0))
         self.setCurrentIndex(index)
 
-    def find_items_in_tree(self, root_item, text):
-        matched_items = []
-
-        # Search for items in the root item
-        matched_items += root_item.findItems(text, QtCore.Qt.MatchExactly, column=1)
-
-        # Recursively search for items in each child item
-        for child_item in root_item.childItems():
-            matched_items += self.find_items_in_tree(child_item, text)
-
-        return matched_items
-
     def get_items_count(self):
-        """Return the number of items in the tree under selected one"""
-
-        # count all items
-        _all_items = self.model.findItems(
-            "*", QtCore.Qt.MatchWildcard | QtCore.Qt.MatchRecursive
-        )
-        return len(_all_items)
+        """Return the number of fetched items in the tree."""
+        return sum(1 for _ in self.model.iter_items())
 
     def select_by_id(self, unique_id, append=False):
         """Look at the id column and select
@@ -347,6 +305,7 @@ class TikSubView(QtWidgets.QTreeView):
         _item = self.model.itemFromIndex(index)
         if _item:
             if _item.subproject.id in expanded_state:
+                self.model.fetch_item(_item)
                 self.expand(view_index)
 
         for row in range(self.model.rowCount(index)):
@@ -392,30 +351,29 @@ class TikSubView(QtWidgets.QTreeView):
         self.resizeColumnToContents(4)
 
     @staticmethod
-    def collect_tasks(sub_items, recursive=True, filtered=True):
+    def collect_tasks(sub_items, recursive=True, filtered=True, force=False):
         if not isinstance(sub_items, list):
             sub_items = [sub_items]
         for sub_item in sub_items:
             if not isinstance(sub_item, tik_manager4.objects.subproject.Subproject):
                 # just to prevent crashes if something goes wrong
                 return
-            sub_item.scan_tasks()
-            tasks = sub_item.tasks if filtered else sub_item.all_tasks
-            for key, value in tasks.items():
-                yield value
-
-            if recursive:
-                queue = list(sub_item.subs.values())
-                while queue:
-                    sub = queue.pop(0)
-                    sub.scan_tasks()
-                    tasks = sub.tasks if filtered else sub.all_tasks
-                    for key, value in tasks.items():
-                        yield value
-                    queue.extend(list(sub.subs.values()))
-
-    def get_tasks(self, idx=None):
-        """Returns the tasks of the selected subproject"""
+            for sub, _parent, _depth in utils.walk_tree(
+                    sub_item, lambda sub: list(sub.subs.values()),
+                    max_depth=None if recursive else 0):
+                sub.scan_tasks(force=force)
+                tasks = sub.tasks if filtered else sub.all_tasks
+                for key, value in tasks.items():
+                    yield value
+
+    def get_tasks(self, idx=None, force=False):
+        """Returns the tasks of the selected subproject
+
+        Args:
+            idx (QModelIndex, optional): Not used.
+            force (bool, optional): If True, the task folders are scanned
+                even if they have not changed.
+        """
         selected_indexes = self.selectedIndexes()
 
         if not selected_indexes:
@@ -431,7 +389,8 @@ class TikSubView(QtWidgets.QTreeView):
             if _item:
                 sub_project_objects.append(_item.subproject)
         _tasks = self.collect_tasks(
-            sub_project_objects, recursive=self._recursive_task_scan, filtered=not self.purgatory_mode
+            sub_project_objects, recursive=self._recursive_task_scan, filtered=not self.purgatory_mode,
+            force=force
         )
         self.item_selected.emit(_tasks)
 
@@ -619,21 +578,10 @@ class TikSubView(QtWidgets.QTreeView):
             # TODO: is this overcomplicated?
             _new_sub = _dialog.get_created_subproject()
             # Find the parent item _new_sub id
-            _items = self.model.findItems(
-                str(_new_sub.parent.id), QtCore.Qt.MatchRecursive, 1
-            )
-            if _items:
-                _item_at_id_column = _items[0]
-                # find the index of the item
-                _index = self.model.indexFromItem(_item_at_id_column)
-                # make sure the index is pointing to the first column
-                first_column_index = _index.sibling(_index.row(), 0)
-                # get the item from index
-                parent_item = self.model.itemFromIndex(first_column_index)
-                # The reason we are doing this is that we may change
-                # the parent of the item on new subproject UI
-            else:
-                parent_item = self.model.root_item
+            # The reason we are doing this is that we may change
+            # the parent of the item on new subproject UI
+            parent_item = (self.model.find_item_by_id_column(_new_sub.parent.id)
+                           or self.model.root_item)
 
             self.model.append_sub(_new_sub, parent_item)
 
@@ -719,15 +667,12 @@ class ProxyModel(FilterModel):
     def __init__(self, parent=None):
         super(ProxyModel, self).__init__(parent=parent)
 
-    def filterAcceptsRow(self, source_row, source_parent):
-        model = self.sourceModel()
-        index = model.index(source_row, 0, QtCore.QModelIndex())
-
-        item = model.itemFromIndex(index)
-        if isinstance(item, TikSubItem):
-            pass
-
-        return super(ProxyModel, self).filterAcceptsRow(source_row, source_parent)
+    @QtCore.Slot(str)
+    def set_filter_text(self, text):
+        # the filter needs to see the subprojects which are not fetched yet.
+        if text and isinstance(self.sourceModel(), TikSubModel):
+            self.sourceModel().fetch_all()
+        super(ProxyModel, self).set_filter_text(text)
 
 
 class TikSubProjectWidget(QtWidgets.QWidget):
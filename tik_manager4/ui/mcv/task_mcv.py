@@ -1,21 +1,29 @@
 
 import webbrowser
-from tik_manager4.ui.Qt import QtWidgets, QtCore, QtGui
+from tik_manager4.ui.Qt import QtWidgets, QtCore
 from tik_manager4.core import filelog
 from tik_manager4.ui.dialog.feedback import Feedback
 import tik_manager4.ui.dialog.task_dialog
 from tik_manager4.ui.widgets.common import HorizontalSeparator, TikIconButton
 from tik_manager4.ui.widgets.style import ColorKeepingDelegate
 from tik_manager4.ui.mcv.filter import FilterModel, FilterWidget
+from tik_manager4.ui.mcv.loader import BackgroundLoader
+from tik_manager4.ui.mcv.object_model import (
+    TikModelItem,
+    TikObjectModel,
+    cached_color,
+    cached_font,
+    cached_icon,
+)
 from tik_manager4.objects.guard import Guard
 
-from tik_manager4.ui import pick
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
 
-class TikTaskItem(QtGui.QStandardItem):
+class TikTaskItem(TikModelItem):
     """Item class for the task view"""
+    __slots__ = ()
     color_dict = {
         "asset": (0, 187, 184),
         "shot": (0, 115, 255),
@@ -24,65 +32,34 @@ class TikTaskItem(QtGui.QStandardItem):
         "deleted": (255, 0, 0),
     }
 
-    def __init__(self, task_obj):
-        """
-        Initialize the item with the given task object.
-        Args:
-            task_obj (tik_manager4.objects.task.Task): Task object
-        """
-        super(TikTaskItem, self).__init__()
-
-        # # test
-        _icon = pick.icon(f"{task_obj.type}.png")
-        self.setIcon(_icon)
-
-        self.task = task_obj
-        #
-        self.fnt = QtGui.QFont("Open Sans", 12)
-        self.fnt.setBold(True)
-        self.setEditable(False)
-
-        self._state = None
-
-        self.setText(task_obj.nice_name or task_obj.name)
-
-        self.refresh()
-
-    def refresh(self):
-        """Refresh the item"""
-        self.set_state(self.task.state)
+    @property
+    def task(self):
+        """The task object of the item."""
+        return self.tik_obj
 
+    def foreground(self):
+        """Return the text color of the item."""
         if self.task.deleted:
-            self.setForeground(QtGui.QColor(255, 0, 0))
-            self.setFont(QtGui.QFont("Open Sans", 12, italic=True))
-            _icon = pick.icon(f"{self.task.type}-ghost.png")
-            self.setIcon(_icon)
-
-    def set_state(self, state):
-        """Set the state of the item.
-
-        Args:
-            state (str): State of the task
-        """
-        self._state = state
-        _color = self.color_dict.get(self.task.type, (255, 255, 255))
-        self.fnt.setStrikeOut(state == "omitted")
-        self.setFont(self.fnt)
-        self.setForeground(QtGui.QColor(*_color))
-
-        # it its deleted make is transparent and italic
-        if state == "deleted":
-            self.setForeground(QtGui.QColor(255, 0, 0, 100))
-            self.setFont(QtGui.QFont("Open Sans", 12, italic=True))
-
-
-class TikTaskColumnItem(QtGui.QStandardItem):
-    def __init__(self, text):
-        super(TikTaskColumnItem, self).__init__(text)
-        self.setEditable(False)
+            return (255, 0, 0)
+        if self.task.state == "deleted":
+            return (255, 0, 0, 100)
+        return self.color_dict.get(self.task.type, (255, 255, 255))
+
+    def font(self):
+        """Return the font of the item."""
+        if self.task.deleted or self.task.state == "deleted":
+            # it its deleted make is transparent and italic
+            return cached_font(12, italic=True)
+        return cached_font(12, bold=True, strike_out=self.task.state == "omitted")
+
+    def icon(self):
+        """Return the icon of the item."""
+        if self.task.deleted:
+            return cached_icon(f"{self.task.type}-ghost.png")
+        return cached_icon(f"{self.task.type}.png")
 
 
-class TikTaskModel(QtGui.QStandardItemModel):
+class TikTaskModel(TikObjectModel):
     columns = ["name", "id", "path"]
     filter_key = "super"
 
@@ -90,41 +67,57 @@ class TikTaskModel(QtGui.QStandardItemModel):
         """Initialize the model"""
         super(TikTaskModel, self).__init__()
         self.purgatory_mode = False
-        self.setHorizontalHeaderLabels(self.columns)
 
         self._tasks = []
 
     def clear(self):
         """Clear the model"""
         self._tasks = []
-        self.setRowCount(0)
+        super(TikTaskModel, self).clear()
+
+    def item_data(self, item, column, role):
+        """Return the data of the task for the given column and role."""
+        task = item.task
+        if role == QtCore.Qt.DisplayRole:
+            if column == 0:
+                return task.nice_name or task.name
+            if column == 1:
+                return str(task.id)
+            return task.path
+        if column != 0:
+            return None
+        if role == QtCore.Qt.ForegroundRole:
+            return cached_color(item.foreground())
+        if role == QtCore.Qt.FontRole:
+            return item.font()
+        if role == QtCore.Qt.DecorationRole:
+            return item.icon()
+        return None
 
     def append_task(self, task_obj):
         """Append a task to the model"""
-        self._tasks.append(task_obj)
-        _task_item = TikTaskItem(task_obj)
-        pid = TikTaskColumnItem(str(task_obj.id))
-        path = TikTaskColumnItem(task_obj.path)
-
-        self.appendRow(
-            [
-                _task_item,
-                pid,
-                path,
-            ]
-        )
-        return _task_item
+        return self.append_tasks([task_obj])[0]
+
+    def append_tasks(self, task_objects):
+        """Append the tasks to the model with a single insertion.
+
+        Args:
+            task_objects (list): List of task objects.
+
+        Returns:
+            list: The created items.
+        """
+        self._tasks.extend(task_objects)
+        items = [TikTaskItem(task_obj) for task_obj in task_objects]
+        self.append_rows(items)
+        return items
 
     def find_item_by_id_column(self, unique_id):
         """Search entire tree and find the matching item."""
-        # get EVERY item in this model
-        _all_items = self.findItems(
-            "*", QtCore.Qt.MatchWildcard | QtCore.Qt.MatchRecursive
-        )
-        for x in _all_items:
-            if isinstance(x, TikTaskItem):
-                if x.task.id == unique_id:
-                    return x
+        for item in self.invisible_root.children:
+            if item.task.id == unique_id:
+                return item
+        return None
 
     def is_multi_subproject(self):
         """Return True if the tasks in the model belong to multiple subprojects."""
@@ -164,6 +157,13 @@ class TikTaskView(QtWidgets.QTreeView):
 
         self.is_management_locked = False
 
+        # tasks are collected on a worker thread and appended in batches.
+        self.loader = BackgroundLoader(parent=self)
+        self.loader.batch_loaded.connect(self._append_batch)
+        self.loader.loading_finished.connect(self._on_loading_finished)
+        self._loaded_ids = set()
+        self._pending_selection = None
+
         # SIGNALS
 
         self.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
@@ -246,15 +246,18 @@ class TikTaskView(QtWidgets.QTreeView):
 
     def select_first_item(self):
         """Select the first item in the view."""
+        self.loader.wait()
         idx = self.proxy_model.index(0, 0)
         self.setCurrentIndex(idx)
 
     def get_items_count(self):
         """Return the number of items in the view."""
+        self.loader.wait()
         return self.proxy_model.rowCount()
 
     def select_by_id(self, unique_id):
         """Select the item with the given id"""
+        self.loader.wait()
         # get the index of the item
         match_item = self.model.find_item_by_id_column(unique_id)
         if match_item:
@@ -266,20 +269,41 @@ class TikTaskView(QtWidgets.QTreeView):
         return False
 
     def set_tasks(self, tasks_gen):
-        """Set the data for the model"""
+        """Set the data for the model.
+
+        The tasks are collected on a worker thread. Any running collection
+        is cancelled.
+
+        Args:
+            tasks_gen (iterable): Tasks or a generator scanning the tasks.
+        """
+        pending_selection = self._pending_selection
+        self.loader.cancel()
         # get the selected item
         selected_item = self.get_selected_item()
+        self._pending_selection = selected_item.task.id if selected_item else pending_selection
         self.model.clear()
-        for task in tasks_gen:
+        self._loaded_ids = set()
+        self.loader.start(iter, tasks_gen)
+
+    def _append_batch(self, tasks):
+        """Append a batch of loaded tasks to the model."""
+        new_tasks = []
+        for task in tasks:
             # if the task is already in model, skip it
-            if self.model.find_item_by_id_column(task.id):
+            if task.id in self._loaded_ids:
                 continue
+            self._loaded_ids.add(task.id)
+            new_tasks.append(task)
+        self.model.append_tasks(new_tasks)
 
-            self.model.append_task(task)
+    def _on_loading_finished(self):
+        """Restore the selection after the tasks are loaded."""
         self.expandAll()
         # if the item still exists, select it
-        if selected_item:
-            self.select_by_id(selected_item.task.id)
+        selection, self._pending_selection = self._pending_selection, None
+        if selection is not None and not self.loader.is_loading:
+            self.select_by_id(selection)
 
     def get_selected_item(self):
         """Return the selected item"""
@@ -294,7 +318,9 @@ class TikTaskView(QtWidgets.QTreeView):
 
     def add_tasks(self, tasks):
         """Add a task to the model"""
-        _ = [self.model.append_task(x) for x in tasks]
+        self.loader.wait()
+        self._loaded_ids.update(task.id for task in tasks)
+        self.model.append_tasks(list(tasks))
         self.expandAll()
 
     def header_right_click_menu(self, position):
@@ -513,6 +539,21 @@ class TikTaskWidget(QtWidgets.QWidget):
             self.task_view.hideColumn(idx)
 
         self.refresh_btn.clicked.connect(lambda: self.refresh())
+        self.task_view.loader.loading_started.connect(lambda: self.set_loading_state(True))
+        self.task_view.loader.progress.connect(lambda count: self.set_loading_state(True, count))
+        self.task_view.loader.loading_finished.connect(lambda: self.set_loading_state(False))
+
+    def set_loading_state(self, state, count=0):
+        """Show the loading state on the header.
+
+        Args:
+            state (bool): Whether the tasks are loading or not.
+            count (int, optional): Number of tasks loaded so far.
+        """
+        if not state:
+            self.label.setText("Tasks")
+            return
+        self.label.setText(f"Tasks (loading {count}...)" if count else "Tasks (loading...)")
 
     def set_purgatory_mode(self, value):
         self.purgatory_mode = value
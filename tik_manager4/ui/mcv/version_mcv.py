@@ -4,7 +4,8 @@ from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass
 
-from tik_manager4.core.constants import ObjectType, ValidationResult, ValidationState
+from tik_manager4.core.constants import ObjectType, ValidationResult, ValidationState, PostPublishStates
+from tik_manager4.objects import post_publish
 from tik_manager4.ui.Qt import QtWidgets, QtCore, QtGui
 from tik_manager4.ui.dialog.feedback import Feedback
 from tik_manager4.ui.widgets.common import TikButton, HorizontalSeparator, TikIconButton
@@ -129,6 +130,7 @@ class VersionWidgets:
     promote_btn: TikIconButton
     preview_btn: TikIconButton
     last_modified_lbl: QtWidgets.QLabel
+    post_publish_lbl: QtWidgets.QLabel
     owner_lbl: QtWidgets.QLabel
     info_btn: TikIconButton
 
@@ -194,6 +196,7 @@ class TikVersionWidget(QtWidgets.QWidget):
             promote_btn=TikIconButton(icon_name="star.png", circle=False, size=30),
             preview_btn=TikIconButton(icon_name="player.png", circle=False, size=30),
             last_modified_lbl = QtWidgets.QLabel("---"),
+            post_publish_lbl=QtWidgets.QLabel(""),
             owner_lbl=QtWidgets.QLabel("Owner: "),
             info_btn=TikIconButton(icon_name="info.png", circle=False, size=30)
         )
@@ -282,6 +285,9 @@ class TikVersionWidget(QtWidgets.QWidget):
         self.version.last_modified_lbl.setFont(QtGui.QFont("Roboto", 8))
         # make the color grey
         self.version.last_modified_lbl.setStyleSheet("color: grey;")
+        self.version.post_publish_lbl.setFont(QtGui.QFont("Roboto", 8))
+        self.version.post_publish_lbl.setHidden(True)
+        date_layout.addWidget(self.version.post_publish_lbl)
         date_layout.addStretch()
         date_layout.addWidget(self.version.last_modified_lbl)
 
@@ -771,8 +777,10 @@ class TikVersionWidget(QtWidgets.QWidget):
             # trigger the element type changed manually
             self.element_type_changed(self.element.element_combo.currentText())
             owner = _version.creator
+            self.update_post_publish_state(_version)
         else:  # WORK
             self.version.promote_btn.setHidden(True)
+            self.version.post_publish_lbl.setHidden(True)
             self.element.element_combo.setEnabled(False)
             self.element.element_view_btn.setEnabled(False)
             self.element.ingest_with_combo.setEnabled(False)
@@ -789,9 +797,42 @@ class TikVersionWidget(QtWidgets.QWidget):
         self.element.element_combo.blockSignals(False)
         self.element.ingest_with_combo.blockSignals(False)
 
+    def update_post_publish_state(self, version_obj):
+        """Show the state of the post publish steps of the publish version."""
+        # the steps may have been run in the background since the last read.
+        version_obj.refresh()
+        data = version_obj.post_publish or {}
+        state = data.get("state")
+        if not state or state == PostPublishStates.DONE.value:
+            self.version.post_publish_lbl.setHidden(True)
+            return
+        color = "red" if state == PostPublishStates.FAILED.value else "orange"
+        self.version.post_publish_lbl.setText(f"Post publish {state}")
+        self.version.post_publish_lbl.setStyleSheet(f"color: {color};")
+        messages = [
+            f"{step['name']}: {step['message'] or step['state']}"
+            for step in data["steps"]
+            if step["state"] != PostPublishStates.DONE.value
+        ]
+        self.version.post_publish_lbl.setToolTip("\n".join(messages))
+        self.version.post_publish_lbl.setHidden(False)
+
+    def on_retry_post_publish(self):
+        """Queue the failed post publish steps of the selected version again."""
+        _version = self.version.combo.get_current_item()
+        if not _version:
+            return
+        state, msg = post_publish.QUEUE.retry(_version)
+        if not state:
+            self.feedback.pop_info(title="Cannot retry", text=msg, critical=True)
+            return
+        self.status_updated.emit(msg, 5000)
+        self.update_post_publish_state(_version)
+
     def clear_version_info(self):
         """Clear the version info widgets."""
         self.version.last_modified_lbl.setText("---")
+        self.version.post_publish_lbl.setHidden(True)
         self.version.owner_lbl.setText("Owner: ")
         self.info.notes_editor.clear()
         self.info.thumbnail.clear()
@@ -1052,6 +1093,16 @@ class TikVersionWidget(QtWidgets.QWidget):
                 self.tr("Publish Snapshot")
             )
             publish_snapshot_act.triggered.connect(self.publish_snapshot)
+        else:
+            _version = self.version.combo.get_current_item()
+            if _version:
+                _version.refresh()
+            if _version and _version.post_publish_state not in ("", PostPublishStates.DONE.value) \
+                    and not post_publish.QUEUE.is_active(_version):
+                retry_post_publish_act = right_click_menu.addAction(
+                    self.tr("Retry Post Publish")
+                )
+                retry_post_publish_act.triggered.connect(self.on_retry_post_publish)
 
         right_click_menu.addSeparator()
         open_scene_folder_action = right_click_menu.addAction(self.tr("Open Scene Folder"))